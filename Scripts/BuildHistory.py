@@ -0,0 +1,265 @@
+"""
+--------------------------------------------------------------------------------
+File:        BuildHistory.py
+
+Description: Local SQLite history of the builds of automation.py. Each build
+             is stored with its V-ECU, target, configuration, input
+             fingerprint, return code, number of COM calls and the times of
+             its phases, which are taken from the spans of Profiling.Spans:
+                 with BuildHistory.History("BuildHistory.sqlite") as history:
+                     buildId = history.AddBuild("OpenSUT_Example", "HostPC32/GCC", "Debug",
+                         fingerprint, returnCode, BuildHistory.PhaseTimes(Profiling.Spans))
+                     for regression in history.FindRegressions(buildId):
+                         print(regression)
+             A phase has regressed if it took more than the threshold longer
+             than the median of the same phase in the last successful builds
+             of the same V-ECU, target and configuration.
+
+Tip/Remarks: Command line, exits with 1 if regressions are found:
+                 python BuildHistory.py trend --vecu OpenSUT_Example --phase "VEOS build"
+                 python BuildHistory.py regressions --threshold 0.25 --window 10
+             Options of both commands: --database, --vecu, --target,
+             --configuration. "regressions" checks the last build of each
+             V-ECU, target and configuration unless --build is given.
+
+Limitations: Phases which a build did not reach, e.g. the VEOS build after
+             a failed export, do not count for the baseline of these phases.
+--------------------------------------------------------------------------------
+"""
+
+import argparse
+import datetime
+import os
+import socket
+import sqlite3
+import statistics
+import sys
+
+# Default file of the history.
+DefaultDatabase = "BuildHistory.sqlite"
+
+# A phase has regressed if it took more than this fraction longer than its baseline.
+DefaultThreshold = 0.25
+
+# Number of the last successful builds which form the baseline.
+DefaultWindow = 10
+
+# Increases below this number of seconds are no regression.
+MinIncrease = 1.0
+
+# Name of the span of the whole build in automation.py.
+BuildSpanName = "build"
+
+_Schema = """
+CREATE TABLE IF NOT EXISTS Builds (
+    BuildId INTEGER PRIMARY KEY AUTOINCREMENT,
+    StartTime TEXT NOT NULL,
+    Host TEXT,
+    VEcuName TEXT,
+    Target TEXT,
+    Configuration TEXT,
+    Fingerprint TEXT,
+    ReturnCode INTEGER,
+    Seconds REAL,
+    ComCalls INTEGER
+);
+CREATE TABLE IF NOT EXISTS Phases (
+    BuildId INTEGER NOT NULL REFERENCES Builds(BuildId),
+    PhaseName TEXT NOT NULL,
+    Seconds REAL NOT NULL,
+    PRIMARY KEY (BuildId, PhaseName)
+);
+CREATE INDEX IF NOT EXISTS BuildsByKey ON Builds (VEcuName, Target, Configuration, BuildId);
+"""
+
+
+def PhaseTimes(spanProfiler, buildSpanName=BuildSpanName):
+    """
+    Returns a list of tuples (phaseName, seconds) with the build span and the
+    spans directly below it, from the totals of a Profiling.SpanProfiler.
+    """
+    phases = []
+    for (path, (count, totalNs, childNs)) in spanProfiler.Totals.items():
+        if path[0] == buildSpanName and len(path) <= 2:
+            phases.append((path[-1], totalNs / 1e9))
+    return phases
+
+
+class Regression():
+    """
+    Phase of a build which took longer than its baseline allows.
+    """
+    def __init__(self, buildId, vEcuName, target, configuration, phaseName, seconds, baselineSeconds, baselineCount):
+        self.BuildId = buildId
+        self.VEcuName = vEcuName
+        self.Target = target
+        self.Configuration = configuration
+        self.PhaseName = phaseName
+        self.Seconds = seconds
+        # Median of the phase in the last successful builds.
+        self.BaselineSeconds = baselineSeconds
+        self.BaselineCount = baselineCount
+
+    def __str__(self):
+        return "Build %d (%s, %s, %s): %s took %.1f s, baseline %.1f s of %d builds (+%.0f%%)" % \
+            (self.BuildId, self.VEcuName, self.Target, self.Configuration, self.PhaseName, self.Seconds, \
+            self.BaselineSeconds, self.BaselineCount, 100.0 * (self.Seconds / self.BaselineSeconds - 1.0))
+
+
+class History():
+    """
+    Build history in a SQLite database, which is created on first use.
+    """
+    def __init__(self, fileName=DefaultDatabase):
+        self.FileName = fileName
+        self._Connection = sqlite3.connect(fileName)
+        self._Connection.executescript(_Schema)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, excType, excValue, excTraceback):
+        self.Close()
+
+    def Close(self):
+        """
+        Closes the database.
+        """
+        if self._Connection != None:
+            self._Connection.close()
+            self._Connection = None
+
+    def AddBuild(self, vEcuName, target, configuration, fingerprint, returnCode, phases, comCalls=None, startTime=None):
+        """
+        Appends a build with its phases as tuples (phaseName, seconds) and
+        returns its id. The time of the build span is the time of the build.
+        """
+        if startTime == None:
+            startTime = datetime.datetime.now()
+        seconds = dict(phases).get(BuildSpanName)
+        with self._Connection:
+            cursor = self._Connection.execute("INSERT INTO Builds (StartTime, Host, VEcuName, Target, Configuration, "
+                "Fingerprint, ReturnCode, Seconds, ComCalls) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (startTime.isoformat(timespec="seconds"), socket.gethostname(), vEcuName, target, configuration, \
+                fingerprint, returnCode, seconds, comCalls))
+            buildId = cursor.lastrowid
+            self._Connection.executemany("INSERT OR REPLACE INTO Phases (BuildId, PhaseName, Seconds) VALUES (?, ?, ?)",
+                [(buildId, phaseName, phaseSeconds) for (phaseName, phaseSeconds) in phases])
+        return buildId
+
+    def Trend(self, vEcuName=None, target=None, configuration=None, phaseName=None, limit=20):
+        """
+        Returns the phases of the last builds, oldest first, as tuples
+        (buildId, startTime, vEcuName, target, configuration, returnCode,
+        comCalls, phaseName, seconds).
+        """
+        (condition, parameters) = _KeyCondition(vEcuName, target, configuration)
+        parameters.append(limit)
+        phaseCondition = ""
+        if phaseName != None:
+            phaseCondition = " AND p.PhaseName = ?"
+            parameters.append(phaseName)
+        return self._Connection.execute("SELECT b.BuildId, b.StartTime, b.VEcuName, b.Target, b.Configuration, "
+            "b.ReturnCode, b.ComCalls, p.PhaseName, p.Seconds FROM Builds b JOIN Phases p ON p.BuildId = b.BuildId "
+            "WHERE b.BuildId IN (SELECT BuildId FROM Builds b WHERE " + condition + " ORDER BY BuildId DESC LIMIT ?)" \
+            + phaseCondition + " ORDER BY b.BuildId, p.Seconds DESC", parameters).fetchall()
+
+    def LastBuildIds(self, vEcuName=None, target=None, configuration=None):
+        """
+        Returns the id of the last build of each V-ECU, target and configuration.
+        """
+        (condition, parameters) = _KeyCondition(vEcuName, target, configuration)
+        return [row[0] for row in self._Connection.execute("SELECT MAX(BuildId) FROM Builds b WHERE " + condition + \
+            " GROUP BY VEcuName, Target, Configuration ORDER BY 1", parameters)]
+
+    def FindRegressions(self, buildId, threshold=DefaultThreshold, window=DefaultWindow, minIncrease=MinIncrease):
+        """
+        Returns a Regression for each phase of a build which took more than
+        the threshold longer than the median of the phase in the last window
+        successful builds before it with the same V-ECU, target and
+        configuration.
+        """
+        build = self._Connection.execute("SELECT VEcuName, Target, Configuration FROM Builds WHERE BuildId = ?",
+            (buildId,)).fetchone()
+        if build == None:
+            raise Exception("Build %d is not in the history %s." % (buildId, self.FileName))
+        (vEcuName, target, configuration) = build
+        regressions = []
+        for (phaseName, seconds) in self._Connection.execute("SELECT PhaseName, Seconds FROM Phases WHERE BuildId = ?",
+            (buildId,)).fetchall():
+            baseline = [row[0] for row in self._Connection.execute("SELECT p.Seconds FROM Builds b "
+                "JOIN Phases p ON p.BuildId = b.BuildId WHERE b.VEcuName IS ? AND b.Target IS ? "
+                "AND b.Configuration IS ? AND b.ReturnCode = 0 AND b.BuildId < ? AND p.PhaseName = ? "
+                "ORDER BY b.BuildId DESC LIMIT ?", (vEcuName, target, configuration, buildId, phaseName, window))]
+            if not baseline:
+                continue
+            baselineSeconds = statistics.median(baseline)
+            if seconds > baselineSeconds * (1.0 + threshold) and seconds - baselineSeconds > minIncrease:
+                regressions.append(Regression(buildId, vEcuName, target, configuration, phaseName, seconds, \
+                    baselineSeconds, len(baseline)))
+        return regressions
+
+
+def _KeyCondition(vEcuName, target, configuration):
+    """
+    Returns the WHERE condition on the table Builds b and its parameters.
+    """
+    conditions = ["1 = 1"]
+    parameters = []
+    for (column, value) in (("VEcuName", vEcuName), ("Target", target), ("Configuration", configuration)):
+        if value != None:
+            conditions.append("b.%s = ?" % column)
+            parameters.append(value)
+    return (" AND ".join(conditions), parameters)
+
+
+def _PrintTrend(history, args):
+    rows = history.Trend(args.vecu, args.target, args.configuration, args.phase, args.limit)
+    print("%6s  %-19s  %-20s %-14s %-8s %5s %9s  %-24s %10s" % \
+        ("Build", "Start", "V-ECU", "Target", "Config", "Exit", "COM calls", "Phase", "Seconds"))
+    for (buildId, startTime, vEcuName, target, configuration, returnCode, comCalls, phaseName, seconds) in rows:
+        print("%6d  %-19s  %-20s %-14s %-8s %5s %9s  %-24s %10.1f" % (buildId, startTime, vEcuName, target, \
+            configuration, returnCode, "" if comCalls == None else comCalls, phaseName, seconds))
+
+
+def _PrintRegressions(history, args):
+    if args.build != None:
+        buildIds = [args.build]
+    else:
+        buildIds = history.LastBuildIds(args.vecu, args.target, args.configuration)
+    regressions = []
+    for buildId in buildIds:
+        regressions.extend(history.FindRegressions(buildId, args.threshold, args.window, args.min_increase))
+    for regression in regressions:
+        print("*** Regression: %s" % regression)
+    if not regressions:
+        print("No regressions in %d builds." % len(buildIds))
+    return regressions
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Build history of automation.py")
+    parser.add_argument("--database", default=DefaultDatabase, help="SQLite file of the history")
+    subparsers = parser.add_subparsers(dest="command")
+    subparsers.required = True
+    trendParser = subparsers.add_parser("trend", help="Print the phase times of the last builds")
+    trendParser.add_argument("--phase", help="Name of the phase")
+    trendParser.add_argument("--limit", type=int, default=20, help="Number of builds")
+    regressionsParser = subparsers.add_parser("regressions", help="Check builds against their baseline")
+    regressionsParser.add_argument("--build", type=int, help="Id of the build, default the last build of each key")
+    regressionsParser.add_argument("--threshold", type=float, default=DefaultThreshold, help="Allowed increase, e.g. 0.25")
+    regressionsParser.add_argument("--window", type=int, default=DefaultWindow, help="Number of builds of the baseline")
+    regressionsParser.add_argument("--min-increase", type=float, default=MinIncrease, help="Smallest regression in seconds")
+    for subparser in (trendParser, regressionsParser):
+        subparser.add_argument("--vecu", help="Name of the V-ECU")
+        subparser.add_argument("--target", help="Build target, e.g. HostPC32/GCC")
+        subparser.add_argument("--configuration", help="Build configuration, e.g. Debug")
+    args = parser.parse_args()
+
+    if not os.path.exists(args.database):
+        sys.exit("Cannot find the build history " + args.database + ".")
+    with History(args.database) as history:
+        if args.command == "trend":
+            _PrintTrend(history, args)
+        elif _PrintRegressions(history, args):
+            sys.exit(1)
@@ -0,0 +1,480 @@
+"""
+--------------------------------------------------------------------------------
+File:        ComTrace.py
+
+Description: Records the COM calls of a SystemDesk or VEOS Player session to a
+             trace file and replays them without the COM servers. Each record
+             holds the object, the member, the arguments, the result and the
+             duration of one call. A replayed session returns the recorded
+             results and waits the recorded durations, optionally scaled, so
+             the Python side of a slow run can be profiled on any machine:
+                 Utilities.Options.RecordComTrace = "Build.comtrace"
+                 Utilities.ConnectToSystemDesk()   # real session, recorded
+                 ...
+                 Utilities.Options.ReplayComTrace = "Build.comtrace"
+                 Utilities.ConnectToSystemDesk()   # replayed session
+             The trace file is gzip compressed, with one JSON array per line:
+                 [objectId, kind, member, arguments, result, microseconds]
+             where kind is "d" (dispatch), "g" (get), "s" (set) or "c" (call).
+             COM objects are encoded as {"o": objectId}, tuples as {"t": [...]},
+             exceptions as {"e": message} and other values as {"r": text}.
+
+Tip/Remarks: The replay serves the results of each object and member in the
+             recorded order. Calls which were made more often than recorded
+             get the last result again, calls with other arguments get the
+             results of the member, see ReplaySession.Statistics.
+
+Limitations: The trace contains the names and values of the model, so it has
+             to be handled like the project itself. Modules which the session
+             imports from the SystemDesk or VEOS installation, e.g. VeosEnums,
+             must be on the Python path for the replay.
+--------------------------------------------------------------------------------
+"""
+
+import atexit
+import collections
+import gzip
+import json
+import time
+
+# Version of the trace file format, written in the first line.
+TRACE_VERSION = 1
+
+# Open recorders and replay sessions by the name of their trace file.
+_Recorders = {}
+_ReplaySessions = {}
+
+# Types of the values which are written to the trace as they are.
+_ScalarTypes = (type(None), bool, int, float, str)
+
+
+def GetRecorder(fileName):
+    """
+    Returns the Recorder which writes to the given trace file. All sessions
+    which record to the same file share one recorder.
+    """
+    recorder = _Recorders.get(fileName)
+    if recorder == None:
+        recorder = Recorder(fileName)
+        _Recorders[fileName] = recorder
+    return recorder
+
+
+def GetReplaySession(fileName, timeScale=1.0):
+    """
+    Returns the ReplaySession for the given trace file.
+    """
+    replaySession = _ReplaySessions.get(fileName)
+    if replaySession == None:
+        replaySession = ReplaySession(fileName)
+        _ReplaySessions[fileName] = replaySession
+    replaySession.TimeScale = timeScale
+    return replaySession
+
+
+def StopRecording():
+    """
+    Closes all trace files which are recorded.
+    """
+    for recorder in _Recorders.values():
+        recorder.Close()
+    _Recorders.clear()
+
+
+class Recorder():
+    """
+    Writes the COM calls of the objects wrapped by Dispatch() to a trace file.
+    """
+    def __init__(self, fileName):
+        self.FileName = fileName
+        self._File = gzip.open(fileName, "wt", encoding="utf-8")
+        self._File.write(json.dumps({"ComTrace": TRACE_VERSION}) + "\n")
+        # Object IDs by the key of the COM object and the COM objects by ID. The
+        # objects are kept, so their keys are not reused.
+        self._ObjectIds = {}
+        self._Objects = []
+
+    def Close(self):
+        """
+        Closes the trace file.
+        """
+        if self._File != None:
+            self._File.close()
+            self._File = None
+
+    def Dispatch(self, progId, createObject):
+        """
+        Creates a COM object by the function createObject and returns it
+        wrapped as TracedObject.
+        """
+        startTime = time.perf_counter()
+        comObject = createObject(progId)
+        self._Write(0, "d", progId, (), comObject, startTime)
+        return TracedObject(comObject, self)
+
+    def Flush(self):
+        """
+        Writes the buffered records to the trace file.
+        """
+        if self._File != None:
+            self._File.flush()
+
+    def _Encode(self, value):
+        """
+        Returns the JSON representation of a value.
+        """
+        if isinstance(value, _ScalarTypes):
+            return value
+        if isinstance(value, (tuple, list)):
+            return {"t": [self._Encode(item) for item in value]}
+        if isinstance(value, BaseException):
+            return {"e": str(value)}
+        if isinstance(value, TracedObject):
+            value = value._Target
+        if _IsComObject(value):
+            return {"o": self._GetObjectId(value)}
+        return {"r": str(value)}
+
+    def _GetObjectId(self, comObject):
+        """
+        Returns the ID of a COM object. Wrappers of the same COM object get the
+        same ID.
+        """
+        objectKey = _ObjectKey(comObject)
+        objectId = self._ObjectIds.get(objectKey)
+        if objectId == None:
+            self._Objects.append(comObject)
+            objectId = len(self._Objects)
+            self._ObjectIds[objectKey] = objectId
+        return objectId
+
+    def _Write(self, objectId, kind, member, args, result, startTime):
+        """
+        Writes one record.
+        """
+        microseconds = int((time.perf_counter() - startTime) * 1000000)
+        if self._File != None:
+            record = [objectId, kind, member, self._Encode(tuple(args))["t"], self._Encode(result), microseconds]
+            self._File.write(json.dumps(record, separators=(",", ":")) + "\n")
+
+
+class TracedObject():
+    """
+    Wrapper of a COM object which records each property read, property write
+    and method call.
+    """
+    def __init__(self, target, recorder):
+        object.__setattr__(self, "_Target", target)
+        object.__setattr__(self, "_Recorder", recorder)
+        object.__setattr__(self, "_oleobj_", getattr(target, "_oleobj_", target))
+
+    def __getattr__(self, name):
+        if name.startswith("_"):
+            raise AttributeError(name)
+        recorder = self._Recorder
+        startTime = time.perf_counter()
+        try:
+            value = getattr(self._Target, name)
+        except Exception as e:
+            recorder._Write(recorder._GetObjectId(self._Target), "g", name, (), e, startTime)
+            raise
+        if callable(value) and not _IsComObject(value):
+            return _TracedMethod(self, name, value)
+        recorder._Write(recorder._GetObjectId(self._Target), "g", name, (), value, startTime)
+        return _WrapResult(value, recorder)
+
+    def __setattr__(self, name, value):
+        recorder = self._Recorder
+        startTime = time.perf_counter()
+        try:
+            setattr(self._Target, name, _Unwrap(value))
+        except Exception as e:
+            recorder._Write(recorder._GetObjectId(self._Target), "s", name, (value,), e, startTime)
+            raise
+        recorder._Write(recorder._GetObjectId(self._Target), "s", name, (value,), None, startTime)
+
+    def __eq__(self, other):
+        return self._oleobj_ == getattr(other, "_oleobj_", other)
+
+    def __ne__(self, other):
+        return not self.__eq__(other)
+
+    def __hash__(self):
+        return hash(self._oleobj_)
+
+    def __bool__(self):
+        return True
+
+    def __iter__(self):
+        return _IterateEnumerator(self._NewEnum())
+
+    def __repr__(self):
+        return "<TracedObject %r>" % (self._Target,)
+
+    def _NewEnum(self):
+        """
+        Returns the enumerator of a collection, which is recorded as well.
+        """
+        return _TracedMethod(self, "_NewEnum", self._Target._NewEnum)()
+
+
+class _TracedMethod():
+    """
+    Bound method of a TracedObject.
+    """
+    def __init__(self, owner, name, method):
+        self._Owner = owner
+        self._Name = name
+        self._Method = method
+
+    def __call__(self, *args):
+        recorder = self._Owner._Recorder
+        objectId = recorder._GetObjectId(self._Owner._Target)
+        startTime = time.perf_counter()
+        try:
+            result = self._Method(*(_Unwrap(arg) for arg in args))
+        except Exception as e:
+            recorder._Write(objectId, "c", self._Name, args, e, startTime)
+            raise
+        recorder._Write(objectId, "c", self._Name, args, result, startTime)
+        return _WrapResult(result, recorder)
+
+
+#-----------------------------
+# Replay.
+#-----------------------------
+
+class ReplaySession():
+    """
+    Serves the COM calls of a trace file. Statistics counts the replayed
+    calls ("Calls"), the calls served by the results of the member for other
+    arguments ("ArgumentMismatches") and the calls which were made more often
+    than recorded ("Repeated").
+    """
+    def __init__(self, fileName, timeScale=1.0):
+        self.FileName = fileName
+        # Factor of the recorded durations, 0 does not wait.
+        self.TimeScale = timeScale
+        self.Statistics = {"Calls": 0, "ArgumentMismatches": 0, "Repeated": 0}
+        # Recorded results by the tuple (objectId, kind, member, arguments) and
+        # by the tuple (objectId, kind, member). Each result is a tuple
+        # (result, microseconds).
+        self._Results = collections.defaultdict(collections.deque)
+        self._MemberResults = collections.defaultdict(collections.deque)
+        # Last served result by the same keys.
+        self._LastResults = {}
+        # Tuples (objectId, member) of the recorded method calls.
+        self._Methods = set()
+        # Handles of the replayed objects by ID, see ReplayObject.
+        self._Handles = {}
+        with gzip.open(fileName, "rt", encoding="utf-8") as traceFile:
+            header = json.loads(traceFile.readline())
+            if header.get("ComTrace") != TRACE_VERSION:
+                raise Exception("Unsupported COM trace file %s" % fileName)
+            for line in traceFile:
+                (objectId, kind, member, args, result, microseconds) = json.loads(line)
+                argsKey = json.dumps(args)
+                self._Results[(objectId, kind, member, argsKey)].append((result, microseconds))
+                self._MemberResults[(objectId, kind, member)].append((result, microseconds))
+                if kind == "c":
+                    self._Methods.add((objectId, member))
+
+    def Dispatch(self, progId):
+        """
+        Returns the replayed COM object which was created for the ProgID.
+        """
+        return self._Serve(0, "d", progId, ())
+
+    def _Decode(self, value):
+        """
+        Returns the value of a JSON representation.
+        """
+        if isinstance(value, dict):
+            if "o" in value:
+                return ReplayObject(self, value["o"])
+            if "t" in value:
+                return tuple(self._Decode(item) for item in value["t"])
+            if "e" in value:
+                raise Exception(value["e"])
+            if "r" in value:
+                return value["r"]
+        return value
+
+    def _Encode(self, value):
+        """
+        Returns the JSON representation of an argument.
+        """
+        if isinstance(value, _ScalarTypes):
+            return value
+        if isinstance(value, (tuple, list)):
+            return {"t": [self._Encode(item) for item in value]}
+        if isinstance(value, ReplayObject):
+            return {"o": value._ObjectId}
+        return str(value)
+
+    def _GetHandle(self, objectId):
+        """
+        Returns the handle of a replayed object, which is its _oleobj_.
+        """
+        handle = self._Handles.get(objectId)
+        if handle == None:
+            handle = _ReplayHandle(objectId)
+            self._Handles[objectId] = handle
+        return handle
+
+    def _Serve(self, objectId, kind, member, args):
+        """
+        Returns the next recorded result of a call and waits its duration.
+        """
+        key = (objectId, kind, member, json.dumps([self._Encode(arg) for arg in args]))
+        results = self._Results.get(key)
+        if not results and key not in self._LastResults:
+            # Use the results of the member for other arguments.
+            key = (objectId, kind, member)
+            results = self._MemberResults.get(key)
+            if results or key in self._LastResults:
+                self.Statistics["ArgumentMismatches"] += 1
+        if results:
+            (result, microseconds) = results.popleft()
+            self._LastResults[key] = (result, microseconds)
+        elif key in self._LastResults:
+            (result, microseconds) = self._LastResults[key]
+            self.Statistics["Repeated"] += 1
+        elif kind == "s":
+            # Writes of properties need no result.
+            return None
+        else:
+            raise Exception("COM call %s of object %d not recorded in %s" % (member, objectId, self.FileName))
+        self.Statistics["Calls"] += 1
+        if self.TimeScale > 0.0:
+            _Wait(microseconds * self.TimeScale / 1000000.0)
+        return self._Decode(result)
+
+
+class ReplayObject():
+    """
+    COM object of a ReplaySession.
+    """
+    def __init__(self, session, objectId):
+        object.__setattr__(self, "_Session", session)
+        object.__setattr__(self, "_ObjectId", objectId)
+        object.__setattr__(self, "_oleobj_", session._GetHandle(objectId))
+
+    def __getattr__(self, name):
+        if name.startswith("_"):
+            raise AttributeError(name)
+        if (self._ObjectId, name) in self._Session._Methods:
+            return lambda *args: self._Session._Serve(self._ObjectId, "c", name, args)
+        return self._Session._Serve(self._ObjectId, "g", name, ())
+
+    def __setattr__(self, name, value):
+        self._Session._Serve(self._ObjectId, "s", name, (value,))
+
+    def __eq__(self, other):
+        return self._oleobj_ is getattr(other, "_oleobj_", other)
+
+    def __ne__(self, other):
+        return not self.__eq__(other)
+
+    def __hash__(self):
+        return hash(self._oleobj_)
+
+    def __bool__(self):
+        return True
+
+    def __iter__(self):
+        return _IterateEnumerator(self._NewEnum())
+
+    def __repr__(self):
+        return "<ReplayObject %d>" % self._ObjectId
+
+    def _NewEnum(self):
+        """
+        Returns the enumerator of a collection.
+        """
+        return self._Session._Serve(self._ObjectId, "c", "_NewEnum", ())
+
+
+class _ReplayHandle():
+    """
+    Identity of a replayed COM object.
+    """
+    def __init__(self, objectId):
+        self.ObjectId = objectId
+
+    def __repr__(self):
+        return "<ReplayHandle %d>" % self.ObjectId
+
+
+def _IsComObject(value):
+    """
+    Returns True if the value is a COM object or the enumerator of a collection.
+    """
+    if isinstance(value, _ScalarTypes) or isinstance(value, (tuple, list)):
+        return False
+    return hasattr(value, "_oleobj_") or hasattr(value, "GetIDsOfNames") \
+        or (hasattr(value, "Next") and not callable(value))
+
+
+def _IterateEnumerator(enumerator):
+    """
+    Yields the items of a COM enumerator.
+    """
+    if enumerator == None:
+        return
+    while True:
+        chunk = enumerator.Next(100)
+        if not chunk:
+            return
+        for item in chunk:
+            yield item
+
+
+def _ObjectKey(comObject):
+    """
+    Returns a hashable key of a COM object, see Utilities._ElementKey().
+    """
+    objectKey = getattr(comObject, "_oleobj_", comObject)
+    try:
+        hash(objectKey)
+    except TypeError:
+        objectKey = id(comObject)
+    return objectKey
+
+
+def _Unwrap(value):
+    """
+    Returns the COM object of a TracedObject.
+    """
+    if isinstance(value, TracedObject):
+        return value._Target
+    if isinstance(value, tuple):
+        return tuple(_Unwrap(item) for item in value)
+    return value
+
+
+def _Wait(seconds):
+    """
+    Waits the given time. Short times are waited actively, since time.sleep()
+    is too coarse for them.
+    """
+    if seconds >= 0.002:
+        time.sleep(seconds)
+        return
+    endTime = time.perf_counter() + seconds
+    while time.perf_counter() < endTime:
+        pass
+
+
+def _WrapResult(value, recorder):
+    """
+    Wraps the COM objects in the result of a call as TracedObjects.
+    """
+    if isinstance(value, tuple):
+        return tuple(_WrapResult(item, recorder) for item in value)
+    if _IsComObject(value):
+        return TracedObject(value, recorder)
+    return value
+
+
+atexit.register(StopRecording)
@@ -0,0 +1,179 @@
+"""
+--------------------------------------------------------------------------------
+File:        DebugLog.py
+
+Description: Debug logging of the scripts. Whether debug messages are printed
+             is decided once by Configure(), which runs on import, so a debug
+             message which is off costs one flag check:
+                 DebugLog.Debug("Mapped %d events to %s", len(rows), taskName)
+             The messages are formatted only if they are printed or dumped.
+             Debugging is enabled by the file __ENABLE_DEBUG__ in the working
+             directory or the environment variable UTILITIES_DEBUG=1.
+
+Tip/Remarks: Configure(ringBufferSize=1000) keeps the last debug messages in
+             memory, also if debugging is disabled, and dumps them to stderr
+             if the script fails with an exception, or in a DumpOnFailure()
+             block on any error:
+                 DebugLog.Configure(ringBufferSize=1000)
+                 with DebugLog.DumpOnFailure():
+                     build()
+
+Limitations: The __ENABLE_DEBUG__ file is only checked by Configure(), call it
+             again after creating or deleting the file in a running script.
+--------------------------------------------------------------------------------
+"""
+
+import collections
+import contextlib
+import logging
+import os
+import sys
+
+# File in the working directory which enables debugging.
+DEBUG_FILE = "__ENABLE_DEBUG__"
+
+# Environment variable which enables debugging if set to 1.
+DEBUG_VARIABLE = "UTILITIES_DEBUG"
+
+# Logger of the scripts.
+Logger = logging.getLogger("Utilities")
+Logger.propagate = False
+
+# True if debug messages are printed. Set by Configure().
+DebugEnabled = False
+
+# True if debug messages are printed or kept in the ring buffer.
+_DebugActive = False
+
+# Handlers installed by Configure().
+_ConsoleHandler = None
+_RingBufferHandler = None
+
+# Format of the printed and dumped messages.
+_Format = "*** %(levelname)s: %(message)s"
+
+
+def Configure(debug=None, ringBufferSize=0, stream=None):
+    """
+    Decides once whether debug messages are printed. If debug is None it is
+    enabled by the file __ENABLE_DEBUG__ or the variable UTILITIES_DEBUG=1.
+    With a ringBufferSize the last debug messages are kept in memory for
+    DumpRingBuffer(). The messages are printed to the stream, default stdout.
+    """
+    global DebugEnabled, _DebugActive, _ConsoleHandler, _RingBufferHandler
+    if debug == None:
+        debug = os.environ.get(DEBUG_VARIABLE) == "1" or os.path.exists(DEBUG_FILE)
+    for handler in (_ConsoleHandler, _RingBufferHandler):
+        if handler != None:
+            Logger.removeHandler(handler)
+
+    _ConsoleHandler = logging.StreamHandler(stream or sys.stdout)
+    _ConsoleHandler.setFormatter(logging.Formatter(_Format))
+    _ConsoleHandler.setLevel(logging.DEBUG if debug else logging.INFO)
+    Logger.addHandler(_ConsoleHandler)
+    _RingBufferHandler = None
+    if ringBufferSize > 0:
+        _RingBufferHandler = RingBufferHandler(ringBufferSize)
+        Logger.addHandler(_RingBufferHandler)
+
+    DebugEnabled = bool(debug)
+    _DebugActive = DebugEnabled or _RingBufferHandler != None
+    Logger.setLevel(logging.DEBUG if _DebugActive else logging.INFO)
+
+
+def Debug(message, *args):
+    """
+    Logs a debug message, which is formatted with the arguments by the %
+    operator only if it is printed or dumped.
+    """
+    if _DebugActive:
+        Logger.debug(message, *args)
+
+
+def Info(message, *args):
+    """
+    Logs an info message.
+    """
+    Logger.info(message, *args)
+
+
+def Warning(message, *args):
+    """
+    Logs a warning.
+    """
+    Logger.warning(message, *args)
+
+
+def Error(message, *args):
+    """
+    Logs an error.
+    """
+    Logger.error(message, *args)
+
+
+def DumpRingBuffer(stream=None):
+    """
+    Writes the messages of the ring buffer to the stream, default stderr, and
+    empties the buffer. Returns the number of messages.
+    """
+    if _RingBufferHandler == None:
+        return 0
+    return _RingBufferHandler.Dump(stream or sys.stderr)
+
+
+@contextlib.contextmanager
+def DumpOnFailure(stream=None):
+    """
+    Context manager which dumps the ring buffer if its block raises an
+    exception or exits with an error code.
+    """
+    try:
+        yield
+    except SystemExit as e:
+        if e.code not in (None, 0):
+            DumpRingBuffer(stream)
+        raise
+    except BaseException:
+        DumpRingBuffer(stream)
+        raise
+
+
+class RingBufferHandler(logging.Handler):
+    """
+    Keeps the last log records in memory. The records are formatted by Dump().
+    """
+    def __init__(self, size):
+        logging.Handler.__init__(self, logging.DEBUG)
+        self.setFormatter(logging.Formatter("%(asctime)s " + _Format))
+        self.Records = collections.deque(maxlen=size)
+
+    def emit(self, record):
+        self.Records.append(record)
+
+    def Dump(self, stream):
+        """
+        Writes the formatted records to the stream and empties the buffer.
+        Returns the number of records.
+        """
+        count = len(self.Records)
+        if count == 0:
+            return 0
+        stream.write("*** Last %d log messages:\n" % count)
+        while self.Records:
+            stream.write(self.format(self.Records.popleft()) + "\n")
+        stream.flush()
+        return count
+
+
+def _ExceptHook(excType, excValue, excTraceback):
+    """
+    Dumps the ring buffer before an uncaught exception is reported.
+    """
+    DumpRingBuffer()
+    _PreviousExceptHook(excType, excValue, excTraceback)
+
+
+_PreviousExceptHook = sys.excepthook
+sys.excepthook = _ExceptHook
+
+Configure()
@@ -0,0 +1,306 @@
+"""
+--------------------------------------------------------------------------------
+File:        DispatchBenchmark.py
+
+Description: Counts the COM calls of some Utilities helpers with win32com style
+             dynamic dispatch and with the dispatch ID cache of DispatchCache.
+             The helpers run against the fake server of FakeSystemDesk.py,
+             whose offline model is reached through fake IDispatch and
+             ITypeInfo interfaces, so the benchmark needs neither SystemDesk
+             nor pywin32.
+
+Tip/Remarks: Run "python DispatchBenchmark.py" in the Scripts directory.
+             Every method of the fake IDispatch and ITypeInfo interfaces
+             counts as one COM call of the fake server, as it would for an
+             out-of-process server.
+
+Limitations: The dynamic dispatch is modeled after win32com.client.dynamic:
+             each new COM object reads its type information, each name is
+             bound once per object. The type information only lists the
+             members in FakeInterfaces.
+--------------------------------------------------------------------------------
+"""
+
+import sys
+
+import DispatchCache
+import FakeSystemDesk
+import OfflineModel
+import Utilities
+
+# FakeComServer which counts the calls of the running scenario.
+FakeServer = None
+
+# Properties, methods and writable properties of the fake interfaces by
+# interface name, see FakeSystemDesk._InterfaceName().
+_ElementProperties = ("ShortName", "ElementType", "Parent")
+FakeInterfaces = {
+    "IApplication": (("ActiveProject", "BatchMode"), (), ("BatchMode",)),
+    "IProject": (("Name", "RootAutosar"), (), ("Name",)),
+    "IAUTOSAR": (_ElementProperties + ("ArPackages",), (), ()),
+    "IARPackage": (_ElementProperties + ("ArPackages", "Elements"), (), ("ShortName",)),
+    "ICollection": (("Count", "Elements"), ("Item", "AddNew"), ()),
+    "IElement": (_ElementProperties, (), ("ShortName",)),
+    "IOsTask": (_ElementProperties, (), ("ShortName",)),
+    "IRteConfiguration": (_ElementProperties + ("RteSwComponentInstances", "RteBswModuleInstances"), (), ()),
+    "IRteSwComponentInstance": (_ElementProperties + ("RteEventToTaskMappings",), (), ()),
+    "IRteEventToTaskMapping": (_ElementProperties + ("RteMappedToTaskRef", "RtePositionInTask"), (), \
+        ("RteMappedToTaskRef", "RtePositionInTask")),
+    }
+
+# Type information of the fake interfaces by name.
+_FakeTypeInfos = {}
+
+
+def CountCall(interfaceName, memberName):
+    """
+    Counts a call of the fake COM interfaces by the fake server.
+    """
+    FakeServer.CountCall(interfaceName, memberName)
+
+
+class FakeDispatch():
+    """
+    Fake of the IDispatch interface of an object of the offline model.
+    """
+    def __init__(self, target):
+        self._Target = target
+        self._TypeInfo = _GetFakeTypeInfo(FakeSystemDesk._InterfaceName(target))
+
+    def __eq__(self, other):
+        return isinstance(other, FakeDispatch) and self._Target is other._Target
+
+    def __ne__(self, other):
+        return not self.__eq__(other)
+
+    def __hash__(self):
+        return id(self._Target)
+
+    def GetTypeInfo(self, *args):
+        CountCall(self._TypeInfo.InterfaceName, "GetTypeInfo")
+        return self._TypeInfo
+
+    def GetIDsOfNames(self, *names):
+        CountCall(self._TypeInfo.InterfaceName, "GetIDsOfNames")
+        return self._TypeInfo.DispatchIds[names[-1]]
+
+    def Invoke(self, dispatchId, lcid, flags, resultWanted, *args):
+        name = self._TypeInfo.Names[dispatchId]
+        CountCall(self._TypeInfo.InterfaceName, name)
+        if flags & (DispatchCache.DISPATCH_PROPERTYPUT | DispatchCache.DISPATCH_PROPERTYPUTREF):
+            setattr(self._Target, name, _UnwrapFake(args[0]))
+            return None
+        if flags & DispatchCache.DISPATCH_METHOD and name in self._TypeInfo.Methods:
+            return _WrapFake(getattr(self._Target, name)(*(_UnwrapFake(arg) for arg in args)))
+        return _WrapFake(getattr(self._Target, name))
+
+
+class _FakeFuncDesc():
+    """
+    Fake of the FUNCDESC structure.
+    """
+    def __init__(self, memid, invkind, args):
+        self.memid = memid
+        self.invkind = invkind
+        self.args = args
+
+
+class _FakeTypeComp():
+    """
+    Fake of the ITypeComp interface, used by dynamic dispatch to bind names.
+    """
+    def __init__(self, typeInfo):
+        self._TypeInfo = typeInfo
+
+    def Bind(self, name):
+        CountCall("ITypeComp", "Bind")
+        return self._TypeInfo.DispatchIds.get(name)
+
+
+class _FakeTypeInfo():
+    """
+    Fake of the ITypeInfo interface of a fake interface.
+    """
+    def __init__(self, interfaceName, properties, methods, puts):
+        self.InterfaceName = interfaceName
+        self.Methods = methods
+        self.DispatchIds = {}
+        self.Names = {}
+        self._FuncDescs = []
+        for (index, name) in enumerate(sorted(set(properties + methods + puts))):
+            self.DispatchIds[name] = index + 1
+            self.Names[index + 1] = name
+        for name in properties:
+            self._FuncDescs.append(_FakeFuncDesc(self.DispatchIds[name], DispatchCache.INVOKE_PROPERTYGET, ()))
+        for name in methods:
+            self._FuncDescs.append(_FakeFuncDesc(self.DispatchIds[name], DispatchCache.INVOKE_FUNC, (None,)))
+        for name in puts:
+            invkind = DispatchCache.INVOKE_PROPERTYPUTREF if name.endswith("Ref") else DispatchCache.INVOKE_PROPERTYPUT
+            self._FuncDescs.append(_FakeFuncDesc(self.DispatchIds[name], invkind, (None,)))
+
+    def GetTypeAttr(self):
+        CountCall("ITypeInfo", "GetTypeAttr")
+        # (iid, lcid, memidConstructor, memidDestructor, schema, typekind,
+        #  cFuncs, cVars, cImplTypes, cbSizeVft, cbAlignment, wTypeFlags)
+        return (self.InterfaceName, 0, -1, -1, None, 4, len(self._FuncDescs), 0, 0, 0, 0, 0)
+
+    def GetTypeComp(self):
+        CountCall("ITypeInfo", "GetTypeComp")
+        return _FakeTypeComp(self)
+
+    def GetDocumentation(self, memid):
+        CountCall("ITypeInfo", "GetDocumentation")
+        return (self.InterfaceName, None, 0, None)
+
+    def GetFuncDesc(self, index):
+        CountCall("ITypeInfo", "GetFuncDesc")
+        return self._FuncDescs[index]
+
+    def GetNames(self, memid):
+        CountCall("ITypeInfo", "GetNames")
+        return (self.Names[memid],)
+
+
+class LateBoundDispatch():
+    """
+    Model of win32com's dynamic dispatch: reads the type information for each
+    new COM object and binds each name once per object.
+    """
+    def __init__(self, dispatch):
+        object.__setattr__(self, "_oleobj_", dispatch)
+        typeInfo = dispatch.GetTypeInfo()
+        typeInfo.GetTypeAttr()
+        object.__setattr__(self, "_TypeComp", typeInfo.GetTypeComp())
+        object.__setattr__(self, "_DispatchIds", {})
+
+    def __getattr__(self, name):
+        if name.startswith("_"):
+            raise AttributeError(name)
+        dispatchId = self._Bind(name)
+        if name in self._oleobj_._TypeInfo.Methods:
+            def CallMethod(*args):
+                args = tuple(getattr(arg, "_oleobj_", arg) for arg in args)
+                return _WrapLateBound(self._oleobj_.Invoke(dispatchId, 0, DispatchCache.DISPATCH_METHOD, True, *args))
+            return CallMethod
+        return _WrapLateBound(self._oleobj_.Invoke(dispatchId, 0, DispatchCache.DISPATCH_PROPERTYGET, True))
+
+    def __setattr__(self, name, value):
+        dispatchId = self._Bind(name)
+        value = getattr(value, "_oleobj_", value)
+        self._oleobj_.Invoke(dispatchId, 0, DispatchCache.DISPATCH_PROPERTYPUT, False, value)
+
+    def __eq__(self, other):
+        return self._oleobj_ == getattr(other, "_oleobj_", other)
+
+    def __ne__(self, other):
+        return not self.__eq__(other)
+
+    def __hash__(self):
+        return hash(self._oleobj_)
+
+    def _Bind(self, name):
+        if name not in self._DispatchIds:
+            self._DispatchIds[name] = self._TypeComp.Bind(name)
+        return self._DispatchIds[name]
+
+
+def RunBenchmark():
+    """
+    Runs all scenarios with both kinds of dispatch. Each scenario gets the
+    function which wraps the objects of the offline model as COM objects.
+    Returns a list of tuples
+    (scenarioName, dynamicCalls, cachedCalls).
+    """
+    global FakeServer
+    results = []
+    for (scenarioName, scenario) in _Scenarios:
+        calls = []
+        for wrapDispatch in (LateBoundDispatch, DispatchCache.WrapDispatch):
+            def Wrap(target):
+                return wrapDispatch(FakeDispatch(target))
+            DispatchCache.Reset()
+            FakeServer = FakeSystemDesk.ConnectFakeSystemDesk(projectName="Benchmark")
+            Utilities.SdApplication = Wrap(FakeServer.Model)
+            scenario(Wrap)
+            calls.append(FakeServer.CallCount)
+        Utilities.SdApplication = None
+        Utilities.InvalidateModelCaches()
+        results.append((scenarioName, calls[0], calls[1]))
+    FakeServer = None
+    return results
+
+
+def _FindCommonPackageScenario(wrap):
+    swcPackage = Utilities.GetOrCreatePackage("/Components/SwComponentTypes")
+    elements = [swcPackage.Elements.AddNew("Swc%d" % index) for index in range(50)]
+    for element in elements:
+        Utilities.FindCommonPackage(element)
+
+
+def _FindNextPositionInTaskScenario(wrap):
+    rteConfiguration = OfflineModel.OfflineElement("Rte", "IRteConfiguration", None)
+    osTask = OfflineModel.OfflineElement("Task10ms", "IOsTask", None)
+    for swcIndex in range(10):
+        swcInstance = rteConfiguration.RteSwComponentInstances.AddNew("Swc%d" % swcIndex)
+        for eventIndex in range(10):
+            mapping = swcInstance.RteEventToTaskMappings.AddNew("Event%d" % eventIndex)
+            mapping.RteMappedToTaskRef = osTask
+            mapping.RtePositionInTask = swcIndex * 10 + eventIndex
+    for index in range(10):
+        # Each call scans the mappings again.
+        Utilities.InvalidateModelCaches()
+        Utilities.FindNextPositionInTask(wrap(rteConfiguration), wrap(osTask))
+
+
+def _GetOrCreatePackageScenario(wrap):
+    for index in range(20):
+        Utilities.GetOrCreatePackage("/Benchmark/Package%d/SubPackage" % (index % 5))
+        # Resolve the packages again instead of using the package trie.
+        Utilities.InvalidateModelCaches()
+
+
+def _GetFakeTypeInfo(interfaceName):
+    typeInfo = _FakeTypeInfos.get(interfaceName)
+    if typeInfo == None:
+        (properties, methods, puts) = FakeInterfaces[interfaceName]
+        typeInfo = _FakeTypeInfo(interfaceName, properties, methods, puts)
+        _FakeTypeInfos[interfaceName] = typeInfo
+    return typeInfo
+
+
+def _UnwrapFake(value):
+    if isinstance(value, FakeDispatch):
+        return value._Target
+    return value
+
+
+def _WrapFake(value):
+    if isinstance(value, tuple):
+        return tuple(_WrapFake(item) for item in value)
+    if isinstance(value, FakeSystemDesk._ModelTypes):
+        return FakeDispatch(value)
+    return value
+
+
+def _WrapLateBound(value):
+    if isinstance(value, tuple):
+        return tuple(_WrapLateBound(item) for item in value)
+    if isinstance(value, FakeDispatch):
+        return LateBoundDispatch(value)
+    return value
+
+
+# Benchmark scenarios by name.
+_Scenarios = (
+    ("GetOrCreatePackage", _GetOrCreatePackageScenario),
+    ("FindCommonPackage", _FindCommonPackageScenario),
+    ("FindNextPositionInTask", _FindNextPositionInTaskScenario),
+    )
+
+
+if __name__ == "__main__":
+    print("%-24s %14s %14s %8s" % ("Helper", "Dynamic calls", "Cached calls", "Ratio"))
+    for (scenarioName, dynamicCalls, cachedCalls) in RunBenchmark():
+        print("%-24s %14d %14d %7.2fx" % (scenarioName, dynamicCalls, cachedCalls, \
+            float(dynamicCalls) / max(cachedCalls, 1)))
+    sys.exit(0)
@@ -0,0 +1,298 @@
+"""
+--------------------------------------------------------------------------------
+File:        DispatchCache.py
+
+Description: Late-bound COM dispatch with names resolved once per interface.
+             win32com's dynamic dispatch resolves the name of each property
+             and method again for every new COM object. Objects wrapped by
+             this module share the dispatch IDs of their interface, which
+             are read once from the type information. Names which cannot be
+             resolved this way fall back to win32com's dynamic dispatch.
+
+Tip/Remarks: Enabled for SystemDesk and VEOS Player sessions by setting
+             Utilities.Options.CacheDispatchIds = True before connecting.
+             See DispatchBenchmark.py for a comparison of the COM calls.
+
+Limitations: Keyword arguments are passed on by dynamic dispatch.
+--------------------------------------------------------------------------------
+"""
+
+# Flags of IDispatch::Invoke.
+DISPATCH_METHOD = 1
+DISPATCH_PROPERTYGET = 2
+DISPATCH_PROPERTYPUT = 4
+DISPATCH_PROPERTYPUTREF = 8
+
+# Kinds of the functions in the type information.
+INVOKE_FUNC = 1
+INVOKE_PROPERTYGET = 2
+INVOKE_PROPERTYPUT = 4
+INVOKE_PROPERTYPUTREF = 8
+
+# Type kinds and flags of the type information.
+TKIND_INTERFACE = 3
+TYPEFLAG_FDUAL = 0x40
+
+# Error codes of IDispatch::Invoke which mean that the dispatch ID or the kind
+# of the call did not fit. The call is repeated with dynamic dispatch.
+_FallbackErrors = (
+    -2147352573,  # DISP_E_MEMBERNOTFOUND
+    -2147352570,  # DISP_E_UNKNOWNNAME
+    -2147352562,  # DISP_E_BADPARAMCOUNT
+    )
+
+# Interface descriptions by the IID of the interface.
+_Interfaces = {}
+
+# Counters of the dispatch ID cache, see GetStatistics().
+_Statistics = {"Interfaces": 0, "Wrapped": 0, "Fallbacks": 0}
+
+
+def Dispatch(progId):
+    """
+    Creates the COM object with the given ProgID and returns it wrapped as
+    CachedDispatch.
+    Example: sdApplication = Dispatch("SystemDesk.Application.5.5")
+    """
+    import win32com.client
+    return WrapDispatch(win32com.client.Dispatch(progId)._oleobj_)
+
+
+def GetStatistics():
+    """
+    Returns the counters of the dispatch ID cache as a dictionary:
+    Interfaces counts the interfaces which were read from the type information,
+    Wrapped the wrapped COM objects and Fallbacks the calls made by dynamic
+    dispatch.
+    """
+    return dict(_Statistics)
+
+
+def Reset():
+    """
+    Discards all cached interfaces and resets the counters.
+    """
+    _Interfaces.clear()
+    for name in _Statistics:
+        _Statistics[name] = 0
+
+
+def WrapDispatch(dispatch):
+    """
+    Returns a CachedDispatch for the given IDispatch interface. Objects without
+    type information are returned as win32com dynamic dispatch objects.
+    """
+    try:
+        typeInfo = dispatch.GetTypeInfo()
+        typeAttr = typeInfo.GetTypeAttr()
+        if typeAttr[5] == TKIND_INTERFACE and typeAttr[11] & TYPEFLAG_FDUAL:
+            # Use the dispatch part of a dual interface.
+            typeInfo = typeInfo.GetRefTypeInfo(typeInfo.GetRefTypeOfImplType(-1))
+            typeAttr = typeInfo.GetTypeAttr()
+        interface = _Interfaces.get(typeAttr[0])
+        if interface == None:
+            interface = _Interface(typeInfo, typeAttr)
+            _Interfaces[typeAttr[0]] = interface
+            _Statistics["Interfaces"] += 1
+    except Exception:
+        return _DynamicDispatch(dispatch)
+    _Statistics["Wrapped"] += 1
+    return CachedDispatch(dispatch, interface)
+
+
+class CachedDispatch():
+    """
+    Late-bound wrapper of a COM object. Behaves like a win32com dynamic
+    dispatch object, but uses the dispatch IDs cached for its interface.
+    """
+    def __init__(self, dispatch, interface):
+        object.__setattr__(self, "_oleobj_", dispatch)
+        object.__setattr__(self, "_Interface", interface)
+        object.__setattr__(self, "_Dynamic", None)
+
+    def __getattr__(self, name):
+        if name.startswith("_"):
+            raise AttributeError(name)
+        interface = self._Interface
+        dispatchId = interface.Properties.get(name)
+        if dispatchId != None:
+            try:
+                return _WrapResult(self._oleobj_.Invoke(dispatchId, 0, DISPATCH_PROPERTYGET, True))
+            except Exception as e:
+                if not _IsFallbackError(e):
+                    raise
+                interface.Properties.pop(name, None)
+        elif name in interface.Methods:
+            (dispatchId, flags) = interface.Methods[name]
+            return _CachedMethod(self, name, dispatchId, flags)
+        return _WrapResult(getattr(self._GetDynamic(), name))
+
+    def __setattr__(self, name, value):
+        put = self._Interface.Puts.get(name)
+        if put != None:
+            (dispatchId, flags) = put
+            if flags & DISPATCH_PROPERTYPUTREF and (not flags & DISPATCH_PROPERTYPUT or _IsDispatch(_Unwrap(value))):
+                flags = DISPATCH_PROPERTYPUTREF
+            else:
+                flags = DISPATCH_PROPERTYPUT
+            try:
+                self._oleobj_.Invoke(dispatchId, 0, flags, False, _Unwrap(value))
+                return
+            except Exception as e:
+                if not _IsFallbackError(e):
+                    raise
+                self._Interface.Puts.pop(name, None)
+        setattr(self._GetDynamic(), name, value)
+
+    def __call__(self, *args, **kwargs):
+        return _WrapResult(self._GetDynamic()(*args, **kwargs))
+
+    def __iter__(self):
+        for item in self._GetDynamic():
+            yield _WrapResult(item)
+
+    def _NewEnum(self):
+        """
+        Returns the enumerator of a collection or None.
+        """
+        enumerator = self._GetDynamic()._NewEnum()
+        if enumerator == None:
+            return None
+        return _CachedEnumerator(enumerator)
+
+    def __eq__(self, other):
+        return self._oleobj_ == getattr(other, "_oleobj_", other)
+
+    def __ne__(self, other):
+        return not self.__eq__(other)
+
+    def __hash__(self):
+        return hash(self._oleobj_)
+
+    def __bool__(self):
+        return True
+
+    def __repr__(self):
+        return "<CachedDispatch %s>" % (self._Interface.Name,)
+
+    def _GetDynamic(self):
+        """
+        Returns a win32com dynamic dispatch object for the same COM object.
+        """
+        _Statistics["Fallbacks"] += 1
+        if self._Dynamic == None:
+            object.__setattr__(self, "_Dynamic", _DynamicDispatch(self._oleobj_))
+        return self._Dynamic
+
+
+class _CachedMethod():
+    """
+    Bound method of a CachedDispatch.
+    """
+    def __init__(self, owner, name, dispatchId, flags):
+        self._Owner = owner
+        self._Name = name
+        self._DispatchId = dispatchId
+        self._Flags = flags
+
+    def __call__(self, *args, **kwargs):
+        if not kwargs:
+            try:
+                args = tuple(_Unwrap(arg) for arg in args)
+                return _WrapResult(self._Owner._oleobj_.Invoke(self._DispatchId, 0, self._Flags, True, *args))
+            except Exception as e:
+                if not _IsFallbackError(e):
+                    raise
+        return _WrapResult(getattr(self._Owner._GetDynamic(), self._Name)(*args, **kwargs))
+
+
+class _CachedEnumerator():
+    """
+    Enumerator of a collection which returns CachedDispatch objects.
+    """
+    def __init__(self, enumerator):
+        self._Enumerator = enumerator
+
+    def Next(self, count=1):
+        return tuple(_WrapResult(item) for item in self._Enumerator.Next(count))
+
+
+class _Interface():
+    """
+    Dispatch IDs of the properties and methods of one COM interface.
+    """
+    def __init__(self, typeInfo, typeAttr):
+        self.Name = typeInfo.GetDocumentation(-1)[0] if hasattr(typeInfo, "GetDocumentation") else str(typeAttr[0])
+        # Dispatch IDs of the properties without arguments by name.
+        self.Properties = {}
+        # The tuple (dispatchId, flags) of the methods by name.
+        self.Methods = {}
+        # The tuple (dispatchId, flags) of the writable properties by name.
+        self.Puts = {}
+        for index in range(typeAttr[6]):
+            funcDesc = typeInfo.GetFuncDesc(index)
+            name = typeInfo.GetNames(funcDesc.memid)[0]
+            if funcDesc.invkind == INVOKE_FUNC:
+                self.Methods[name] = (funcDesc.memid, DISPATCH_METHOD)
+            elif funcDesc.invkind == INVOKE_PROPERTYGET:
+                if len(funcDesc.args) == 0:
+                    self.Properties[name] = funcDesc.memid
+                else:
+                    # Properties with arguments are called like methods.
+                    self.Methods[name] = (funcDesc.memid, DISPATCH_METHOD | DISPATCH_PROPERTYGET)
+            elif funcDesc.invkind in (INVOKE_PROPERTYPUT, INVOKE_PROPERTYPUTREF):
+                flags = self.Puts.get(name, (None, 0))[1]
+                self.Puts[name] = (funcDesc.memid, flags | funcDesc.invkind)
+        for index in range(typeAttr[7]):
+            varDesc = typeInfo.GetVarDesc(index)
+            name = typeInfo.GetNames(varDesc.memid)[0]
+            self.Properties[name] = varDesc.memid
+            self.Puts[name] = (varDesc.memid, DISPATCH_PROPERTYPUT)
+
+
+def _DynamicDispatch(dispatch):
+    """
+    Returns a win32com dynamic dispatch object for an IDispatch interface.
+    """
+    import win32com.client.dynamic
+    return win32com.client.dynamic.Dispatch(dispatch)
+
+
+def _IsDispatch(value):
+    """
+    Returns True if the value is an IDispatch interface.
+    """
+    return hasattr(value, "Invoke") and hasattr(value, "GetIDsOfNames")
+
+
+def _IsFallbackError(exception):
+    """
+    Returns True if a failed call should be repeated with dynamic dispatch.
+    """
+    hresult = getattr(exception, "hresult", None)
+    if hresult == None and exception.args:
+        hresult = exception.args[0]
+    return hresult in _FallbackErrors
+
+
+def _Unwrap(value):
+    """
+    Returns the IDispatch interface of a wrapped COM object.
+    """
+    return getattr(value, "_oleobj_", value)
+
+
+def _WrapResult(value):
+    """
+    Wraps the COM objects in the result of a call.
+    """
+    if isinstance(value, CachedDispatch):
+        return value
+    if isinstance(value, tuple):
+        return tuple(_WrapResult(item) for item in value)
+    if _IsDispatch(value):
+        return WrapDispatch(value)
+    if _IsDispatch(getattr(value, "_oleobj_", None)):
+        # Result of dynamic dispatch.
+        return WrapDispatch(value._oleobj_)
+    return value
@@ -0,0 +1,304 @@
+"""
+--------------------------------------------------------------------------------
+File:        FakeSystemDesk.py
+
+Description: Local stand-in for the COM servers of SystemDesk and VEOS Player.
+             The model is held by the offline model of OfflineModel.py. Every
+             object which is handed out is wrapped in a FakeComObject, which
+             counts each property read, property write and method call as one
+             COM round trip and delays it by the latency of the fake server:
+                 fakeServer = FakeSystemDesk.ConnectFakeSystemDesk(latency=0.0002)
+                 Utilities.GetOrCreatePackage("/Comm/ISignals")
+                 print(fakeServer.CallCount, fakeServer.Calls.most_common(5))
+
+Tip/Remarks: The model for a measurement can be prepared without counting by
+             the objects of fakeServer.Model, the unwrapped offline model, or
+             inside a "with fakeServer.Paused():" block.
+             See UtilitiesBenchmark.py for the benchmark of the helpers.
+
+Limitations: The latency is waited actively, since time.sleep() is too coarse
+             for latencies below one millisecond. The VEOS Player stand-in
+             only provides the project, its VPUs and a successful import,
+             which writes the build log next to the system file.
+--------------------------------------------------------------------------------
+"""
+
+import collections
+import contextlib
+import enum
+import os
+import time
+
+import OfflineModel
+import Utilities
+
+# Types of the offline model which are wrapped as COM objects.
+_ModelTypes = (OfflineModel.OfflineApplication, OfflineModel.OfflineProject, \
+    OfflineModel.OfflineElement, OfflineModel.OfflineCollection)
+
+
+def ConnectFakeSystemDesk(latency=0.0, projectName="FakeProject"):
+    """
+    Replaces the SystemDesk application of Utilities by a FakeComServer with
+    an empty offline project. Returns the fake server.
+    """
+    fakeServer = FakeComServer(Utilities.UseOfflineBackend(projectName), latency)
+    Utilities.SdApplication = fakeServer.Application
+    return fakeServer
+
+
+def ConnectFakeVeosPlayer(latency=0.0, systemFile="Fake.osa"):
+    """
+    Replaces the VEOS Player application of Utilities by a FakeComServer with
+    an empty project. Returns the fake server.
+    """
+    fakeServer = FakeComServer(FakeVeosApplication(systemFile), latency)
+    Utilities.VpApplication = fakeServer.Application
+    Utilities.VpEnums = FakeVeosEnums
+    return fakeServer
+
+
+class FakeComServer():
+    """
+    Fake COM server. Counts the calls of the objects it hands out by the tuple
+    (interfaceName, memberName) and delays each of them by the latency.
+    """
+    def __init__(self, model, latency=0.0):
+        # Unwrapped application object of the model.
+        self.Model = model
+        # Delay of each COM call in seconds.
+        self.Latency = latency
+        # Number of calls by the tuple (interfaceName, memberName).
+        self.Calls = collections.Counter()
+        self._Paused = 0
+
+    @property
+    def Application(self):
+        """
+        Returns the wrapped application object.
+        """
+        return self.Wrap(self.Model)
+
+    @property
+    def CallCount(self):
+        """
+        Returns the number of COM calls since the last Reset().
+        """
+        return sum(self.Calls.values())
+
+    @contextlib.contextmanager
+    def Paused(self):
+        """
+        Context manager which neither counts nor delays the calls in its block.
+        """
+        self._Paused += 1
+        try:
+            yield self
+        finally:
+            self._Paused -= 1
+
+    def Reset(self):
+        """
+        Resets the call counters.
+        """
+        self.Calls.clear()
+
+    def Wrap(self, value):
+        """
+        Wraps the objects of the model in a value as FakeComObjects.
+        """
+        if isinstance(value, _ModelTypes):
+            return FakeComObject(value, self)
+        if isinstance(value, tuple):
+            return tuple(self.Wrap(item) for item in value)
+        return value
+
+    def CountCall(self, interfaceName, memberName):
+        """
+        Counts and delays one COM call of the given interface, e.g. of a fake
+        IDispatch or ITypeInfo interface.
+        """
+        if self._Paused:
+            return
+        self.Calls[(interfaceName, memberName)] += 1
+        if self.Latency > 0.0:
+            endTime = time.perf_counter() + self.Latency
+            while time.perf_counter() < endTime:
+                pass
+
+    def _Call(self, target, memberName):
+        """
+        Counts and delays one COM call of an object of the model.
+        """
+        self.CountCall(_InterfaceName(target), memberName)
+
+
+class FakeComObject():
+    """
+    COM object of a FakeComServer. Like the Python wrappers of win32com, a new
+    wrapper is returned for each access, the wrapped object is _oleobj_.
+    """
+    def __init__(self, target, server):
+        object.__setattr__(self, "_oleobj_", target)
+        object.__setattr__(self, "_Server", server)
+
+    def __getattr__(self, name):
+        if name.startswith("_"):
+            raise AttributeError(name)
+        value = getattr(self._oleobj_, name)
+        if callable(value) and not isinstance(value, _ModelTypes):
+            # Methods are called by the caller, which makes the round trip.
+            return _FakeComMethod(self, name, value)
+        self._Server._Call(self._oleobj_, name)
+        return self._Server.Wrap(value)
+
+    def __setattr__(self, name, value):
+        self._Server._Call(self._oleobj_, name)
+        setattr(self._oleobj_, name, _Unwrap(value))
+
+    def __eq__(self, other):
+        return self._oleobj_ is _Unwrap(other)
+
+    def __ne__(self, other):
+        return not self.__eq__(other)
+
+    def __hash__(self):
+        return id(self._oleobj_)
+
+    def __bool__(self):
+        return True
+
+    def __iter__(self):
+        enumerator = self._NewEnum()
+        while True:
+            chunk = enumerator.Next(100)
+            if not chunk:
+                return
+            for item in chunk:
+                yield item
+
+    def __repr__(self):
+        return "<FakeComObject %r>" % (self._oleobj_,)
+
+    def _NewEnum(self):
+        """
+        Returns the enumerator of a collection.
+        """
+        if not isinstance(self._oleobj_, OfflineModel.OfflineCollection):
+            return None
+        self._Server._Call(self._oleobj_, "_NewEnum")
+        return _FakeEnumerator(self._oleobj_, self._Server)
+
+
+class _FakeComMethod():
+    """
+    Bound method of a FakeComObject.
+    """
+    def __init__(self, owner, name, method):
+        self._Owner = owner
+        self._Name = name
+        self._Method = method
+
+    def __call__(self, *args):
+        self._Owner._Server._Call(self._Owner._oleobj_, self._Name)
+        return self._Owner._Server.Wrap(self._Method(*(_Unwrap(arg) for arg in args)))
+
+
+class _FakeEnumerator():
+    """
+    Enumerator of a collection, each call of Next() is one COM call.
+    """
+    def __init__(self, collection, server):
+        self._Items = list(collection.Elements)
+        self._Position = 0
+        self._Server = server
+
+    def Next(self, count=1):
+        self._Server._Call(self, "Next")
+        chunk = self._Items[self._Position:self._Position + count]
+        self._Position += len(chunk)
+        return self._Server.Wrap(tuple(chunk))
+
+
+#-----------------------------
+# VEOS Player stand-in.
+#-----------------------------
+
+class FakeVeosEnums():
+    """
+    Enums of the VEOS Player automation used by Utilities.
+    """
+    class BuildStatusEnum(enum.IntEnum):
+        Invalid = 0
+        Valid = 1
+
+
+class FakeVeosApplication(OfflineModel.OfflineApplication):
+    """
+    Application object of the VEOS Player stand-in.
+    """
+    def __init__(self, systemFile="Fake.osa"):
+        OfflineModel.OfflineApplication.__init__(self, "FakeVeosProject")
+        self.ApplicationRootDir = ""
+        self.Projects = OfflineModel.OfflineElement(None, "IProjects", None)
+        self.Projects.Active = _NewVeosProject(systemFile)
+
+
+def _NewVeosProject(systemFile):
+    """
+    Returns the offline element of a VEOS Player project with its methods.
+    """
+    vpProject = OfflineModel.OfflineElement("FakeVeosProject", "IVeosProject", None)
+    vpProject.SystemFile = systemFile
+
+    def CreateNewImportSettings():
+        return OfflineModel.OfflineElement(None, "IImportSettings", vpProject)
+
+    def Import(importSettings):
+        vpuName = os.path.splitext(os.path.basename(importSettings.ImportFilePath))[0]
+        vpProject.Vpus.AddNew(vpuName)
+        # Write the build log and the VPU directory, which Utilities.CopyBuildLog() expects.
+        systemDir = os.path.dirname(os.path.abspath(vpProject.SystemFile))
+        if not os.path.isdir(os.path.join(systemDir, vpuName)):
+            os.makedirs(os.path.join(systemDir, vpuName))
+        with open(os.path.splitext(vpProject.SystemFile)[0] + ".Build.log", "w") as logFile:
+            logFile.write("Build of %s finished.\n" % vpuName)
+        buildResult = OfflineModel.OfflineElement(None, "IBuildResult", vpProject)
+        buildResult.BuildStatus = FakeVeosEnums.BuildStatusEnum.Valid
+        buildResult.BuildOutput = "Build of %s finished." % vpuName
+        return buildResult
+
+    def RemoveVpu(vpuName):
+        vpProject.Vpus.Remove(vpProject.Vpus.Item(vpuName))
+
+    def Save(systemFile=None):
+        pass
+
+    for method in (CreateNewImportSettings, Import, RemoveVpu, Save):
+        vpProject._Properties[method.__name__] = method
+    return vpProject
+
+
+def _InterfaceName(target):
+    """
+    Returns the name of the interface of an object of the model.
+    """
+    elementType = getattr(target, "ElementType", None)
+    if isinstance(elementType, str):
+        return elementType
+    if isinstance(target, OfflineModel.OfflineCollection):
+        return "ICollection"
+    if isinstance(target, _FakeEnumerator):
+        return "IEnumVARIANT"
+    if isinstance(target, OfflineModel.OfflineProject):
+        return "IProject"
+    return "IApplication"
+
+
+def _Unwrap(value):
+    """
+    Returns the object of the model of a FakeComObject.
+    """
+    if isinstance(value, tuple):
+        return tuple(_Unwrap(item) for item in value)
+    return getattr(value, "_oleobj_", value)
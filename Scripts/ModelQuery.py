@@ -0,0 +1,374 @@
+"""
+--------------------------------------------------------------------------------
+File:        ModelQuery.py
+
+Description: Small query language for elements of the SystemDesk model.
+             A query is a sequence of steps, each with an optional list of
+             predicates:
+                 /Comm/Signals          child elements with the given name
+                 //IISignal             descendants with the given ElementType
+                 /*                     all child elements
+                 [ShortName^='Brake_']  elements whose property matches
+             A step test matches the ShortName or the ElementType of an
+             element. Predicates support the operators = != ^= (starts with)
+             $= (ends with) *= (contains) and ~= (regular expression).
+             Example:
+                 for signal in Query("/Comm//IISignal[ShortName^='Brake_']"):
+                     print(signal.ShortName)
+
+Tip/Remarks: Queries are compiled into a plan, see CompileQuery() and
+             QueryPlan.Explain(). Leading name steps are resolved by the path
+             cache of Utilities.GetElementByPath(), descendant steps by a type
+             index if one is registered by RegisterTypeIndex() for the type.
+             Otherwise the packages below the context are traversed with
+             Utilities.WalkModel(), which does not descend into elements.
+             The ElementTypes of Utilities.ReferenceProperties are looked up in
+             the ReferenceIndex once it exists. The index also holds elements
+             below other elements, e.g. the ISignalToIPduMappings of a PDU.
+
+Limitations: Results are returned lazily, so the model should not be changed
+             while the results are iterated.
+--------------------------------------------------------------------------------
+"""
+
+import re
+
+import Utilities
+from Utilities import _ReadProperty
+
+# Functions which return all elements of an ElementType by the ElementType, see
+# RegisterTypeIndex(). Each function gets the AUTOSAR path of the context
+# element and returns an iterable of tuples (element, arPath) for the elements
+# below this path, or None if its index is not available. The step is then
+# resolved by a traversal.
+TypeIndexProviders = {}
+
+# Compiled plans by their query.
+_CompiledQueries = {}
+
+# Operators of the predicates.
+_Operators = {
+    "=": lambda value, literal: _Equals(value, literal),
+    "!=": lambda value, literal: value != None and not _Equals(value, literal),
+    "^=": lambda value, literal: value != None and str(value).startswith(literal),
+    "$=": lambda value, literal: value != None and str(value).endswith(literal),
+    "*=": lambda value, literal: value != None and literal in str(value),
+    "~=": lambda value, literal: value != None and re.search(literal, str(value)) != None,
+    }
+
+# Regular expressions of the query syntax.
+_StepPattern = re.compile(r"(//?)([^/\[\]]+)")
+_PredicatePattern = re.compile(r"\[\s*(\w+)\s*(=|!=|\^=|\$=|\*=|~=)\s*('[^']*'|\"[^\"]*\"|[-\w.]+)\s*\]")
+
+# Element types are named like IISignal or IARPackage.
+_ElementTypePattern = re.compile(r"^I[A-Z]")
+
+
+def CompileQuery(query):
+    """
+    Returns the QueryPlan for a query. Plans are cached by their query.
+    """
+    queryPlan = _CompiledQueries.get(query)
+    if queryPlan == None:
+        queryPlan = QueryPlan(query, _ParseQuery(query))
+        _CompiledQueries[query] = queryPlan
+    return queryPlan
+
+
+def Query(query, root=None, rootArPath=""):
+    """
+    Yields the elements which match the query. The query starts at the given
+    root element or at the root of the active project.
+    """
+    return CompileQuery(query).Execute(root, rootArPath)
+
+
+class QueryPlan():
+    """
+    Compiled query: a sequence of operations which each map the context
+    elements to the elements of the next step.
+    """
+    def __init__(self, query, steps):
+        self.Query = query
+        self.Operations = []
+        stepIndex = 0
+
+        # Resolve the leading name steps by a single path lookup.
+        pathItems = []
+        while stepIndex < len(steps) and steps[stepIndex].IsPathItem():
+            pathItems.append(steps[stepIndex].Test)
+            stepIndex += 1
+        if pathItems:
+            self.Operations.append(_PathLookup(pathItems))
+
+        for step in steps[stepIndex:]:
+            if step.Axis == "/":
+                self.Operations.append(_ChildLookup(step))
+            elif step.Test in TypeIndexProviders:
+                self.Operations.append(_TypeIndexLookup(step))
+            else:
+                self.Operations.append(_DescendantTraversal(step))
+
+    def Execute(self, root=None, rootArPath=""):
+        """
+        Yields the elements which match the query.
+        """
+        if root == None:
+            root = Utilities.SdApplication.ActiveProject.RootAutosar
+            rootArPath = ""
+        contexts = iter([(root, rootArPath)])
+        for operation in self.Operations:
+            contexts = operation.Apply(contexts)
+        for (element, arPath) in contexts:
+            yield element
+
+    def Explain(self):
+        """
+        Returns a list with a description of each operation of the plan.
+        """
+        return [operation.Explain() for operation in self.Operations]
+
+
+class _Step():
+    """
+    Parsed step of a query.
+    """
+    def __init__(self, axis, test, predicates):
+        self.Axis = axis
+        self.Test = test
+        # List of tuples (propertyName, operator, literal).
+        self.Predicates = predicates
+
+    def IsPathItem(self):
+        """
+        Returns True if the step selects a child by its name only.
+        """
+        return self.Axis == "/" and self.IsNameTest() and not self.Predicates
+
+    def IsNameTest(self):
+        """
+        Returns True if the test can only match a ShortName.
+        """
+        return self.Test != "*" and not _ElementTypePattern.match(self.Test)
+
+    def Matches(self, shortName, elementType, readProperty):
+        """
+        Returns True if an element matches the test and all predicates.
+        readProperty returns the value of a property by its name.
+        """
+        if self.Test != "*" and self.Test != shortName and self.Test != elementType:
+            return False
+        for (propertyName, operator, literal) in self.Predicates:
+            if not _Operators[operator](readProperty(propertyName), literal):
+                return False
+        return True
+
+    def Describe(self):
+        """
+        Returns the step in query syntax.
+        """
+        return self.Axis + self.Test + "".join("[%s%s'%s']" % predicate for predicate in self.Predicates)
+
+    def PropertyNames(self):
+        """
+        Returns the names of the properties used by the predicates.
+        """
+        return [propertyName for (propertyName, operator, literal) in self.Predicates]
+
+
+class _PathLookup():
+    """
+    Resolves a path of names below the context element.
+    """
+    def __init__(self, pathItems):
+        self.PathItems = pathItems
+
+    def Apply(self, contexts):
+        for (element, arPath) in contexts:
+            if arPath == "" and element == Utilities.SdApplication.ActiveProject.RootAutosar:
+                element = Utilities.GetElementByPath("/" + "/".join(self.PathItems))
+            else:
+                for pathItem in self.PathItems:
+                    element = _FindChild(element, pathItem)
+                    if element == None:
+                        break
+            if element != None:
+                yield (element, arPath + "/" + "/".join(self.PathItems))
+
+    def Explain(self):
+        return "PathLookup /%s (path cache)" % "/".join(self.PathItems)
+
+
+class _ChildLookup():
+    """
+    Selects the children of the context elements which match a step.
+    """
+    def __init__(self, step):
+        self.Step = step
+
+    def Apply(self, contexts):
+        for (element, arPath) in contexts:
+            if self.Step.IsNameTest():
+                child = _FindChild(element, self.Step.Test)
+                if child != None and self.Step.Matches(self.Step.Test, None, lambda name: _ReadProperty(child, name)):
+                    yield (child, arPath + "/" + self.Step.Test)
+                continue
+            for collectionName in ("ArPackages", "Elements"):
+                collection = _ReadProperty(element, collectionName)
+                if collection == None:
+                    continue
+                for child in Utilities.IterateCollection(collection):
+                    shortName = _ReadProperty(child, "ShortName")
+                    if self.Step.Matches(shortName, _ReadProperty(child, "ElementType"), \
+                        lambda name: _ReadProperty(child, name)):
+                        yield (child, arPath + "/" + shortName)
+
+    def Explain(self):
+        if self.Step.IsNameTest():
+            return "ChildLookup %s (by name)" % self.Step.Describe()
+        return "ChildScan %s" % self.Step.Describe()
+
+
+class _DescendantTraversal():
+    """
+    Selects the descendants of the context elements which match a step by a
+    traversal of the packages.
+    """
+    def __init__(self, step):
+        self.Step = step
+
+    def Apply(self, contexts):
+        visitedArPaths = set()
+        for (element, arPath) in contexts:
+            walkItems = Utilities.WalkModel(element, properties=self.Step.PropertyNames(), \
+                prune=_IsNoPackage, rootArPath=arPath)
+            for walkItem in walkItems:
+                if walkItem.ArPath in visitedArPaths:
+                    continue
+                if self.Step.Matches(walkItem.ArPath.rsplit("/", 1)[-1], walkItem.ElementType, \
+                    walkItem.Properties.get):
+                    visitedArPaths.add(walkItem.ArPath)
+                    yield (walkItem.Element, walkItem.ArPath)
+
+    def Explain(self):
+        return "DescendantTraversal %s (packages only)" % self.Step.Describe()
+
+
+class _TypeIndexLookup():
+    """
+    Selects the descendants of the context elements which match a step by the
+    type index of the ElementType.
+    """
+    def __init__(self, step):
+        self.Step = step
+
+    def Apply(self, contexts):
+        visitedArPaths = set()
+        for (element, arPath) in contexts:
+            indexedElements = TypeIndexProviders[self.Step.Test](arPath)
+            if indexedElements == None:
+                for (traversedElement, traversedArPath) in _DescendantTraversal(self.Step).Apply([(element, arPath)]):
+                    if traversedArPath not in visitedArPaths:
+                        visitedArPaths.add(traversedArPath)
+                        yield (traversedElement, traversedArPath)
+                continue
+            for (indexedElement, indexedArPath) in indexedElements:
+                if not indexedArPath.startswith(arPath + "/") or indexedArPath in visitedArPaths:
+                    continue
+                if self.Step.Matches(indexedArPath.rsplit("/", 1)[-1], self.Step.Test, \
+                    lambda name: _ReadProperty(indexedElement, name)):
+                    visitedArPaths.add(indexedArPath)
+                    yield (indexedElement, indexedArPath)
+
+    def Explain(self):
+        return "TypeIndexLookup %s" % self.Step.Describe()
+
+
+def RegisterTypeIndex(elementType, provider):
+    """
+    Registers the type index of an ElementType, see TypeIndexProviders.
+    Queries compiled before are compiled again to use it.
+    """
+    TypeIndexProviders[elementType] = provider
+    _CompiledQueries.clear()
+
+
+def _ReferenceIndexProvider(elementType):
+    """
+    Returns the provider of the elements of an ElementType by the
+    ReferenceIndex, which is not created by the provider.
+    """
+    def Provider(arPath):
+        referenceIndex = Utilities.GetReferenceIndex(create=False)
+        if referenceIndex == None:
+            return None
+        return referenceIndex.FindElementsByType(elementType, arPath)
+    return Provider
+
+
+def _Equals(value, literal):
+    """
+    Compares a property value with a literal, numerically if possible.
+    """
+    if value == None:
+        return False
+    if Utilities.Isa(value, "bool"):
+        return str(value).lower() == literal.lower()
+    if Utilities.Isa(value, "int") or Utilities.Isa(value, "float"):
+        try:
+            return float(value) == float(literal)
+        except ValueError:
+            return False
+    return str(value) == literal
+
+
+def _FindChild(element, shortName):
+    """
+    Returns the subpackage or element with the given name or None.
+    """
+    for collectionName in ("ArPackages", "Elements"):
+        collection = _ReadProperty(element, collectionName)
+        if collection != None:
+            child = collection.Item(shortName)
+            if child != None:
+                return child
+    return None
+
+
+def _IsNoPackage(walkItem):
+    """
+    Prunes the traversal below elements which are no packages.
+    """
+    return walkItem.ElementType != "IARPackage"
+
+
+def _ParseQuery(query):
+    """
+    Parses a query into a list of _Steps.
+    """
+    steps = []
+    position = 0
+    while position < len(query):
+        stepMatch = _StepPattern.match(query, position)
+        if stepMatch == None:
+            raise Exception("Invalid query %s at position %d" % (query, position))
+        position = stepMatch.end()
+        predicates = []
+        while position < len(query) and query[position] == "[":
+            predicateMatch = _PredicatePattern.match(query, position)
+            if predicateMatch == None:
+                raise Exception("Invalid predicate in query %s at position %d" % (query, position))
+            literal = predicateMatch.group(3)
+            if literal[0] in "'\"":
+                literal = literal[1:-1]
+            predicates.append((predicateMatch.group(1), predicateMatch.group(2), literal))
+            position = predicateMatch.end()
+        steps.append(_Step(stepMatch.group(1), stepMatch.group(2).strip(), predicates))
+    if not steps:
+        raise Exception("Empty query")
+    return steps
+
+
+# The ElementTypes with references are looked up in the ReferenceIndex.
+for _ElementType in Utilities.ReferenceProperties:
+    RegisterTypeIndex(_ElementType, _ReferenceIndexProvider(_ElementType))
@@ -0,0 +1,598 @@
+"""
+--------------------------------------------------------------------------------
+File:        ModelSnapshot.py
+
+Description: Compact columnar snapshot of a SystemDesk project for offline
+             analysis. SnapshotProject() walks the model once and writes the
+             elements to a file, which is loaded by Snapshot without
+             SystemDesk:
+                 SnapshotProject("Project.sdsnap")     # with SystemDesk
+                 with Snapshot("Project.sdsnap") as snapshot:
+                     for elementId in snapshot.ElementsOfType("IISignal"):
+                         print(snapshot.ArPath(elementId))
+
+Tip/Remarks: Elements are identified by integer IDs in the order of the walk,
+             parents and references are stored as element IDs. All strings
+             are stored once in a string table and referred to by their ID.
+             Each column is an array of 32-bit integers, which is memory-mapped
+             on load, so only the parts of the file which are used are read.
+
+             File layout, all sections aligned to 4 bytes:
+                 header              magic, byte order and counts
+                 string offsets      uint32[stringCount + 1]
+                 string data         UTF-8
+                 parents             int32[elementCount], -1 for the root
+                 element types       uint32[elementCount], string IDs
+                 short names         uint32[elementCount], string IDs
+                 property names      uint32[propertyCount], string IDs
+                 property values     uint32[propertyCount * elementCount],
+                                     string IDs or NO_VALUE, one column per
+                                     property
+                 reference sources   int32[referenceCount], sorted
+                 reference names     uint32[referenceCount], string IDs
+                 reference targets   int32[referenceCount], -1 for targets
+                                     outside the snapshot
+
+             DiffSnapshots() compares two snapshots, e.g. of the last and the
+             current build, to report what changed in the model.
+
+Limitations: The file is written in the byte order of the machine and can only
+             be loaded on machines with the same byte order.
+--------------------------------------------------------------------------------
+"""
+
+import array
+import bisect
+import mmap
+import struct
+import sys
+
+import Utilities
+from Utilities import _ElementKey, _ReadProperty
+
+# Magic number and version of the file format.
+MAGIC = b"SDSNAP01"
+
+# Property value which is missing for an element.
+NO_VALUE = 0xFFFFFFFF
+
+# Properties which are stored in a snapshot by ElementType.
+SnapshotProperties = {
+    "ICanFrame": ("FrameLength",),
+    "ICanFrameTriggering": ("Identifier",),
+    "IISignal": ("Length",),
+    "IISignalIPdu": ("Length",),
+    "IISignalToIPduMapping": ("StartPosition",),
+    "ILinUnconditionalFrame": ("FrameLength",),
+    "ISystemSignal": ("DynamicLength",),
+    }
+
+# Header: magic, byte order (0 little, 1 big), elementCount, stringCount,
+# propertyCount, referenceCount.
+_Header = struct.Struct("<8sIIIII")
+
+
+def DiffSnapshots(oldSnapshot, newSnapshot):
+    """
+    Returns the SnapshotDiff between two snapshots. Elements are matched by
+    their AUTOSAR path, elements without ShortName by their position among
+    the children of the same ElementType of their parent.
+    """
+    oldKeys = _ElementKeys(oldSnapshot)
+    newKeys = _ElementKeys(newSnapshot)
+    oldIds = dict((key, elementId) for (elementId, key) in enumerate(oldKeys))
+    oldPackages = _PackageKeys(oldSnapshot, oldKeys)
+    newPackages = _PackageKeys(newSnapshot, newKeys)
+    propertyNames = sorted(set(oldSnapshot.PropertyNames()) | set(newSnapshot.PropertyNames()))
+    snapshotDiff = SnapshotDiff()
+    for (newId, key) in enumerate(newKeys):
+        oldId = oldIds.pop(key, None)
+        elementType = newSnapshot.ElementType(newId)
+        if oldId == None:
+            snapshotDiff.Added.append(ElementChange(key, elementType, newPackages[newId], []))
+            continue
+        changes = []
+        oldElementType = oldSnapshot.ElementType(oldId)
+        if oldElementType != elementType:
+            changes.append("ElementType: %s -> %s" % (oldElementType, elementType))
+        for propertyName in propertyNames:
+            oldValue = oldSnapshot.Property(oldId, propertyName)
+            newValue = newSnapshot.Property(newId, propertyName)
+            if oldValue != newValue:
+                changes.append("%s: %s -> %s" % (propertyName, oldValue, newValue))
+        oldReferences = set(_ReferenceKeys(oldSnapshot, oldKeys, oldId))
+        newReferences = set(_ReferenceKeys(newSnapshot, newKeys, newId))
+        for (propertyName, targetKey) in sorted(oldReferences - newReferences):
+            changes.append("-%s %s" % (propertyName, targetKey))
+            snapshotDiff.ReferenceChanges += 1
+        for (propertyName, targetKey) in sorted(newReferences - oldReferences):
+            changes.append("+%s %s" % (propertyName, targetKey))
+            snapshotDiff.ReferenceChanges += 1
+        if changes:
+            snapshotDiff.Modified.append(ElementChange(key, elementType, newPackages[newId], changes))
+    for (key, oldId) in sorted(oldIds.items(), key=lambda item: item[1]):
+        snapshotDiff.Removed.append(ElementChange(key, oldSnapshot.ElementType(oldId), oldPackages[oldId], []))
+    return snapshotDiff
+
+
+def SnapshotProject(fileName, root=None, properties=None, chunkSize=100):
+    """
+    Walks the model below the root, by default the root of the active
+    project, and writes its snapshot to a file. Returns the number of elements.
+    Reference targets are resolved by their AUTOSAR path below the root, which
+    is read from their parents up to the first element with known path.
+    properties:     Properties to store by ElementType, default is
+                    SnapshotProperties.
+    """
+    if root == None:
+        root = Utilities.SdApplication.ActiveProject.RootAutosar
+    if properties == None:
+        properties = SnapshotProperties
+    writer = _SnapshotWriter()
+    # AUTOSAR paths of the walked elements and the resolved reference targets
+    # by their key, see Utilities._ElementKey().
+    arPaths = {_ElementKey(root): ""}
+    # Tuples (elementId, arPath) of the ancestors of the current element by
+    # their depth.
+    ancestors = [(-1, "")]
+    for walkItem in Utilities.WalkModel(root, chunkSize=chunkSize, childCollections=Utilities.ChildCollections):
+        del ancestors[walkItem.Depth:]
+        (parentId, parentArPath) = ancestors[-1]
+        shortName = ""
+        if walkItem.ArPath != parentArPath:
+            # Elements without ShortName have the ArPath of their parent.
+            shortName = walkItem.ArPath.rsplit("/", 1)[-1]
+        elementId = writer.AddElement(walkItem.ArPath, parentId, walkItem.ElementType, shortName)
+        if shortName:
+            arPaths[_ElementKey(walkItem.Element)] = walkItem.ArPath
+        ancestors.append((elementId, walkItem.ArPath))
+        for propertyName in properties.get(walkItem.ElementType, ()):
+            writer.SetProperty(elementId, propertyName, _ReadProperty(walkItem.Element, propertyName))
+        for (propertyName, target) in Utilities.GetReferences(walkItem.Element, walkItem.ElementType):
+            writer.AddReference(elementId, propertyName, _ReferenceTargetPath(target, arPaths))
+    writer.Write(fileName)
+    return len(writer.Parents)
+
+
+class Snapshot():
+    """
+    Snapshot file loaded by memory mapping. Elements are identified by their
+    element ID, see Count.
+    """
+    def __init__(self, fileName):
+        self.FileName = fileName
+        with open(fileName, "rb") as snapshotFile:
+            self._Map = mmap.mmap(snapshotFile.fileno(), 0, access=mmap.ACCESS_READ)
+        self._Views = []
+        (magic, byteOrder, self.Count, stringCount, propertyCount, referenceCount) = _Header.unpack_from(self._Map)
+        if magic != MAGIC:
+            self.Close()
+            raise Exception("Invalid snapshot file " + fileName)
+        if byteOrder != _ByteOrder():
+            self.Close()
+            raise Exception("Snapshot file %s was written with a different byte order" % fileName)
+        self._Position = _Header.size
+        self._StringOffsets = self._Column("I", stringCount + 1)
+        self._StringData = self._Bytes(self._StringOffsets[stringCount])
+        self._Parents = self._Column("i", self.Count)
+        self._ElementTypes = self._Column("I", self.Count)
+        self._ShortNames = self._Column("I", self.Count)
+        propertyNames = self._Column("I", propertyCount)
+        propertyValues = self._Column("I", propertyCount * self.Count)
+        self._ReferenceSources = self._Column("i", referenceCount)
+        self._ReferenceNames = self._Column("I", referenceCount)
+        self._ReferenceTargets = self._Column("i", referenceCount)
+        # Decoded strings by string ID.
+        self._Strings = [None] * stringCount
+        # Property columns by property name.
+        self._Properties = {}
+        for index in range(propertyCount):
+            column = propertyValues[index * self.Count:(index + 1) * self.Count]
+            self._Views.append(column)
+            self._Properties[self.String(propertyNames[index])] = column
+        # Indexes which are built on first use.
+        self._ArPaths = None
+        self._Children = None
+        self._ElementsOfType = None
+        self._Referrers = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, excType, excValue, traceback):
+        self.Close()
+
+    def Close(self):
+        """
+        Releases the memory mapping of the file.
+        """
+        self._Properties = {}
+        for view in reversed(self._Views):
+            view.release()
+        self._Views = []
+        self._Map.close()
+
+    def ArPath(self, elementId):
+        """
+        Returns the AUTOSAR path of an element. Elements without ShortName, e.g.
+        mappings, have the path of their parent.
+        """
+        pathItems = []
+        while elementId >= 0:
+            shortName = self.ShortName(elementId)
+            if shortName:
+                pathItems.append(shortName)
+            elementId = self._Parents[elementId]
+        return "/" + "/".join(reversed(pathItems))
+
+    def Children(self, elementId):
+        """
+        Returns the element IDs of the children of an element, or of the
+        top-level packages for elementId -1.
+        """
+        if self._Children == None:
+            self._Children = {}
+            for childId in range(self.Count):
+                self._Children.setdefault(self._Parents[childId], []).append(childId)
+        return self._Children.get(elementId, [])
+
+    def ElementType(self, elementId):
+        """
+        Returns the ElementType of an element.
+        """
+        return self.String(self._ElementTypes[elementId])
+
+    def ElementsOfType(self, elementType):
+        """
+        Returns the element IDs of all elements of an ElementType.
+        """
+        if self._ElementsOfType == None:
+            self._ElementsOfType = {}
+            for elementId in range(self.Count):
+                self._ElementsOfType.setdefault(self._ElementTypes[elementId], []).append(elementId)
+        for (stringId, elementIds) in self._ElementsOfType.items():
+            if self.String(stringId) == elementType:
+                return elementIds
+        return []
+
+    def FindElement(self, arPath):
+        """
+        Returns the element ID of the element with the given AUTOSAR path or
+        None. For elements without ShortName the parent is returned.
+        """
+        if self._ArPaths == None:
+            self._ArPaths = {}
+            for elementId in range(self.Count):
+                if self._ShortNames[elementId]:
+                    self._ArPaths.setdefault(self.ArPath(elementId), elementId)
+        return self._ArPaths.get(arPath)
+
+    def Parent(self, elementId):
+        """
+        Returns the element ID of the parent of an element or -1.
+        """
+        return self._Parents[elementId]
+
+    def Property(self, elementId, propertyName):
+        """
+        Returns the value of a stored property as string or None.
+        """
+        column = self._Properties.get(propertyName)
+        if column == None or column[elementId] == NO_VALUE:
+            return None
+        return self.String(column[elementId])
+
+    def PropertyNames(self):
+        """
+        Returns the names of the stored properties.
+        """
+        return list(self._Properties)
+
+    def References(self, elementId):
+        """
+        Returns a list of tuples (propertyName, targetId) for the references of
+        an element. targetId is -1 for targets outside the snapshot.
+        """
+        start = bisect.bisect_left(self._ReferenceSources, elementId)
+        end = bisect.bisect_right(self._ReferenceSources, elementId, start)
+        return [(self.String(self._ReferenceNames[index]), self._ReferenceTargets[index]) \
+            for index in range(start, end)]
+
+    def Referrers(self, elementId):
+        """
+        Returns a list of tuples (propertyName, sourceId) for the references to
+        an element.
+        """
+        if self._Referrers == None:
+            self._Referrers = {}
+            for index in range(len(self._ReferenceTargets)):
+                self._Referrers.setdefault(self._ReferenceTargets[index], []).append(index)
+        return [(self.String(self._ReferenceNames[index]), self._ReferenceSources[index]) \
+            for index in self._Referrers.get(elementId, [])]
+
+    def ShortName(self, elementId):
+        """
+        Returns the ShortName of an element or an empty string.
+        """
+        return self.String(self._ShortNames[elementId])
+
+    def String(self, stringId):
+        """
+        Returns a string of the string table by its ID.
+        """
+        string = self._Strings[stringId]
+        if string == None:
+            string = bytes(self._StringData[self._StringOffsets[stringId]:self._StringOffsets[stringId + 1]]).decode("utf-8")
+            self._Strings[stringId] = string
+        return string
+
+    def _Bytes(self, size):
+        """
+        Returns a view of the next size bytes of the file.
+        """
+        view = memoryview(self._Map)[self._Position:self._Position + size]
+        self._Views.append(view)
+        self._Position += _Align(size)
+        return view
+
+    def _Column(self, typeCode, count):
+        """
+        Returns a view of the next column of the file.
+        """
+        view = self._Bytes(count * 4).cast(typeCode)
+        self._Views.append(view)
+        return view
+
+
+class ElementChange():
+    """
+    Element which was added, removed or modified between two snapshots.
+    Changes contains a description of each modification.
+    """
+    def __init__(self, key, elementType, package, changes):
+        self.Key = key
+        self.ElementType = elementType
+        self.Package = package
+        self.Changes = changes
+
+    def __repr__(self):
+        return "<ElementChange %s %s>" % (self.ElementType, self.Key)
+
+
+class SnapshotDiff():
+    """
+    Differences between two snapshots, see DiffSnapshots().
+    """
+    def __init__(self):
+        self.Added = []
+        self.Removed = []
+        self.Modified = []
+        # Number of added and removed references of the modified elements.
+        self.ReferenceChanges = 0
+
+    def IsEmpty(self):
+        """
+        Returns True if the snapshots are equal.
+        """
+        return not (self.Added or self.Removed or self.Modified)
+
+    def Report(self):
+        """
+        Returns the differences as list of text lines, grouped by package and
+        ElementType.
+        """
+        lines = []
+        for ((package, elementType), counts) in sorted(self.Summary().items()):
+            lines.append("%s %s: %d added, %d removed, %d modified" % \
+                (package, elementType, counts["Added"], counts["Removed"], counts["Modified"]))
+        for elementChange in self.Modified:
+            for change in elementChange.Changes:
+                lines.append("    %s %s" % (elementChange.Key, change))
+        return lines
+
+    def Summary(self):
+        """
+        Returns the number of added, removed and modified elements as dictionary
+        {(package, elementType): {"Added": n, "Removed": n, "Modified": n}}.
+        """
+        summary = {}
+        for (kind, elementChanges) in (("Added", self.Added), ("Removed", self.Removed), ("Modified", self.Modified)):
+            for elementChange in elementChanges:
+                counts = summary.get((elementChange.Package, elementChange.ElementType))
+                if counts == None:
+                    counts = summary[(elementChange.Package, elementChange.ElementType)] = \
+                        {"Added": 0, "Removed": 0, "Modified": 0}
+                counts[kind] += 1
+        return summary
+
+    def Touches(self, elementTypes=None, packages=None):
+        """
+        Returns True if an element of one of the ElementTypes or below one of the
+        packages was changed. None matches all.
+        """
+        for elementChange in self.Added + self.Removed + self.Modified:
+            if elementTypes != None and elementChange.ElementType not in elementTypes:
+                continue
+            if packages != None and not any(elementChange.Key == package or \
+                elementChange.Key.startswith(package + "/") for package in packages):
+                continue
+            return True
+        return False
+
+
+class _SnapshotWriter():
+    """
+    Collects the columns of a snapshot and writes them to a file.
+    """
+    def __init__(self):
+        self.Strings = [""]
+        self.StringIds = {"": 0}
+        self.Parents = _NewColumn("i")
+        self.ElementTypes = _NewColumn("I")
+        self.ShortNames = _NewColumn("I")
+        # IDs of the elements with ShortName by their AUTOSAR path.
+        self.ElementIds = {}
+        # Property columns by property name.
+        self.Properties = {}
+        self.ReferenceSources = _NewColumn("i")
+        self.ReferenceNames = _NewColumn("I")
+        # AUTOSAR paths of the referenced elements, resolved to element IDs by
+        # Write(). None for targets without ShortName or outside the root.
+        self.ReferenceTargets = []
+
+    def AddElement(self, arPath, parentId, elementType, shortName):
+        elementId = len(self.Parents)
+        if shortName:
+            self.ElementIds[arPath] = elementId
+        self.Parents.append(parentId)
+        self.ElementTypes.append(self.StringId(elementType))
+        self.ShortNames.append(self.StringId(shortName))
+        return elementId
+
+    def AddReference(self, elementId, propertyName, targetArPath):
+        self.ReferenceSources.append(elementId)
+        self.ReferenceNames.append(self.StringId(propertyName))
+        self.ReferenceTargets.append(targetArPath)
+
+    def SetProperty(self, elementId, propertyName, value):
+        if value == None:
+            return
+        column = self.Properties.get(propertyName)
+        if column == None:
+            column = self.Properties[propertyName] = _NewColumn("I")
+        if len(column) <= elementId:
+            column.extend([NO_VALUE] * (elementId + 1 - len(column)))
+        column[elementId] = self.StringId(str(value))
+
+    def StringId(self, string):
+        stringId = self.StringIds.get(string)
+        if stringId == None:
+            stringId = self.StringIds[string] = len(self.Strings)
+            self.Strings.append(string)
+        return stringId
+
+    def Write(self, fileName):
+        elementCount = len(self.Parents)
+        referenceTargets = _NewColumn("i")
+        referenceTargets.extend(self.ElementIds.get(arPath, -1) for arPath in self.ReferenceTargets)
+        propertyNames = _NewColumn("I")
+        for propertyName in self.Properties:
+            propertyNames.append(self.StringId(propertyName))
+        encodedStrings = [string.encode("utf-8") for string in self.Strings]
+        stringOffsets = _NewColumn("I")
+        offset = 0
+        for encodedString in encodedStrings:
+            stringOffsets.append(offset)
+            offset += len(encodedString)
+        stringOffsets.append(offset)
+        with open(fileName, "wb") as snapshotFile:
+            snapshotFile.write(_Header.pack(MAGIC, _ByteOrder(), elementCount, len(self.Strings), \
+                len(self.Properties), len(self.ReferenceSources)))
+            stringOffsets.tofile(snapshotFile)
+            snapshotFile.write(b"".join(encodedStrings))
+            snapshotFile.write(b"\0" * (_Align(offset) - offset))
+            for column in (self.Parents, self.ElementTypes, self.ShortNames, propertyNames):
+                column.tofile(snapshotFile)
+            for column in self.Properties.values():
+                column.extend([NO_VALUE] * (elementCount - len(column)))
+                column.tofile(snapshotFile)
+            for column in (self.ReferenceSources, self.ReferenceNames, referenceTargets):
+                column.tofile(snapshotFile)
+
+
+def _Align(size):
+    """
+    Returns the size rounded up to a multiple of 4.
+    """
+    return (size + 3) & ~3
+
+
+def _ByteOrder():
+    """
+    Returns the byte order of the machine as stored in the header.
+    """
+    return 0 if sys.byteorder == "little" else 1
+
+
+def _ElementKeys(snapshot):
+    """
+    Returns a list with the key of each element of a snapshot by element ID.
+    The key is the AUTOSAR path, for elements without ShortName the key of the
+    parent followed by the ElementType and the position among the children of
+    the parent with the same ElementType.
+    """
+    keys = []
+    # Number of children without ShortName by the tuple (parentId, elementType).
+    positions = {}
+    for elementId in range(snapshot.Count):
+        parentId = snapshot.Parent(elementId)
+        # Parents precede their children in the order of the walk.
+        parentKey = keys[parentId] if parentId >= 0 else ""
+        shortName = snapshot.ShortName(elementId)
+        if shortName:
+            keys.append(parentKey + "/" + shortName)
+        else:
+            elementType = snapshot.ElementType(elementId)
+            position = positions.get((parentId, elementType), 0)
+            positions[(parentId, elementType)] = position + 1
+            keys.append("%s/<%s %d>" % (parentKey, elementType, position))
+    return keys
+
+
+def _PackageKeys(snapshot, keys):
+    """
+    Returns a list with the key of the package of each element by element ID.
+    """
+    packageKeys = []
+    for elementId in range(snapshot.Count):
+        parentId = snapshot.Parent(elementId)
+        if parentId < 0:
+            packageKeys.append("/")
+        elif snapshot.ElementType(parentId) == "IARPackage":
+            packageKeys.append(keys[parentId])
+        else:
+            packageKeys.append(packageKeys[parentId])
+    return packageKeys
+
+
+def _ReferenceTargetPath(target, arPaths):
+    """
+    Returns the AUTOSAR path of a reference target below the root, or None if
+    the target has no ShortName or is not below the root. arPaths holds the
+    known paths by element key, the root has the path "". The path of the
+    target is added to it.
+    """
+    targetKey = _ElementKey(target)
+    if targetKey in arPaths:
+        return arPaths[targetKey] or "/"
+    arPathItems = []
+    element = target
+    while element != None:
+        elementKey = _ElementKey(element)
+        if elementKey in arPaths:
+            arPath = arPaths[elementKey] + "/" + "/".join(reversed(arPathItems))
+            arPaths[targetKey] = arPath
+            return arPath
+        shortName = _ReadProperty(element, "ShortName")
+        if shortName:
+            arPathItems.append(shortName)
+        elif element is target:
+            return None
+        element = _ReadProperty(element, "Parent")
+    return None
+
+
+def _ReferenceKeys(snapshot, keys, elementId):
+    """
+    Yields the tuple (propertyName, targetKey) for each reference of an element.
+    Targets outside the snapshot have the key <outside>.
+    """
+    for (propertyName, targetId) in snapshot.References(elementId):
+        yield (propertyName, keys[targetId] if targetId >= 0 else "<outside>")
+
+
+def _NewColumn(typeCode):
+    """
+    Returns an empty column of 32-bit integers.
+    """
+    return array.array(typeCode)
@@ -0,0 +1,562 @@
+"""
+--------------------------------------------------------------------------------
+File:        OfflineModel.py
+
+Description: Offline backend for the helpers of Utilities.py. The model is
+             built in memory by pure Python objects with the same surface as
+             the SystemDesk COM objects and written to an ARXML file, which can
+             be imported into SystemDesk by ImportAutosarFilesAtProject():
+                 Utilities.UseOfflineBackend()
+                 iSignal = Utilities.CreateISignal(systemSignal)
+                 ...
+                 OfflineModel.WriteArxml("Signals.arxml")
+
+Tip/Remarks: The element objects support the patterns used by the helpers:
+             properties and references are set by assignment, collections
+             provide Item(), Add(), AddNew() and AddNew<Type>(), and elements
+             provide SetNew<Property>(), Add<Property>(), GetOrCreate<Property>(),
+             TrySet<Property>() and Delete(). Unset properties are None. The
+             ElementTypes in PropertyOrder only have the properties listed
+             there and in IdentifiableProperties, other names raise an
+             AttributeError like unknown names of SystemDesk.
+
+             The XML names are derived from the ElementTypes and property names
+             by the AUTOSAR naming rules, e.g. IISignalIPdu -> I-SIGNAL-I-PDU
+             and SystemSignalRef -> SYSTEM-SIGNAL-REF. Names which differ are
+             listed in XmlNames.
+
+Limitations: Methods of SystemDesk which do more than creating elements, e.g.
+             GetInterface() or the import and export methods, are not available
+             and raise an AttributeError. The XML elements are written in
+             schema order for the ElementTypes in PropertyOrder, for the other
+             ElementTypes in the order in which the properties were set.
+             Only the packages are written, WriteArxml() raises an exception
+             for a project with ECU configurations.
+--------------------------------------------------------------------------------
+"""
+
+import re
+
+# Namespace and schema of the written ARXML files.
+AUTOSAR_NAMESPACE = "http://autosar.org/schema/r4.0"
+AUTOSAR_SCHEMA = "AUTOSAR_4-3-0.xsd"
+
+# XML names which differ from the names derived from ElementTypes, collection
+# names and property names.
+XmlNames = {
+    "InternalBehavior": "INTERNAL-BEHAVIORS",
+    "L2": "L-2",
+    }
+
+# ElementTypes of the elements created by AddNew() by collection name. The
+# default is the collection name without the plural s.
+CollectionItemTypes = {
+    "ArPackages": "IARPackage",
+    "InternalBehavior": "ISwcInternalBehavior",
+    "ISignalToPduMappings": "IISignalToIPduMapping",
+    "L2": "ILOverviewParagraph",
+    "V": "INumericalValue",
+    }
+
+# Properties which are collections although their name does not end with s.
+CollectionNames = frozenset(("InternalBehavior", "L2", "L4", "L5", "Sd", "V"))
+
+# Collections whose items are written without an XML element for the
+# collection, each item with the XML name of the collection. Their items may
+# also be plain values.
+UnwrappedCollections = frozenset(("L2", "Sd", "V"))
+
+# Properties which are no collections although their name ends with s.
+ScalarPropertyNames = frozenset(("Address", "Alias", "Status", "Bus", "ContainedIPduProps", "ISignalProps", \
+    "NetworkRepresentationProps", "PhysicalProps", "SdgContents"))
+
+# Properties which are created on first access.
+ImplicitChildren = frozenset(("MixedContent",))
+
+# Properties which are written as XML attributes of their element.
+XmlAttributeNames = frozenset(("Gid", "L"))
+
+# Child elements whose text is written without their own XML element.
+InlineChildren = frozenset(("MixedContent",))
+
+# Child elements whose properties are written into the XML element of their
+# parent, e.g. the SDs of an SDG.
+MergedChildren = frozenset(("SdgContents",))
+
+# Properties which are written as text of their XML element by ElementType.
+TextProperties = {"ISd": "Value"}
+
+# Properties of all identifiable elements in schema order, written before the
+# properties of PropertyOrder.
+IdentifiableProperties = ("ShortNameFragments", "LongName", "Desc", "Category", "AdminData", "Introduction", \
+    "Annotations", "VariationPoint")
+
+# Properties in schema order by ElementType. Properties which are not listed
+# are written after them in the order in which they were set.
+PropertyOrder = {
+    "IARPackage": ("ReferenceBases", "Elements", "ArPackages"),
+    "ICanFrame": ("FrameLength", "PduToFrameMappings"),
+    "ICanFrameTriggering": ("FramePortRefs", "FrameRef", "PduTriggerings", "CanAddressingMode", \
+        "CanFrameRxBehavior", "CanFrameTxBehavior", "Identifier", "RxIdentifierRange"),
+    "IISignal": ("DataTypePolicy", "ISignalProps", "ISignalType", "InitValue", "Length", \
+        "NetworkRepresentationProps", "SystemSignalRef", "TimeoutSubstitutionValue"),
+    "IISignalGroup": ("ISignalRefs", "SystemSignalGroupRef"),
+    "IISignalIPdu": ("HasDynamicLength", "Length", "ContainedIPduProps", "IPduTimingSpecifications", \
+        "ISignalToPduMappings", "UnusedBitPattern"),
+    "IISignalToIPduMapping": ("ISignalGroupRef", "ISignalRef", "PackingByteOrder", "StartPosition", \
+        "TransferProperty", "UpdateIndicationBitPosition"),
+    "IISignalTriggering": ("ISignalGroupRef", "ISignalPortRefs", "ISignalRef"),
+    "IISignalTriggeringRefConditional": ("ISignalTriggeringRef",),
+    "IPduToFrameMapping": ("PackingByteOrder", "PduRef", "StartPosition", "UpdateIndicationBitPosition"),
+    "IPduTriggering": ("IPduPortRefs", "IPduRef", "ISignalTriggerings"),
+    "IPduTriggeringRefConditional": ("PduTriggeringRef",),
+    "ISystemSignal": ("DynamicLength", "PhysicalProps"),
+    "ISystemSignalGroup": ("SystemSignalRefs", "TransformingSystemSignalRef"),
+    }
+
+# Properties with a typed SetNew method, e.g. SetNewValueSpecNumericalValueSpecification().
+TypedProperties = ("RamBlockInitValue", "RomBlockInitValue", "ModeGroupIref", "InitValue", "ValueSpec", \
+    "OsAlarmAction")
+
+# Name prefixes of the SystemDesk methods which are not available offline.
+_MethodPrefixes = ("Add", "Create", "Export", "Find", "Get", "Import", "Remove", "Run", "Set", "Try")
+
+# Word boundaries of the names for the conversion to XML names.
+_WordBoundary = re.compile(r"(?<=[a-z0-9])(?=[A-Z])|(?<=[A-Z])(?=[A-Z][a-z])|(?<=[A-Za-z])(?=[0-9])")
+
+# Position of the properties in the XML elements by ElementType, see PropertyOrder.
+_PropertyRanks = {}
+
+# Spelling of the property names by their lower case name. COM resolves names
+# case-insensitively, e.g. TypeTRef and TypeTref are the same property.
+_CanonicalNames = {
+    "elementtype": "ElementType",
+    "parent": "Parent",
+    "shortname": "ShortName",
+    }
+
+
+def WriteArxml(fileName, root=None, packages=None):
+    """
+    Writes the model below the root, by default the root of the offline
+    project, to an ARXML file. The file is written while the model is walked.
+    packages:       Top-level packages to write, default is all. The whole
+                    offline project can only be written without ECU
+                    configurations.
+    Returns the number of written elements.
+    """
+    if root == None:
+        import Utilities
+        project = Utilities.SdApplication.ActiveProject
+        if packages == None and project.EcuConfigurations.Count > 0:
+            raise Exception("The ECU configurations of the offline project %s cannot be written to ARXML." % project.Name)
+        root = project.RootAutosar
+    if packages == None:
+        packages = root.ArPackages.Elements
+    elementCount = 0
+    with open(fileName, "w", encoding="utf-8") as arxmlFile:
+        arxmlFile.write('<?xml version="1.0" encoding="UTF-8"?>\n')
+        arxmlFile.write('<AUTOSAR xmlns="%s" xmlns:xsi="http://www.w3.org/2001/XMLSchema-instance" ' \
+            'xsi:schemaLocation="%s %s">\n' % (AUTOSAR_NAMESPACE, AUTOSAR_NAMESPACE, AUTOSAR_SCHEMA))
+        arxmlFile.write("  <AR-PACKAGES>\n")
+        stack = [_ElementLines(package, ElementXmlName(package.ElementType), 2) for package in reversed(packages)]
+        elementCount += len(stack)
+        while stack:
+            line = next(stack[-1], None)
+            if line == None:
+                stack.pop()
+            elif isinstance(line, tuple):
+                # Child element, which is written before the rest of its parent.
+                stack.append(_ElementLines(*line))
+                elementCount += 1
+            else:
+                arxmlFile.write(line)
+        arxmlFile.write("  </AR-PACKAGES>\n")
+        arxmlFile.write("</AUTOSAR>\n")
+    return elementCount
+
+
+def ElementXmlName(elementType):
+    """
+    Returns the XML name of an ElementType.
+    """
+    xmlName = XmlNames.get(elementType)
+    if xmlName == None:
+        xmlName = XmlName(elementType[1:])
+    return xmlName
+
+
+def XmlName(name):
+    """
+    Returns the XML name of a collection or property.
+    """
+    xmlName = XmlNames.get(name)
+    if xmlName == None:
+        xmlName = _WordBoundary.sub("-", name).upper()
+    return xmlName
+
+
+class OfflineApplication():
+    """
+    Offline replacement of the SystemDesk application object.
+    """
+    def __init__(self, projectName="OfflineProject"):
+        self.ActiveProject = OfflineProject(projectName)
+        self.BatchMode = False
+        self.Visible = False
+
+    def Quit(self):
+        self.ActiveProject = None
+
+
+class OfflineProject():
+    """
+    Offline replacement of a SystemDesk project.
+    """
+    def __init__(self, name):
+        self.Name = name
+        self.RootAutosar = OfflineElement(None, "IAUTOSAR", None)
+        self.EcuConfigurations = OfflineCollection(None, "EcuConfigurations")
+
+    def Close(self, save=False):
+        pass
+
+
+class OfflineElement():
+    """
+    Element of the offline model.
+    """
+    def __init__(self, shortName, elementType, parent):
+        object.__setattr__(self, "ShortName", shortName)
+        object.__setattr__(self, "ElementType", elementType)
+        object.__setattr__(self, "Parent", parent)
+        # Values of the properties, collections and child elements by name.
+        object.__setattr__(self, "_Properties", {})
+        # Names of the properties whose child was created with an explicit type.
+        object.__setattr__(self, "_TypedProperties", set())
+        # Text content added by AddStringContent().
+        object.__setattr__(self, "_Text", [])
+        # OfflineCollections which contain the element, see OfflineCollection.Item().
+        object.__setattr__(self, "_Collections", [])
+
+    def __getattr__(self, name):
+        if name.startswith("_"):
+            raise AttributeError(name)
+        name = _CanonicalNames.setdefault(name.lower(), name)
+        if name in self._Properties:
+            return self._Properties[name]
+        if name in ("ElementType", "Parent", "ShortName"):
+            return object.__getattribute__(self, name)
+        if name.startswith("SetNew"):
+            return lambda: self._SetNew(name[len("SetNew"):])
+        if name.startswith("GetOrCreate"):
+            return lambda: self._GetOrCreate(name[len("GetOrCreate"):])
+        if name.startswith("TrySet"):
+            return lambda value: self._TrySet(name[len("TrySet"):], value)
+        if name.startswith("Add") and not name.startswith("AddNew"):
+            # Containers of the ECU configuration, e.g. AddOsAlarmAutostart().
+            return lambda: self._SetNew(name[len("Add"):])
+        if _IsCollectionName(name):
+            collection = OfflineCollection(self, name)
+            self._Properties[name] = collection
+            return collection
+        if name in ImplicitChildren:
+            return self._SetNew(name)
+        if name.startswith(_MethodPrefixes):
+            raise AttributeError("%s.%s is not available in the offline model" % (self.ElementType, name))
+        if not name[0].isupper() or \
+            (self.ElementType in PropertyOrder and name not in _GetPropertyRanks(self.ElementType)):
+            raise AttributeError("%s has no property %s" % (self.ElementType, name))
+        return None
+
+    def __setattr__(self, name, value):
+        name = _CanonicalNames.setdefault(name.lower(), name)
+        if name == "ShortName":
+            for collection in self._Collections:
+                collection._CheckShortName(self, value)
+            oldShortName = self.ShortName
+            object.__setattr__(self, name, value)
+            for collection in self._Collections:
+                collection._NoteRenamed(self, oldShortName)
+        elif value == None:
+            self._Properties.pop(name, None)
+        else:
+            self._Properties[name] = value
+
+    def __repr__(self):
+        return "<OfflineElement %s %s>" % (self.ElementType, self.ShortName)
+
+    def AddStringContent(self, text):
+        self._Text.append(text)
+
+    def Delete(self):
+        parent = self.Parent
+        if parent == None:
+            return
+        for (name, value) in list(parent._Properties.items()):
+            if value is self:
+                del parent._Properties[name]
+            elif isinstance(value, OfflineCollection) and self in value._Items:
+                value.Remove(self)
+
+    def GetElementsByARPath(self, arPath):
+        root = self
+        while root.Parent != None:
+            root = root.Parent
+        element = root
+        for shortName in arPath.strip("/").split("/"):
+            child = element.ArPackages.Item(shortName)
+            if child == None:
+                child = element.Elements.Item(shortName)
+            if child == None:
+                return ()
+            element = child
+        return (element,)
+
+    def _GetOrCreate(self, propertyName):
+        child = self._Properties.get(propertyName)
+        if child == None:
+            child = self._SetNew(propertyName)
+        return child
+
+    def _SetNew(self, name):
+        (propertyName, elementType) = (name, "I" + name)
+        for typedProperty in TypedProperties:
+            if name.startswith(typedProperty) and len(name) > len(typedProperty):
+                (propertyName, elementType) = (typedProperty, "I" + name[len(typedProperty):])
+                self._TypedProperties.add(propertyName)
+                break
+        else:
+            self._TypedProperties.discard(propertyName)
+        child = OfflineElement(None, elementType, self)
+        self._Properties[propertyName] = child
+        return child
+
+    def _TrySet(self, propertyName, value):
+        setattr(self, propertyName, value)
+        return True
+
+
+class OfflineCollection():
+    """
+    Collection of the offline model.
+    """
+    def __init__(self, owner, name):
+        self._Owner = owner
+        self._Name = name
+        self._Items = []
+        # First item with a ShortName by the ShortName, see Item().
+        self._ItemsByName = {}
+
+    def __getattr__(self, name):
+        if name.startswith("AddNew"):
+            return lambda shortName=None: self._AddNew(shortName, "I" + name[len("AddNew"):])
+        raise AttributeError(name)
+
+    def __iter__(self):
+        return iter(list(self._Items))
+
+    def __len__(self):
+        return len(self._Items)
+
+    @property
+    def Count(self):
+        return len(self._Items)
+
+    @property
+    def Elements(self):
+        return tuple(self._Items)
+
+    def Add(self, item):
+        """
+        Adds a reference to an element, or a new element for a name. Plain
+        values are added to the UnwrappedCollections.
+        """
+        if self._Name in UnwrappedCollections and not isinstance(item, OfflineElement):
+            self._Items.append(item)
+            return item
+        if isinstance(item, str):
+            return self.AddNew(item)
+        self._Append(item)
+        return item
+
+    def AddNew(self, shortName=None):
+        return self._AddNew(shortName, CollectionItemTypes.get(self._Name, "I" + self._Name.rstrip("s")))
+
+    def Item(self, name):
+        if isinstance(name, int):
+            return self._Items[name]
+        return self._ItemsByName.get(name)
+
+    def Remove(self, item):
+        if item not in self._Items:
+            return
+        self._Items.remove(item)
+        if isinstance(item, OfflineElement):
+            if self in item._Collections:
+                item._Collections.remove(self)
+            self._NoteRenamed(item, item.ShortName)
+
+    def _AddNew(self, shortName, elementType):
+        element = OfflineElement(shortName, elementType, self._Owner)
+        self._Append(element)
+        return element
+
+    def _Append(self, item):
+        if isinstance(item, OfflineElement):
+            self._CheckShortName(item, item.ShortName)
+        self._Items.append(item)
+        if isinstance(item, OfflineElement):
+            item._Collections.append(self)
+            if item.ShortName != None:
+                self._ItemsByName.setdefault(item.ShortName, item)
+
+    def _CheckShortName(self, item, shortName):
+        """
+        Raises an exception if the collection owns another element with the
+        ShortName, like SystemDesk does for duplicate ShortNames.
+        """
+        other = self._ItemsByName.get(shortName)
+        if shortName == None or other == None or other is item:
+            return
+        if item.Parent is self._Owner and other.Parent is self._Owner:
+            raise Exception("%s of %s already contains an element with the ShortName %s." % \
+                (self._Name, _ArPath(self._Owner), shortName))
+
+    def _NoteRenamed(self, item, oldShortName):
+        """
+        Updates the items by name after an item was renamed or removed.
+        """
+        if oldShortName != None and self._ItemsByName.get(oldShortName) is item:
+            del self._ItemsByName[oldShortName]
+            for other in self._Items:
+                if isinstance(other, OfflineElement) and other.ShortName == oldShortName:
+                    self._ItemsByName[oldShortName] = other
+                    break
+        if item in self._Items and item.ShortName != None:
+            self._ItemsByName.setdefault(item.ShortName, item)
+
+
+def _ArPath(element):
+    """
+    Returns the AUTOSAR path of an element.
+    """
+    pathItems = []
+    while element != None:
+        if element.ShortName:
+            pathItems.append(element.ShortName)
+        element = element.Parent
+    return "/" + "/".join(reversed(pathItems))
+
+
+def _ElementLines(element, tag, depth):
+    """
+    Yields the XML lines of an element. Child elements are yielded as tuple
+    (element, tag, depth), so the caller can write them without recursion.
+    Without tag, only the lines of the properties are yielded.
+    """
+    indent = "  " * depth
+    attributes = "".join(' %s="%s"' % (XmlName(name), _Escape(_XmlValue(value))) \
+        for (name, value) in element._Properties.items() if name in XmlAttributeNames)
+    properties = [(name, value) for (name, value) in element._Properties.items() if name not in XmlAttributeNames]
+    textProperty = TextProperties.get(element.ElementType)
+    if not element.ShortName and all(name in InlineChildren or name == textProperty for (name, value) in properties):
+        # Element with text only, e.g. <L-2 L="FOR-ALL">text</L-2>.
+        text = "".join(element._Text) + "".join(_XmlValue(value) if name == textProperty else "".join(value._Text) \
+            for (name, value) in properties)
+        yield "%s<%s%s>%s</%s>\n" % (indent, tag, attributes, _Escape(text), tag)
+        return
+    if tag != None:
+        yield "%s<%s%s>\n" % (indent, tag, attributes)
+    if element.ShortName:
+        yield "%s  <SHORT-NAME>%s</SHORT-NAME>\n" % (indent, _Escape(element.ShortName))
+    if element._Text:
+        yield "%s  %s\n" % (indent, _Escape("".join(element._Text)))
+    propertyRanks = _GetPropertyRanks(element.ElementType)
+    properties.sort(key=lambda nameValue: propertyRanks.get(nameValue[0], len(propertyRanks)))
+    for (name, value) in properties:
+        if name in InlineChildren:
+            yield "%s  %s\n" % (indent, _Escape("".join(value._Text)))
+        elif isinstance(value, OfflineCollection) and name in UnwrappedCollections:
+            for item in value.Elements:
+                if isinstance(item, OfflineElement):
+                    yield (item, XmlName(name), depth + 1)
+                else:
+                    yield "%s  <%s>%s</%s>\n" % (indent, XmlName(name), _Escape(_XmlValue(item)), XmlName(name))
+        elif isinstance(value, OfflineCollection):
+            if not value._Items:
+                continue
+            yield "%s  <%s>\n" % (indent, XmlName(name))
+            for item in value.Elements:
+                if item.Parent is element:
+                    yield (item, ElementXmlName(item.ElementType), depth + 2)
+                else:
+                    yield _ReferenceLine(indent + "    ", name.rstrip("s"), item)
+            yield "%s  </%s>\n" % (indent, XmlName(name))
+        elif isinstance(value, OfflineElement) and name in MergedChildren:
+            for line in _ElementLines(value, None, depth):
+                yield line
+        elif isinstance(value, OfflineElement):
+            if value.Parent is not element:
+                yield _ReferenceLine(indent + "  ", name, value)
+            elif name in element._TypedProperties:
+                yield "%s  <%s>\n" % (indent, XmlName(name))
+                yield (value, ElementXmlName(value.ElementType), depth + 2)
+                yield "%s  </%s>\n" % (indent, XmlName(name))
+            else:
+                yield (value, XmlName(name), depth + 1)
+        else:
+            yield "%s  <%s>%s</%s>\n" % (indent, XmlName(name), _Escape(_XmlValue(value)), XmlName(name))
+    if tag != None:
+        yield "%s</%s>\n" % (indent, tag)
+
+
+def _Escape(text):
+    """
+    Escapes the XML special characters of a text.
+    """
+    return text.replace("&", "&amp;").replace("<", "&lt;").replace(">", "&gt;").replace('"', "&quot;")
+
+
+def _GetPropertyRanks(elementType):
+    """
+    Returns the positions of the properties of an ElementType in its XML
+    element by property name, see IdentifiableProperties and PropertyOrder.
+    """
+    propertyRanks = _PropertyRanks.get(elementType)
+    if propertyRanks == None:
+        propertyNames = IdentifiableProperties + PropertyOrder.get(elementType, ())
+        propertyRanks = dict((name, index) for (index, name) in enumerate(propertyNames))
+        _PropertyRanks[elementType] = propertyRanks
+    return propertyRanks
+
+
+def _IsCollectionName(name):
+    """
+    Returns True if a property with the given name is a collection.
+    """
+    if name in CollectionNames:
+        return True
+    return name.endswith("s") and name[0].isupper() and name not in ScalarPropertyNames
+
+
+def _ReferenceLine(indent, name, target):
+    """
+    Returns the XML line of a reference to a target element.
+    """
+    tag = XmlName(name)
+    if not tag.endswith("REF"):
+        tag += "-REF"
+    return '%s<%s DEST="%s">%s</%s>\n' % (indent, tag, ElementXmlName(target.ElementType), _ArPath(target), tag)
+
+
+def _XmlValue(value):
+    """
+    Returns the XML text of a property value.
+    """
+    if isinstance(value, bool):
+        return "true" if value else "false"
+    if isinstance(value, int) and hasattr(type(value), "_names_"):
+        # SystemDesk enum, e.g. MostSignificantByteLast.
+        return XmlName(repr(value))
+    return str(value)
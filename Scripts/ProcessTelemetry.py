@@ -0,0 +1,334 @@
+"""
+--------------------------------------------------------------------------------
+File:        ProcessTelemetry.py
+
+Description: Samples the CPU time, the resident memory and the disk I/O of the
+             processes of a build, e.g. Python, SystemDesk and the VEOS build
+             tool, in a background thread, and summarizes them per span of
+             Profiling.Spans:
+                 sampler = ProcessTelemetry.TelemetrySampler(interval=0.5)
+                 sampler.Track(os.getpid(), "Python", includeChildren=False)
+                 sampler.Start()
+                 with Profiling.Span("VEOS build"):
+                     process = subprocess.Popen(arguments)
+                     sampler.Track(process.pid, "VEOS build")
+                     process.wait()
+                 sampler.Stop()
+                 sampler.Attach(Profiling.Spans)
+                 print(sampler.Summary(Profiling.Spans))
+             The samples are taken with time.perf_counter_ns(), the clock of
+             the spans.
+
+Tip/Remarks: The processes are read by a provider with the methods Sample(pid)
+             and FindPids(name). ProcFsProvider reads /proc on Linux,
+             PsutilProvider uses the optional psutil package on the other
+             platforms. By default the CPU time includes the children which the
+             process has waited for, e.g. the compilers of the VEOS build tool.
+             Track the parent of tracked processes without them.
+
+Limitations: Memory and CPU time between two samples are not seen, so phases
+             shorter than the interval get no or imprecise values. The disk
+             I/O of other users' processes may not be readable and is 0.
+--------------------------------------------------------------------------------
+"""
+
+import bisect
+import os
+import threading
+import time
+try:
+    import psutil
+except ImportError:
+    # Only needed on platforms without /proc.
+    psutil = None
+
+# Interval between two samples in seconds.
+DefaultInterval = 0.5
+
+
+def DefaultProvider():
+    """
+    Returns the provider of the platform or None if none is available.
+    """
+    if os.path.isdir("/proc/self"):
+        return ProcFsProvider()
+    if psutil != None:
+        return PsutilProvider()
+    return None
+
+
+class ProcessSample():
+    """
+    Resource usage of one process at one point in time.
+    """
+    def __init__(self, timeNs, cpuSeconds, childrenCpuSeconds, rssBytes, readBytes, writeBytes):
+        # Time of the sample by time.perf_counter_ns().
+        self.TimeNs = timeNs
+        # User and system CPU time of the process and of its waited-for children.
+        self.CpuSeconds = cpuSeconds
+        self.ChildrenCpuSeconds = childrenCpuSeconds
+        self.RssBytes = rssBytes
+        self.ReadBytes = readBytes
+        self.WriteBytes = writeBytes
+
+
+class ProcessUsage():
+    """
+    Resource usage of one process during one span.
+    """
+    def __init__(self, processName, cpuSeconds, peakRssBytes, readBytes, writeBytes, seconds):
+        self.ProcessName = processName
+        self.CpuSeconds = cpuSeconds
+        self.PeakRssBytes = peakRssBytes
+        self.ReadBytes = readBytes
+        self.WriteBytes = writeBytes
+        # Average number of busy cores, e.g. 2.0 for two cores.
+        self.CpuLoad = cpuSeconds / seconds if seconds > 0.0 else 0.0
+
+
+class ProcFsProvider():
+    """
+    Reads the processes from /proc on Linux.
+    """
+    def __init__(self):
+        self._TicksPerSecond = float(os.sysconf("SC_CLK_TCK"))
+        self._PageSize = os.sysconf("SC_PAGE_SIZE")
+
+    def Sample(self, pid):
+        """
+        Returns the ProcessSample of a process or None if it has ended.
+        """
+        timeNs = time.perf_counter_ns()
+        try:
+            with open("/proc/%d/stat" % pid, "r") as statFile:
+                stat = statFile.read()
+        except (IOError, OSError):
+            return None
+        # The fields after the command, which may contain blanks, start with the state (field 3).
+        fields = stat[stat.rindex(")") + 2:].split()
+        cpuTicks = int(fields[11]) + int(fields[12])
+        childrenCpuTicks = int(fields[13]) + int(fields[14])
+        rssBytes = int(fields[21]) * self._PageSize
+        (readBytes, writeBytes) = (0, 0)
+        try:
+            with open("/proc/%d/io" % pid, "r") as ioFile:
+                for line in ioFile:
+                    (key, value) = line.split(":", 1)
+                    if key == "read_bytes":
+                        readBytes = int(value)
+                    elif key == "write_bytes":
+                        writeBytes = int(value)
+        except (IOError, OSError):
+            pass
+        return ProcessSample(timeNs, cpuTicks / self._TicksPerSecond, childrenCpuTicks / self._TicksPerSecond, \
+            rssBytes, readBytes, writeBytes)
+
+    def FindPids(self, name):
+        """
+        Returns the ids of the processes whose name contains the given name,
+        ignoring the case.
+        """
+        pids = []
+        for entry in os.listdir("/proc"):
+            if not entry.isdigit():
+                continue
+            try:
+                with open("/proc/%s/comm" % entry, "r") as commFile:
+                    processName = commFile.read().strip()
+            except (IOError, OSError):
+                continue
+            if name.lower() in processName.lower():
+                pids.append(int(entry))
+        return pids
+
+
+class PsutilProvider():
+    """
+    Reads the processes with the psutil package.
+    """
+    def __init__(self):
+        if psutil == None:
+            raise Exception("The psutil package is not installed.")
+        self._Processes = {}
+
+    def Sample(self, pid):
+        """
+        Returns the ProcessSample of a process or None if it has ended.
+        """
+        timeNs = time.perf_counter_ns()
+        try:
+            process = self._Processes.get(pid)
+            if process == None:
+                process = psutil.Process(pid)
+                self._Processes[pid] = process
+            with process.oneshot():
+                cpuTimes = process.cpu_times()
+                rssBytes = process.memory_info().rss
+                try:
+                    ioCounters = process.io_counters()
+                    (readBytes, writeBytes) = (ioCounters.read_bytes, ioCounters.write_bytes)
+                except (AttributeError, psutil.AccessDenied):
+                    (readBytes, writeBytes) = (0, 0)
+        except (psutil.NoSuchProcess, psutil.AccessDenied):
+            self._Processes.pop(pid, None)
+            return None
+        childrenCpuSeconds = getattr(cpuTimes, "children_user", 0.0) + getattr(cpuTimes, "children_system", 0.0)
+        return ProcessSample(timeNs, cpuTimes.user + cpuTimes.system, childrenCpuSeconds, rssBytes, readBytes, writeBytes)
+
+    def FindPids(self, name):
+        """
+        Returns the ids of the processes whose name contains the given name,
+        ignoring the case.
+        """
+        return [process.pid for process in psutil.process_iter(["name"]) \
+            if name.lower() in (process.info["name"] or "").lower()]
+
+
+class TelemetrySampler():
+    """
+    Samples the tracked processes in a background thread.
+    """
+    def __init__(self, provider=None, interval=DefaultInterval):
+        self.Provider = provider or DefaultProvider()
+        self.Interval = interval
+        # Names of the tracked processes by their id.
+        self.Processes = {}
+        # Ids of the processes whose CPU time includes their children.
+        self.WithChildren = set()
+        # List of ProcessSamples by process id, ordered by time.
+        self.Samples = {}
+        self._Lock = threading.Lock()
+        self._StopEvent = threading.Event()
+        self._Thread = None
+
+    def Track(self, pid, name, includeChildren=True):
+        """
+        Adds a process to the sampled processes and takes its first sample.
+        """
+        with self._Lock:
+            self.Processes[pid] = name
+            if includeChildren:
+                self.WithChildren.add(pid)
+            self.Samples.setdefault(pid, [])
+        self._SampleProcess(pid)
+
+    def TrackByName(self, processName, name=None):
+        """
+        Tracks all processes whose name contains the given process name.
+        Returns the number of processes found.
+        """
+        if self.Provider == None:
+            return 0
+        pids = self.Provider.FindPids(processName)
+        for pid in pids:
+            self.Track(pid, name or processName)
+        return len(pids)
+
+    def Start(self):
+        """
+        Starts the background thread.
+        """
+        if self.Provider == None or self._Thread != None:
+            return
+        self._StopEvent.clear()
+        self._Thread = threading.Thread(target=self._Run, name="ProcessTelemetry")
+        self._Thread.daemon = True
+        self._Thread.start()
+
+    def Stop(self):
+        """
+        Stops the background thread after a last sample.
+        """
+        if self._Thread == None:
+            return
+        self._StopEvent.set()
+        self._Thread.join()
+        self._Thread = None
+        self.SampleOnce()
+
+    def SampleOnce(self):
+        """
+        Takes one sample of each tracked process.
+        """
+        with self._Lock:
+            pids = list(self.Processes)
+        for pid in pids:
+            self._SampleProcess(pid)
+
+    def Usage(self, startNs, endNs):
+        """
+        Returns the ProcessUsage of each tracked process which was sampled in
+        the interval by the times of time.perf_counter_ns().
+        """
+        usages = []
+        seconds = (endNs - startNs) / 1e9
+        with self._Lock:
+            processSamples = [(self.Processes[pid], pid in self.WithChildren, list(samples)) \
+                for (pid, samples) in self.Samples.items()]
+        for (processName, includeChildren, samples) in processSamples:
+            times = [sample.TimeNs for sample in samples]
+            first = bisect.bisect_right(times, startNs)
+            last = bisect.bisect_right(times, endNs)
+            if last == first:
+                continue
+            # The last sample before the span is the start value, if there is one.
+            baseSample = samples[max(first - 1, 0)]
+            endSample = samples[last - 1]
+            cpuSeconds = endSample.CpuSeconds - baseSample.CpuSeconds
+            if includeChildren:
+                cpuSeconds += endSample.ChildrenCpuSeconds - baseSample.ChildrenCpuSeconds
+            usages.append(ProcessUsage(processName, cpuSeconds,
+                max(sample.RssBytes for sample in samples[first:last]),
+                endSample.ReadBytes - baseSample.ReadBytes, endSample.WriteBytes - baseSample.WriteBytes, seconds))
+        return usages
+
+    def Attach(self, spanProfiler, minSeconds=None):
+        """
+        Adds the usage of each process to the arguments of the spans which
+        last at least minSeconds, by default two intervals, so they are
+        exported with the spans.
+        """
+        if minSeconds == None:
+            minSeconds = 2 * self.Interval
+        for (name, startNs, durationNs, threadId, startSeq, endSeq, args) in spanProfiler.Spans:
+            if durationNs < minSeconds * 1e9:
+                continue
+            for usage in self.Usage(startNs, startNs + durationNs):
+                args[usage.ProcessName + " CPU [s]"] = "%.2f" % usage.CpuSeconds
+                args[usage.ProcessName + " peak RSS [MB]"] = "%.1f" % (usage.PeakRssBytes / 1048576.0)
+                args[usage.ProcessName + " read/write [MB]"] = "%.1f/%.1f" % \
+                    (usage.ReadBytes / 1048576.0, usage.WriteBytes / 1048576.0)
+
+    def Summary(self, spanProfiler, minSeconds=None):
+        """
+        Returns the usage of each process during each span which lasts at
+        least minSeconds, by default two intervals, as text.
+        """
+        if minSeconds == None:
+            minSeconds = 2 * self.Interval
+        lines = ["%-30s %-20s %9s %8s %14s %10s %10s" % \
+            ("Span", "Process", "CPU [s]", "Cores", "Peak RSS [MB]", "Read [MB]", "Write [MB]")]
+        for (name, startNs, durationNs, threadId, startSeq, endSeq, args) in sorted(spanProfiler.Spans, key=lambda span: span[1]):
+            if durationNs < minSeconds * 1e9:
+                continue
+            for usage in self.Usage(startNs, startNs + durationNs):
+                lines.append("%-30s %-20s %9.2f %8.2f %14.1f %10.1f %10.1f" % (name, usage.ProcessName, \
+                    usage.CpuSeconds, usage.CpuLoad, usage.PeakRssBytes / 1048576.0, \
+                    usage.ReadBytes / 1048576.0, usage.WriteBytes / 1048576.0))
+        return "\n".join(lines) + "\n"
+
+    def _Run(self):
+        while not self._StopEvent.wait(self.Interval):
+            self.SampleOnce()
+
+    def _SampleProcess(self, pid):
+        """
+        Takes one sample of a process, ended processes are skipped.
+        """
+        if self.Provider == None:
+            return
+        sample = self.Provider.Sample(pid)
+        if sample == None:
+            return
+        with self._Lock:
+            self.Samples[pid].append(sample)
@@ -0,0 +1,577 @@
+"""
+--------------------------------------------------------------------------------
+File:        Profiling.py
+
+Description: Counts the COM calls of a SystemDesk or VEOS Player session and
+             measures their latencies per Utilities helper and COM member:
+                 Utilities.Options.ProfileComCalls = "Build.comprofile.txt"
+                 Utilities.ConnectToSystemDesk()
+                 ...
+                 Utilities.DisconnectFromSystemDesk()   # writes the report
+             Each call is attributed to the innermost Utilities helper on the
+             stack, calls of the scripts themselves to "<script>". The report
+             lists the call sites (helper, member) by total time with the
+             number of calls and the p50, p95 and p99 latencies, followed by
+             the COM calls and time of each helper.
+             The SpanProfiler measures nested spans, e.g. the phases of a build,
+             and exports them for chrome://tracing, Perfetto or speedscope:
+                 with Profiling.Span("VEOS build"):
+                     ...
+                 Profiling.Spans.WriteChromeTrace("Build.trace.json")
+                 print(Profiling.Spans.Summary())
+
+Tip/Remarks: The latencies are kept in histograms with logarithmic buckets of
+             about 9 percent width, so the memory does not grow with the number
+             of calls and the percentiles are accurate to one bucket. The
+             profiler only adds a few microseconds to each COM call and can
+             be left on in production.
+             Objects of other COM servers, e.g. the fake server of
+             FakeSystemDesk.py, can be profiled with ComProfiler.Wrap().
+
+Limitations: Only the module level functions of the instrumented module are
+             helpers, the methods of its classes are attributed to the helper
+             which calls them. Only the first MaxSpans spans are exported, the
+             summary covers all of them.
+--------------------------------------------------------------------------------
+"""
+
+import atexit
+import contextlib
+import functools
+import inspect
+import itertools
+import json
+import math
+import os
+import threading
+import time
+import types
+
+# Name of the call site of COM calls made outside of any helper.
+SCRIPT_HELPER = "<script>"
+
+# Number of histogram buckets per doubling of the latency.
+_BucketsPerOctave = 8
+
+# Open profilers by the name of their report file.
+_Profilers = {}
+
+# Types of the values which are returned as they are.
+_ScalarTypes = (type(None), bool, int, float, str, bytes)
+
+
+def GetProfiler(reportFile):
+    """
+    Returns the ComProfiler which writes to the given report file. All
+    sessions which report to the same file share one profiler.
+    """
+    profiler = _Profilers.get(reportFile)
+    if profiler == None:
+        profiler = ComProfiler(reportFile)
+        _Profilers[reportFile] = profiler
+    return profiler
+
+
+def WriteReports():
+    """
+    Writes the reports of all profilers.
+    """
+    for profiler in _Profilers.values():
+        profiler.WriteReport()
+
+
+class LatencyHistogram():
+    """
+    Histogram of the latencies of one call site.
+    """
+    def __init__(self):
+        self.Count = 0
+        self.TotalTime = 0.0
+        self.MaxTime = 0.0
+        # Number of calls by bucket index.
+        self._Buckets = {}
+
+    def Add(self, seconds):
+        """
+        Adds the latency of one call.
+        """
+        self.Count += 1
+        self.TotalTime += seconds
+        if seconds > self.MaxTime:
+            self.MaxTime = seconds
+        index = _BucketIndex(seconds)
+        self._Buckets[index] = self._Buckets.get(index, 0) + 1
+
+    def Percentile(self, percent):
+        """
+        Returns the latency in seconds below which the given percentage of the
+        calls lies, as upper bound of its bucket.
+        """
+        if self.Count == 0:
+            return 0.0
+        rank = math.ceil(self.Count * percent / 100.0)
+        count = 0
+        for index in sorted(self._Buckets):
+            count += self._Buckets[index]
+            if count >= rank:
+                return min(_BucketLimit(index), self.MaxTime)
+        return self.MaxTime
+
+
+class ComProfiler():
+    """
+    Counts the COM calls of the objects wrapped by Wrap() and measures their
+    latencies per call site (helperName, memberName).
+    """
+    def __init__(self, reportFile=None):
+        # File to which WriteReport() writes, None prints the report.
+        self.ReportFile = reportFile
+        # Latency histograms by the tuple (helperName, memberName).
+        self.CallSites = {}
+        # Names of the helpers which are currently executed, innermost last.
+        self._HelperStack = [SCRIPT_HELPER]
+        self._InstrumentedModules = set()
+
+    @property
+    def CallCount(self):
+        """
+        Returns the number of measured COM calls.
+        """
+        return sum(histogram.Count for histogram in self.CallSites.values())
+
+    def InstrumentModule(self, module):
+        """
+        Replaces the public functions of a module by wrappers which make them
+        the call site of the COM calls they execute. Calling it again for the
+        same module does nothing.
+        """
+        if module.__name__ in self._InstrumentedModules:
+            return
+        self._InstrumentedModules.add(module.__name__)
+        for (name, value) in list(vars(module).items()):
+            if isinstance(value, types.FunctionType) and name[:1].isupper() \
+                and value.__module__ == module.__name__:
+                setattr(module, name, self._HelperWrapper(name, value))
+
+    def Reset(self):
+        """
+        Discards the measured calls.
+        """
+        self.CallSites.clear()
+
+    def Wrap(self, value):
+        """
+        Wraps a COM object, whose calls and the calls of all objects returned
+        by them are measured.
+        """
+        if _IsComObject(value):
+            return ProfiledObject(value, self)
+        if isinstance(value, tuple):
+            return tuple(self.Wrap(item) for item in value)
+        return value
+
+    def Report(self, count=30):
+        """
+        Returns the report of the call sites with the highest total time and
+        the COM calls and time of each helper as text.
+        """
+        callSites = sorted(self.CallSites.items(), key=lambda item: item[1].TotalTime, reverse=True)
+        totalCalls = sum(histogram.Count for histogram in self.CallSites.values())
+        totalTime = sum(histogram.TotalTime for histogram in self.CallSites.values())
+        lines = ["COM calls: %d, COM time: %.3f s" % (totalCalls, totalTime), ""]
+        lines.append("%-40s %-30s %9s %10s %9s %9s %9s %9s" % \
+            ("Helper", "Member", "Calls", "Total [s]", "p50 [ms]", "p95 [ms]", "p99 [ms]", "max [ms]"))
+        for ((helperName, memberName), histogram) in callSites[:count]:
+            lines.append("%-40s %-30s %9d %10.3f %9.3f %9.3f %9.3f %9.3f" % (helperName, memberName, \
+                histogram.Count, histogram.TotalTime, histogram.Percentile(50) * 1000.0, \
+                histogram.Percentile(95) * 1000.0, histogram.Percentile(99) * 1000.0, histogram.MaxTime * 1000.0))
+        if len(callSites) > count:
+            lines.append("... %d more call sites" % (len(callSites) - count))
+
+        helpers = {}
+        for ((helperName, memberName), histogram) in callSites:
+            (calls, seconds) = helpers.get(helperName, (0, 0.0))
+            helpers[helperName] = (calls + histogram.Count, seconds + histogram.TotalTime)
+        lines.extend(("", "%-40s %9s %10s" % ("Helper", "Calls", "Total [s]")))
+        for (helperName, (calls, seconds)) in sorted(helpers.items(), key=lambda item: item[1][1], reverse=True):
+            lines.append("%-40s %9d %10.3f" % (helperName, calls, seconds))
+        return "\n".join(lines) + "\n"
+
+    def WriteReport(self):
+        """
+        Writes the report to the report file or prints it.
+        """
+        if not self.CallSites:
+            return
+        if self.ReportFile == None:
+            print(self.Report())
+            return
+        with open(self.ReportFile, "w") as reportFile:
+            reportFile.write(self.Report())
+
+    def _Add(self, memberName, seconds):
+        """
+        Adds the latency of one COM call to the call site of the current helper.
+        """
+        callSite = (self._HelperStack[-1], memberName)
+        histogram = self.CallSites.get(callSite)
+        if histogram == None:
+            histogram = LatencyHistogram()
+            self.CallSites[callSite] = histogram
+        histogram.Add(seconds)
+
+    def _HelperWrapper(self, name, function):
+        """
+        Returns a wrapper of a helper function which pushes its name while it
+        is executed.
+        """
+        helperStack = self._HelperStack
+
+        if inspect.isgeneratorfunction(function):
+            # The caller runs between the items, so only the fetch of each item is attributed.
+            @functools.wraps(function)
+            def GeneratorWrapper(*args, **kwargs):
+                iterator = function(*args, **kwargs)
+                while True:
+                    helperStack.append(name)
+                    try:
+                        item = next(iterator)
+                    except StopIteration:
+                        return
+                    finally:
+                        helperStack.pop()
+                    yield item
+            return GeneratorWrapper
+
+        @functools.wraps(function)
+        def Wrapper(*args, **kwargs):
+            helperStack.append(name)
+            try:
+                return function(*args, **kwargs)
+            finally:
+                helperStack.pop()
+        return Wrapper
+
+
+class ProfiledObject():
+    """
+    Wrapper of a COM object which measures each property read, property write
+    and method call.
+    """
+    def __init__(self, target, profiler):
+        object.__setattr__(self, "_Target", target)
+        object.__setattr__(self, "_Profiler", profiler)
+        object.__setattr__(self, "_oleobj_", getattr(target, "_oleobj_", target))
+
+    def __getattr__(self, name):
+        if name.startswith("_"):
+            raise AttributeError(name)
+        startTime = time.perf_counter()
+        try:
+            value = getattr(self._Target, name)
+        finally:
+            seconds = time.perf_counter() - startTime
+        if callable(value) and not _IsComObject(value):
+            # Methods are measured when they are called.
+            return _ProfiledMethod(self, name, value)
+        self._Profiler._Add(name, seconds)
+        return self._Profiler.Wrap(value)
+
+    def __setattr__(self, name, value):
+        startTime = time.perf_counter()
+        try:
+            setattr(self._Target, name, _Unwrap(value))
+        finally:
+            self._Profiler._Add(name, time.perf_counter() - startTime)
+
+    def __eq__(self, other):
+        return self._oleobj_ == getattr(other, "_oleobj_", other)
+
+    def __ne__(self, other):
+        return not self.__eq__(other)
+
+    def __hash__(self):
+        return hash(self._oleobj_)
+
+    def __bool__(self):
+        return True
+
+    def __iter__(self):
+        enumerator = self._NewEnum()
+        if enumerator == None:
+            return
+        while True:
+            chunk = enumerator.Next(100)
+            if not chunk:
+                return
+            for item in chunk:
+                yield item
+
+    def __repr__(self):
+        return "<ProfiledObject %r>" % (self._Target,)
+
+    def _NewEnum(self):
+        """
+        Returns the enumerator of a collection, which is measured as well.
+        """
+        return _ProfiledMethod(self, "_NewEnum", self._Target._NewEnum)()
+
+
+class _ProfiledMethod():
+    """
+    Bound method of a ProfiledObject.
+    """
+    def __init__(self, owner, name, method):
+        self._Owner = owner
+        self._Name = name
+        self._Method = method
+
+    def __call__(self, *args):
+        profiler = self._Owner._Profiler
+        startTime = time.perf_counter()
+        try:
+            result = self._Method(*(_Unwrap(arg) for arg in args))
+        finally:
+            profiler._Add(self._Name, time.perf_counter() - startTime)
+        return profiler.Wrap(result)
+
+
+#-----------------------------
+# Spans.
+#-----------------------------
+
+class SpanProfiler():
+    """
+    Measures nested spans, e.g. the phases of a build and the helpers they
+    call, with time.perf_counter_ns():
+        with Profiling.Span("Export", file=containerFile):
+            ...
+        @Profiling.Profiled()
+        def exportContainer(sd, vEcu):
+    The spans of each thread are nested by the order in which they are entered.
+    """
+    def __init__(self, maxSpans=1000000):
+        # Spans which are kept for the export, the summary covers all spans.
+        self.MaxSpans = maxSpans
+        # Function which prints the times of DeltaTime() and TotalTime(), called
+        # with a format string and the time like Utilities.PrintD().
+        self.PrintFunction = None
+        # Finished spans as tuple (name, startNs, durationNs, threadId, startSeq, endSeq, args).
+        self.Spans = []
+        # Tuple [count, totalNs, childNs] by the tuple of the names of a span and its parents.
+        self.Totals = {}
+        self._Stacks = {}
+        self._Sequence = itertools.count()
+        self._Lock = threading.Lock()
+        self.Start()
+
+    def Start(self):
+        """
+        Discards the measured spans and starts the time measurement.
+        """
+        self.Spans = []
+        self.Totals = {}
+        self._StartNs = time.perf_counter_ns()
+        self._LastNs = self._StartNs
+
+    def DeltaTime(self, display=True):
+        """
+        Returns the time in seconds since the last call of DeltaTime() or Start().
+        """
+        currentNs = time.perf_counter_ns()
+        deltaTime = (currentNs - self._LastNs) / 1e9
+        self._LastNs = currentNs
+        if display and self.PrintFunction != None:
+            self.PrintFunction("DeltaTime =%6.3f sec", deltaTime)
+        return deltaTime
+
+    def TotalTime(self, display=True):
+        """
+        Returns the time in seconds since the last call of Start().
+        """
+        totalTime = (time.perf_counter_ns() - self._StartNs) / 1e9
+        if display and self.PrintFunction != None:
+            self.PrintFunction("TotalTime =%6.3f sec", totalTime)
+        return totalTime
+
+    @contextlib.contextmanager
+    def Span(self, name, **args):
+        """
+        Context manager which measures its block as span with the given name.
+        The keyword arguments are exported with the span.
+        """
+        threadId = threading.get_ident()
+        stack = self._Stacks.get(threadId)
+        if stack == None:
+            stack = self._Stacks.setdefault(threadId, [])
+        stack.append([name, 0])
+        startSeq = next(self._Sequence)
+        startNs = time.perf_counter_ns()
+        try:
+            yield
+        finally:
+            durationNs = time.perf_counter_ns() - startNs
+            endSeq = next(self._Sequence)
+            (path, childNs) = (tuple(entry[0] for entry in stack), stack[-1][1])
+            stack.pop()
+            if stack:
+                stack[-1][1] += durationNs
+            with self._Lock:
+                totals = self.Totals.get(path)
+                if totals == None:
+                    totals = self.Totals.setdefault(path, [0, 0, 0])
+                totals[0] += 1
+                totals[1] += durationNs
+                totals[2] += childNs
+                if len(self.Spans) < self.MaxSpans:
+                    self.Spans.append((name, startNs, durationNs, threadId, startSeq, endSeq, args))
+
+    def Profiled(self, name=None):
+        """
+        Decorator which measures each call of a function as span, named after
+        the function by default.
+        """
+        if callable(name):
+            return self.Profiled()(name)
+
+        def Decorator(function):
+            spanName = name or function.__name__
+
+            @functools.wraps(function)
+            def Wrapper(*args, **kwargs):
+                with self.Span(spanName):
+                    return function(*args, **kwargs)
+            return Wrapper
+        return Decorator
+
+    def ChromeTrace(self):
+        """
+        Returns the spans in the trace event format of chrome://tracing and Perfetto.
+        """
+        events = []
+        for (name, startNs, durationNs, threadId, startSeq, endSeq, args) in self.Spans:
+            event = {"name": name, "cat": "span", "ph": "X", "pid": os.getpid(), "tid": threadId,
+                "ts": (startNs - self._StartNs) / 1000.0, "dur": durationNs / 1000.0}
+            if args:
+                event["args"] = dict((key, str(value)) for (key, value) in args.items())
+            events.append(event)
+        return {"traceEvents": events, "displayTimeUnit": "ms"}
+
+    def Speedscope(self, profileName="Profile"):
+        """
+        Returns the spans in the evented file format of speedscope, one
+        profile per thread.
+        """
+        frames = []
+        frameIndices = {}
+        threadEvents = {}
+        for (name, startNs, durationNs, threadId, startSeq, endSeq, args) in self.Spans:
+            frameIndex = frameIndices.get(name)
+            if frameIndex == None:
+                frameIndex = len(frames)
+                frameIndices[name] = frameIndex
+                frames.append({"name": name})
+            events = threadEvents.setdefault(threadId, [])
+            events.append((startSeq, "O", frameIndex, startNs - self._StartNs))
+            events.append((endSeq, "C", frameIndex, startNs + durationNs - self._StartNs))
+        profiles = []
+        for (threadId, events) in sorted(threadEvents.items()):
+            # The sequence numbers give the order of nested spans with equal times.
+            events.sort()
+            profiles.append({"type": "evented", "name": "%s (thread %d)" % (profileName, threadId),
+                "unit": "nanoseconds", "startValue": events[0][3], "endValue": max(event[3] for event in events),
+                "events": [{"type": kind, "frame": frameIndex, "at": at} for (seq, kind, frameIndex, at) in events]})
+        return {"$schema": "https://www.speedscope.app/file-format-schema.json",
+            "shared": {"frames": frames}, "profiles": profiles, "name": profileName}
+
+    def Summary(self):
+        """
+        Returns the number of calls, the total time and the self time of each
+        span, nested below its parents, as text.
+        """
+        lines = ["%-60s %8s %11s %11s %7s" % ("Span", "Calls", "Total [s]", "Self [s]", "Total %")]
+        rootNs = sum(totals[1] for (path, totals) in self.Totals.items() if len(path) == 1) or 1
+
+        def AddChildren(parentPath):
+            children = [(path, totals) for (path, totals) in self.Totals.items() \
+                if len(path) == len(parentPath) + 1 and path[:-1] == parentPath]
+            for (path, (count, totalNs, childNs)) in sorted(children, key=lambda item: item[1][1], reverse=True):
+                lines.append("%-60s %8d %11.3f %11.3f %7.1f" % ("  " * (len(path) - 1) + path[-1], count, \
+                    totalNs / 1e9, (totalNs - childNs) / 1e9, 100.0 * totalNs / rootNs))
+                AddChildren(path)
+        AddChildren(())
+        return "\n".join(lines) + "\n"
+
+    def WriteChromeTrace(self, fileName):
+        """
+        Writes the spans to a JSON file for chrome://tracing or Perfetto.
+        """
+        with open(fileName, "w") as traceFile:
+            json.dump(self.ChromeTrace(), traceFile)
+
+    def WriteSpeedscope(self, fileName, profileName="Profile"):
+        """
+        Writes the spans to a JSON file for speedscope.
+        """
+        with open(fileName, "w") as traceFile:
+            json.dump(self.Speedscope(profileName), traceFile)
+
+
+# Global span profiler of the scripts.
+Spans = SpanProfiler()
+
+
+def Span(name, **args):
+    """
+    Context manager which measures its block as span of the global span profiler.
+    """
+    return Spans.Span(name, **args)
+
+
+def Profiled(name=None):
+    """
+    Decorator which measures each call of a function as span of the global
+    span profiler.
+    """
+    return Spans.Profiled(name)
+
+
+def _BucketIndex(seconds):
+    """
+    Returns the index of the histogram bucket of a latency.
+    """
+    microseconds = seconds * 1000000.0
+    if microseconds <= 1.0:
+        return 0
+    return int(math.log2(microseconds) * _BucketsPerOctave) + 1
+
+
+def _BucketLimit(index):
+    """
+    Returns the upper bound of a histogram bucket in seconds.
+    """
+    return 2.0 ** (float(index) / _BucketsPerOctave) / 1000000.0
+
+
+def _IsComObject(value):
+    """
+    Returns True if the value is a COM object or the enumerator of a collection.
+    """
+    if isinstance(value, _ScalarTypes) or isinstance(value, (tuple, list)):
+        return False
+    return hasattr(value, "_oleobj_") or hasattr(value, "GetIDsOfNames") \
+        or (hasattr(value, "Next") and not callable(value))
+
+
+def _Unwrap(value):
+    """
+    Returns the wrapped COM object of a ProfiledObject.
+    """
+    if isinstance(value, ProfiledObject):
+        return value._Target
+    if isinstance(value, tuple):
+        return tuple(_Unwrap(item) for item in value)
+    return value
+
+
+atexit.register(WriteReports)
@@ -0,0 +1,342 @@
+"""
+--------------------------------------------------------------------------------
+File:        ProjectGenerator.py
+
+Description: Generates large synthetic projects for scale tests. The model is
+             built by the helpers of Utilities.py, so the generator works with
+             a SystemDesk project as well as with the offline model and the
+             fake COM server. The shape of the model is given by a
+             ProjectShape, all random choices are made by a generator seeded
+             with the given seed, so the same seed gives the same model:
+                 Utilities.UseOfflineBackend()
+                 generated = GenerateProject(ProductionShape, seed=1)
+                 OfflineModel.WriteArxml("Generated.arxml", packages=[generated.RootPackage])
+             The generated project contains:
+                 - SWCs in a package tree with ports, runnables and TimingEvents
+                 - SenderReceiverInterfaces with typed data elements and init
+                   values
+                 - SystemSignals, ISignals packed into ISignalIPdus, frames and
+                   the triggerings on CAN channels
+                 - OsTasks with their alarms and the mapping of the
+                   TimingEvents to the tasks with the same period
+
+Tip/Remarks: Run "python ProjectGenerator.py --shape Production --seed 1
+             Generated.arxml" in the Scripts directory to write a project with
+             the offline model.
+             The tasks are created in the OS configuration of the given
+             EcuConfiguration. The offline model gets an EcuConfiguration with
+             OS and RTE configuration for the generated composition. Since the
+             EcuConfigurations are not written to ARXML, only the package of
+             the generated project is written.
+
+Limitations: The TimingEvents of a SystemDesk project are only mapped if the
+             ECU flat view of the EcuConfiguration contains their components.
+--------------------------------------------------------------------------------
+"""
+
+import argparse
+import enum
+import random
+import sys
+
+import OfflineModel
+import Utilities
+
+
+class ProjectShape():
+    """
+    Parameters of the shape of a generated project.
+    """
+    def __init__(self, swcCount=100, packageDepth=2, packageFanOut=4, portsPerSwc=4, \
+        dataElementsPerInterface=2, runnablesPerSwc=2, dataTypeCount=16, signalCount=1000, \
+        signalSizes=((1, 3), (8, 3), (16, 3), (32, 1)), pduLength=8, channelCount=2, \
+        taskCount=20, taskPeriods=(0.001, 0.005, 0.01, 0.02, 0.1), initValues=True):
+        # Number of SWCs and the depth and fan-out of the package tree of the SWCs.
+        self.SwcCount = swcCount
+        self.PackageDepth = packageDepth
+        self.PackageFanOut = packageFanOut
+        # Ports and runnables of each SWC. Half of the ports provide a new interface.
+        self.PortsPerSwc = portsPerSwc
+        self.DataElementsPerInterface = dataElementsPerInterface
+        self.RunnablesPerSwc = runnablesPerSwc
+        # Number of ApplicationPrimitiveDataTypes of the data elements.
+        self.DataTypeCount = dataTypeCount
+        # Number of SystemSignals and the tuples (lengthInBits, weight) of their lengths.
+        self.SignalCount = signalCount
+        self.SignalSizes = signalSizes
+        # Length of the ISignalIPdus in bytes and the number of CAN channels.
+        self.PduLength = pduLength
+        self.ChannelCount = channelCount
+        # Number of OsTasks and their periods in seconds.
+        self.TaskCount = taskCount
+        self.TaskPeriods = taskPeriods
+        # Create an init value for each data element.
+        self.InitValues = initValues
+
+
+# Shapes of generated projects by name.
+SmallShape = ProjectShape()
+ProductionShape = ProjectShape(swcCount=2000, packageDepth=3, packageFanOut=6, signalCount=20000, \
+    channelCount=8, taskCount=200)
+Shapes = {"Small": SmallShape, "Production": ProductionShape}
+
+
+# Enums of the OS configurations of the offline model. They name this module as
+# PythonEnumerationFile, see Utilities.TriggerOsTask().
+class OsCounterType(enum.Enum):
+    HARDWARE = 1
+    SOFTWARE = 2
+
+
+class OsAlarmAutostartType(enum.Enum):
+    ABSOLUTE = 1
+    RELATIVE = 2
+
+
+class GeneratedProject():
+    """
+    Elements of a generated project.
+    """
+    def __init__(self, seed, shape):
+        self.Seed = seed
+        self.Shape = shape
+        self.Components = []
+        self.Interfaces = []
+        self.SystemSignals = []
+        self.ISignals = []
+        self.Pdus = []
+        self.Frames = []
+        self.OsTasks = []
+        self.Composition = None
+        self.EcuConfiguration = None
+        # Top-level package which contains the generated project.
+        self.RootPackage = None
+        # Number of TimingEvents mapped to OsTasks.
+        self.MappedEvents = 0
+
+    def Summary(self):
+        """
+        Returns the numbers of the generated elements as dictionary.
+        """
+        return {"Components": len(self.Components), "Interfaces": len(self.Interfaces), \
+            "SystemSignals": len(self.SystemSignals), "Pdus": len(self.Pdus), "Frames": len(self.Frames), \
+            "OsTasks": len(self.OsTasks), "MappedEvents": self.MappedEvents}
+
+
+def GenerateProject(shape=SmallShape, seed=0, rootPath="/Generated", ecuConfiguration=None):
+    """
+    Generates a project of the given shape below the package rootPath of the
+    active project. The tasks are created in the given EcuConfiguration, for
+    the offline model a new EcuConfiguration is created if it is None.
+    Returns a GeneratedProject.
+    """
+    randomGenerator = random.Random(seed)
+    generated = GeneratedProject(seed, shape)
+    taskPeriods = [shape.TaskPeriods[index % len(shape.TaskPeriods)] for index in range(shape.TaskCount)]
+    _GenerateComponents(generated, randomGenerator, rootPath, sorted(set(taskPeriods)))
+    _GenerateCommunication(generated, randomGenerator, rootPath)
+    generated.RootPackage = Utilities.GetElementByPath("/" + rootPath.strip("/").split("/")[0])
+    if ecuConfiguration == None and _IsOfflineModel():
+        ecuConfiguration = CreateOfflineEcuConfiguration(generated.Composition, rootPath)
+    if ecuConfiguration != None:
+        generated.EcuConfiguration = ecuConfiguration
+        _GenerateTasks(generated, randomGenerator, taskPeriods)
+    # Some elements were created without the helpers.
+    Utilities.InvalidateModelCaches()
+    return generated
+
+
+def CreateOfflineEcuConfiguration(composition, rootPath="/Generated", ecuName="Ecu"):
+    """
+    Creates an EcuConfiguration in the offline model with an OS configuration
+    and an RTE configuration for the components of the composition.
+    """
+    project = Utilities.SdApplication.ActiveProject
+    ecuConfiguration = project.EcuConfigurations.AddNew(ecuName)
+    ecucValues = ecuConfiguration.SetNewEcucValueCollection().EcucValues
+    ecucValuesPackage = Utilities.GetOrCreatePackage(rootPath + "/EcucValues")
+    for moduleName in ("Os", "Rte"):
+        moduleConfiguration = ecucValuesPackage.Elements.AddNewEcucModuleConfigurationValues(moduleName)
+        ecucValues.AddNew().EcucModuleConfigurationValuesRef = moduleConfiguration
+        if moduleName == "Os":
+            moduleConfiguration.PythonEnumerationFile = __name__
+            systemTimer = moduleConfiguration.OsCounters.AddNew("SystemTimer")
+            systemTimer.OsCounterType = OsCounterType.HARDWARE
+            systemTimer.OsSecondsPerTick = 0.001
+            moduleConfiguration.OsAppModes.AddNew("OSDEFAULTAPPMODE")
+        else:
+            for component in Utilities.IterateCollection(composition.Components):
+                moduleConfiguration.RteSwComponentInstances.AddNew(component.ShortName)
+    ecuExtract = Utilities.GetOrCreatePackage(rootPath + "/Systems").Elements.AddNewSystem(ecuName + "Extract")
+    ecuExtract.SetNewRootSwCompositionPrototype().SoftwareCompositionTref = composition
+    ecuConfiguration.EcuExtractSystem = ecuExtract
+    return ecuConfiguration
+
+
+def _GenerateCommunication(generated, randomGenerator, rootPath):
+    """
+    Generates the SystemSignals and packs their ISignals into ISignalIPdus,
+    which are sent by frames on the CAN channels.
+    """
+    shape = generated.Shape
+    systemSignals = Utilities.GetOrCreatePackage(rootPath + "/Comm/SystemSignals").Elements
+    pdus = Utilities.GetOrCreatePackage(rootPath + "/Comm/Pdus").Elements
+    clusters = Utilities.GetOrCreatePackage(rootPath + "/Comm/CommunicationClusters").Elements
+    channels = []
+    for channelIndex in range(shape.ChannelCount):
+        cluster = clusters.AddNewCanCluster("Can%d" % channelIndex)
+        channels.append(cluster.PhysicalChannels.AddNewCanPhysicalChannel("Can%dChannel" % channelIndex))
+
+    (sizes, weights) = zip(*shape.SignalSizes)
+    pduBits = shape.PduLength * 8
+    pdu = None
+    startPosition = pduBits
+    iSignalTriggerings = []
+    for signalIndex in range(shape.SignalCount):
+        length = min(randomGenerator.choices(sizes, weights)[0], pduBits)
+        if startPosition + length > pduBits:
+            _CompletePdu(generated, channels, pdu, iSignalTriggerings)
+            pdu = pdus.AddNewISignalIPdu("Msg%dIPdu" % len(generated.Pdus))
+            pdu.Length = shape.PduLength
+            generated.Pdus.append(pdu)
+            startPosition = 0
+            iSignalTriggerings = []
+        systemSignal = systemSignals.AddNewSystemSignal("Sig%d" % signalIndex)
+        iSignal = Utilities.CreateISignal(systemSignal)
+        iSignal.Length = length
+        Utilities.AddISignalToPduMapping(pdu, iSignal, startPosition)
+        channel = channels[(len(generated.Pdus) - 1) % len(channels)]
+        iSignalTriggerings.append(Utilities.CreateISignalTriggering(channel, iSignal, ()))
+        generated.SystemSignals.append(systemSignal)
+        generated.ISignals.append(iSignal)
+        startPosition += length
+    _CompletePdu(generated, channels, pdu, iSignalTriggerings)
+
+
+def _CompletePdu(generated, channels, pdu, iSignalTriggerings):
+    """
+    Creates the frame of an ISignalIPdu and the triggerings of both.
+    """
+    if pdu == None:
+        return
+    pduIndex = len(generated.Pdus) - 1
+    channel = channels[pduIndex % len(channels)]
+    frame = Utilities.CreateFrame(pdu)
+    pduTriggering = Utilities.CreatePduTriggering(channel, pdu, iSignalTriggerings, ())
+    Utilities.CreateFrameTriggering("CAN", channel, frame, 0x100 + pduIndex, (pduTriggering,), ())
+    generated.Frames.append(frame)
+
+
+def _GenerateComponents(generated, randomGenerator, rootPath, eventPeriods):
+    """
+    Generates the SWCs with their ports, interfaces, runnables and events and
+    a composition with a prototype of each SWC.
+    """
+    shape = generated.Shape
+    dataTypes = Utilities.GetOrCreatePackage(rootPath + "/DataTypes/ApplicationDataTypes").Elements
+    interfaces = Utilities.GetOrCreatePackage(rootPath + "/Interfaces/PortInterfaces").Elements
+    compositions = Utilities.GetOrCreatePackage(rootPath + "/Compositions").Elements
+    adts = []
+    for dataTypeIndex in range(shape.DataTypeCount):
+        adt = dataTypes.AddNewApplicationPrimitiveDataType("Type%d" % dataTypeIndex)
+        adt.Category = "VALUE"
+        adts.append(adt)
+    generated.Composition = compositions.AddNewCompositionSwComponentType("EcuComposition")
+
+    providedPortCount = (shape.PortsPerSwc + 1) // 2
+    for swcIndex in range(shape.SwcCount):
+        swcPackage = Utilities.GetOrCreatePackage(_SwcPackagePath(rootPath, swcIndex, shape))
+        swcName = "Swc%d" % swcIndex
+        swc = swcPackage.Elements.AddNewApplicationSwComponentType(swcName)
+
+        # Ports which provide new interfaces and ports which require existing ones.
+        for portIndex in range(shape.PortsPerSwc):
+            if portIndex < providedPortCount or not generated.Interfaces:
+                interface = interfaces.AddNewSenderReceiverInterface("If%d" % len(generated.Interfaces))
+                for dataElementIndex in range(shape.DataElementsPerInterface):
+                    # The name is unique in the project, since SetInitValue() names the constant after it.
+                    dataElement = interface.DataElements.AddNew("%s_Data%d" % (interface.ShortName, dataElementIndex))
+                    dataElement.TypeTref = randomGenerator.choice(adts)
+                    if shape.InitValues:
+                        Utilities.SetInitValue(dataElement, randomGenerator.randint(0, 100))
+                generated.Interfaces.append(interface)
+                port = swc.Ports.AddNewPPortPrototype("P%d" % portIndex)
+                port.ProvidedInterfaceTref = interface
+            else:
+                port = swc.Ports.AddNewRPortPrototype("R%d" % portIndex)
+                port.RequiredInterfaceTref = randomGenerator.choice(generated.Interfaces)
+
+        # Runnables which are started periodically.
+        behavior = swc.InternalBehaviors.AddNew(swcName + "Behavior")
+        for runnableIndex in range(shape.RunnablesPerSwc):
+            runnable = behavior.Runnables.AddNew("%s_Run%d" % (swcName, runnableIndex))
+            event = behavior.Events.AddNewTimingEvent("%s_Timer%d" % (swcName, runnableIndex))
+            event.StartOnEventRef = runnable
+            event.Period = randomGenerator.choice(eventPeriods)
+
+        component = generated.Composition.Components.AddNewSwComponentPrototype(swcName)
+        component.TypeTref = swc
+        generated.Components.append(swc)
+
+
+def _GenerateTasks(generated, randomGenerator, taskPeriods):
+    """
+    Generates the OsTasks with their alarms and maps the TimingEvents to the
+    tasks with the same period.
+    """
+    ecuConfigurationIndex = Utilities.GetEcuConfigurationIndex(generated.EcuConfiguration)
+    osConfiguration = ecuConfigurationIndex.FindModuleConfiguration("Os")
+    tasksByPeriod = {}
+    for (taskIndex, taskPeriod) in enumerate(taskPeriods):
+        osTask = osConfiguration.OsTasks.Add("Task%d_%gms" % (taskIndex, taskPeriod * 1000))
+        Utilities.TriggerOsTask(osTask, taskPeriod)
+        tasksByPeriod.setdefault(taskPeriod, []).append(osTask)
+        generated.OsTasks.append(osTask)
+
+    rows = []
+    for swc in generated.Components:
+        if ecuConfigurationIndex.FindComponentPrototype(swc.ShortName) == None:
+            continue
+        behavior = swc.InternalBehaviors.Elements[0]
+        for event in Utilities.IterateCollection(behavior.Events):
+            osTask = randomGenerator.choice(tasksByPeriod[event.Period])
+            rows.append((swc.ShortName, event.ShortName, osTask))
+    Utilities.ApplyRteEventMappings(generated.EcuConfiguration, rows)
+    generated.MappedEvents = len(rows)
+
+
+def _IsOfflineModel():
+    """
+    Returns True if the helpers of Utilities work on the offline model.
+    """
+    sdApplication = getattr(Utilities.SdApplication, "_oleobj_", Utilities.SdApplication)
+    return isinstance(sdApplication, OfflineModel.OfflineApplication)
+
+
+def _SwcPackagePath(rootPath, swcIndex, shape):
+    """
+    Returns the package path of a SWC. The SWCs are spread over a package
+    tree with the depth and fan-out of the shape.
+    """
+    groups = []
+    groupIndex = swcIndex
+    for depth in range(shape.PackageDepth):
+        groups.append("Group%d" % (groupIndex % shape.PackageFanOut))
+        groupIndex //= shape.PackageFanOut
+    return "/".join([rootPath, "Swcs"] + groups + ["SwComponentTypes"])
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Generate a synthetic project with the offline model")
+    parser.add_argument("arxmlFile", help="ARXML file to write")
+    parser.add_argument("--shape", choices=sorted(Shapes), default="Small", help="Shape of the project")
+    parser.add_argument("--seed", type=int, default=0, help="Seed of the random choices")
+    args = parser.parse_args()
+
+    Utilities.UseOfflineBackend()
+    generated = GenerateProject(Shapes[args.shape], args.seed)
+    for (name, count) in sorted(generated.Summary().items()):
+        print("%-16s %8d" % (name, count))
+    elementCount = OfflineModel.WriteArxml(args.arxmlFile, packages=[generated.RootPackage])
+    print("%d elements written to %s" % (elementCount, args.arxmlFile))
+    sys.exit(0)
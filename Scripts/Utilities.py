@@ -25,12 +25,21 @@ Copyright (c) 2020 by dSPACE GmbH, Paderborn, Germany
 --------------------------------------------------------------------------------
 """
 
+import collections
+import csv
 import importlib
 import sys
 import os
-import time
-import win32com.client
 import shutil
+try:
+    import win32com.client
+except ImportError:
+    # Only needed to connect to SystemDesk and VEOS Player.
+    win32com = None
+import ComTrace
+import DebugLog
+import DispatchCache
+import Profiling
 
 #path = 'D:\Cicd_Implementation\Virtual_ECU\SystemDeskProject\Production_Asw_Rte_Sim'
 #------------------------------------------------------------------------------
@@ -42,6 +51,11 @@ class OptionsHelper():
     """
     def __init__(self):
         self._ProjectName = "Untitled"
+        self._CacheDispatchIds = False
+        self._RecordComTrace = None
+        self._ReplayComTrace = None
+        self._ReplayTimeScale = 1.0
+        self._ProfileComCalls = None
 
     @property
     def ProjectName(self):
@@ -56,6 +70,106 @@ class OptionsHelper():
         """
         self._ProjectName = value
 
+    @property
+    def CacheDispatchIds(self):
+        """
+        Gets whether ConnectToSystemDesk() and ConnectToVeosPlayer() resolve the
+        names of COM properties and methods once per interface.
+        """
+        return self._CacheDispatchIds
+    @CacheDispatchIds.setter
+    def CacheDispatchIds(self, value):
+        """
+        Sets whether ConnectToSystemDesk() and ConnectToVeosPlayer() resolve the
+        names of COM properties and methods once per interface, see DispatchCache.
+        """
+        self._CacheDispatchIds = value
+
+    @property
+    def RecordComTrace(self):
+        """
+        Gets the trace file to which the COM calls of the sessions are recorded.
+        """
+        return self._RecordComTrace
+    @RecordComTrace.setter
+    def RecordComTrace(self, value):
+        """
+        Sets the trace file to which ConnectToSystemDesk() and ConnectToVeosPlayer()
+        record the COM calls of their sessions, see ComTrace. None records nothing.
+        """
+        self._RecordComTrace = value
+
+    @property
+    def ReplayComTrace(self):
+        """
+        Gets the trace file from which the COM calls of the sessions are replayed.
+        """
+        return self._ReplayComTrace
+    @ReplayComTrace.setter
+    def ReplayComTrace(self, value):
+        """
+        Sets the trace file from which ConnectToSystemDesk() and ConnectToVeosPlayer()
+        replay their sessions instead of connecting to the COM servers, see ComTrace.
+        """
+        self._ReplayComTrace = value
+
+    @property
+    def ReplayTimeScale(self):
+        """
+        Gets the factor of the recorded durations of replayed COM calls.
+        """
+        return self._ReplayTimeScale
+    @ReplayTimeScale.setter
+    def ReplayTimeScale(self, value):
+        """
+        Sets the factor of the recorded durations of replayed COM calls, e.g.
+        0.5 for half the time or 0 to replay without waiting.
+        """
+        self._ReplayTimeScale = value
+
+    @property
+    def ProfileComCalls(self):
+        """
+        Gets the report file of the COM call profile of the sessions.
+        """
+        return self._ProfileComCalls
+    @ProfileComCalls.setter
+    def ProfileComCalls(self, value):
+        """
+        Sets the report file to which the COM calls and latencies of the sessions
+        are written per helper and member, see Profiling. None profiles nothing.
+        """
+        self._ProfileComCalls = value
+
+
+class BatchSession():
+    """
+    Context manager which runs SystemDesk in batch mode (without dialogs).
+    Sessions can be nested: only the outermost session switches the batch mode
+    on and restores the previous state when it ends, even on exceptions.
+    Example:
+        with BatchSession():
+            for command in commands:
+                StartBswGeneration(ecuConfiguration, command)
+    """
+    def __enter__(self):
+        global _BatchSessionDepth, _BatchSessionOldMode
+        if _BatchSessionDepth == 0:
+            _BatchSessionOldMode = SdApplication.BatchMode
+            if not _BatchSessionOldMode:
+                SdApplication.BatchMode = True
+        _BatchSessionDepth += 1
+        return self
+
+    def __exit__(self, excType, excValue, traceback):
+        global _BatchSessionDepth, _BatchSessionOldMode
+        _BatchSessionDepth -= 1
+        if _BatchSessionDepth == 0:
+            if not _BatchSessionOldMode:
+                SdApplication.BatchMode = _BatchSessionOldMode
+            _BatchSessionOldMode = None
+        return False
+
 
 #===============================================================================
 # Global variables for easier access to elements in SystemDesk.
@@ -64,6 +178,10 @@ class OptionsHelper():
 # Global variable containing configuration options.
 Options = OptionsHelper()
 
+# Number of nested BatchSessions and the batch mode before the outermost one.
+_BatchSessionDepth = 0
+_BatchSessionOldMode = None
+
 # The SystemDesk application object. This object is None until
 # ConnectToSystemDesk() is successfully performed.
 SdApplication = None
@@ -80,6 +198,155 @@ VpApplication = None
 # ConnectToVeosPlayer() is successfully performed.
 VpEnums = None
 
+# Elements resolved by GetElementByPath(). Maps (scope, arPath) to the element.
+# The scope is None for paths without a project or ECU configuration name.
+_ElementCache = {}
+
+# Keys of the paths which could not be resolved by GetElementByPath(). They are
+# kept apart from the element cache, because every new element may turn a miss
+# into a hit.
+_ElementMissCache = set()
+
+# Keys of the missed paths by each ShortName of their path. A new element can
+# only turn the misses into hits whose path contains its ShortName.
+_ElementMissesByShortName = {}
+
+# Root node of the package trie for the active project. The trie remembers the
+# ArPackages resolved or created by GetOrCreatePackage(). It is None until the
+# first package is requested.
+_PackageTrie = None
+
+# Nodes of the package trie by the key of their ArPackage, see _ElementKey().
+_PackageNodes = {}
+
+# Ancestors resolved by FindAncestor() and FindCommonPackage(). Maps the tuple
+# (elementKey, ancestorKind, includeSelf) to the tuple (ancestor, comCalls),
+# where comCalls is the number of COM calls the walk up from the element needs.
+# The least recently used entries are dropped beyond _AncestorCacheSize.
+_AncestorCache = collections.OrderedDict()
+
+# Maximum number of entries of the ancestor cache.
+_AncestorCacheSize = 20000
+
+# Hit and miss counters of the ancestor cache, see GetAncestorCacheStatistics().
+_AncestorCacheStatistics = {"Hits": 0, "Misses": 0, "ParentHits": 0, "ComCallsSaved": 0}
+
+# Index of the task mappings and alarms of the active project, see
+# GetRteOsIndex(). It is None until the first mapping is looked up.
+_RteOsIndex = None
+
+# Indexes of the EcuConfigurations of the active project by the key of the
+# EcuConfiguration, see GetEcuConfigurationIndex().
+_EcuConfigurationIndexes = {}
+
+# Accessor for the special data of the model elements, see
+# GetSpecialDataAccessor(). It is None until the first special data is used.
+_SpecialDataAccessor = None
+
+# Index of the references between the elements of the active project, see
+# GetReferenceIndex(). It is None until the first reference is looked up.
+_ReferenceIndex = None
+
+# Index of the communication paths of the active project, see
+# GetSignalPathIndex(). It is None until the first path is looked up.
+_SignalPathIndex = None
+
+# Kinds of the elements along a communication path, from the software
+# component to the bus, see SignalPathIndex.
+SignalPathKinds = ("DataElement", "SystemSignal", "ISignal", "IPdu", "Frame", "FrameTriggering", "PhysicalChannel")
+
+# Name prefixes of the COM methods which only look up elements. Their results
+# are cached in a ReadOnlyPhase.
+_LookupMethodPrefixes = ("Item", "Get", "Find", "Is", "Has")
+
+# Standard subpackages which are skipped by FindCommonPackage().
+_CommonSubPackageNames = frozenset((
+    "ApplicationDataTypes",
+    "CommunicationClusters",
+    "CompuMethods",
+    "ConstantSpecificationMappingSets",
+    "ConstantSpecifications",
+    "DataConstrs",
+    "DataTypeMappingSets",
+    "EcuInstances",
+    "Frames",
+    "ImplementationDataTypes",
+    "ISignals",
+    "Pdus",
+    "PhysicalDimensions",
+    "PortInterfaces",
+    "ModeDeclarationGroups",
+    "SwAddrMethods",
+    "SwComponentTypes",
+    "SwcImplementations",
+    "SystemSignals",
+    "Systems",
+    "Units",))
+
+# Properties which refer to other elements by the ElementType of the referring
+# element, see GetReferences(). Properties of instance references are given as
+# path, e.g. "ProviderIref.TargetPPortRef". References of other properties, of
+# value specifications and of the ECU configurations, which are not below the
+# packages, are not followed.
+ReferenceProperties = {
+    "IAssemblySwConnector": ("ProviderIref.ContextComponentRef", "ProviderIref.TargetPPortRef", \
+        "RequesterIref.ContextComponentRef", "RequesterIref.TargetRPortRef"),
+    "ICanCommunicationConnector": ("CommControllerRef",),
+    "ICanFrameTriggering": ("FrameRef",),
+    "IDelegationSwConnector": ("InnerPortIref.ContextComponentRef", "InnerPortIref.TargetPortRef", "OuterPortRef"),
+    "IEthernetCommunicationConnector": ("CommControllerRef",),
+    "IFlexrayCommunicationConnector": ("CommControllerRef",),
+    "IFlexrayFrameTriggering": ("FrameRef",),
+    "IISignal": ("SystemSignalRef",),
+    "IISignalGroup": ("SystemSignalGroupRef",),
+    "IISignalToIPduMapping": ("ISignalRef", "ISignalGroupRef"),
+    "IISignalTriggering": ("ISignalRef", "ISignalGroupRef"),
+    "IISignalTriggeringRefConditional": ("ISignalTriggeringRef",),
+    "ILinCommunicationConnector": ("CommControllerRef",),
+    "ILinFrameTriggering": ("FrameRef",),
+    "IPPortPrototype": ("ProvidedInterfaceTref",),
+    "IParameterDataPrototype": ("TypeTref",),
+    "IPduToFrameMapping": ("PduRef",),
+    "IPduTriggering": ("IPduRef",),
+    "IPduTriggeringRefConditional": ("PduTriggeringRef",),
+    "IRPortPrototype": ("RequiredInterfaceTref",),
+    "IRootSwCompositionPrototype": ("SoftwareCompositionTref",),
+    "ISenderReceiverToSignalGroupMapping": ("SignalGroupRef",),
+    "ISenderReceiverToSignalMapping": ("SystemSignalRef",),
+    "ISwComponentPrototype": ("TypeTRef",),
+    "ISwcImplementation": ("BehaviorRef",),
+    "IVariableDataPrototype": ("TypeTref",),
+    }
+
+# Collections of child elements by the ElementType of their parent. They are
+# visited by WalkModel() in addition to the packages and their elements, if
+# requested.
+ChildCollections = {
+    "IApplicationSwComponentType": ("Ports",),
+    "ICanFrame": ("PduToFrameMappings",),
+    "ICanFrameTriggering": ("PduTriggerings",),
+    "ICanPhysicalChannel": ("ISignalTriggerings", "PduTriggerings", "FrameTriggerings"),
+    "IComplexDeviceDriverSwComponentType": ("Ports",),
+    "ICompositionSwComponentType": ("Ports", "Components", "Connectors"),
+    "IEcuAbstractionSwComponentType": ("Ports",),
+    "IEcuInstance": ("Connectors",),
+    "IEthernetFrame": ("PduToFrameMappings",),
+    "IFlexrayFrame": ("PduToFrameMappings",),
+    "IFlexrayFrameTriggering": ("PduTriggerings",),
+    "IFlexrayPhysicalChannel": ("ISignalTriggerings", "PduTriggerings", "FrameTriggerings"),
+    "IISignalIPdu": ("ISignalToPduMappings",),
+    "ILinFrameTriggering": ("PduTriggerings",),
+    "ILinPhysicalChannel": ("ISignalTriggerings", "PduTriggerings", "FrameTriggerings"),
+    "ILinUnconditionalFrame": ("PduToFrameMappings",),
+    "IParameterSwComponentType": ("Ports",),
+    "IPduTriggering": ("ISignalTriggerings",),
+    "ISenderReceiverInterface": ("DataElements",),
+    "ISensorActuatorSwComponentType": ("Ports",),
+    "IServiceSwComponentType": ("Ports",),
+    "ISystem": ("Mappings",),
+    "ISystemMapping": ("DataMappings",),
+    }
+
 
 #===============================================================================
 # Utility methods.
@@ -112,6 +379,7 @@ def AddBusConnectorAndPorts(ecuInstance, commController, busConnectorName=None):
         busConnectorName = ecuInstance.ShortName + busName + "Connector"
     commConnector.ShortName = busConnectorName
     commConnector.CommControllerRef = commController
+    _NoteReference(commConnector, "CommControllerRef", commController)
 
     # FramePorts
     portNamePrefix = TrimEnd(busConnectorName, "Connector")
@@ -242,6 +510,8 @@ def AddModuleConfiguration(ecuConfiguration, bswModuleName, importToProject=Fals
             importToProject, \
             moduleName)
     assert moduleConfiguration, "Could not find module definition " + moduleDefinitionArPath
+    _NoteElementsAdded()
+    GetEcuConfigurationIndex(ecuConfiguration).NoteModuleConfigurationAdded(moduleConfiguration, moduleName)
 
     return moduleConfiguration
 
@@ -251,12 +521,11 @@ def AddRteEventMapping(ecuConfiguration, osTask, componentName, rteEventName, \
     """
     Adds a RunnableEntityMapping for the given RTE event to the RTE configuration.
     """
-    rteConfiguration = FindModuleConfiguration(ecuConfiguration, "Rte")
+    ecuConfigurationIndex = GetEcuConfigurationIndex(ecuConfiguration)
+    rteConfiguration = ecuConfigurationIndex.FindModuleConfiguration("Rte")
 
     # Get the component prototype and the RTE event.
-    ecuFlatView = ecuConfiguration.EcuExtractSystem.RootSwCompositionPrototype
-    rootSwComposition = ecuFlatView.SoftwareCompositionTref
-    component = rootSwComposition.Components.Item(componentName)
+    component = ecuConfigurationIndex.FindComponentPrototype(componentName)
     rteEvent = component.TypeTRef.InternalBehaviors.Elements[0].Events.Item(rteEventName)
 
     # Determine the next free PositionInTask.
@@ -264,7 +533,7 @@ def AddRteEventMapping(ecuConfiguration, osTask, componentName, rteEventName, \
         positionInTask = FindNextPositionInTask(rteConfiguration, osTask)
 
     # Find the SwComponentInstance in the RTE configuration.
-    swcInstance = rteConfiguration.RteSwComponentInstances.Item(componentName)
+    swcInstance = ecuConfigurationIndex.FindRteSwComponentInstance(componentName)
 
     # Create a new runnable entity mapping.
     runnableEntityMapping = swcInstance.RteEventToTaskMappings.Add(rteEventName)
@@ -275,6 +544,8 @@ def AddRteEventMapping(ecuConfiguration, osTask, componentName, rteEventName, \
         runnableEntityMapping.RteUsedOsEventRef = osEvent
     if osAlarm:
         runnableEntityMapping.RteUsedOsAlarmRef = osAlarm
+    GetRteOsIndex().NotePositionInTask(rteConfiguration, runnableEntityMapping, \
+        osTask, positionInTask)
 
 
 def AddISignalToPduMapping(iPdu, iSignalOrISignalGroup, startPosition=0, \
@@ -290,8 +561,10 @@ def AddISignalToPduMapping(iPdu, iSignalOrISignalGroup, startPosition=0, \
     iSignalToPduMapping = iPdu.ISignalToPduMappings.AddNew(iSignalOrISignalGroup.ShortName)
     if iSignalOrISignalGroup.ElementType == "IISignal":
         iSignalToPduMapping.ISignalRef = iSignalOrISignalGroup
+        _NoteReference(iSignalToPduMapping, "ISignalRef", iSignalOrISignalGroup)
     elif iSignalOrISignalGroup.ElementType == "IISignalGroup":
         iSignalToPduMapping.ISignalGroupRef = iSignalOrISignalGroup
+        _NoteReference(iSignalToPduMapping, "ISignalGroupRef", iSignalOrISignalGroup)
     else:
         raise Exception("Invalid type of parameter iSignalOrISignalGroup: " + iSignalOrISignalGroup.ElementType)
     iSignalToPduMapping.StartPosition = startPosition
@@ -327,6 +600,95 @@ def ApplyDisplayFormat(arElement, displayFormat):
     arElement.GetOrCreateSwDataDefProps().DisplayFormat = displayFormat
 
 
+def ApplyRteEventMappings(ecuConfiguration, rows):
+    """
+    Maps RTE events to OsTasks as given by a table of rows. Each row is a tuple
+    (componentName, rteEventName, osTask, positionInTask, osEvent, osAlarm),
+    where the last three items are optional and may be None. osTask, osEvent and
+    osAlarm are elements of the OS configuration or their names.
+    Only mappings which are missing or differ from a row are changed, like
+    AddRteEventMapping() and UpdateRteEventMapping() would do. Mappings which are
+    not listed in the rows remain unchanged.
+    Returns the tuple (addedCount, updatedCount).
+    Example: ApplyRteEventMappings(ecuConfig, ReadRteEventMappings("Mappings.csv"))
+    """
+    ecuConfigurationIndex = GetEcuConfigurationIndex(ecuConfiguration)
+    rteConfiguration = ecuConfigurationIndex.FindModuleConfiguration("Rte")
+    rteOsIndex = GetRteOsIndex()
+    addedCount = 0
+    updatedCount = 0
+
+    # Shared objects which are resolved on first use.
+    components = {}
+    osElements = {}
+
+    def GetOsElement(collectionName, osElement):
+        # Returns an element of the OS configuration given by the element or its name.
+        if osElement == None or not Isa(osElement, "str"):
+            return osElement
+        cacheKey = (collectionName, osElement)
+        if cacheKey not in osElements:
+            osConfiguration = ecuConfigurationIndex.FindModuleConfiguration("Os")
+            osElements[cacheKey] = getattr(osConfiguration, collectionName).Item(osElement)
+            AssertIf(osElements[cacheKey] == None, "No element " + osElement + " found in " + collectionName)
+        return osElements[cacheKey]
+
+    def GetComponent(componentName):
+        # Returns the tuple (rteEvents, swcInstance, mappings) of a component.
+        if componentName not in components:
+            component = ecuConfigurationIndex.FindComponentPrototype(componentName)
+            AssertIf(component == None, "No component prototype found for " + componentName)
+            rteEvents = component.TypeTRef.InternalBehaviors.Elements[0].Events
+            swcInstance = ecuConfigurationIndex.FindRteSwComponentInstance(componentName)
+            mappings = {}
+            for mapping in IterateCollection(swcInstance.RteEventToTaskMappings):
+                mappings[mapping.ShortName] = mapping
+            components[componentName] = (rteEvents, swcInstance, mappings)
+        return components[componentName]
+
+    for row in rows:
+        row = tuple(row) + (None,) * (6 - len(row))
+        (componentName, rteEventName, osTask, positionInTask, osEvent, osAlarm) = row
+        osTask = GetOsElement("OsTasks", osTask)
+        osEvent = GetOsElement("OsEvents", osEvent)
+        osAlarm = GetOsElement("OsAlarms", osAlarm)
+        (rteEvents, swcInstance, mappings) = GetComponent(componentName)
+
+        runnableEntityMapping = mappings.get(rteEventName)
+        if runnableEntityMapping != None:
+            # Compare the existing mapping with the row.
+            oldOsTask = runnableEntityMapping.RteMappedToTaskRef
+            isSameTask = oldOsTask and oldOsTask.ShortName == osTask.ShortName
+            oldPositionInTask = runnableEntityMapping.RtePositionInTask
+            if isSameTask and positionInTask == None:
+                positionInTask = oldPositionInTask
+            if isSameTask and positionInTask == oldPositionInTask \
+                and (not osEvent or _IsSameElement(runnableEntityMapping.RteUsedOsEventRef, osEvent)) \
+                and (not osAlarm or _IsSameElement(runnableEntityMapping.RteUsedOsAlarmRef, osAlarm)):
+                continue
+            updatedCount += 1
+        else:
+            runnableEntityMapping = swcInstance.RteEventToTaskMappings.Add(rteEventName)
+            mappings[rteEventName] = runnableEntityMapping
+            addedCount += 1
+
+        # Determine the next free PositionInTask.
+        if positionInTask == None:
+            positionInTask = rteOsIndex.FindNextPositionInTask(rteConfiguration, osTask)
+
+        runnableEntityMapping.RteMappedToTaskRef = osTask
+        runnableEntityMapping.RteEventRef = rteEvents.Item(rteEventName)
+        runnableEntityMapping.RtePositionInTask = positionInTask
+        if osEvent:
+            runnableEntityMapping.RteUsedOsEventRef = osEvent
+        if osAlarm:
+            runnableEntityMapping.RteUsedOsAlarmRef = osAlarm
+        rteOsIndex.NotePositionInTask(rteConfiguration, runnableEntityMapping, \
+            osTask, positionInTask)
+
+    return (addedCount, updatedCount)
+
+
 def ApplyUnit(arElement, unit):
     """
     Applies an existing Unit to an AUTOSAR element.
@@ -340,8 +702,8 @@ def AssignMemMapAddressingModeSet(memMapConfiguration, sectionName, addressingMo
     MemMapAllocations.
     """
     # First priority: Check if the sectionName matches MemorySection.Symbol
-    for memMapAllocation in memMapConfiguration.MemMapAllocations.Elements:
-        for sectionMapping in memMapAllocation.MemMapSectionSpecificMappings.Elements:
+    for memMapAllocation in IterateCollection(memMapConfiguration.MemMapAllocations):
+        for sectionMapping in IterateCollection(memMapAllocation.MemMapSectionSpecificMappings):
             if not sectionMapping.MemMapAddressingModeSetRef:
                 memorySection = sectionMapping.MemMapMemorySectionRef
                 memorySectionSymbol = memorySection.Symbol
@@ -349,8 +711,8 @@ def AssignMemMapAddressingModeSet(memMapConfiguration, sectionName, addressingMo
                     sectionMapping.MemMapAddressingModeSetRef = addressingModeSet
 
     # Second priority: Check if the sectionName matches MemorySection.ShortName
-    for memMapAllocation in memMapConfiguration.MemMapAllocations.Elements:
-        for sectionMapping in memMapAllocation.MemMapSectionSpecificMappings.Elements:
+    for memMapAllocation in IterateCollection(memMapConfiguration.MemMapAllocations):
+        for sectionMapping in IterateCollection(memMapAllocation.MemMapSectionSpecificMappings):
             if not sectionMapping.MemMapAddressingModeSetRef:
                 memorySection = sectionMapping.MemMapMemorySectionRef
                 memorySectionName = memorySection.ShortName
@@ -371,23 +733,20 @@ def BuildForVeos(simSystem, vEcuName=None):
         vEcu = None
 
     # Run the build. Catch exceptions.
-    oldBatchMode = SdApplication.BatchMode
-    SdApplication.BatchMode = True
-    try:
-        if vEcu == None:
-            # Build whole simulation system.
-            buildResult = simSystem.Build()
-            buildStatus = buildResult.BuildStatus
-        else:
-            # Build single V-ECU.
-            buildResult = vEcu.Build()
-            buildStatus = buildResult.BuildStatus
-        if Isa(buildStatus, "int"):
-            buildStatus = SdEnums.BuildStatusEnum(buildStatus)
-    except Exception:
-        buildStatus = SdEnums.BuildStatusEnum.Invalid
-    finally:
-        SdApplication.BatchMode = oldBatchMode
+    with BatchSession():
+        try:
+            if vEcu == None:
+                # Build whole simulation system.
+                buildResult = simSystem.Build()
+                buildStatus = buildResult.BuildStatus
+            else:
+                # Build single V-ECU.
+                buildResult = vEcu.Build()
+                buildStatus = buildResult.BuildStatus
+            if Isa(buildStatus, "int"):
+                buildStatus = SdEnums.BuildStatusEnum(buildStatus)
+        except Exception:
+            buildStatus = SdEnums.BuildStatusEnum.Invalid
 
     return buildStatus
 
@@ -540,7 +899,8 @@ def ConnectToSystemDesk():
     global SdEnums
     if SdApplication == None:
         print("Opening COM connection to SystemDesk")
-        SdApplication = win32com.client.Dispatch("SystemDesk.Application.5.5")
+        InvalidateModelCaches()
+        SdApplication = _Dispatch("SystemDesk.Application.5.5")
         SdApplication.Visible = True
         applicationRootDir = SdApplication.ApplicationRootDir
         # Append the SystemDesk's directory for the BSW module automation to the Python search path.
@@ -568,11 +928,11 @@ def ConnectToVeosPlayer():
         print("Opening COM connection to VEOS Player")
         # try to connect to VEOS Player 5.1 or 5.2
         try:
-            VpApplication = win32com.client.Dispatch("VeosPlayer.Application.5.1")
+            VpApplication = _Dispatch("VeosPlayer.Application.5.1")
         except Exception:
             pass
         if not VpApplication:
-            VpApplication = win32com.client.Dispatch("VeosPlayer.Application.5.2")
+            VpApplication = _Dispatch("VeosPlayer.Application.5.2")
         if not VpApplication:
             raise Exception("Could not dispatch VEOS Player 5.1 or 5.2")
 
@@ -622,12 +982,11 @@ def CreateConstantSpecification(arElement, initValue, constantSpecShortName=None
     if IsNumerical(initValue):
         # Create a new ConstantSpecification.
         commonPackage = FindCommonPackage(arElement)
-        constantsPackage = commonPackage.ArPackages.Item("ConstantSpecifications")
-        if constantsPackage == None:
-            constantsPackage = commonPackage.ArPackages.AddNew("ConstantSpecifications")
+        constantsPackage = GetOrCreateSubPackage(commonPackage, "ConstantSpecifications")
         if constantSpecShortName == None:
             constantSpecShortName = "CONST_" + arElement.ShortName
         constantSpec = constantsPackage.Elements.AddNewConstantSpecification(constantSpecShortName)
+        _NoteElementsAdded(constantSpecShortName)
         SetDescription(constantSpec, GetDescription(arElement))
         # Create a value specification.
         dataType = arElement.TypeTref
@@ -739,9 +1098,11 @@ def CreateFrameTriggering(busType, physicalChannel, frame, identifier, pduTrigge
     frameTriggering.ShortName = frame.ShortName + "Triggering"
     frameTriggering.Identifier = identifier
     frameTriggering.FrameRef = frame
+    _NoteReference(frameTriggering, "FrameRef", frame)
     for pduTriggering in pduTriggerings:
         pduTriggeringConditional = frameTriggering.PduTriggerings.AddNew()
         pduTriggeringConditional.PduTriggeringRef = pduTriggering
+        _NoteReference(pduTriggeringConditional, "PduTriggeringRef", pduTriggering)
     for framePortRef in framePortRefs:
         frameTriggering.FramePortRefs.Add(framePortRef)
     return frameTriggering
@@ -761,9 +1122,7 @@ def CreateFrame(iSignalIPdu, frameType="CanFrame", frameShortName=None, \
         packingByteOrder = iSignalIPdu.ISignalToPduMappings.Elements[0].PackingByteOrder
     # Create or get a package for new Frames.
     commonPackage = FindCommonPackage(iSignalIPdu)
-    framesPackage = commonPackage.ArPackages.Item("Frames")
-    if framesPackage == None:
-        framesPackage = commonPackage.ArPackages.AddNew("Frames")
+    framesPackage = GetOrCreateSubPackage(commonPackage, "Frames")
     # Create the Frame.
     if frameType == "CanFrame":
         frame = framesPackage.Elements.AddNewCanFrame(frameShortName)
@@ -777,11 +1136,13 @@ def CreateFrame(iSignalIPdu, frameType="CanFrame", frameShortName=None, \
         frame = framesPackage.Elements.AddNewLinEventTriggeredFrame(frameShortName)
     else:
         assert 0, "Currently this utility method does not support " + frameType
+    _NoteElementsAdded(frameShortName)
     SetDescription(frame, frameType + " for ISignalIPdu " + iSignalIPdu.ShortName)
     # Set Frame parameters.
     frame.FrameLength = frameLength
     pduToFrameMapping = frame.PduToFrameMappings.AddNew()
     pduToFrameMapping.PduRef = iSignalIPdu
+    _NoteReference(pduToFrameMapping, "PduRef", iSignalIPdu)
     pduToFrameMapping.StartPosition = startPosition
     pduToFrameMapping.PackingByteOrder = packingByteOrder
     return frame
@@ -795,6 +1156,7 @@ def CreateImplConstantForApplConstant(applConstant, value, lsb=None, implConstan
     """
     constantsPackage = FindPackage(applConstant)
     implConstant = constantsPackage.Elements.AddNewConstantSpecification()
+    _NoteElementsAdded()
     if implConstantShortName != None:
         implConstant.ShortName = implConstantShortName
     else:
@@ -828,12 +1190,12 @@ def CreateISignal(systemSignal, iSignalShortName=None):
     if iSignalShortName == None:
         iSignalShortName = systemSignal.ShortName + "ISignal"
     commonPackage = FindCommonPackage(systemSignal)
-    iSignalsPackage = commonPackage.ArPackages.Item("ISignals")
-    if iSignalsPackage == None:
-        iSignalsPackage = commonPackage.ArPackages.AddNew("ISignals")
+    iSignalsPackage = GetOrCreateSubPackage(commonPackage, "ISignals")
     iSignal = iSignalsPackage.Elements.AddNewISignal(iSignalShortName)
+    _NoteElementsAdded(iSignalShortName)
     SetDescription(iSignal, "ISignal for SystemSignal " + systemSignal.ShortName)
     iSignal.SystemSignalRef = systemSignal
+    _NoteReference(iSignal, "SystemSignalRef", systemSignal)
     return iSignal
 
 
@@ -844,12 +1206,12 @@ def CreateISignalGroup(systemSignalGroup, iSignalGroupShortName=None):
     if iSignalGroupShortName == None:
         iSignalGroupShortName = systemSignalGroup.ShortName + "ISignalGroup"
     commonPackage = FindCommonPackage(systemSignalGroup)
-    iSignalsPackage = commonPackage.ArPackages.Item("ISignals")
-    if iSignalsPackage == None:
-        iSignalsPackage = commonPackage.ArPackages.AddNew("ISignals")
+    iSignalsPackage = GetOrCreateSubPackage(commonPackage, "ISignals")
     iSignalGroup = iSignalsPackage.Elements.AddNewISignalGroup(iSignalGroupShortName)
+    _NoteElementsAdded(iSignalGroupShortName)
     SetDescription(iSignalGroup, "ISignalGroup for SystemSignalGroup " + systemSignalGroup.ShortName)
     iSignalGroup.SystemSignalGroupRef = systemSignalGroup
+    _NoteReference(iSignalGroup, "SystemSignalGroupRef", systemSignalGroup)
     return iSignalGroup
 
 
@@ -860,8 +1222,10 @@ def CreateISignalTriggering(physicalChannel, iSignalOrISignalGroup, iSignalPortR
     iSignalTriggering = physicalChannel.ISignalTriggerings.AddNew(iSignalOrISignalGroup.ShortName + "Triggering")
     if iSignalOrISignalGroup.ElementType == "IISignal":
         iSignalTriggering.ISignalRef = iSignalOrISignalGroup
+        _NoteReference(iSignalTriggering, "ISignalRef", iSignalOrISignalGroup)
     elif iSignalOrISignalGroup.ElementType == "IISignalGroup":
         iSignalTriggering.ISignalGroupRef = iSignalOrISignalGroup
+        _NoteReference(iSignalTriggering, "ISignalGroupRef", iSignalOrISignalGroup)
     else:
         raise Exception("Invalid type of parameter iSignalOrISignalGroup: " + iSignalOrISignalGroup.ElementType)
     for iSignalPortRef in iSignalPortRefs:
@@ -932,9 +1296,11 @@ def CreatePduTriggering(physicalChannel, iPdu, iSignalTriggerings, iPduPortRefs)
     """
     pduTriggering = physicalChannel.PduTriggerings.AddNew(iPdu.ShortName + "Triggering")
     pduTriggering.IPduRef = iPdu
+    _NoteReference(pduTriggering, "IPduRef", iPdu)
     for iSignalTriggering in iSignalTriggerings:
         iSignalTriggeringConditional = pduTriggering.ISignalTriggerings.AddNew()
         iSignalTriggeringConditional.ISignalTriggeringRef = iSignalTriggering
+        _NoteReference(iSignalTriggeringConditional, "ISignalTriggeringRef", iSignalTriggering)
     for iPduPortRef in iPduPortRefs:
         pduTriggering.IPduPortRefs.Add(iPduPortRef)
     return pduTriggering
@@ -961,6 +1327,7 @@ def CreateProject(saveOldProject=False):
     # Close open project.
     if SdApplication.ActiveProject != None:
         SdApplication.ActiveProject.Close(saveOldProject)
+    InvalidateModelCaches()
     # Determine the full path of the new project file.
     projectRootDir = GetNewProjectRootDir()
     projectFile = os.path.join(projectRootDir, Options.ProjectName + ".sdp")
@@ -1018,6 +1385,7 @@ def CreateSenderReceiverToSignalGroupMapping(arSystem, swcs, port, dataElement,
         sr2sgMapping = arSystem.CreateSenderReceiverToSignalGroupMapping( \
             swcs, port, dataElement)
         sr2sgMapping.SignalGroupRef = systemSignalGroup
+        _NoteReference(sr2sgMapping, "SignalGroupRef", systemSignalGroup)
         sr2sgMapping.SetNewTypeMapping()
         if dataElement.TypeTref.ElementType == "IApplicationArrayDataType":
             srPrimitiveElementMappings = sr2sgMapping.TypeMapping.ArrayElementMappings.Elements
@@ -1160,6 +1528,39 @@ def DeleteElementByPath(arQualifiedPath):
     element = GetElementByPath(arQualifiedPath)
     if element:
         element.Delete()
+        _NoteElementDeleted(arQualifiedPath)
+
+
+def DeleteElements(elements, force=False):
+    """
+    Deletes the given elements and the elements below them. Elements which
+    refer to other elements of the list are deleted before them. Raises an
+    exception without deleting anything if other elements refer to the deleted
+    elements, unless force is True. See ReferenceIndex.FindImpact().
+    Only the references in ReferenceProperties are checked, e.g. not the
+    references of the ECU configurations.
+    Returns the list of deleted elements in the order of deletion.
+    """
+    elements = list(elements)
+    referenceIndex = GetReferenceIndex()
+    if not force:
+        impact = referenceIndex.FindImpact(elements)
+        if impact:
+            raise Exception("Elements are still referenced (checked are the ReferenceProperties only): " + ", ".join( \
+                "%s.%s -> %s" % (_ReadProperty(referrer, "ShortName"), propertyName, _ReadProperty(target, "ShortName")) \
+                for (referrer, propertyName, target) in impact[:10]))
+    orderedElements = referenceIndex.GetDeletionOrder(elements)
+    for element in orderedElements:
+        arPath = referenceIndex.GetArPath(element)
+        element.Delete()
+        referenceIndex.NoteElementDeleted(element)
+        if arPath != None:
+            _NoteElementDeleted(arPath)
+        else:
+            # The element is unknown to the path caches, so they are discarded.
+            InvalidateElementCache()
+            InvalidateAncestorCache()
+    return orderedElements
 
 
 def DisconnectFromSystemDesk():
@@ -1170,6 +1571,11 @@ def DisconnectFromSystemDesk():
     if SdApplication != None:
         SdApplication.Quit()
         SdApplication = None
+        InvalidateModelCaches()
+        if Options.RecordComTrace:
+            ComTrace.GetRecorder(Options.RecordComTrace).Flush()
+        if Options.ProfileComCalls:
+            Profiling.GetProfiler(Options.ProfileComCalls).WriteReport()
 
 
 def DisconnectFromVeosPlayer():
@@ -1180,6 +1586,10 @@ def DisconnectFromVeosPlayer():
     if VpApplication != None:
         VpApplication.Quit()
         VpApplication = None
+        if Options.RecordComTrace:
+            ComTrace.GetRecorder(Options.RecordComTrace).Flush()
+        if Options.ProfileComCalls:
+            Profiling.GetProfiler(Options.ProfileComCalls).WriteReport()
 
 
 def ExportSwcContainer(swc, autosarExportVersion=None):
@@ -1200,12 +1610,9 @@ def ExportSwcContainer(swc, autosarExportVersion=None):
 
     # Perform the export in batch mode (without dialogs).
     try:
-        oldBatchMode = SdApplication.BatchMode
-        SdApplication.BatchMode = True
-        swc.ContainerManager.Export()
-        SdApplication.BatchMode = oldBatchMode
+        with BatchSession():
+            swc.ContainerManager.Export()
     except Exception as e:
-        SdApplication.BatchMode = False
         ##print repr(e)
         raise Exception(e)
 
@@ -1214,135 +1621,52 @@ def FindAncestor(arElement, ancestorElementType):
     """
     Returns the first parent of the arElement with the given ElementType.
     """
-    parent = arElement.Parent
-    while(True):
-        if parent == None:
-            return None
-        elif parent.ElementType == ancestorElementType:
-            return parent
-        else:
-            parent = parent.Parent
+    def IsAncestor(parent):
+        return (parent.ElementType == ancestorElementType, 1)
+    return _ResolveAncestor(arElement, ancestorElementType, IsAncestor)
 
 
 def FindCommonPackage(arElement):
     """
     Returns the AUTOSAR package for a component or for common elements.
     """
-    subPackageNames = (
-        "ApplicationDataTypes",
-        "CommunicationClusters",
-        "CompuMethods",
-        "ConstantSpecificationMappingSets",
-        "ConstantSpecifications",
-        "DataConstrs",
-        "DataTypeMappingSets",
-        "EcuInstances",
-        "Frames",
-        "ImplementationDataTypes",
-        "ISignals",
-        "Pdus",
-        "PhysicalDimensions",
-        "PortInterfaces",
-        "ModeDeclarationGroups",
-        "SwAddrMethods",
-        "SwComponentTypes",
-        "SwcImplementations",
-        "SystemSignals",
-        "Systems",
-        "Units",)
-    parent = arElement.Parent
-    while(True):
-        if parent == None:
-            return None
-        elif parent.ElementType == "IARPackage":
-            # Skip subpackages for standard elements.
-            if subPackageNames.__contains__(parent.ShortName):
-                parent = parent.Parent
-            else:
-                # Ok, package found.
-                return parent
-        else:
-            parent = parent.Parent
+    def IsCommonPackage(parent):
+        if parent.ElementType != "IARPackage":
+            return (False, 1)
+        # Skip subpackages for standard elements.
+        return (parent.ShortName not in _CommonSubPackageNames, 2)
+    return _ResolveAncestor(arElement, "<CommonPackage>", IsCommonPackage)
 
 
 def FindModuleConfiguration(ecuConfiguration, moduleName):
     """
     Searches a module configuration in the given EcuConfiguration.
     """
-    ecucValues = ecuConfiguration.EcucValueCollection.EcucValues
-    for moduleConfigurationRefConditional in ecucValues.Elements:
-        moduleConfiguration = moduleConfigurationRefConditional.EcucModuleConfigurationValuesRef
-        if moduleConfiguration.ShortName == moduleName:
-            return moduleConfiguration
-    return None
+    return GetEcuConfigurationIndex(ecuConfiguration).FindModuleConfiguration(moduleName)
 
 def FindNextPositionInTask(rteConfiguration, osTask):
     """
     Searches all runnables and BSW main functions which are mapped on a given task
     and returns the next free position in the task.
     """
-    positionInTask = 0
-
-    if rteConfiguration != None:
-        # Iterate all RTE event mappings.
-        for swcInstance in rteConfiguration.RteSwComponentInstances.Elements:
-            for rteEventToTaskMapping in swcInstance.RteEventToTaskMappings.Elements:
-                if rteEventToTaskMapping.RteMappedToTaskRef:
-                    if rteEventToTaskMapping.RteMappedToTaskRef.ShortName == osTask.ShortName:
-                        if rteEventToTaskMapping.RtePositionInTask >= positionInTask:
-                            positionInTask = rteEventToTaskMapping.RtePositionInTask + 1
-        # Iterate all BSW event mappings.
-        for bswModuleInstance in rteConfiguration.RteBswModuleInstances.Elements:
-            for bswEventToTaskMapping in bswModuleInstance.RteBswEventToTaskMappings.Elements:
-                if bswEventToTaskMapping.RteBswMappedToTaskRef:
-                    if bswEventToTaskMapping.RteBswMappedToTaskRef.ShortName == osTask.ShortName:
-                        if bswEventToTaskMapping.RteBswPositionInTask >= positionInTask:
-                            positionInTask = bswEventToTaskMapping.RteBswPositionInTask + 1
-
-    return positionInTask
+    if rteConfiguration == None:
+        return 0
+    return GetRteOsIndex().FindNextPositionInTask(rteConfiguration, osTask)
 
 
 def FindOsTaskForBswMainFunction(rteConfiguration, bswModuleName, bswMainFunctionName):
     """
     Returns the OsTask which contains the given BSW main function.
     """
-
-    # Iterate all main function mappings.
-    for bswModuleInstance in rteConfiguration.RteBswModuleInstances.Elements:
-        for bswEventToTaskMapping in bswModuleInstance.RteBswEventToTaskMappings.Elements:
-            bswEvent = bswEventToTaskMapping.RteBswEventRef
-            bswModuleDescription = bswEvent.Parent.Parent
-            if bswModuleDescription.ShortName == bswModuleName:
-                if bswEvent.StartsOnEventRef.ShortName == bswMainFunctionName:
-                    return bswEventToTaskMapping.RteBswMappedToTaskRef
-                elif bswMainFunctionName.startswith(bswModuleName + "_"):
-                    ## HACK: Remove this.
-                    bswMainFunctionNameWithoutPrefix = bswMainFunctionName[len(bswModuleName)+1:]
-                    if bswEvent.StartsOnEventRef.ShortName == bswMainFunctionNameWithoutPrefix:
-                        return bswEventToTaskMapping.RteBswMappedToTaskRef
-                elif bswEvent.StartsOnEventRef.ShortName.startswith(bswModuleName + "_"):
-                    ## HACK: Remove this.
-                    bswStartsOnEventWithoutPrefix = bswEvent.StartsOnEventRef.ShortName[len(bswModuleName)+1:]
-                    if bswStartsOnEventWithoutPrefix == bswMainFunctionName:
-                        return bswEventToTaskMapping.RteBswMappedToTaskRef
-
-    # BSW main function is not mapped to an OsTask.
-    return None
+    return GetRteOsIndex().FindOsTaskForBswMainFunction(rteConfiguration, \
+        bswModuleName, bswMainFunctionName)
 
 
 def FindOsAlarmForOsTask(osTask):
     """
-    Returns the OsTask which contains the given BSW main function.
+    Returns the OsAlarm which activates the given OsTask.
     """
-    osConfiguration = osTask.Parent
-
-    # Iterate all OsAlarms.
-    for osAlarm in osConfiguration.OsAlarms.Elements:
-        if osAlarm.OsAlarmAction.OsAlarmActivateTaskRef.ShortName == osTask.ShortName:
-            return osAlarm
-
-    # BSW main function is not mapped to an OsTask.
-    return None
+    return GetRteOsIndex().FindOsAlarmForOsTask(osTask)
 
 
 def FindPackage(element):
@@ -1357,14 +1681,20 @@ def FindSwcPrototype(ecuConfiguration, swcType):
     Returns the (first) software component prototype in the ECU flat view which
     references the given software component.
     """
-    ecuFlatView = ecuConfiguration.EcuExtractSystem.RootSwCompositionPrototype
-    swComposition = ecuFlatView.SoftwareCompositionTref
-    for swcPrototype in swComposition.Components.Elements:
-        if swcPrototype.TypeTref == swcType:
-            return swcPrototype
+    swcPrototypes = FindSwcPrototypes(ecuConfiguration, swcType)
+    if swcPrototypes:
+        return swcPrototypes[0]
     return None
 
 
+def FindSwcPrototypes(ecuConfiguration, swcType):
+    """
+    Returns all software component prototypes in the ECU flat view which
+    reference the given software component.
+    """
+    return GetEcuConfigurationIndex(ecuConfiguration).FindSwcPrototypes(swcType)
+
+
 def GetBswPluginDir(bswModuleName):
     """
     Returns the plugin directory for a given BSW module
@@ -1421,62 +1751,72 @@ def GetElementByPath(arQualifiedPath):
     Returns the element at the given AUTOSAR path. The path may start with a
     project name or ECU configuration name separated by a colon ':', which
     restricts the search to the given scope.
+    Resolved paths are cached until the element is deleted by a helper of this
+    module or InvalidateElementCache() is called.
     Examples:
         /AUTOSAR_Platform/ImplemmentationTypes/uint8
         ControllerEcuConfiguration:/AUTOSAR_Platform/ImplemmentationTypes/uint8
     """
+    cacheKey = _GetElementCacheKey(arQualifiedPath)
+    if cacheKey in _ElementCache:
+        return _ElementCache[cacheKey]
+    if cacheKey in _ElementMissCache:
+        return None
 
-    # Split the scope from the AUTOSAR path.
-    arQualifiedPathItems = arQualifiedPath.split(':')
-    if len(arQualifiedPathItems) <= 1:
+    (scope, arPath) = cacheKey
+    if scope == None:
         # Normal path without scope. Search the element at the given path.
         arRoot = SdApplication.ActiveProject.RootAutosar
-        if arRoot.ArPackages.Count == 0:
-            return None
-        firstPackage = arRoot.ArPackages.Elements[0]
-        elements = firstPackage.GetElementsByARPath(arQualifiedPath)
-        if bool(elements):
-            return elements[0]
-        else:
+        element = _FindElementByArPath(arRoot, arPath)
+    else:
+        # Given path contains scope. Determine the root element for the search.
+        arRoot = _FindScopeRoot(scope)
+        if not arRoot:
             return None
+        (element, remainingItems) = _WalkArPath(arRoot, arPath, {})
 
-    # Given path contains scope.
-    scope = arQualifiedPathItems[0]
-    arPath = arQualifiedPathItems[1]
+    _CacheElement(cacheKey, element)
+    return element
 
-    # Determine the root element for the search.
-    arRoot = None
-    if scope == SdApplication.ActiveProject.Name:
-        arRoot = SdApplication.ActiveProject.RootAutosar
-    else:
-        for ecuConfiguration in SdApplication.ActiveProject.EcuConfigurations.Elements:
-            if ecuConfiguration.Name == scope:
-                arRoot = ecuConfiguration.RootAutosar
-                break
-    if not arRoot:
-        return None
 
-    # Search the element at the given path.
-    element = None
-    # Iterate all path items. List begins with "" if the path is rooted.
-    for arPathItem in arPath.split('/'):
-        if arPathItem == "":
-            # Iteration starts with root.
-            element = arRoot
-        else:
-            # Try to find a subpackage with the given name.
-            subpackage = element.ArPackages.Item(arPathItem)
-            if subpackage == None:
-                if element == arRoot:
-                    # Element is root package. Path below root could not be resolved.
-                    return None
-                # Element is a package. Return element in package.
-                element = element.Elements.Item(arPathItem)
-                return element
+def GetElementsByPaths(arQualifiedPaths):
+    """
+    Returns the elements at the given AUTOSAR paths as a list in the same order.
+    Paths which cannot be resolved yield None. The paths may have a scope like
+    the paths of GetElementByPath(). Packages shared by several paths are
+    resolved only once.
+    """
+    elements = [None] * len(arQualifiedPaths)
+    arRoots = {}
+    packages = {}
+    for index, arQualifiedPath in enumerate(arQualifiedPaths):
+        cacheKey = _GetElementCacheKey(arQualifiedPath)
+        if cacheKey in _ElementCache:
+            elements[index] = _ElementCache[cacheKey]
+            continue
+        if cacheKey in _ElementMissCache:
+            continue
+
+        # Determine the root element once per scope.
+        (scope, arPath) = cacheKey
+        if not scope in arRoots:
+            if scope == None:
+                arRoots[scope] = SdApplication.ActiveProject.RootAutosar
             else:
-                # Continue with subpackage.
-                element = subpackage
-    return element
+                arRoots[scope] = _FindScopeRoot(scope)
+            packages[scope] = {}
+        arRoot = arRoots[scope]
+        if not arRoot:
+            continue
+
+        # Walk the packages. Packages already walked for other paths are reused.
+        (element, remainingItems) = _WalkArPath(arRoot, arPath, packages[scope])
+        if scope == None and (element == None or remainingItems > 0):
+            # The element is not directly contained in a package.
+            element = _FindElementByArPath(arRoot, arPath)
+        _CacheElement(cacheKey, element)
+        elements[index] = element
+    return elements
 
 
 def GetNoUnit():
@@ -1529,13 +1869,14 @@ def GetOrCreateApplicationArrayDataType(arElement):
     adt = arElement.TypeTref
     if adt == None:
         commonPackage = FindCommonPackage(arElement)
-        adtPackage = commonPackage.ArPackages.Item("ApplicationDataTypes")
-        if adtPackage == None:
-            adtPackage = commonPackage.ArPackages.AddNew("ApplicationDataTypes")
-        adt = adtPackage.Elements.AddNewApplicationArrayDataType(arElement.ShortName)
+        adtPackage = GetOrCreateSubPackage(commonPackage, "ApplicationDataTypes")
+        adtShortName = arElement.ShortName
+        adt = adtPackage.Elements.AddNewApplicationArrayDataType(adtShortName)
+        _NoteElementsAdded(adtShortName)
         adt.Category = "ARRAY"
         SetDescription(adt, "ApplicationDataType for " + arElement.ShortName)
         arElement.TypeTref = adt
+        _NoteReference(arElement, "TypeTref", adt)
         adt.SetNewElement()
         adt.Element.ShortName = arElement.ShortName + "_ELEMENT"
         SetDescription(adt.Element, "Element of " + arElement.ShortName)
@@ -1552,15 +1893,15 @@ def GetOrCreateApplicationPrimitiveDataType(arElement, adtShortName=None):
         adtShortName = arElement.ShortName
     if adt == None:
         commonPackage = FindCommonPackage(arElement)
-        adtPackage = commonPackage.ArPackages.Item("ApplicationDataTypes")
-        if adtPackage == None:
-            adtPackage = commonPackage.ArPackages.AddNew("ApplicationDataTypes")
+        adtPackage = GetOrCreateSubPackage(commonPackage, "ApplicationDataTypes")
         adt = adtPackage.Elements.Item(adtShortName)
         if not adt:
             adt = adtPackage.Elements.AddNewApplicationPrimitiveDataType(adtShortName)
+            _NoteElementsAdded(adtShortName)
             adt.Category = arElement.Category
             SetDescription(adt, "ApplicationDataType for " + arElement.ShortName)
         arElement.TypeTref = adt
+        _NoteReference(arElement, "TypeTref", adt)
     return adt
 
 
@@ -1573,15 +1914,15 @@ def GetOrCreateCompuMethod(arElement, shortName=None):
     compuMethod = swDataDefProps.CompuMethodRef
     if compuMethod == None:
         commonPackage = FindCommonPackage(arElement)
-        cmPackage = commonPackage.ArPackages.Item("CompuMethods")
-        if cmPackage == None:
-            cmPackage = commonPackage.ArPackages.AddNew("CompuMethods")
+        cmPackage = GetOrCreateSubPackage(commonPackage, "CompuMethods")
         if shortName != None:
             compuMethod = cmPackage.Elements.Item(shortName)
             if compuMethod == None:
                 compuMethod = cmPackage.Elements.AddNewCompuMethod(shortName)
         else:
-            compuMethod = cmPackage.Elements.AddNewCompuMethod(arElement.ShortName)
+            shortName = arElement.ShortName
+            compuMethod = cmPackage.Elements.AddNewCompuMethod(shortName)
+        _NoteElementsAdded(shortName)
         SetDescription(compuMethod, "CompuMethod for " + arElement.ShortName)
         swDataDefProps.TrySetCompuMethodRef(compuMethod)
     return compuMethod
@@ -1602,10 +1943,9 @@ def GetOrCreateConstantSpecificationMappingSet(element):
 
     # Create ConstantMappingSpecificationSet below the package of the SWC.
     swcPackage = FindPackage(element)
-    csmsPackage = swcPackage.ArPackages.Item("ConstantSpecificationMappingSets")
-    if csmsPackage == None:
-        csmsPackage = swcPackage.ArPackages.AddNew("ConstantSpecificationMappingSets")
+    csmsPackage = GetOrCreateSubPackage(swcPackage, "ConstantSpecificationMappingSets")
     csms = csmsPackage.Elements.AddNewConstantSpecificationMappingSet()
+    _NoteElementsAdded()
     SetDescription(csms, "ConstantSpecificationMappingSet for " + element.ShortName)
 
     # Add the ConstantMappingSpecificationSet to the given element.
@@ -1637,7 +1977,9 @@ def GetOrCreateDataConstr(arElement, shortName=None):
             if dataConstr == None:
                 dataConstr = dcPackage.Elements.AddNewDataConstr(shortName)
         else:
-            dataConstr = dcPackage.Elements.AddNewDataConstr("DC_" + arElement.ShortName)
+            shortName = "DC_" + arElement.ShortName
+            dataConstr = dcPackage.Elements.AddNewDataConstr(shortName)
+        _NoteElementsAdded(shortName)
         swDataDefProps.TrySetDataConstrRef(dataConstr)
     return dataConstr
 
@@ -1652,10 +1994,9 @@ def GetOrCreateDataTypeMappingSet(element):
         return element.DataTypeMappingRefs.Elements[0]
     # Create DataTypeMappingSet below the package of the SWC.
     swcPackage = FindPackage(element)
-    dtmsPackage = swcPackage.ArPackages.Item("DataTypeMappingSets")
-    if dtmsPackage == None:
-        dtmsPackage = swcPackage.ArPackages.AddNew("DataTypeMappingSets")
+    dtmsPackage = GetOrCreateSubPackage(swcPackage, "DataTypeMappingSets")
     dtms = dtmsPackage.Elements.AddNewDataTypeMappingSet()
+    _NoteElementsAdded()
     if element.ElementType == "IParameterSwComponentType":
         dtms.ShortName = element.ShortName + "_DataTypeMappingSet"
     else:
@@ -1674,13 +2015,12 @@ def GetOrCreateImplementationDataType(adt, idtShortName=None, idtElementType=Non
         idtShortName = adt.ShortName + "_IDT"
 
     commonPackage = FindCommonPackage(adt)
-    idtPackage = commonPackage.ArPackages.Item("ImplementationDataTypes")
-    if idtPackage == None:
-        idtPackage = commonPackage.ArPackages.AddNew("ImplementationDataTypes")
+    idtPackage = GetOrCreateSubPackage(commonPackage, "ImplementationDataTypes")
     idt = idtPackage.Elements.Item(idtShortName)
     if idt != None:
         return idt
     idt = idtPackage.Elements.AddNewImplementationDataType(idtShortName)
+    _NoteElementsAdded(idtShortName)
     SetDescription(idt, "ImplementationDataType for ApplicationDataType " + adt.ShortName)
     idt.Category = adt.Category
     if adt.ElementType == "IApplicationArrayDataType":
@@ -1717,10 +2057,9 @@ def GetOrCreateInitValueConstant(arElement, constantSpecShortName=None):
         if (constantSpecShortName == None):
             constantSpecShortName = "CONST_" + arElement.ShortName
         commonPackage = FindCommonPackage(arElement)
-        constantsPackage = commonPackage.ArPackages.Item("ConstantSpecifications")
-        if constantsPackage == None:
-            constantsPackage = commonPackage.ArPackages.AddNew("ConstantSpecifications")
+        constantsPackage = GetOrCreateSubPackage(commonPackage, "ConstantSpecifications")
         constantSpec = constantsPackage.Elements.AddNewConstantSpecification(constantSpecShortName)
+        _NoteElementsAdded(constantSpecShortName)
         SetDescription(constantSpec, GetDescription(arElement))
         constantRef = arElement.SetNewInitValueConstantReference()
         ##constantRef.ShortLabel = constantSpec.ShortName
@@ -1734,19 +2073,40 @@ def GetOrCreatePackage(arPath):
     """
     Returns the ArPackage at the given AUTOSAR path.
     Creates a new ArPackage if it does not exist.
+    The packages are remembered in the package trie of the session, so paths
+    with a common prefix are walked only once.
     """
-    arPathItems = arPath.split('/')
-    arRoot = SdApplication.ActiveProject.RootAutosar
-    arPackage = None
-    for arPathItem in arPathItems:
+    packageNode = _GetPackageTrie()
+    for arPathItem in arPath.split('/'):
         if arPathItem == "":
-            arPackage = arRoot
+            packageNode = _GetPackageTrie()
         else:
-            subpackage = arPackage.ArPackages.Item(arPathItem)
-            if subpackage == None:
-                subpackage = arPackage.ArPackages.AddNew(arPathItem)
-            arPackage = subpackage
-    return arPackage
+            packageNode = _GetOrCreatePackageNode(packageNode, arPathItem)
+    return packageNode.Package
+
+
+def GetOrCreatePackages(arPaths):
+    """
+    Returns the ArPackages at the given AUTOSAR paths as a list in the same
+    order. Creates all packages which do not exist. The paths are processed in
+    sorted order, so that each package of the skeleton is visited only once.
+    """
+    packages = {}
+    for arPath in sorted(set(arPaths)):
+        packages[arPath] = GetOrCreatePackage(arPath)
+    return [packages[arPath] for arPath in arPaths]
+
+
+def GetOrCreateSubPackage(arPackage, shortName):
+    """
+    Returns the subpackage with the given name of an ArPackage.
+    Creates a new subpackage if it does not exist.
+    """
+    packageNode = _PackageNodes.get(_ElementKey(arPackage))
+    if packageNode == None:
+        packageNode = _PackageTrieNode(arPackage, _GetArPath(arPackage).rstrip('/'))
+        _PackageNodes[_ElementKey(arPackage)] = packageNode
+    return _GetOrCreatePackageNode(packageNode, shortName).Package
 
 
 def GetOrCreateSwcImplementation(element, shortName=None):
@@ -1772,7 +2132,9 @@ def GetOrCreateSwcImplementation(element, shortName=None):
     ##if implPackage == None:
     ##    implPackage = swcPackage.ArPackages.AddNew("SwcImplementations")
     swcImplementation = implPackage.Elements.AddNewSwcImplementation(shortName)
+    _NoteElementsAdded(shortName)
     swcImplementation.BehaviorRef = swcInternalBehavior
+    _NoteReference(swcImplementation, "BehaviorRef", swcInternalBehavior)
 
     return swcImplementation
 
@@ -1816,6 +2178,20 @@ def GetProjectRootDir():
     return projectRootDir
 
 
+def GetSpecialData(elements, sdgGid="edve:taggedStringValue"):
+    """
+    Returns the special data items of the given elements as a list of tuples
+    (element, gid, value), e.g. for auditing the tags of a whole project.
+    Only the items of the SDG with the given sdgGid are returned.
+    """
+    specialDataAccessor = GetSpecialDataAccessor()
+    specialData = []
+    for element in elements:
+        for (gid, value) in specialDataAccessor.GetValues(element, sdgGid).items():
+            specialData.append((element, gid, value))
+    return specialData
+
+
 def GetVpuPort(vpu, pathItems):
     """
     Returns the VpuPort object at the given path.
@@ -1847,14 +2223,12 @@ def ImportA2lFile(internalBehavior, a2lFilePath):
     # Get an import manager and import the A2L file.
     a2lVariableImporter = internalBehavior.VariableImporter
     a2lVariableImporter.Filename = a2lFilePath
-    oldBatchMode = SdApplication.BatchMode
-    SdApplication.BatchMode = True
-    try:
-        status = a2lVariableImporter.Import()
-    except Exception:
-        status = False
-    finally:
-        SdApplication.BatchMode = oldBatchMode
+    with BatchSession():
+        try:
+            status = a2lVariableImporter.Import()
+        except Exception:
+            status = False
+    InvalidateModelCaches()
     assert status, "A2L import from file %s failed. See Message Browser." % a2lFilePath
 
 
@@ -1928,6 +2302,7 @@ def ImportAutosarFiles(fileNames, elementSelections="/",
 
         # Now import the file.
         success = importExportFile.Import()
+        InvalidateModelCaches()
         if success == False:
             raise Exception("AUTOSAR import failed")
 
@@ -1962,6 +2337,7 @@ def ImportAutosarFilesAtProject(fileNames, elementSelections="/",
 
     # Now import the file(s).
     success = SdProject.Serializer.Import(importSettings)
+    InvalidateModelCaches()
     if success == False:
         raise Exception("AUTOSAR import failed")
 
@@ -1981,14 +2357,13 @@ def ImportSwcContainer(containerName, containerSet=None):
 
     # Perform the import in batch mode (without dialogs).
     try:
-        oldBatchMode = SdApplication.BatchMode
-        SdApplication.BatchMode = True
-        containerManager.Import()
-        SdApplication.BatchMode = oldBatchMode
+        with BatchSession():
+            containerManager.Import()
     except Exception as e:
-        SdApplication.BatchMode = False
         ##print repr(e)
         raise Exception(e)
+    finally:
+        InvalidateModelCaches()
 
 def OpenProject(saveOldProject=False):
     """
@@ -1999,6 +2374,7 @@ def OpenProject(saveOldProject=False):
     # Close open project.
     if SdApplication.ActiveProject != None:
         SdApplication.ActiveProject.Close(saveOldProject)
+    InvalidateModelCaches()
 
     # Determine the full path of the new project file.
     projectRootDir = GetNewProjectRootDir()
@@ -2009,16 +2385,34 @@ def OpenProject(saveOldProject=False):
         return
 
     # Open the project in batch mode. Catch exceptions.
-    oldBatchMode = SdApplication.BatchMode
-    SdApplication.BatchMode = True
     try:
-        print("\nOpening SystemDesk project %s" % projectFile)
-        SdApplication.OpenProject(projectFile)
+        with BatchSession():
+            print("\nOpening SystemDesk project %s" % projectFile)
+            SdApplication.OpenProject(projectFile)
     except Exception as e:
-        SdApplication.BatchMode = oldBatchMode
         raise Exception(e)
-    finally:
-        SdApplication.BatchMode = oldBatchMode
+
+
+def ReadRteEventMappings(csvFileName):
+    """
+    Reads a table of RTE event mappings for ApplyRteEventMappings() from a CSV
+    file. The first line contains the column names Component, Event, Task,
+    Position, OsEvent and OsAlarm; the last three columns are optional.
+    Empty cells are returned as None.
+    """
+    rows = []
+    with open(csvFileName, newline="") as csvFile:
+        for record in csv.DictReader(csvFile):
+            row = []
+            for columnName in ("Component", "Event", "Task", "Position", "OsEvent", "OsAlarm"):
+                value = (record.get(columnName) or "").strip()
+                if value == "":
+                    value = None
+                elif columnName == "Position":
+                    value = int(value)
+                row.append(value)
+            rows.append(tuple(row))
+    return rows
 
 
 def RemoveFromContainerFile(containerFile, arQualifiedPath):
@@ -2029,28 +2423,36 @@ def RemoveFromContainerFile(containerFile, arQualifiedPath):
     Examples:
         /AUTOSAR_Platform/ImplemmentationTypes/uint32_least
         ControllerEcuConfiguration:/AUTOSAR_Platform/ImplemmentationTypes/uint32_least
+    A warning is logged for the references to the element, if the reference
+    index exists, since they dangle in the exported container.
     """
     element = GetElementByPath(arQualifiedPath)
     if element:
         containerFile.Remove(element)
+        referenceIndex = GetReferenceIndex(create=False)
+        if referenceIndex != None:
+            for (referrer, propertyName, target) in referenceIndex.FindImpact(element):
+                DebugLog.Warning("%s.%s still refers to %s, which was removed from the container file.", \
+                    _ReadProperty(referrer, "ShortName"), propertyName, arQualifiedPath)
 
 
 def RunBswPlugin(bswModuleConfiguration, command, arg=None):
     """
     Invokes a BSW plugin command in batch mode for the given module configuration.
+    The plugin may change the whole ECU configuration, so the model caches are
+    discarded.
     """
     messages = None
     try:
-        oldBatchMode = SdApplication.BatchMode
-        SdApplication.BatchMode = True
-        if not arg:
-            messages = bswModuleConfiguration.RunBswPlugin(command)
-        else:
-            messages = bswModuleConfiguration.RunBswPluginWithArgs(command, arg)
-        SdApplication.BatchMode = oldBatchMode
+        with BatchSession():
+            if not arg:
+                messages = bswModuleConfiguration.RunBswPlugin(command)
+            else:
+                messages = bswModuleConfiguration.RunBswPluginWithArgs(command, arg)
     except:
-        SdApplication.BatchMode = False
         raise Exception("Command '%s' aborted with exception." % command)
+    finally:
+        InvalidateModelCaches()
     ThrowIfError(messages, command)
 
 
@@ -2697,33 +3099,26 @@ def SetQueuedReceiverComSpec(port, dataElement, queueLength=None):
     if queueLength != None:
         queuedReceiverComSpec.QueueLength = queueLength
 
+def SetSpecialData(elementsToValues, sdgGid="edve:taggedStringValue"):
+    """
+    Sets many special data items in one pass. elementsToValues is a sequence of
+    tuples (element, gid, value). Like SetSpecialDataString(), an existing item
+    with the given gid is updated and a missing one is created. The SDGs and SDs
+    of each element are looked up only once.
+    E.g. SetSpecialData([(runA, "NoRestartCode", "false"), (runB, "NoRestartCode", "true")])
+    """
+    specialDataAccessor = GetSpecialDataAccessor()
+    for (element, gid, value) in elementsToValues:
+        specialDataAccessor.SetValue(element, sdgGid, gid, value)
+
+
 def SetSpecialDataRunnableKind(runnable, runnableKind):
     """
     Creates a special data item for the RunnableKind. Valid values are
     {InitRunnable, "TerminateRunnable")
     E.g. SetSpecialDataRunnableKind(runFuelsysSensorsInit, "InitRunnable")
     """
-    # Get the AdminData element.
-    if runnable.AdminData == None:
-        adminData = runnable.SetNewAdminData()
-    else:
-        adminData = runnable.AdminData
-
-    # Get existing SDG or create a new  SDG.
-    sdg = None
-    sdgGid = "edve:RunnableKind"
-    for sdgItem in adminData.Sdgs.Elements:
-        if sdgItem.Gid == sdgGid:
-            sdg = sdgItem
-            break
-    if sdg == None:
-        sdg = adminData.Sdgs.AddNew()
-        sdg.Gid = sdgGid
-
-    # Set the new value.
-    sdgContents = sdg.SetNewSdgContents()
-    sd = sdgContents.Sd.AddNew()
-    sd.Value = runnableKind
+    GetSpecialDataAccessor().SetValue(runnable, "edve:RunnableKind", None, runnableKind)
 
     ##  <ADMIN-DATA>
     ##    <SDGS>
@@ -2739,39 +3134,7 @@ def SetSpecialDataFileUri(element, gid, value):
     custom file attribute with the given gid and sets it's value if it exists.
     Otherwise a new special data item with the given value is created.
     """
-    # Get the AdminData element.
-    if element.AdminData == None:
-        adminData = element.SetNewAdminData()
-    else:
-        adminData = element.AdminData
-
-    # Get existing SDG or create a new  SDG.
-    sdg = None
-    sdgGid = "edve:taggedFileUri"
-    for sdgItem in adminData.Sdgs.Elements:
-        if sdgItem.Gid == sdgGid:
-            sdg = sdgItem
-            break
-    if sdg == None:
-        sdg = adminData.Sdgs.AddNew()
-        sdg.Gid = sdgGid
-
-    # Get existing SD with given GID or create a new  SD.
-    sd = None
-    if sdg.SdgContents == None:
-        sdgContents = sdg.SetNewSdgContents()
-    else:
-        sdgContents = sdg.SdgContents
-    for sdItem in sdgContents.Sd.Elements:
-        if sdItem.Gid == gid:
-            sd = sdItem
-            break
-    if sd == None:
-        sd = sdgContents.Sd.AddNew()
-        sd.Gid = gid
-
-    # Set the new value.
-    sd.Value = value
+    GetSpecialDataAccessor().SetValue(element, "edve:taggedFileUri", gid, value)
 
     ##  <ADMIN-DATA>
     ##    <SDGS>
@@ -2788,39 +3151,7 @@ def SetSpecialDataString(element, gid, value):
     custom string attribute with the given gid and sets it's value if it exists.
     Otherwise a new special data item with the given value is created.
     """
-    # Get the AdminData element.
-    if element.AdminData == None:
-        adminData = element.SetNewAdminData()
-    else:
-        adminData = element.AdminData
-
-    # Get existing SDG or create a new  SDG.
-    sdg = None
-    sdgGid = "edve:taggedStringValue"
-    for sdgItem in adminData.Sdgs.Elements:
-        if sdgItem.Gid == sdgGid:
-            sdg = sdgItem
-            break
-    if sdg == None:
-        sdg = adminData.Sdgs.AddNew()
-        sdg.Gid = sdgGid
-
-    # Get existing SD with given GID or create a new  SD.
-    sd = None
-    if sdg.SdgContents == None:
-        sdgContents = sdg.SetNewSdgContents()
-    else:
-        sdgContents = sdg.SdgContents
-    for sdItem in sdgContents.Sd.Elements:
-        if sdItem.Gid == gid:
-            sd = sdItem
-            break
-    if sd == None:
-        sd = sdgContents.Sd.AddNew()
-        sd.Gid = gid
-
-    # Set the new value.
-    sd.Value = value
+    GetSpecialDataAccessor().SetValue(element, "edve:taggedStringValue", gid, value)
 
     ##  <ADMIN-DATA>
     ##    <SDGS>
@@ -2909,16 +3240,17 @@ def SetTextTableCompuMethod(compuMethod, textTable, defaultValue=None):
 def StartBswGeneration(ecuConfiguration, command):
     """
     Invokes a BSW generation command in batch mode for the given ECU configuration.
+    The generation may change the whole ECU configuration, so the model caches
+    are discarded.
     """
     messages = None
     #
     try:
-        oldBatchMode = SdApplication.BatchMode
-        SdApplication.BatchMode = True
-        messages = ecuConfiguration.StartBswGeneration(command)
-        SdApplication.BatchMode = oldBatchMode
+        with BatchSession():
+            messages = ecuConfiguration.StartBswGeneration(command)
     except Exception:
-        SdApplication.BatchMode = False
+        pass
+    InvalidateModelCaches()
     # Check for messages with severity 'error'.
     ThrowIfError(messages, command)
 
@@ -2932,10 +3264,8 @@ def TriggerOsTask(osTask, osTaskPeriod):
     osEnums = __import__(osConfiguration.PythonEnumerationFile)
 
     # Early return if the task is already triggered by an alarm.
-    for osAlarmItem in osConfiguration.OsAlarms.Elements:
-        if osAlarmItem.OsAlarmAction.ShortName == "OsAlarmActivateTask":
-            if osAlarmItem.OsAlarmAction.OsAlarmActivateTaskRef.ShortName == osTask.ShortName:
-                return
+    if GetRteOsIndex().FindOsAlarmForOsTask(osTask) != None:
+        return
 
     # Find a counter which is connected to a hardware timer
     systemTimer = None
@@ -2959,6 +3289,7 @@ def TriggerOsTask(osTask, osTaskPeriod):
     osAlarm.OsAlarmAutostart.OsAlarmCycleTime = osAlarmCycleTime
     osAlarmActivateTask = osAlarm.AddOsAlarmActionOsAlarmActivateTask()
     osAlarmActivateTask.OsAlarmActivateTaskRef = osTask
+    GetRteOsIndex().NoteOsAlarm(osTask, osAlarm)
 
 
 def UpdateBswEventToTaskMapping(rteConfiguration, osTask, \
@@ -2968,13 +3299,10 @@ def UpdateBswEventToTaskMapping(rteConfiguration, osTask, \
     """
     bswEvent = None
     osConfiguration = osTask.Parent
+    rteOsIndex = GetRteOsIndex()
 
     # Check if an old BswEventToTaskMapping exists.
-    bswEventToTaskMapping = None
-    for bswModuleInstance in rteConfiguration.RteBswModuleInstances.Elements:
-        bswEventToTaskMapping = bswModuleInstance.RteBswEventToTaskMappings.Item(bswEventName)
-        if bswEventToTaskMapping:
-            break
+    bswEventToTaskMapping = rteOsIndex.FindBswEventToTaskMapping(rteConfiguration, bswEventName)
     AssertIf(bswEventToTaskMapping == None, "No RteBswEventToTaskMapping found for " + bswEventName)
     bswEvent = bswEventToTaskMapping.RteBswEventRef
 
@@ -2983,14 +3311,13 @@ def UpdateBswEventToTaskMapping(rteConfiguration, osTask, \
         if bswEventToTaskMapping.RteBswMappedToTaskRef:
             osTaskOld = osConfiguration.OsTasks.Item(bswEventToTaskMapping.RteBswMappedToTaskRef.ShortName)
             if osTaskOld:
-                for osAlarm in osConfiguration.OsAlarms.Elements:
+                for osAlarm in rteOsIndex.FindOsAlarmsForOsTask(osTaskOld):
                     try:
-                        osAlarmActivateTask = osAlarm.OsAlarmAction
-                        if osAlarmActivateTask.OsAlarmActivateTaskRef.ShortName == osTaskOld.ShortName:
-                            osAlarm.Delete()
+                        _DeleteElement(osAlarm)
                     except Exception:
                         pass
-                osTaskOld.Delete()
+                rteOsIndex.NoteOsTaskDeleted(osTaskOld)
+                _DeleteElement(osTaskOld)
 
     # Determine the next free position in the new OsTask.
     if not positionInTask:
@@ -3000,6 +3327,8 @@ def UpdateBswEventToTaskMapping(rteConfiguration, osTask, \
     bswEventToTaskMapping.RteBswEventRef = bswEvent
     bswEventToTaskMapping.RteBswMappedToTaskRef = osTask
     bswEventToTaskMapping.RteBswPositionInTask = positionInTask
+    rteOsIndex.NotePositionInTask(rteConfiguration, bswEventToTaskMapping, \
+        osTask, positionInTask)
 
 
 def UpdateRteEventMapping(ecuConfiguration, osTask, componentName, rteEventName, \
@@ -3007,12 +3336,11 @@ def UpdateRteEventMapping(ecuConfiguration, osTask, componentName, rteEventName,
     """
     Updates a RunnableEntityMapping for the given RTE event to the RTE configuration.
     """
-    rteConfiguration = FindModuleConfiguration(ecuConfiguration, "Rte")
+    ecuConfigurationIndex = GetEcuConfigurationIndex(ecuConfiguration)
+    rteConfiguration = ecuConfigurationIndex.FindModuleConfiguration("Rte")
 
     # Get the component prototype and the RTE event.
-    ecuFlatView = ecuConfiguration.EcuExtractSystem.RootSwCompositionPrototype
-    rootSwComposition = ecuFlatView.SoftwareCompositionTref
-    component = rootSwComposition.Components.Item(componentName)
+    component = ecuConfigurationIndex.FindComponentPrototype(componentName)
     rteEvent = component.TypeTRef.InternalBehaviors.Elements[0].Events.Item(rteEventName)
 
     # Determine the next free PositionInTask.
@@ -3020,7 +3348,7 @@ def UpdateRteEventMapping(ecuConfiguration, osTask, componentName, rteEventName,
         positionInTask = FindNextPositionInTask(rteConfiguration, osTask)
 
     # Find the SwComponentInstance in the RTE configuration.
-    swcInstance = rteConfiguration.RteSwComponentInstances.Item(componentName)
+    swcInstance = ecuConfigurationIndex.FindRteSwComponentInstance(componentName)
 
     # Get the existing runnable entity mapping.
     runnableEntityMapping = swcInstance.RteEventToTaskMappings.Item(rteEventName)
@@ -3028,7 +3356,9 @@ def UpdateRteEventMapping(ecuConfiguration, osTask, componentName, rteEventName,
     # Remove old OsTask, if it exists.
     if removeOldTask:
         if runnableEntityMapping.RteMappedToTaskRef:
-            runnableEntityMapping.RteMappedToTaskRef.Delete()
+            osTaskOld = runnableEntityMapping.RteMappedToTaskRef
+            GetRteOsIndex().NoteOsTaskDeleted(osTaskOld)
+            _DeleteElement(osTaskOld)
 
     # Set the new properties.
     runnableEntityMapping.RteMappedToTaskRef = osTask
@@ -3038,143 +3368,1791 @@ def UpdateRteEventMapping(ecuConfiguration, osTask, componentName, rteEventName,
         runnableEntityMapping.RteUsedOsEventRef = osEvent
     if osAlarm:
         runnableEntityMapping.RteUsedOsAlarmRef = osAlarm
+    GetRteOsIndex().NotePositionInTask(rteConfiguration, runnableEntityMapping, \
+        osTask, positionInTask)
 
 
-#---------------------------------------------
-# Methods for handling components in diagrams.
-#---------------------------------------------
-
-def SetPosition(item, x, y):
+def UseOfflineBackend(projectName="OfflineProject"):
     """
-    Set the (x,y)-position of an item.
+    Replaces the SystemDesk application by an in-memory model, so the helpers
+    of this module run without SystemDesk. The model is written to an ARXML
+    file by OfflineModel.WriteArxml(), which can be imported into SystemDesk
+    by ImportAutosarFilesAtProject(). Returns the offline application.
     """
-    item.Position.SetCoordinates(x, y)
+    global SdApplication
+    global SdEnums
+    import OfflineModel
+    import SystemDeskEnums
+    InvalidateModelCaches()
+    SdApplication = OfflineModel.OfflineApplication(projectName)
+    SdEnums = SystemDeskEnums
+    return SdApplication
 
 
-def SetRelativeLeftSidePosition(item, x):
+#-----------------------------
+# Caches for model lookups.
+#-----------------------------
+
+def InvalidateModelCaches():
     """
-    Set the relative left side position of an assembly port within a component.
+    Discards all cached model lookups. Call this after the model was changed
+    without the helpers of this module, e.g. by a script which imports files or
+    deletes or renames elements directly. The import and generation helpers of
+    this module call it themselves.
     """
-    item.PushToLeftSide()
-    item.RelativePosition = x
+    global _PackageTrie, _RteOsIndex, _SpecialDataAccessor, _ReferenceIndex, _SignalPathIndex
+    InvalidateElementCache()
+    InvalidateAncestorCache()
+    _PackageTrie = None
+    _PackageNodes.clear()
+    _RteOsIndex = None
+    _EcuConfigurationIndexes.clear()
+    _SpecialDataAccessor = None
+    _ReferenceIndex = None
+    _SignalPathIndex = None
 
-def SetRelativeRightSidePosition(item, x):
+
+def GetEcuConfigurationIndex(ecuConfiguration):
     """
-    Set the relative right side position of an assembly port within a component.
+    Returns the EcuConfigurationIndex of the given EcuConfiguration. The index
+    is created on first use and discarded by InvalidateModelCaches().
     """
-    item.PushToRightSide()
-    item.RelativePosition = x
+    ecuConfigurationKey = _ElementKey(ecuConfiguration)
+    ecuConfigurationIndex = _EcuConfigurationIndexes.get(ecuConfigurationKey)
+    if ecuConfigurationIndex == None:
+        ecuConfigurationIndex = EcuConfigurationIndex(ecuConfiguration)
+        _EcuConfigurationIndexes[ecuConfigurationKey] = ecuConfigurationIndex
+    return ecuConfigurationIndex
 
 
-def SetSize(item, width, height):
+def GetSpecialDataAccessor():
     """
-    Set the width and height of an item.
+    Returns the SpecialDataAccessor of the active project. The accessor is
+    created on first use and discarded by InvalidateModelCaches().
     """
-    item.Size.Width = width
-    item.Size.Height = height
+    global _SpecialDataAccessor
+    if _SpecialDataAccessor == None:
+        _SpecialDataAccessor = SpecialDataAccessor()
+    return _SpecialDataAccessor
 
 
-def SetPositionAndSize(item, x, y, width, height):
+def GetReferenceIndex(create=True):
     """
-    Set the (x,y)-position and width/height of an item.
+    Returns the ReferenceIndex of the active project. The index is created on
+    first use and discarded by InvalidateModelCaches(). If create is False,
+    None is returned instead of creating the index.
     """
-    SetPosition(item, x, y)
-    SetSize(item, width, height)
+    global _ReferenceIndex
+    if _ReferenceIndex == None and create:
+        _ReferenceIndex = ReferenceIndex()
+    return _ReferenceIndex
 
 
-def SetFillColor(item, fillColor):
+def GetSignalPathIndex():
     """
-    Set the fill color (background color) of an item. Possible colors:
-        "orange"
-        "lightblue"
-        "darkblue"
+    Returns the SignalPathIndex of the active project. The index is created on
+    first use and discarded by InvalidateModelCaches().
     """
-    if fillColor.lower() == 'orange':
-        r = 255
-        g = 200
-        b = 145
-    elif fillColor.lower() == 'lightblue':
-        r = 220
-        g = 230
-        b = 250
-    elif fillColor.lower() == 'darkblue':
-        r = 0
-        g = 0
-        b = 255
-    elif fillColor.lower() == 'lightgreen':
-        r = 0
-        g = 250
-        b = 0
-    else:
-        assert 0, "Invalid color name '%s'"  % (fillColor)
-
-    item.FillColor.Set(r, g, b)
+    global _SignalPathIndex
+    if _SignalPathIndex == None:
+        _SignalPathIndex = SignalPathIndex()
+    return _SignalPathIndex
 
 
-def SetTextColor(item, textColor):
+def GetRteOsIndex():
     """
-    Set the text color of an item. Possible colors:
-        "orange"
-        "lightblue"
-        "darkblue"
+    Returns the RteOsIndex of the active project. The index is created on first
+    use and discarded by InvalidateModelCaches().
     """
-    if textColor.lower() == 'orange':
-        r = 255
-        g = 200
-        b = 145
-    elif textColor.lower() == 'lightblue':
-        r = 220
-        g = 230
-        b = 250
-    elif textColor.lower() == 'darkblue':
-        r = 0
-        g = 0
-        b = 255
-    elif textColor.lower() == 'lightgreen':
-        r = 0
-        g = 250
-        b = 0
-    else:
-        assert 0, "Invalid color name '%s'"  % (textColor)
+    global _RteOsIndex
+    if _RteOsIndex == None:
+        _RteOsIndex = RteOsIndex()
+    return _RteOsIndex
 
-    item.TextColor.Set(r, g, b)
 
+def InvalidateAncestorCache():
+    """
+    Discards the ancestors resolved by FindAncestor() and FindCommonPackage().
+    Call this after elements were moved to another parent.
+    """
+    _AncestorCache.clear()
 
-#----------------
-# Simple helpers.
-#----------------
 
-def Isa(obj, typeName):
+def GetAncestorCacheStatistics():
     """
-    Returns True if the 'obj' is of type 'typeName'.
+    Returns the counters of the ancestor cache as a dictionary:
+    Hits and Misses count the lookups whose element was and was not in the
+    cache, ParentHits counts the misses whose walk stopped at a cached parent,
+    ComCallsSaved counts the COM calls which were not needed due to the cache.
     """
-    if str(obj.__class__).__contains__("'" + typeName + "'"):
-        return True
-    else:
-        return False
+    return dict(_AncestorCacheStatistics)
 
 
-def IsBoolean(obj):
+def InvalidateElementCache(arQualifiedPath=None):
     """
-    Returns True if the 'obj' is of boolean type.
+    Discards the cached result of GetElementByPath() for the given path and all
+    paths below it. If no path is given, the whole cache is discarded.
     """
-    if str(obj.__class__).__contains__("'bool'"):
-        return True
-    elif str(obj.__class__).__contains__("'list'") and bool(obj):
-        return IsBoolean(obj[0])
-    elif str(obj.__class__).__contains__("'tuple'") and bool(obj):
-        return IsBoolean(obj[0])
-    else:
-        return False
+    if arQualifiedPath == None:
+        _ElementCache.clear()
+        _ElementMissCache.clear()
+        _ElementMissesByShortName.clear()
+        return
+    (scope, arPath) = _GetElementCacheKey(arQualifiedPath)
+    _RemoveCachedPaths(arPath)
 
 
-def IsNumerical(obj):
+class ReadOnlyPhase():
     """
-    Returns True if the 'obj' is of numerical type (i.e. 'float', 'int').
+    Context manager for a phase which mainly reads the model. Elements wrapped
+    by the phase cache the values of their properties and the results of lookup
+    methods like Item(), so repeated reads do not call SystemDesk again. Writes
+    and other methods are passed through and discard all cached values. After the
+    phase, the wrapped elements read directly from SystemDesk again.
+    Example:
+        with ReadOnlyPhase() as phase:
+            for osTask in phase.Wrap(osConfiguration).OsTasks.Elements:
+                print(FindNextPositionInTask(phase.Wrap(rteConfiguration), osTask))
     """
-    if str(obj.__class__).__contains__("'float'"):
-        return True
-    elif str(obj.__class__).__contains__("'int'"):
+    def __init__(self):
+        self.Active = False
+        # Counters of the cached reads.
+        self.Statistics = {"Hits": 0, "Misses": 0}
+        # ReadThroughProxies by the key of their element.
+        self._Proxies = {}
+
+    def __enter__(self):
+        self.Active = True
+        return self
+
+    def __exit__(self, excType, excValue, traceback):
+        self.Active = False
+        self._Proxies.clear()
+        return False
+
+    def Clear(self):
+        """
+        Discards the cached values of all wrapped elements.
+        """
+        for proxy in self._Proxies.values():
+            proxy._Fields.clear()
+
+    def Wrap(self, value):
+        """
+        Returns a ReadThroughProxy for a model element. Tuples and lists are
+        wrapped element by element, other values are returned unchanged.
+        """
+        if isinstance(value, ReadThroughProxy):
+            return value
+        if isinstance(value, (tuple, list)):
+            return type(value)(self.Wrap(item) for item in value)
+        if not _IsComObject(value):
+            return value
+        elementKey = _ElementKey(value)
+        proxy = self._Proxies.get(elementKey)
+        if proxy == None:
+            proxy = ReadThroughProxy(self, value)
+            self._Proxies[elementKey] = proxy
+        return proxy
+
+
+class ReadThroughProxy():
+    """
+    Wraps a model element for a ReadOnlyPhase. Behaves like the element and can
+    be passed to all helpers and to SystemDesk.
+    """
+    def __init__(self, phase, element):
+        object.__setattr__(self, "_Phase", phase)
+        object.__setattr__(self, "_Element", element)
+        # Cached property values and method results by name.
+        object.__setattr__(self, "_Fields", {})
+
+    @property
+    def _oleobj_(self):
+        return _ElementKey(self._Element)
+
+    def __getattr__(self, name):
+        if name.startswith("_"):
+            raise AttributeError(name)
+        phase = self._Phase
+        if not phase.Active:
+            return getattr(self._Element, name)
+        if name in self._Fields:
+            phase.Statistics["Hits"] += 1
+            return self._Fields[name]
+        phase.Statistics["Misses"] += 1
+        value = getattr(self._Element, name)
+        if _IsComObject(value) or not callable(value):
+            value = phase.Wrap(value)
+        else:
+            value = self._WrapMethod(name, value)
+        self._Fields[name] = value
+        return value
+
+    def __setattr__(self, name, value):
+        setattr(self._Element, name, _UnwrapProxy(value))
+        self._Phase.Clear()
+
+    def __eq__(self, other):
+        if other == None or not _IsComObject(other):
+            return False
+        return _ElementKey(self) == _ElementKey(other)
+
+    def __ne__(self, other):
+        return not self.__eq__(other)
+
+    def __hash__(self):
+        return hash(_ElementKey(self))
+
+    def __bool__(self):
+        return True
+
+    def __iter__(self):
+        for item in self._Element:
+            yield self._Phase.Wrap(item)
+
+    def __repr__(self):
+        return "<ReadThroughProxy of %r>" % (self._Element,)
+
+    def _WrapMethod(self, name, method):
+        """
+        Returns a function which calls the given method of the element. Results
+        of lookup methods are cached, other methods discard the cache.
+        """
+        phase = self._Phase
+        isLookup = name.startswith(_LookupMethodPrefixes) and not name.startswith("GetOrCreate")
+        results = {}
+        def CallMethod(*args):
+            args = tuple(_UnwrapProxy(arg) for arg in args)
+            if not phase.Active or not isLookup:
+                result = method(*args)
+                if phase.Active:
+                    phase.Clear()
+                return result
+            try:
+                cacheKey = tuple(_ElementKey(arg) for arg in args)
+                hash(cacheKey)
+            except TypeError:
+                return phase.Wrap(method(*args))
+            if cacheKey in results:
+                phase.Statistics["Hits"] += 1
+            else:
+                phase.Statistics["Misses"] += 1
+                results[cacheKey] = phase.Wrap(method(*args))
+            return results[cacheKey]
+        return CallMethod
+
+
+class SpecialDataAccessor():
+    """
+    Reads and writes the special data (SDG/SD) in the AdminData of model elements.
+    The SDGs of an element and the SDs of an SDG are collected on first access
+    and then looked up by their GID, so tagging many elements does not scan the
+    collections again for each value. Only the last maxElements elements are
+    kept. The accessor is discarded by InvalidateModelCaches(), e.g. after an
+    import.
+    """
+    def __init__(self, maxElements=1000):
+        self.MaxElements = maxElements
+        # The list [adminData, {sdgGid: sdg}, {sdgGid: (sdgContents, {sdGid: sd})}]
+        # by the key of the element, least recently used first.
+        self._Elements = collections.OrderedDict()
+
+    def Clear(self):
+        """
+        Discards all collected SDGs and SDs.
+        """
+        self._Elements.clear()
+
+    def GetValues(self, element, sdgGid):
+        """
+        Returns the values of the SDs in the SDG with the given GID as a
+        dictionary by the GID of the SD. SDs without GID have the key None.
+        """
+        sds = self._GetSds(element, sdgGid, False)
+        if sds == None:
+            return {}
+        return dict((gid, sd.Value) for (gid, sd) in sds[1].items())
+
+    def SetValue(self, element, sdgGid, gid, value):
+        """
+        Sets the value of the SD with the given GID in the SDG with the given
+        sdgGid. Missing AdminData, SDGs and SDs are created. If gid is None,
+        the contents of the SDG are replaced by a single SD without GID.
+        """
+        if gid == None:
+            sdg = self._GetSdg(element, sdgGid, True)
+            sdgContents = sdg.SetNewSdgContents()
+            sd = sdgContents.Sd.AddNew()
+            sd.Value = value
+            self._GetElementData(element)[2][sdgGid] = (sdgContents, {None: sd})
+            return
+        (sdgContents, sds) = self._GetSds(element, sdgGid, True)
+        sd = sds.get(gid)
+        if sd == None:
+            sd = sdgContents.Sd.AddNew()
+            sd.Gid = gid
+            sds[gid] = sd
+        sd.Value = value
+
+    def _GetElementData(self, element):
+        """
+        Returns the collected special data of an element, see _Elements. The
+        SDGs are collected on first access.
+        """
+        elementKey = _ElementKey(element)
+        elementData = self._Elements.get(elementKey)
+        if elementData != None:
+            self._Elements.move_to_end(elementKey)
+            return elementData
+        adminData = element.AdminData
+        elementData = [adminData, {}, {}]
+        if adminData != None:
+            for sdgItem in IterateCollection(adminData.Sdgs):
+                elementData[1].setdefault(sdgItem.Gid, sdgItem)
+        self._Elements[elementKey] = elementData
+        while len(self._Elements) > self.MaxElements:
+            self._Elements.popitem(last=False)
+        return elementData
+
+    def _GetSdg(self, element, sdgGid, create):
+        """
+        Returns the SDG with the given GID of an element. Creates the SDG if it
+        does not exist and create is True, otherwise returns None.
+        """
+        elementData = self._GetElementData(element)
+        sdg = elementData[1].get(sdgGid)
+        if sdg == None and create:
+            if elementData[0] == None:
+                elementData[0] = element.SetNewAdminData()
+            sdg = elementData[0].Sdgs.AddNew()
+            sdg.Gid = sdgGid
+            elementData[1][sdgGid] = sdg
+        return sdg
+
+    def _GetSds(self, element, sdgGid, create):
+        """
+        Returns the tuple (sdgContents, {sdGid: sd}) for the SDG with the given
+        GID of an element. Creates the SDG and its contents if they do not exist
+        and create is True, otherwise returns None.
+        """
+        elementSds = self._GetElementData(element)[2]
+        sds = elementSds.get(sdgGid)
+        if sds == None:
+            sdg = self._GetSdg(element, sdgGid, create)
+            if sdg == None:
+                return None
+            sdgContents = sdg.SdgContents
+            sds = (sdgContents, {})
+            if sdgContents == None:
+                if not create:
+                    return None
+                sds = (sdg.SetNewSdgContents(), {})
+            else:
+                for sdItem in IterateCollection(sdgContents.Sd):
+                    sds[1].setdefault(sdItem.Gid, sdItem)
+            elementSds[sdgGid] = sds
+        return sds
+
+
+class EcuConfigurationIndex():
+    """
+    Index of the module configurations and component prototypes of one
+    EcuConfiguration. Each part is scanned on first use and then kept up to date
+    by the helpers of this module. The indexes are discarded by the import and
+    BSW plugin helpers, which call InvalidateModelCaches(). Call it after adding
+    component prototypes to the ECU flat view without these helpers.
+    """
+    def __init__(self, ecuConfiguration):
+        self.EcuConfiguration = ecuConfiguration
+        # Module configurations by their name.
+        self._ModuleConfigurations = None
+        # Component prototypes of the ECU flat view by their name.
+        self._ComponentPrototypes = None
+        # Lists of component prototypes by the key of their SWC type.
+        self._SwcPrototypes = None
+        # RteSwComponentInstances by their name.
+        self._RteSwComponentInstances = None
+
+    def FindComponentPrototype(self, componentName):
+        """
+        Returns the component prototype with the given name or None.
+        """
+        self._ScanComponentPrototypes()
+        return self._ComponentPrototypes.get(componentName)
+
+    def FindModuleConfiguration(self, moduleName):
+        """
+        Returns the module configuration with the given name or None.
+        """
+        if self._ModuleConfigurations == None:
+            self._ModuleConfigurations = {}
+            ecucValues = self.EcuConfiguration.EcucValueCollection.EcucValues
+            for moduleConfigurationRefConditional in IterateCollection(ecucValues):
+                moduleConfiguration = moduleConfigurationRefConditional.EcucModuleConfigurationValuesRef
+                self._ModuleConfigurations.setdefault(moduleConfiguration.ShortName, moduleConfiguration)
+        return self._ModuleConfigurations.get(moduleName)
+
+    def FindRteSwComponentInstance(self, componentName):
+        """
+        Returns the RteSwComponentInstance of the given component or None.
+        The instances are scanned again if the component is not found, since
+        the RTE plugin creates them.
+        """
+        if self._RteSwComponentInstances != None:
+            swcInstance = self._RteSwComponentInstances.get(componentName)
+            if swcInstance != None:
+                return swcInstance
+        self._RteSwComponentInstances = {}
+        rteConfiguration = self.FindModuleConfiguration("Rte")
+        if rteConfiguration != None:
+            for swcInstance in IterateCollection(rteConfiguration.RteSwComponentInstances):
+                self._RteSwComponentInstances.setdefault(swcInstance.ShortName, swcInstance)
+        return self._RteSwComponentInstances.get(componentName)
+
+    def FindSwcPrototypes(self, swcType):
+        """
+        Returns a list of the component prototypes which reference the given
+        software component type.
+        """
+        self._ScanComponentPrototypes()
+        return list(self._SwcPrototypes.get(_ElementKey(swcType), ()))
+
+    def NoteModuleConfigurationAdded(self, moduleConfiguration, moduleName):
+        """
+        Adds a new module configuration to the index.
+        """
+        if self._ModuleConfigurations != None:
+            self._ModuleConfigurations.setdefault(moduleName, moduleConfiguration)
+        if moduleName == "Rte":
+            self._RteSwComponentInstances = None
+
+    def _AddComponentPrototype(self, swcPrototype):
+        """
+        Adds a component prototype to the maps by name and by type.
+        """
+        self._ComponentPrototypes.setdefault(swcPrototype.ShortName, swcPrototype)
+        swcPrototypes = self._SwcPrototypes.setdefault(_ElementKey(swcPrototype.TypeTref), [])
+        swcPrototypes.append(swcPrototype)
+
+    def _ScanComponentPrototypes(self):
+        """
+        Scans the component prototypes of the ECU flat view on first use.
+        """
+        if self._ComponentPrototypes != None:
+            return
+        self._ComponentPrototypes = {}
+        self._SwcPrototypes = {}
+        ecuFlatView = self.EcuConfiguration.EcuExtractSystem.RootSwCompositionPrototype
+        swComposition = ecuFlatView.SoftwareCompositionTref
+        for swcPrototype in IterateCollection(swComposition.Components):
+            self._AddComponentPrototype(swcPrototype)
+
+
+class RteOsIndex():
+    """
+    Index of the task mappings of the RTE configurations and of the alarms of the
+    OS configurations. Each configuration is scanned once on first use, then the
+    index is updated by the mapping helpers of this module. This keeps the cost
+    of mapping a runnable independent of the number of existing mappings.
+    The index is discarded by RunBswPlugin() and StartBswGeneration(), since the
+    BSW plugins create mappings and alarms. Call InvalidateModelCaches() after
+    changing mappings or alarms without the helpers of this module.
+    """
+    def __init__(self):
+        # Task mappings by the key of their RTE configuration.
+        self._RteMappings = {}
+        # OsAlarms by the key of their OS configuration and by the name of the
+        # OsTask which they activate.
+        self._OsAlarms = {}
+
+    def FindBswEventToTaskMapping(self, rteConfiguration, bswEventName):
+        """
+        Returns the RteBswEventToTaskMapping with the given name or None.
+        """
+        return self._GetRteMappings(rteConfiguration).BswEventToTaskMappings.get(bswEventName)
+
+    def FindNextPositionInTask(self, rteConfiguration, osTask):
+        """
+        Returns the next free position in the given OsTask.
+        """
+        maxPositions = self._GetRteMappings(rteConfiguration).MaxPositions
+        maxPosition = maxPositions.get(osTask.ShortName)
+        if maxPosition == None:
+            return 0
+        return maxPosition + 1
+
+    def FindOsAlarmForOsTask(self, osTask):
+        """
+        Returns the (first) OsAlarm which activates the given OsTask or None.
+        """
+        osAlarms = self.FindOsAlarmsForOsTask(osTask)
+        if osAlarms:
+            return osAlarms[0]
+        return None
+
+    def FindOsAlarmsForOsTask(self, osTask):
+        """
+        Returns a list of all OsAlarms which activate the given OsTask.
+        """
+        return list(self._GetOsAlarms(osTask.Parent).get(osTask.ShortName, ()))
+
+    def FindOsTaskForBswMainFunction(self, rteConfiguration, bswModuleName, bswMainFunctionName):
+        """
+        Returns the OsTask which contains the given BSW main function.
+        """
+        rteMappings = self._GetRteMappings(rteConfiguration)
+        bswEventToTaskMapping = rteMappings.BswMainFunctions.get((bswModuleName, bswMainFunctionName))
+        if bswEventToTaskMapping == None:
+            if bswMainFunctionName.startswith(bswModuleName + "_"):
+                ## HACK: Remove this.
+                bswMainFunctionNameWithoutPrefix = bswMainFunctionName[len(bswModuleName)+1:]
+                bswEventToTaskMapping = rteMappings.BswMainFunctions.get((bswModuleName, bswMainFunctionNameWithoutPrefix))
+            else:
+                ## HACK: Remove this.
+                bswEventToTaskMapping = rteMappings.PrefixedBswMainFunctions.get((bswModuleName, bswMainFunctionName))
+        if bswEventToTaskMapping == None:
+            # BSW main function is not mapped to an OsTask.
+            return None
+        return bswEventToTaskMapping.RteBswMappedToTaskRef
+
+    def NoteOsAlarm(self, osTask, osAlarm):
+        """
+        Adds a new OsAlarm which activates the given OsTask to the index.
+        """
+        osAlarms = self._GetOsAlarms(osTask.Parent)
+        osAlarms.setdefault(osTask.ShortName, []).append(osAlarm)
+
+    def NoteOsTaskDeleted(self, osTask):
+        """
+        Removes an OsTask from the index. Call this before the task is deleted.
+        The alarms of the task are removed as well.
+        """
+        osTaskName = osTask.ShortName
+        for rteMappings in self._RteMappings.values():
+            rteMappings.RemoveTask(osTaskName)
+        osAlarms = self._OsAlarms.get(_ElementKey(osTask.Parent))
+        if osAlarms != None:
+            osAlarms.pop(osTaskName, None)
+
+    def NotePositionInTask(self, rteConfiguration, eventToTaskMapping, osTask, positionInTask):
+        """
+        Updates the index after an RTE or BSW event was mapped to the given
+        position of an OsTask.
+        """
+        rteMappings = self._GetRteMappings(rteConfiguration)
+        rteMappings.SetPosition(_ElementKey(eventToTaskMapping), osTask.ShortName, positionInTask)
+
+    def _GetOsAlarms(self, osConfiguration):
+        """
+        Returns the OsAlarms of an OS configuration by the name of their OsTask.
+        """
+        osConfigurationKey = _ElementKey(osConfiguration)
+        osAlarms = self._OsAlarms.get(osConfigurationKey)
+        if osAlarms == None:
+            osAlarms = {}
+            for osAlarm in IterateCollection(osConfiguration.OsAlarms):
+                try:
+                    osTask = osAlarm.OsAlarmAction.OsAlarmActivateTaskRef
+                except Exception:
+                    # The alarm does not activate a task.
+                    continue
+                if osTask:
+                    osAlarms.setdefault(osTask.ShortName, []).append(osAlarm)
+            self._OsAlarms[osConfigurationKey] = osAlarms
+        return osAlarms
+
+    def _GetRteMappings(self, rteConfiguration):
+        """
+        Returns the _RteMappings of an RTE configuration.
+        """
+        rteConfigurationKey = _ElementKey(rteConfiguration)
+        rteMappings = self._RteMappings.get(rteConfigurationKey)
+        if rteMappings == None:
+            rteMappings = _RteMappings(rteConfiguration)
+            self._RteMappings[rteConfigurationKey] = rteMappings
+        return rteMappings
+
+
+class ReferenceIndex():
+    """
+    Index of the references between the elements of the active project, by
+    the referring and by the referred element. The model is walked once on
+    creation, see ReferenceProperties and ChildCollections, then the index is
+    updated by the helpers of this module which set references or delete
+    elements. Call InvalidateModelCaches() after changing references without
+    the helpers of this module.
+    """
+    def __init__(self, root=None):
+        if root == None:
+            root = SdApplication.ActiveProject.RootAutosar
+        # Indexed elements by their key.
+        self._Elements = {}
+        # AUTOSAR paths by the key of the element. Elements without ShortName
+        # have the path of their parent.
+        self._ArPaths = {}
+        # Keys of the elements with ShortName by their AUTOSAR path.
+        self._Keys = {}
+        # Key of the parent by the key of the element.
+        self._Parents = {}
+        # Keys of the children by the key of the element.
+        self._Children = {}
+        # Target keys by the key of the referring element and the property name.
+        self._References = {}
+        # Referrers by the key of the target. The referrers are the keys of dict
+        # {(sourceKey, propertyName): None}, which keeps their order.
+        self._Referrers = {}
+        # ElementTypes by the key of the element.
+        self._ElementTypes = {}
+        # Keys of the elements whose references changed, in order of the change.
+        self._ChangeLog = []
+
+        rootKey = _ElementKey(root)
+        # Tuples (elementKey, arPath) of the ancestors by their depth.
+        ancestors = [(rootKey, "")]
+        for walkItem in WalkModel(root, childCollections=ChildCollections):
+            del ancestors[walkItem.Depth:]
+            (parentKey, parentArPath) = ancestors[-1]
+            elementKey = self._AddElement(walkItem.Element, parentKey, walkItem.ArPath, \
+                walkItem.ArPath != parentArPath)
+            ancestors.append((elementKey, walkItem.ArPath))
+            self._ElementTypes[elementKey] = walkItem.ElementType
+            for (propertyName, target) in GetReferences(walkItem.Element, walkItem.ElementType):
+                self.NoteReference(walkItem.Element, propertyName, target)
+        del self._ChangeLog[:]
+
+    def FindElementsByType(self, elementType, arPath=""):
+        """
+        Returns a list of tuples (element, arPath) for the indexed elements with
+        ShortName of the given ElementType below the given AUTOSAR path.
+        """
+        arPathPrefix = arPath + "/"
+        elements = []
+        for (elementArPath, elementKey) in list(self._Keys.items()):
+            if elementArPath.startswith(arPathPrefix):
+                element = self._Elements[elementKey]
+                if self.GetElementType(element) == elementType:
+                    elements.append((element, elementArPath))
+        return elements
+
+    def FindImpact(self, elements):
+        """
+        Returns what breaks if the given elements are deleted: a list of tuples
+        (referrer, propertyName, target) for the references from other elements
+        to the elements or to elements below them.
+        """
+        if not Isa(elements, "list") and not Isa(elements, "tuple"):
+            elements = [elements]
+        deletedKeys = set()
+        for element in elements:
+            deletedKeys.update(self._GetSubtreeKeys(_ElementKey(element)))
+        impact = []
+        for targetKey in deletedKeys:
+            for (sourceKey, propertyName) in self._Referrers.get(targetKey, {}):
+                if sourceKey not in deletedKeys:
+                    impact.append((self._Elements[sourceKey], propertyName, self._Elements[targetKey]))
+        return impact
+
+    def FindParent(self, element):
+        """
+        Returns the parent of an indexed element or None.
+        """
+        return self._Elements.get(self._Parents.get(_ElementKey(element)))
+
+    def FindReferences(self, element):
+        """
+        Returns a list of tuples (propertyName, target) for the references of
+        an element.
+        """
+        references = self._References.get(_ElementKey(element), {})
+        return [(propertyName, self._Elements[targetKey]) for (propertyName, targetKey) in references.items()]
+
+    def FindReferrers(self, element):
+        """
+        Returns a list of tuples (referrer, propertyName) for the references to
+        an element.
+        """
+        referrers = self._Referrers.get(_ElementKey(element), {})
+        return [(self._Elements[sourceKey], propertyName) for (sourceKey, propertyName) in referrers]
+
+    def IterateReferences(self):
+        """
+        Yields the tuple (source, propertyName, target) for each reference.
+        """
+        for (sourceKey, references) in list(self._References.items()):
+            for (propertyName, targetKey) in list(references.items()):
+                yield (self._Elements[sourceKey], propertyName, self._Elements[targetKey])
+
+    def GetArPath(self, element):
+        """
+        Returns the AUTOSAR path of an indexed element or None.
+        """
+        return self._ArPaths.get(_ElementKey(element))
+
+    def GetChangeCount(self):
+        """
+        Returns the number of reference changes noted since the index was built.
+        """
+        return len(self._ChangeLog)
+
+    def GetChangedElements(self, changeCount):
+        """
+        Returns a list of tuples (elementKey, element) for the elements whose
+        references changed after the given GetChangeCount(). element is None for
+        deleted elements. See _ElementKey().
+        """
+        changedKeys = collections.OrderedDict((elementKey, None) for elementKey in self._ChangeLog[changeCount:])
+        return [(elementKey, self._Elements.get(elementKey)) for elementKey in changedKeys]
+
+    def GetElementType(self, element):
+        """
+        Returns the ElementType of an element.
+        """
+        elementKey = _ElementKey(element)
+        elementType = self._ElementTypes.get(elementKey)
+        if elementType == None:
+            elementType = _ReadProperty(element, "ElementType")
+            if elementKey in self._Elements:
+                self._ElementTypes[elementKey] = elementType
+        return elementType
+
+    def GetDeletionOrder(self, elements):
+        """
+        Returns the given elements in the order in which they can be deleted:
+        elements which refer to other elements of the list, or whose children
+        do, come before them. Elements below other elements of the list are
+        dropped, because they are deleted with their ancestor.
+        """
+        elementKeys = []
+        for element in elements:
+            elementKey = _ElementKey(element)
+            self._Elements.setdefault(elementKey, element)
+            if elementKey not in elementKeys:
+                elementKeys.append(elementKey)
+        # Drop the elements below other elements of the list.
+        keySet = set(elementKeys)
+        rootKeys = []
+        for elementKey in elementKeys:
+            parentKey = self._Parents.get(elementKey)
+            while parentKey != None and parentKey not in keySet:
+                parentKey = self._Parents.get(parentKey)
+            if parentKey == None:
+                rootKeys.append(elementKey)
+        # Map each deleted element to the element of the list it is deleted with.
+        owners = {}
+        for rootKey in rootKeys:
+            for subtreeKey in self._GetSubtreeKeys(rootKey):
+                owners[subtreeKey] = rootKey
+        # Count the references between the elements of the list.
+        successors = dict((rootKey, set()) for rootKey in rootKeys)
+        predecessorCounts = dict((rootKey, 0) for rootKey in rootKeys)
+        for (subtreeKey, rootKey) in owners.items():
+            for targetKey in self._References.get(subtreeKey, {}).values():
+                targetRootKey = owners.get(targetKey)
+                if targetRootKey != None and targetRootKey != rootKey and targetRootKey not in successors[rootKey]:
+                    successors[rootKey].add(targetRootKey)
+                    predecessorCounts[targetRootKey] += 1
+        # Sort topologically, keeping the given order where possible.
+        order = []
+        ready = collections.deque(rootKey for rootKey in rootKeys if predecessorCounts[rootKey] == 0)
+        while ready:
+            rootKey = ready.popleft()
+            order.append(rootKey)
+            for successorKey in successors[rootKey]:
+                predecessorCounts[successorKey] -= 1
+                if predecessorCounts[successorKey] == 0:
+                    ready.append(successorKey)
+        # Elements with circular references are deleted in the given order.
+        order.extend(rootKey for rootKey in rootKeys if rootKey not in order)
+        return [self._Elements[rootKey] for rootKey in order]
+
+    def NoteElementDeleted(self, element):
+        """
+        Removes an element and the elements below it from the index.
+        """
+        self._RemoveSubtree(_ElementKey(element))
+
+    def NotePathDeleted(self, arPath):
+        """
+        Removes the element at the given AUTOSAR path and the elements below it
+        from the index.
+        """
+        elementKey = self._Keys.get(arPath)
+        if elementKey != None:
+            self._RemoveSubtree(elementKey)
+
+    def NoteReference(self, source, propertyName, target):
+        """
+        Sets the target of a reference of an element, or removes the reference
+        if the target is None.
+        """
+        sourceKey = _ElementKey(source)
+        self._ChangeLog.append(sourceKey)
+        if sourceKey not in self._Elements:
+            parent = _ReadProperty(source, "Parent")
+            parentKey = None
+            if parent != None:
+                parentKey = _ElementKey(parent)
+                # Keep parents which are not indexed yet for FindParent().
+                self._Elements.setdefault(parentKey, parent)
+            shortName = _ReadProperty(source, "ShortName")
+            parentArPath = self._ArPaths.get(parentKey)
+            arPath = None
+            if parentArPath != None:
+                arPath = parentArPath + "/" + shortName if shortName else parentArPath
+            self._AddElement(source, parentKey, arPath, bool(shortName))
+        references = self._References.setdefault(sourceKey, {})
+        oldTargetKey = references.pop(propertyName, None)
+        if oldTargetKey != None:
+            self._Referrers[oldTargetKey].pop((sourceKey, propertyName), None)
+        if target == None:
+            return
+        targetKey = _ElementKey(target)
+        self._Elements.setdefault(targetKey, target)
+        references[propertyName] = targetKey
+        self._Referrers.setdefault(targetKey, {})[(sourceKey, propertyName)] = None
+
+    def _AddElement(self, element, parentKey, arPath, hasShortName):
+        """
+        Adds an element to the containment maps and returns its key.
+        """
+        elementKey = _ElementKey(element)
+        self._Elements[elementKey] = element
+        if arPath != None:
+            self._ArPaths[elementKey] = arPath
+            if hasShortName:
+                self._Keys[arPath] = elementKey
+        if parentKey != None:
+            self._Parents[elementKey] = parentKey
+            self._Children.setdefault(parentKey, []).append(elementKey)
+        return elementKey
+
+    def _GetSubtreeKeys(self, elementKey):
+        """
+        Returns the keys of an element and of all elements below it.
+        """
+        subtreeKeys = [elementKey]
+        index = 0
+        while index < len(subtreeKeys):
+            subtreeKeys.extend(self._Children.get(subtreeKeys[index], ()))
+            index += 1
+        return subtreeKeys
+
+    def _RemoveSubtree(self, elementKey):
+        """
+        Removes an element and the elements below it with their references.
+        """
+        parentKey = self._Parents.get(elementKey)
+        if parentKey != None and elementKey in self._Children.get(parentKey, ()):
+            self._Children[parentKey].remove(elementKey)
+        for subtreeKey in self._GetSubtreeKeys(elementKey):
+            if subtreeKey in self._References:
+                self._ChangeLog.append(subtreeKey)
+            for (propertyName, targetKey) in self._References.pop(subtreeKey, {}).items():
+                self._Referrers[targetKey].pop((subtreeKey, propertyName), None)
+            # References to deleted elements are dangling now.
+            for (sourceKey, propertyName) in self._Referrers.pop(subtreeKey, {}):
+                self._References.get(sourceKey, {}).pop(propertyName, None)
+                self._ChangeLog.append(sourceKey)
+            arPath = self._ArPaths.pop(subtreeKey, None)
+            if arPath != None and self._Keys.get(arPath) == subtreeKey:
+                del self._Keys[arPath]
+            self._Parents.pop(subtreeKey, None)
+            self._Children.pop(subtreeKey, None)
+            self._Elements.pop(subtreeKey, None)
+            self._ElementTypes.pop(subtreeKey, None)
+
+
+class SignalPathIndex():
+    """
+    Index of the communication paths from the data elements of the software
+    components to the physical channels, see SignalPathKinds:
+        data element -> SystemSignal -> ISignal -> IPdu -> Frame
+            -> FrameTriggering -> PhysicalChannel
+    Each hop is indexed in both directions. Data elements are identified by the
+    tuple (componentName, portName, dataElementName) of their sender-receiver
+    to signal mapping. Signal groups are indexed like signals.
+    The index is derived from the ReferenceIndex and follows its changes on
+    each lookup, so only the elements changed since the last lookup are read
+    again.
+    Example:
+        frames = GetSignalPathIndex().FindDownstream(("Swc", "PortX", "Speed"), "Frame")
+    """
+    def __init__(self):
+        self._ReferenceIndex = None
+        self._Clear()
+
+    def FindDownstream(self, element, kind=None):
+        """
+        Returns the elements on the paths from an element towards the bus, only
+        those of the given kind if a kind is given.
+        """
+        return self._Find(element, kind, True)
+
+    def FindFrames(self, componentName, portName, dataElementName):
+        """
+        Returns the Frames which carry the data element of a port of a
+        component.
+        """
+        return self.FindDownstream((componentName, portName, dataElementName), "Frame")
+
+    def FindUpstream(self, element, kind=None):
+        """
+        Returns the elements on the paths from an element towards the software
+        components, only those of the given kind if a kind is given.
+        """
+        return self._Find(element, kind, False)
+
+    def GetKind(self, element):
+        """
+        Returns the kind of an element on a communication path or None.
+        """
+        self.Refresh()
+        return self._Kinds.get(_SignalPathKey(element))
+
+    def Refresh(self):
+        """
+        Reads the elements whose references changed since the last refresh.
+        The whole index is rebuilt if the ReferenceIndex was discarded.
+        """
+        referenceIndex = GetReferenceIndex()
+        if referenceIndex is not self._ReferenceIndex:
+            self._Clear()
+            self._ReferenceIndex = referenceIndex
+            for (source, propertyName, target) in referenceIndex.IterateReferences():
+                sourceKey = _ElementKey(source)
+                if sourceKey not in self._Hops:
+                    self._UpdateHops(sourceKey, source)
+        else:
+            for (sourceKey, source) in referenceIndex.GetChangedElements(self._ChangeCount):
+                self._UpdateHops(sourceKey, source)
+        self._ChangeCount = referenceIndex.GetChangeCount()
+
+    def _AddHop(self, sourceKey, fromKind, fromElement, toKind, toElement):
+        """
+        Adds a hop which was read from the element with the given key.
+        """
+        if fromElement == None or toElement == None:
+            return
+        fromKey = _SignalPathKey(fromElement)
+        toKey = _SignalPathKey(toElement)
+        self._Elements[fromKey] = fromElement
+        self._Kinds[fromKey] = fromKind
+        self._Elements[toKey] = toElement
+        self._Kinds[toKey] = toKind
+        downstream = self._Downstream.setdefault(fromKey, {})
+        downstream[toKey] = downstream.get(toKey, 0) + 1
+        upstream = self._Upstream.setdefault(toKey, {})
+        upstream[fromKey] = upstream.get(fromKey, 0) + 1
+        self._Hops.setdefault(sourceKey, []).append((fromKey, toKey))
+
+    def _Clear(self):
+        """
+        Removes all paths from the index.
+        """
+        self._ChangeCount = 0
+        # Elements and their kind by the key of the element.
+        self._Elements = {}
+        self._Kinds = {}
+        # Number of hops towards the bus and towards the component by the keys
+        # of both elements, {fromKey: {toKey: count}}.
+        self._Downstream = {}
+        self._Upstream = {}
+        # The hops (fromKey, toKey) by the key of the element they are read from.
+        self._Hops = {}
+
+    def _Find(self, element, kind, downstream):
+        """
+        Returns the elements reachable from an element towards the bus or
+        towards the software components.
+        """
+        self.Refresh()
+        hops = self._Downstream if downstream else self._Upstream
+        startKey = _SignalPathKey(element)
+        foundKeys = [startKey]
+        visitedKeys = set(foundKeys)
+        index = 0
+        while index < len(foundKeys):
+            for nextKey in hops.get(foundKeys[index], ()):
+                if nextKey not in visitedKeys:
+                    visitedKeys.add(nextKey)
+                    foundKeys.append(nextKey)
+            index += 1
+        return [self._Elements[foundKey] for foundKey in foundKeys[1:] \
+            if kind == None or self._Kinds[foundKey] == kind]
+
+    def _RemoveHops(self, sourceKey):
+        """
+        Removes the hops which were read from the element with the given key.
+        """
+        for (fromKey, toKey) in self._Hops.pop(sourceKey, ()):
+            for (hops, firstKey, secondKey) in ((self._Downstream, fromKey, toKey), (self._Upstream, toKey, fromKey)):
+                counts = hops[firstKey]
+                counts[secondKey] -= 1
+                if counts[secondKey] == 0:
+                    del counts[secondKey]
+                if not counts:
+                    del hops[firstKey]
+
+    def _UpdateHops(self, sourceKey, source):
+        """
+        Reads the hops of an element again. source is None for deleted elements.
+        """
+        self._RemoveHops(sourceKey)
+        if source == None:
+            return
+        referenceIndex = self._ReferenceIndex
+        elementType = referenceIndex.GetElementType(source)
+        references = dict(referenceIndex.FindReferences(source))
+        if elementType in ("IISignal", "IISignalGroup"):
+            systemSignal = references.get("SystemSignalRef", references.get("SystemSignalGroupRef"))
+            self._AddHop(sourceKey, "SystemSignal", systemSignal, "ISignal", source)
+        elif elementType == "IISignalToIPduMapping":
+            iSignal = references.get("ISignalRef", references.get("ISignalGroupRef"))
+            self._AddHop(sourceKey, "ISignal", iSignal, "IPdu", referenceIndex.FindParent(source))
+        elif elementType == "IPduToFrameMapping":
+            self._AddHop(sourceKey, "IPdu", references.get("PduRef"), "Frame", referenceIndex.FindParent(source))
+        elif elementType in ("ICanFrameTriggering", "IFlexrayFrameTriggering", "ILinFrameTriggering"):
+            self._AddHop(sourceKey, "Frame", references.get("FrameRef"), "FrameTriggering", source)
+            self._AddHop(sourceKey, "FrameTriggering", source, "PhysicalChannel", referenceIndex.FindParent(source))
+        elif elementType in ("ISenderReceiverToSignalMapping", "ISenderReceiverToSignalGroupMapping"):
+            systemSignal = references.get("SystemSignalRef", references.get("SignalGroupRef"))
+            self._AddHop(sourceKey, "DataElement", _ReadDataElementNames(source), "SystemSignal", systemSignal)
+
+
+class _RteMappings():
+    """
+    Task mappings of one RTE configuration, used by the RteOsIndex.
+    """
+    def __init__(self, rteConfiguration):
+        # Number of mappings at each position by the name of the OsTask.
+        self.Positions = {}
+        # Highest used position by the name of the OsTask.
+        self.MaxPositions = {}
+        # The tuple (osTaskName, position) by the key of the event mapping.
+        self.MappedPositions = {}
+        # RteBswEventToTaskMappings by their name.
+        self.BswEventToTaskMappings = {}
+        # RteBswEventToTaskMappings by the tuple (bswModuleName, mainFunctionName).
+        self.BswMainFunctions = {}
+        # Same as BswMainFunctions, but for main functions with the module name
+        # as prefix, which is removed from the key.
+        self.PrefixedBswMainFunctions = {}
+
+        # Scan all RTE event mappings.
+        for swcInstance in IterateCollection(rteConfiguration.RteSwComponentInstances):
+            for rteEventToTaskMapping in IterateCollection(swcInstance.RteEventToTaskMappings):
+                osTask = rteEventToTaskMapping.RteMappedToTaskRef
+                if osTask:
+                    self.SetPosition(_ElementKey(rteEventToTaskMapping), \
+                        osTask.ShortName, rteEventToTaskMapping.RtePositionInTask)
+        # Scan all BSW event mappings.
+        for bswModuleInstance in IterateCollection(rteConfiguration.RteBswModuleInstances):
+            for bswEventToTaskMapping in IterateCollection(bswModuleInstance.RteBswEventToTaskMappings):
+                self.BswEventToTaskMappings.setdefault(bswEventToTaskMapping.ShortName, bswEventToTaskMapping)
+                osTask = bswEventToTaskMapping.RteBswMappedToTaskRef
+                if osTask:
+                    self.SetPosition(_ElementKey(bswEventToTaskMapping), \
+                        osTask.ShortName, bswEventToTaskMapping.RteBswPositionInTask)
+                bswEvent = bswEventToTaskMapping.RteBswEventRef
+                if bswEvent == None:
+                    continue
+                bswModuleName = bswEvent.Parent.Parent.ShortName
+                mainFunctionName = bswEvent.StartsOnEventRef.ShortName
+                self.BswMainFunctions.setdefault((bswModuleName, mainFunctionName), bswEventToTaskMapping)
+                if mainFunctionName.startswith(bswModuleName + "_"):
+                    mainFunctionName = mainFunctionName[len(bswModuleName)+1:]
+                    self.PrefixedBswMainFunctions.setdefault((bswModuleName, mainFunctionName), bswEventToTaskMapping)
+
+    def RemoveTask(self, osTaskName):
+        """
+        Removes all positions of an OsTask.
+        """
+        self.Positions.pop(osTaskName, None)
+        self.MaxPositions.pop(osTaskName, None)
+        for mappingKey, mappedPosition in list(self.MappedPositions.items()):
+            if mappedPosition[0] == osTaskName:
+                del self.MappedPositions[mappingKey]
+
+    def SetPosition(self, mappingKey, osTaskName, position):
+        """
+        Moves an event mapping to the given position of an OsTask.
+        """
+        oldPosition = self.MappedPositions.pop(mappingKey, None)
+        if oldPosition != None:
+            self._RemovePosition(*oldPosition)
+        self.MappedPositions[mappingKey] = (osTaskName, position)
+        positions = self.Positions.setdefault(osTaskName, {})
+        positions[position] = positions.get(position, 0) + 1
+        if position > self.MaxPositions.get(osTaskName, -1):
+            self.MaxPositions[osTaskName] = position
+
+    def _RemovePosition(self, osTaskName, position):
+        """
+        Removes one mapping from the given position of an OsTask.
+        """
+        positions = self.Positions.get(osTaskName)
+        if positions == None or position not in positions:
+            return
+        positions[position] -= 1
+        if positions[position] > 0:
+            return
+        del positions[position]
+        if position == self.MaxPositions.get(osTaskName):
+            if positions:
+                self.MaxPositions[osTaskName] = max(positions)
+            else:
+                del self.MaxPositions[osTaskName]
+
+
+class _PackageTrieNode():
+    """
+    Node of the package trie. Holds the COM object of an ArPackage, its
+    AUTOSAR path and the nodes of the subpackages resolved so far.
+    """
+    def __init__(self, package, arPath, isNew=False):
+        self.Package = package
+        # AUTOSAR path of the package, "" for the root.
+        self.ArPath = arPath
+        self.Children = {}
+        # True if the package was created in this session. A new package has
+        # no subpackages, which saves the lookup before creating one. The
+        # nodes are dropped by InvalidateModelCaches(), e.g. after an import.
+        self.IsNew = isNew
+
+
+def _CacheElement(cacheKey, element):
+    """
+    Stores the result of a path lookup in the element cache.
+    """
+    if element == None:
+        _ElementMissCache.add(cacheKey)
+        for shortName in cacheKey[1].split("/"):
+            _ElementMissesByShortName.setdefault(shortName, set()).add(cacheKey)
+    else:
+        _ElementCache[cacheKey] = element
+
+
+def _Dispatch(progId):
+    """
+    Creates a COM object for late-bound calls. The names of its properties and
+    methods are resolved once per interface if Options.CacheDispatchIds is set.
+    The calls are recorded or replayed if Options.RecordComTrace or
+    Options.ReplayComTrace is set and profiled if Options.ProfileComCalls is set.
+    """
+    if Options.ReplayComTrace:
+        application = ComTrace.GetReplaySession(Options.ReplayComTrace, Options.ReplayTimeScale).Dispatch(progId)
+    else:
+        if Options.CacheDispatchIds:
+            createObject = DispatchCache.Dispatch
+        else:
+            createObject = win32com.client.Dispatch
+        if Options.RecordComTrace:
+            application = ComTrace.GetRecorder(Options.RecordComTrace).Dispatch(progId, createObject)
+        else:
+            application = createObject(progId)
+    if Options.ProfileComCalls:
+        profiler = Profiling.GetProfiler(Options.ProfileComCalls)
+        profiler.InstrumentModule(sys.modules[__name__])
+        application = profiler.Wrap(application)
+    return application
+
+
+def _DeleteElement(element):
+    """
+    Deletes an element and updates the caches.
+    """
+    arPath = _GetArPath(element)
+    element.Delete()
+    _NoteElementDeleted(arPath)
+
+
+def _ElementKey(element):
+    """
+    Returns a hashable key which identifies a model element. The Python wrappers
+    of COM objects differ for each access to the same element, so the key is the
+    underlying COM object.
+    """
+    return getattr(element, "_oleobj_", element)
+
+
+def _FindElementByArPath(arRoot, arPath):
+    """
+    Returns the element at the given AUTOSAR path using the path search of
+    SystemDesk. Returns None if the path cannot be resolved.
+    """
+    if arRoot.ArPackages.Count == 0:
+        return None
+    firstPackage = arRoot.ArPackages.Elements[0]
+    elements = firstPackage.GetElementsByARPath(arPath)
+    if bool(elements):
+        return elements[0]
+    else:
+        return None
+
+
+def _FindScopeRoot(scope):
+    """
+    Returns the RootAutosar of the project or ECU configuration with the given
+    name, or None if no such scope exists.
+    """
+    if scope == SdApplication.ActiveProject.Name:
+        return SdApplication.ActiveProject.RootAutosar
+    for ecuConfiguration in SdApplication.ActiveProject.EcuConfigurations.Elements:
+        if ecuConfiguration.Name == scope:
+            return ecuConfiguration.RootAutosar
+    return None
+
+
+def _GetArPath(element):
+    """
+    Returns the AUTOSAR path of an element by walking its parents.
+    """
+    arPathItems = []
+    while element != None:
+        shortName = _ReadProperty(element, "ShortName")
+        if shortName:
+            arPathItems.append(shortName)
+        element = _ReadProperty(element, "Parent")
+    return "/" + "/".join(reversed(arPathItems))
+
+
+def _GetOrCreatePackageNode(packageNode, shortName):
+    """
+    Returns the trie node of the subpackage with the given name. Creates the
+    subpackage if it does not exist.
+    """
+    childNode = packageNode.Children.get(shortName)
+    if childNode != None:
+        return childNode
+    subpackage = None
+    if not packageNode.IsNew:
+        subpackage = packageNode.Package.ArPackages.Item(shortName)
+    if subpackage == None:
+        subpackage = packageNode.Package.ArPackages.AddNew(shortName)
+        _NoteElementsAdded(shortName)
+        childNode = _PackageTrieNode(subpackage, packageNode.ArPath + "/" + shortName, True)
+    else:
+        childNode = _PackageTrieNode(subpackage, packageNode.ArPath + "/" + shortName)
+    packageNode.Children[shortName] = childNode
+    _PackageNodes[_ElementKey(subpackage)] = childNode
+    return childNode
+
+
+def _GetPackageTrie():
+    """
+    Returns the root node of the package trie for the active project.
+    """
+    global _PackageTrie
+    if _PackageTrie == None:
+        arRoot = SdApplication.ActiveProject.RootAutosar
+        _PackageTrie = _PackageTrieNode(arRoot, "")
+        _PackageNodes[_ElementKey(arRoot)] = _PackageTrie
+    return _PackageTrie
+
+
+def _GetElementCacheKey(arQualifiedPath):
+    """
+    Splits a path into the tuple (scope, arPath) used as key of the element cache.
+    The scope is None for paths without a scope.
+    """
+    arQualifiedPathItems = arQualifiedPath.split(':')
+    if len(arQualifiedPathItems) <= 1:
+        return (None, arQualifiedPath)
+    return (arQualifiedPathItems[0], arQualifiedPathItems[1])
+
+
+def _NoteElementDeleted(arQualifiedPath):
+    """
+    Updates the caches after the element at the given path was deleted.
+    """
+    InvalidateElementCache(arQualifiedPath)
+    _RemovePackageNodes(_GetElementCacheKey(arQualifiedPath)[1])
+    # The keys of deleted elements may be reused for new elements.
+    InvalidateAncestorCache()
+    _EcuConfigurationIndexes.clear()
+    if _SpecialDataAccessor != None:
+        _SpecialDataAccessor.Clear()
+    if _ReferenceIndex != None:
+        _ReferenceIndex.NotePathDeleted(_GetElementCacheKey(arQualifiedPath)[1])
+
+
+def _NoteElementsAdded(shortName=None):
+    """
+    Updates the caches after new elements were added to the model. Only the
+    missed paths which contain the ShortName of the new element are looked up
+    again. Without ShortName, e.g. after an import, all of them are.
+    """
+    if shortName == None:
+        _ElementMissCache.clear()
+        _ElementMissesByShortName.clear()
+        return
+    for cacheKey in _ElementMissesByShortName.pop(shortName, ()):
+        _ElementMissCache.discard(cacheKey)
+
+
+def _NoteReference(source, propertyName, target):
+    """
+    Updates the reference index after a reference of an element was set.
+    """
+    if _ReferenceIndex != None:
+        _ReferenceIndex.NoteReference(source, propertyName, target)
+
+
+def _ReadDataElementNames(senderReceiverMapping):
+    """
+    Returns the tuple (componentName, portName, dataElementName) of the data
+    element of a sender-receiver to signal mapping, or None.
+    """
+    dataElementIref = _ReadProperty(senderReceiverMapping, "DataElementIref")
+    if dataElementIref == None:
+        return None
+    contextComponents = _ReadProperty(dataElementIref, "ContextComponentRefs")
+    port = _ReadProperty(dataElementIref, "ContextPortRef")
+    dataElement = _ReadProperty(dataElementIref, "TargetDataPrototypeRef")
+    if contextComponents == None or port == None or dataElement == None:
+        return None
+    contextComponents = contextComponents.Elements
+    if not contextComponents:
+        return None
+    return (contextComponents[-1].ShortName, port.ShortName, dataElement.ShortName)
+
+
+def _RemoveCachedPaths(arPath):
+    """
+    Removes the given AUTOSAR path and all paths below it from the element cache.
+    The path is removed for all scopes, because the scopes may share elements.
+    """
+    arPathPrefix = arPath.rstrip('/') + '/'
+    for cacheKey in list(_ElementCache.keys()):
+        if cacheKey[1] == arPath or cacheKey[1].startswith(arPathPrefix):
+            del _ElementCache[cacheKey]
+    for cacheKey in list(_ElementMissCache):
+        if cacheKey[1] == arPath or cacheKey[1].startswith(arPathPrefix):
+            _ElementMissCache.discard(cacheKey)
+
+
+def _IsComObject(value):
+    """
+    Returns True if the value is a COM object, e.g. a model element.
+    """
+    return hasattr(value, "_oleobj_")
+
+
+def _IsSameElement(element, otherElement):
+    """
+    Returns True if both arguments refer to the same model element.
+    """
+    if element == None or otherElement == None:
+        return element == None and otherElement == None
+    return _ElementKey(element) == _ElementKey(otherElement)
+
+
+def _RemovePackageNodes(arPath):
+    """
+    Removes the package at the given AUTOSAR path and its subpackages from the
+    package nodes, including the nodes of GetOrCreateSubPackage() which are
+    not linked into the package trie.
+    """
+    arPath = arPath.rstrip('/')
+    if arPath == "":
+        return
+    arPathPrefix = arPath + '/'
+    (parentPath, shortName) = arPath.rsplit('/', 1)
+    for (packageKey, packageNode) in list(_PackageNodes.items()):
+        if packageNode.ArPath == arPath or packageNode.ArPath.startswith(arPathPrefix):
+            del _PackageNodes[packageKey]
+        elif packageNode.ArPath == parentPath:
+            packageNode.Children.pop(shortName, None)
+
+
+def _SignalPathKey(element):
+    """
+    Returns the key of an element in the SignalPathIndex. Data elements are
+    identified by their tuple of names.
+    """
+    if Isa(element, "tuple"):
+        return element
+    return _ElementKey(element)
+
+
+def _UnwrapProxy(value):
+    """
+    Returns the element of a ReadThroughProxy, other values unchanged.
+    """
+    if isinstance(value, ReadThroughProxy):
+        return value._Element
+    return value
+
+
+def _ResolveAncestor(arElement, ancestorKind, isAncestor):
+    """
+    Returns the first parent of the arElement for which isAncestor returns True.
+    isAncestor returns the tuple (isAncestor, comCalls). The result is cached for
+    the element and for all parents on the way, so siblings and elements in the
+    same package stop the walk at the first known parent.
+    The cache key of the element itself refers to its parents only, the keys of
+    the parents include the parent itself.
+    """
+    cacheKey = (_ElementKey(arElement), ancestorKind, False)
+    cachedAncestor = _AncestorCache.get(cacheKey)
+    if cachedAncestor != None:
+        _AncestorCache.move_to_end(cacheKey)
+        _AncestorCacheStatistics["Hits"] += 1
+        _AncestorCacheStatistics["ComCallsSaved"] += cachedAncestor[1]
+        return cachedAncestor[0]
+    _AncestorCacheStatistics["Misses"] += 1
+    visitedKeys = [(cacheKey, 0)]
+    parent = arElement.Parent
+    comCalls = 1
+    while(True):
+        if parent == None:
+            ancestor = None
+            break
+        cacheKey = (_ElementKey(parent), ancestorKind, True)
+        cachedAncestor = _AncestorCache.get(cacheKey)
+        if cachedAncestor != None:
+            _AncestorCache.move_to_end(cacheKey)
+            (ancestor, cachedComCalls) = cachedAncestor
+            _AncestorCacheStatistics["ParentHits"] += 1
+            _AncestorCacheStatistics["ComCallsSaved"] += cachedComCalls
+            comCalls += cachedComCalls
+            break
+        visitedKeys.append((cacheKey, comCalls))
+        (found, matchComCalls) = isAncestor(parent)
+        comCalls += matchComCalls
+        if found:
+            ancestor = parent
+            break
+        parent = parent.Parent
+        comCalls += 1
+    for (cacheKey, previousComCalls) in visitedKeys:
+        _AncestorCache[cacheKey] = (ancestor, comCalls - previousComCalls)
+    while len(_AncestorCache) > _AncestorCacheSize:
+        _AncestorCache.popitem(last=False)
+    return ancestor
+
+
+def _WalkArPath(arRoot, arPath, packages):
+    """
+    Resolves an AUTOSAR path below arRoot package by package. The dictionary
+    packages maps the package paths already walked to the found subpackage (or
+    None), so that paths with a common prefix are walked only once.
+    Like GetElementByPath(), the walk stops at the first path item which is not
+    a package and returns the element with this name.
+    Returns the tuple (element, remainingItems), where remainingItems is the
+    number of path items behind the returned element.
+    """
+    arPathItems = arPath.split('/')
+    element = None
+    packagePath = ""
+    for index, arPathItem in enumerate(arPathItems):
+        if arPathItem == "":
+            # Iteration starts with root.
+            element = arRoot
+            packagePath = ""
+            continue
+        # Try to find a subpackage with the given name.
+        packagePath = packagePath + "/" + arPathItem
+        if packagePath in packages:
+            subpackage = packages[packagePath]
+        else:
+            subpackage = element.ArPackages.Item(arPathItem)
+            packages[packagePath] = subpackage
+        if subpackage == None:
+            if packagePath.count('/') == 1:
+                # Element is root package. Path below root could not be resolved.
+                return (None, 0)
+            # Element is a package. Return element in package.
+            return (element.Elements.Item(arPathItem), len(arPathItems) - index - 1)
+        # Continue with subpackage.
+        element = subpackage
+    return (element, 0)
+
+
+#-----------------------------
+# Traversal of the model.
+#-----------------------------
+
+class WalkItem():
+    """
+    Element visited by WalkModel(). Properties contains the values of the
+    properties which were requested from WalkModel() by their name.
+    """
+    def __init__(self, element, arPath, elementType, properties, depth):
+        self.Element = element
+        self.ArPath = arPath
+        self.ElementType = elementType
+        self.Properties = properties
+        self.Depth = depth
+
+    def __repr__(self):
+        return "<WalkItem %s %s>" % (self.ElementType, self.ArPath)
+
+
+def GetReferences(element, elementType=None):
+    """
+    Returns a list of tuples (propertyName, target) for the elements referred
+    to by an element, see ReferenceProperties. Empty references are skipped.
+    """
+    if elementType == None:
+        elementType = element.ElementType
+    references = []
+    for propertyName in ReferenceProperties.get(elementType, ()):
+        target = element
+        for name in propertyName.split('.'):
+            target = _ReadProperty(target, name)
+            if target == None:
+                break
+        if target != None:
+            references.append((propertyName, target))
+    return references
+
+
+def IterateCollection(collection, chunkSize=100):
+    """
+    Yields the items of a COM collection. The items are fetched in chunks from
+    the enumerator of the collection, so only one chunk is held in memory.
+    Collections without enumerator are read at once by their Elements property.
+    """
+    for chunk in _IterateChunks(collection, chunkSize):
+        while chunk:
+            yield chunk.popleft()
+
+
+def WalkModel(root, elementTypes=None, prune=None, properties=(), \
+    collectionNames=("ArPackages", "Elements"), chunkSize=100, rootArPath="", \
+    childCollections=None):
+    """
+    Yields a WalkItem for each element below the root, depth-first. Only the
+    elements in the collections with the given collectionNames are visited,
+    by default the packages and their elements.
+    elementTypes:   Yield only elements of these ElementTypes. All elements are
+                    visited anyway.
+    prune:          Function which gets a WalkItem and returns True if the
+                    elements below it shall be skipped.
+    properties:     Names of further properties which are read for each element
+                    and returned in WalkItem.Properties.
+    chunkSize:      Number of elements which are fetched from a collection at
+                    once. Their properties are read before the first of them is
+                    yielded. Elements are released as soon as they are visited.
+    rootArPath:     AUTOSAR path of the root, used as prefix of WalkItem.ArPath.
+    childCollections: Further collections to visit by the ElementType of their
+                    parent, e.g. ChildCollections. Children without ShortName
+                    get the ArPath of their parent.
+    Example:
+        for walkItem in WalkModel(GetElementByPath("/Comm"), ["IISignal"], properties=["Length"]):
+            print(walkItem.ArPath, walkItem.Properties["Length"])
+    """
+    if Isa(elementTypes, "str"):
+        elementTypes = (elementTypes,)
+    if elementTypes != None:
+        elementTypes = frozenset(elementTypes)
+    stack = [_WalkChildren(root, rootArPath, 1, properties, collectionNames, chunkSize)]
+    while stack:
+        walkItem = next(stack[-1], None)
+        if walkItem == None:
+            stack.pop()
+            continue
+        if elementTypes == None or walkItem.ElementType in elementTypes:
+            yield walkItem
+        if prune != None and prune(walkItem):
+            continue
+        childCollectionNames = collectionNames
+        if childCollections != None and walkItem.ElementType in childCollections:
+            childCollectionNames = tuple(collectionNames) + tuple(childCollections[walkItem.ElementType])
+        stack.append(_WalkChildren(walkItem.Element, walkItem.ArPath, walkItem.Depth + 1, \
+            properties, childCollectionNames, chunkSize))
+
+
+def _IterateChunks(collection, chunkSize):
+    """
+    Yields the items of a COM collection as deques of at most chunkSize items.
+    """
+    enumerator = None
+    try:
+        enumerator = collection._NewEnum()
+    except Exception:
+        # No enumerator available, e.g. for wrapped elements.
+        pass
+    if enumerator == None or not hasattr(enumerator, "Next"):
+        elements = collection.Elements
+        for start in range(0, len(elements), chunkSize):
+            yield collections.deque(elements[start:start + chunkSize])
+        return
+    while True:
+        chunk = enumerator.Next(chunkSize)
+        if not chunk:
+            return
+        yield collections.deque(chunk)
+
+
+def _ReadProperty(element, propertyName):
+    """
+    Returns the value of a property or None if the element does not have it.
+    """
+    try:
+        return getattr(element, propertyName)
+    except Exception:
+        return None
+
+
+def _WalkChildren(element, arPath, depth, properties, collectionNames, chunkSize):
+    """
+    Yields the WalkItems for the children of an element in the given
+    collections. The properties of each chunk of children are read at once.
+    """
+    for collectionName in collectionNames:
+        collection = _ReadProperty(element, collectionName)
+        if collection == None:
+            continue
+        for chunk in _IterateChunks(collection, chunkSize):
+            walkItems = collections.deque()
+            while chunk:
+                child = chunk.popleft()
+                shortName = _ReadProperty(child, "ShortName")
+                childArPath = arPath + "/" + shortName if shortName else arPath
+                walkItems.append(WalkItem(child, childArPath, _ReadProperty(child, "ElementType"), \
+                    dict((name, _ReadProperty(child, name)) for name in properties), depth))
+            while walkItems:
+                yield walkItems.popleft()
+
+
+#---------------------------------------------
+# Methods for handling components in diagrams.
+#---------------------------------------------
+
+def SetPosition(item, x, y):
+    """
+    Set the (x,y)-position of an item.
+    """
+    item.Position.SetCoordinates(x, y)
+
+
+def SetRelativeLeftSidePosition(item, x):
+    """
+    Set the relative left side position of an assembly port within a component.
+    """
+    item.PushToLeftSide()
+    item.RelativePosition = x
+
+def SetRelativeRightSidePosition(item, x):
+    """
+    Set the relative right side position of an assembly port within a component.
+    """
+    item.PushToRightSide()
+    item.RelativePosition = x
+
+
+def SetSize(item, width, height):
+    """
+    Set the width and height of an item.
+    """
+    item.Size.Width = width
+    item.Size.Height = height
+
+
+def SetPositionAndSize(item, x, y, width, height):
+    """
+    Set the (x,y)-position and width/height of an item.
+    """
+    SetPosition(item, x, y)
+    SetSize(item, width, height)
+
+
+def SetFillColor(item, fillColor):
+    """
+    Set the fill color (background color) of an item. Possible colors:
+        "orange"
+        "lightblue"
+        "darkblue"
+    """
+    if fillColor.lower() == 'orange':
+        r = 255
+        g = 200
+        b = 145
+    elif fillColor.lower() == 'lightblue':
+        r = 220
+        g = 230
+        b = 250
+    elif fillColor.lower() == 'darkblue':
+        r = 0
+        g = 0
+        b = 255
+    elif fillColor.lower() == 'lightgreen':
+        r = 0
+        g = 250
+        b = 0
+    else:
+        assert 0, "Invalid color name '%s'"  % (fillColor)
+
+    item.FillColor.Set(r, g, b)
+
+
+def SetTextColor(item, textColor):
+    """
+    Set the text color of an item. Possible colors:
+        "orange"
+        "lightblue"
+        "darkblue"
+    """
+    if textColor.lower() == 'orange':
+        r = 255
+        g = 200
+        b = 145
+    elif textColor.lower() == 'lightblue':
+        r = 220
+        g = 230
+        b = 250
+    elif textColor.lower() == 'darkblue':
+        r = 0
+        g = 0
+        b = 255
+    elif textColor.lower() == 'lightgreen':
+        r = 0
+        g = 250
+        b = 0
+    else:
+        assert 0, "Invalid color name '%s'"  % (textColor)
+
+    item.TextColor.Set(r, g, b)
+
+
+#----------------
+# Simple helpers.
+#----------------
+
+def Isa(obj, typeName):
+    """
+    Returns True if the 'obj' is of type 'typeName'.
+    """
+    if str(obj.__class__).__contains__("'" + typeName + "'"):
+        return True
+    else:
+        return False
+
+
+def IsBoolean(obj):
+    """
+    Returns True if the 'obj' is of boolean type.
+    """
+    if str(obj.__class__).__contains__("'bool'"):
+        return True
+    elif str(obj.__class__).__contains__("'list'") and bool(obj):
+        return IsBoolean(obj[0])
+    elif str(obj.__class__).__contains__("'tuple'") and bool(obj):
+        return IsBoolean(obj[0])
+    else:
+        return False
+
+
+def IsNumerical(obj):
+    """
+    Returns True if the 'obj' is of numerical type (i.e. 'float', 'int').
+    """
+    if str(obj.__class__).__contains__("'float'"):
+        return True
+    elif str(obj.__class__).__contains__("'int'"):
         return True
     elif str(obj.__class__).__contains__("'list'") and bool(obj):
         return IsNumerical(obj[0])
@@ -3229,7 +5207,7 @@ def ThrowIfError(messages, command="Command"):
     """
     if not messages:
         msg = "*** UNEXPECTED RESULT: Command '%s' does not return a message object." % command
-        if os.path.exists("__ENABLE_DEBUG__"):
+        if DebugLog.DebugEnabled:
             raise Exception(msg)
         else:
             print(msg)
@@ -3291,53 +5269,15 @@ def AssertZeroOrOneElement(collection, collectionName):
 # Debugging and profiling.
 #-------------------------
 
-def PrintD(message):
-    """
-    Prints a message if debugging is enabled.
+def PrintD(message, *args):
     """
-    if os.path.exists("__ENABLE_DEBUG__"):
-        print("*** DEBUG: %s" % message)
-
-
-class _MiniProfiler():
+    Prints a message if debugging is enabled, see DebugLog. The message is
+    formatted with the arguments by the % operator only if it is printed.
     """
-    This class defines some options which can be used to configure the
-    structure of a project.
-    """
-    def __init__(self):
-        self._StartTime = 0.0
-        self._LastTime = 0.0
-        self._CurrentTime = 0.0
-        self.Start()
-
-    def Start(self):
-        """
-        Starts the time measurement.
-        """
-        self._StartTime = time.process_time()
-        self._LastTime = self._StartTime
-        self._CurrentTime = self._StartTime
+    DebugLog.Debug(message, *args)
 
-    def DeltaTime(self, display=True):
-        """
-        Returns the time since the last call of DeltaTime() or __init__().
-        """
-        self._CurrentTime = time.process_time()
-        deltaTime = self._CurrentTime - self._LastTime
-        self._LastTime = self._CurrentTime
-        if display:
-            PrintD("DeltaTime =%6.3f sec" % deltaTime)
-        return deltaTime
-
-    def TotalTime(self, display=True):
-        """
-        Returns the time since the last call of Start() or __init__().
-        """
-        self._CurrentTime = time.process_time()
-        totalTime = self._CurrentTime - self._StartTime
-        if display:
-            PrintD("TotalTime =%6.3f sec" % totalTime)
-        return totalTime
 
-# Create a global instance of the MiniProfiler.
-MiniProfiler = _MiniProfiler()
+# Global span profiler, see Profiling.SpanProfiler. DeltaTime() and TotalTime()
+# print their times if debugging is enabled.
+MiniProfiler = Profiling.Spans
+MiniProfiler.PrintFunction = PrintD
@@ -0,0 +1,260 @@
+"""
+--------------------------------------------------------------------------------
+File:        UtilitiesBenchmark.py
+
+Description: Benchmark of the heavy helpers of Utilities against the fake COM
+             server of FakeSystemDesk.py. Each scenario prepares a model with
+             the given number of elements, then measures the COM calls and the
+             wall time of the helpers:
+                 RteEventMappings    ApplyRteEventMappings() for one mapping
+                                     per RTE event
+                 CommMatrix          CreateISignal(), AddISignalToPduMapping(),
+                                     CreateFrame() and the triggerings for one
+                                     ISignal per SystemSignal
+                 ValueSpecifications SetInitValue() with an application value
+                                     specification for each data element
+
+Tip/Remarks: Run "python UtilitiesBenchmark.py" in the Scripts directory. The
+             results are compared with the baseline in UtilitiesBenchmark.json
+             and the script exits with 1 if a helper needs more COM calls than
+             the baseline allows. Options:
+                 --sizes 1000 10000  Numbers of elements, default 1k, 10k, 100k
+                 --latency 0.0001    Latency of each COM call in seconds
+                 --update-baseline   Writes the results as new baseline
+                 --check-times       Fails on more wall time than the baseline
+                                     allows, too. With --update-baseline, the
+                                     wall times are written to the baseline
+
+Limitations: The wall times depend on the machine, so the committed baseline
+             only holds COM calls. For --check-times, the baseline has to be
+             updated with --check-times on the machine which runs the
+             benchmark.
+--------------------------------------------------------------------------------
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+
+import FakeSystemDesk
+import Utilities
+
+# Numbers of elements of the scenarios.
+DefaultSizes = (1000, 10000, 100000)
+
+# Baseline of the COM calls and wall times by scenario name and size.
+BaselineFile = os.path.join(os.path.dirname(os.path.abspath(__file__)), "UtilitiesBenchmark.json")
+
+# Allowed increase of the COM calls and of the wall time over the baseline.
+CallTolerance = 0.02
+TimeTolerance = 0.5
+
+# Increases of the wall time below this number of seconds are no regression.
+MinTimeIncrease = 0.05
+
+# Number of OsTasks, RTE events per component and ISignals per IPdu.
+_TaskCount = 8
+_EventsPerComponent = 10
+_SignalsPerPdu = 8
+
+
+class BenchmarkResult():
+    """
+    Result of one scenario for one size.
+    """
+    def __init__(self, scenarioName, size, comCalls, seconds, topCalls):
+        self.ScenarioName = scenarioName
+        self.Size = size
+        self.ComCalls = comCalls
+        self.Seconds = seconds
+        # List of the most frequent calls as tuple ((interfaceName, memberName), count).
+        self.TopCalls = topCalls
+
+
+def CompareWithBaseline(results, baseline, callTolerance=CallTolerance, timeTolerance=TimeTolerance, \
+    checkTimes=False):
+    """
+    Returns a list with a message for each result which needs more COM calls
+    than its baseline allows, with checkTimes also for more time.
+    """
+    regressions = []
+    for result in results:
+        baselineResult = baseline.get(result.ScenarioName, {}).get(str(result.Size))
+        if baselineResult == None:
+            continue
+        baselineCalls = baselineResult.get("ComCalls")
+        if baselineCalls != None and result.ComCalls > baselineCalls * (1.0 + callTolerance):
+            regressions.append("%s(%d): %d COM calls, baseline %d" % \
+                (result.ScenarioName, result.Size, result.ComCalls, baselineCalls))
+        baselineSeconds = baselineResult.get("Seconds")
+        if checkTimes and baselineSeconds != None and result.Seconds > baselineSeconds * (1.0 + timeTolerance) \
+            and result.Seconds - baselineSeconds > MinTimeIncrease:
+            regressions.append("%s(%d): %.3f s, baseline %.3f s" % \
+                (result.ScenarioName, result.Size, result.Seconds, baselineSeconds))
+    return regressions
+
+
+def LoadBaseline(fileName=BaselineFile):
+    """
+    Returns the baseline from a JSON file or an empty baseline.
+    """
+    if not os.path.exists(fileName):
+        return {}
+    with open(fileName, "r") as baselineFile:
+        return json.load(baselineFile)
+
+
+def RunBenchmark(sizes=DefaultSizes, latency=0.0, scenarioNames=None):
+    """
+    Runs the scenarios for each size. Returns a list of BenchmarkResults.
+    """
+    results = []
+    for (scenarioName, scenario) in _Scenarios:
+        if scenarioNames and scenarioName not in scenarioNames:
+            continue
+        for size in sizes:
+            fakeServer = FakeSystemDesk.ConnectFakeSystemDesk()
+            run = scenario(fakeServer, size)
+            # The helpers start without cached elements.
+            Utilities.InvalidateModelCaches()
+            fakeServer.Latency = latency
+            fakeServer.Reset()
+            startTime = time.perf_counter()
+            run()
+            seconds = time.perf_counter() - startTime
+            results.append(BenchmarkResult(scenarioName, size, fakeServer.CallCount, seconds, \
+                fakeServer.Calls.most_common(3)))
+    Utilities.SdApplication = None
+    Utilities.InvalidateModelCaches()
+    return results
+
+
+def SaveBaseline(results, fileName=BaselineFile, withTimes=False):
+    """
+    Writes the results as baseline to a JSON file, with withTimes including
+    the wall times.
+    """
+    baseline = LoadBaseline(fileName)
+    for result in results:
+        baselineResult = {"ComCalls": result.ComCalls}
+        if withTimes:
+            baselineResult["Seconds"] = round(result.Seconds, 3)
+        baseline.setdefault(result.ScenarioName, {})[str(result.Size)] = baselineResult
+    with open(fileName, "w") as baselineFile:
+        json.dump(baseline, baselineFile, indent=4, sort_keys=True)
+
+
+def _CommMatrixScenario(fakeServer, size):
+    rootAutosar = fakeServer.Model.ActiveProject.RootAutosar
+    commPackage = rootAutosar.ArPackages.AddNew("Comm")
+    systemSignals = commPackage.ArPackages.AddNew("SystemSignals").Elements
+    pdus = commPackage.ArPackages.AddNew("Pdus").Elements
+    channel = commPackage.Elements.AddNewCanCluster("Can").PhysicalChannels.AddNewCanPhysicalChannel("Channel")
+    for index in range(size):
+        systemSignals.AddNewSystemSignal("Signal%d" % index)
+    for index in range((size + _SignalsPerPdu - 1) // _SignalsPerPdu):
+        pdus.AddNewISignalIPdu("Pdu%dIPdu" % index).Length = _SignalsPerPdu
+
+    def Run():
+        wrappedChannel = fakeServer.Wrap(channel)
+        wrappedSystemSignals = fakeServer.Wrap(systemSignals.Elements)
+        for (pduIndex, pdu) in enumerate(fakeServer.Wrap(pdus.Elements)):
+            iSignalTriggerings = []
+            for systemSignal in wrappedSystemSignals[pduIndex * _SignalsPerPdu:(pduIndex + 1) * _SignalsPerPdu]:
+                iSignal = Utilities.CreateISignal(systemSignal)
+                iSignal.Length = 8
+                Utilities.AddISignalToPduMapping(pdu, iSignal, len(iSignalTriggerings) * 8)
+                iSignalTriggerings.append(Utilities.CreateISignalTriggering(wrappedChannel, iSignal, ()))
+            frame = Utilities.CreateFrame(pdu)
+            pduTriggering = Utilities.CreatePduTriggering(wrappedChannel, pdu, iSignalTriggerings, ())
+            Utilities.CreateFrameTriggering("CAN", wrappedChannel, frame, pduIndex, (pduTriggering,), ())
+    return Run
+
+
+def _RteEventMappingsScenario(fakeServer, size):
+    project = fakeServer.Model.ActiveProject
+    package = project.RootAutosar.ArPackages.AddNew("Ecu")
+    ecuConfiguration = project.EcuConfigurations.AddNew("Ecu")
+    ecucValues = ecuConfiguration.SetNewEcucValueCollection().EcucValues
+    moduleConfigurations = {}
+    for moduleName in ("Os", "Rte"):
+        moduleConfigurations[moduleName] = package.Elements.AddNewEcucModuleConfigurationValues(moduleName)
+        ecucValues.AddNew().EcucModuleConfigurationValuesRef = moduleConfigurations[moduleName]
+    for taskIndex in range(_TaskCount):
+        moduleConfigurations["Os"].OsTasks.AddNew("Task%d" % taskIndex)
+    composition = package.Elements.AddNewCompositionSwComponentType("Composition")
+    ecuConfiguration.EcuExtractSystem = package.Elements.AddNewSystem("EcuExtract")
+    ecuConfiguration.EcuExtractSystem.SetNewRootSwCompositionPrototype().SoftwareCompositionTref = composition
+
+    rows = []
+    for componentIndex in range((size + _EventsPerComponent - 1) // _EventsPerComponent):
+        componentName = "Swc%d" % componentIndex
+        swcType = package.Elements.AddNewApplicationSwComponentType(componentName + "Type")
+        events = swcType.InternalBehaviors.AddNew("Behavior").Events
+        for eventIndex in range(_EventsPerComponent):
+            eventName = "Event%d" % eventIndex
+            events.AddNewTimingEvent(eventName)
+            rows.append((componentName, eventName, "Task%d" % (len(rows) % _TaskCount)))
+        composition.Components.AddNewSwComponentPrototype(componentName).TypeTref = swcType
+        moduleConfigurations["Rte"].RteSwComponentInstances.AddNew(componentName)
+
+    def Run():
+        Utilities.ApplyRteEventMappings(fakeServer.Wrap(ecuConfiguration), rows[:size])
+    return Run
+
+
+def _ValueSpecificationsScenario(fakeServer, size):
+    package = fakeServer.Model.ActiveProject.RootAutosar.ArPackages.AddNew("Interfaces")
+    dataType = package.Elements.AddNewApplicationPrimitiveDataType("Speed")
+    dataType.Category = "VALUE"
+    dataElements = []
+    for index in range(size):
+        if index % _EventsPerComponent == 0:
+            interface = package.Elements.AddNewSenderReceiverInterface("Interface%d" % index)
+        dataElement = interface.DataElements.AddNew("Data%d" % index)
+        dataElement.TypeTref = dataType
+        dataElements.append(dataElement)
+
+    def Run():
+        for (index, dataElement) in enumerate(fakeServer.Wrap(tuple(dataElements))):
+            # Integral and fractional values.
+            Utilities.SetInitValue(dataElement, index % 100 + (index % 2) * 0.5)
+    return Run
+
+
+# Benchmark scenarios by name.
+_Scenarios = (
+    ("RteEventMappings", _RteEventMappingsScenario),
+    ("CommMatrix", _CommMatrixScenario),
+    ("ValueSpecifications", _ValueSpecificationsScenario),
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark of the Utilities helpers against a fake SystemDesk")
+    parser.add_argument("--sizes", type=int, nargs="+", default=DefaultSizes, help="Numbers of elements")
+    parser.add_argument("--latency", type=float, default=0.0, help="Latency of each COM call in seconds")
+    parser.add_argument("--scenarios", nargs="+", help="Names of the scenarios to run")
+    parser.add_argument("--baseline", default=BaselineFile, help="JSON file with the baseline")
+    parser.add_argument("--update-baseline", action="store_true", help="Write the results as new baseline")
+    parser.add_argument("--check-times", action="store_true", help="Compare the wall times with the baseline, too")
+    args = parser.parse_args()
+
+    results = RunBenchmark(args.sizes, args.latency, args.scenarios)
+    print("%-20s %8s %12s %10s %10s  %s" % ("Scenario", "Size", "COM calls", "Calls/elem", "Seconds", "Top calls"))
+    for result in results:
+        topCalls = ", ".join("%s.%s=%d" % (interfaceName, memberName, count) \
+            for ((interfaceName, memberName), count) in result.TopCalls)
+        print("%-20s %8d %12d %10.1f %10.3f  %s" % (result.ScenarioName, result.Size, result.ComCalls, \
+            float(result.ComCalls) / result.Size, result.Seconds, topCalls))
+
+    if args.update_baseline:
+        SaveBaseline(results, args.baseline, withTimes=args.check_times)
+        print("Baseline written to " + args.baseline)
+        sys.exit(0)
+    regressions = CompareWithBaseline(results, LoadBaseline(args.baseline), checkTimes=args.check_times)
+    for regression in regressions:
+        print("*** Regression: " + regression)
+    sys.exit(1 if regressions else 0)
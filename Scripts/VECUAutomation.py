@@ -1,9 +1,11 @@
 import importlib
 import sys
 import os
-import time
 import win32com.client
 
+import DebugLog
+import Profiling
+
 
 #------------------------------------------------------------------------------
 class OptionsHelper():  # pylint: disable=too-few-public-methods
@@ -275,56 +277,18 @@ def AssertIf(condition, message):
 # Debugging and profiling.
 #-------------------------
 
-def PrintD(message):
+def PrintD(message, *args):
     """
-    Prints a message if debugging is enabled.
+    Prints a message if debugging is enabled, see DebugLog. The message is
+    formatted with the arguments by the % operator only if it is printed.
     """
-    if os.path.exists("__ENABLE_DEBUG__"):
-        print("*** DEBUG: %s" % message)
+    DebugLog.Debug(message, *args)
 
 
-class _MiniProfiler():
-    """
-    This class defines some options which can be used to configure the
-    structure of a project.
-    """
-    def __init__(self):
-        self._StartTime = 0.0
-        self._LastTime = 0.0
-        self._CurrentTime = 0.0
-        self.Start()
-
-    def Start(self):
-        """
-        Starts the time measurement.
-        """
-        self._StartTime = time.clock()
-        self._LastTime = self._StartTime
-        self._CurrentTime = self._StartTime
-
-    def DeltaTime(self, display=True):
-        """
-        Returns the time since the last call of DeltaTime() or __init__().
-        """
-        self._CurrentTime = time.clock()
-        deltaTime = self._CurrentTime - self._LastTime
-        self._LastTime = self._CurrentTime
-        if display:
-            PrintD("DeltaTime =%6.3f sec" % deltaTime)
-        return deltaTime
-
-    def TotalTime(self, display=True):
-        """
-        Returns the time since the last call of Start() or __init__().
-        """
-        self._CurrentTime = time.clock()
-        totalTime = self._CurrentTime - self._StartTime
-        if display:
-            PrintD("TotalTime =%6.3f sec" % totalTime)
-        return totalTime
-
-# Create a global instance of the MiniProfiler.
-MiniProfiler = _MiniProfiler()
+# Global span profiler, see Profiling.SpanProfiler. DeltaTime() and TotalTime()
+# print their times if debugging is enabled.
+MiniProfiler = Profiling.Spans
+MiniProfiler.PrintFunction = PrintD
 
 
 
@@ -9,7 +9,13 @@
 
 """
 import Utilities
+import ModelSnapshot
+import BuildHistory
+import DebugLog
+import Profiling
+import ProcessTelemetry
 import os, json
+import hashlib
 import SystemDeskEnums
 import time
 import shutil
@@ -111,6 +117,42 @@ if osa_author != "None":
 dap_arxml = path_details.get("dap_arxml")
 module = path_details.get("module")
 
+# Snapshot of the project at the last successful build. After each successful build the changes of the project and of
+# the build inputs since the last one are reported. The build is never skipped, since the snapshot only covers the
+# packages of the project, not the ECU configurations and the V-ECU implementation. Specify None to report nothing.
+snapshot_file = path_details.get("snapshot_file")
+snapshotFile = None
+if snapshot_file != None and snapshot_file != "None":
+    snapshotFile = curr_dir+"\\"+snapshot_file
+
+# Prefix of the profile of the build phases, written as <profileFile>.trace.json for chrome://tracing or Perfetto
+# and <profileFile>.speedscope.json for speedscope. Specify None to only print the summary.
+profile_file = path_details.get("profile_file")
+profileFile = None
+if profile_file != None and profile_file != "None":
+    profileFile = curr_dir+"\\"+profile_file
+
+# Interval in seconds between two samples of the CPU time, memory and I/O of Python, SystemDesk and the VEOS build tool.
+# Specify None to sample nothing, e.g. 0.5 to sample twice a second.
+telemetry_interval = path_details.get("telemetry_interval")
+telemetryInterval = None
+if telemetry_interval != None and telemetry_interval != "None":
+    telemetryInterval = float(telemetry_interval)
+
+# Sampler of the build processes, started in the entry point.
+telemetry = None
+
+# SQLite file to which each build appends its phase times, COM calls, fingerprint and outcome.
+# Phases which took longer than the threshold compared with the last successful builds are reported.
+# Specify None to keep no history.
+history_file = path_details.get("history_file")
+historyFile = None
+if history_file != None and history_file != "None":
+    historyFile = curr_dir+"\\"+history_file
+
+# Counts the COM calls of the build for the history, if there is a history.
+comProfiler = Profiling.ComProfiler()
+
 # Constants
 (scriptName, ext) = os.path.splitext(os.path.basename(__file__))
 
@@ -120,6 +162,8 @@ def getSystemDesk():
     """Open COM connection to SystemDesk"""
     try:
         sd = Dispatch("SystemDesk.Application")
+        if historyFile != None:
+            sd = comProfiler.Wrap(sd)
         sd.Visible = False #to disable the ui
         sd.BatchMode = True
     except Exception as e:
@@ -224,19 +268,73 @@ def callVeosBuild(sd, vEcu, container):
         arguments += ' --osa-author "' + osaAuthor + '"'
 
     print(arguments)
-    return subprocess.run(arguments)
+    process = subprocess.Popen(arguments)
+    if telemetry != None:
+        telemetry.Track(process.pid, "VEOS build")
+    process.wait()
+    return subprocess.CompletedProcess(arguments, process.returncode)
+
+#Function to get a fingerprint of the build inputs which are not part of the SystemDesk model
+def buildFingerprint():
+    """Fingerprint of the DAP configuration, the additional code files and the build options"""
+    fingerprint = hashlib.sha256()
+    for input_file in [dap_arxml] + additionalCodeFiles:
+        fingerprint.update(input_file.encode("utf-8"))
+        if os.path.isfile(input_file):
+            with open(input_file, "rb") as code_file:
+                fingerprint.update(code_file.read())
+    options = [vEcuName, target, configuration, compilerOptions, cppCompilerOptions, codeCoverageLevel, osaAuthor,
+        xcpServicePort, preprocessorDefines, additionalCodeFiles, outputFile]
+    fingerprint.update(json.dumps(options).encode("utf-8"))
+    return fingerprint.hexdigest()
+
+#Function to report the changes since the last successful build and keep the snapshot of this build
+def saveSnapshot(sd):
+    """Compare the build inputs and the project with the last successful build and replace its snapshot,
+    errors of the snapshot do not fail the build"""
+    if snapshotFile == None:
+        return
+    try:
+        fingerprint = buildFingerprint()
+        fingerprintFile = snapshotFile + ".fingerprint"
+        if not os.path.exists(snapshotFile) or not os.path.exists(fingerprintFile):
+            print("No snapshot of the last successful build, changes are not reported")
+        else:
+            with open(fingerprintFile, "r") as fingerprint_file:
+                if fingerprint_file.read() != fingerprint:
+                    print("Build inputs changed since the last successful build")
+        print("Taking snapshot of the project")
+        Utilities.SdApplication = sd
+        ModelSnapshot.SnapshotProject(snapshotFile + ".new")
+        if os.path.exists(snapshotFile):
+            with ModelSnapshot.Snapshot(snapshotFile) as oldSnapshot, ModelSnapshot.Snapshot(snapshotFile + ".new") as newSnapshot:
+                snapshotDiff = ModelSnapshot.DiffSnapshots(oldSnapshot, newSnapshot)
+            for line in snapshotDiff.Report():
+                print(line)
+        os.replace(snapshotFile + ".new", snapshotFile)
+        with open(fingerprintFile, "w") as fingerprint_file:
+            fingerprint_file.write(fingerprint)
+    except Exception as e:
+        DebugLog.Warning("Snapshot %s not updated: %s", snapshotFile, e)
 
 #initiation of the build
 def build():
     """Mаin function"""
     startMsg = 'Starting execution of build script: %s' % __file__
     print(startMsg)
-    sd = getSystemDesk()
-    sd.SubmitInfoMessage(scriptName, startMsg)
-    vEcu = getVEcu(sd)
-    dap_config(sd,vEcu)
-    container = exportContainer(sd, vEcu)
-    buildResult = callVeosBuild(sd, vEcu, container)
+    with Profiling.Span("SystemDesk start"):
+        sd = getSystemDesk()
+        sd.SubmitInfoMessage(scriptName, startMsg)
+    if telemetry != None:
+        telemetry.TrackByName("SystemDesk")
+    with Profiling.Span("Open project"):
+        vEcu = getVEcu(sd)
+    with Profiling.Span("DAP import", module=module):
+        dap_config(sd,vEcu)
+    with Profiling.Span("Export container", file=containerFile):
+        container = exportContainer(sd, vEcu)
+    with Profiling.Span("VEOS build", target=target, configuration=configuration):
+        buildResult = callVeosBuild(sd, vEcu, container)
 
     returncode = 0
     if buildResult != None:
@@ -245,19 +343,53 @@ def build():
         returncode = -1
 
     if returncode == 0:
+        with Profiling.Span("Save snapshot"):
+            saveSnapshot(sd)
         sd.SubmitInfoMessage('BuildScript', "VEOS Build finished successfully.")
     else:
         sd.SubmitErrorMessage('BuildScript', "VEOS Build finished with errors. See the Build log for details.")
 
-    time.sleep(10)
-    sd.Quit()
-    time.sleep(5)
+    with Profiling.Span("Shutdown"):
+        time.sleep(10)
+        sd.Quit()
+        time.sleep(5)
     if os.path.exists(outputFile):
         print(".osa file generated succesfully at locationn "+outputFile)
     else:
         sys.exit(".osa file is not generated at location "+outputFile)
     return returncode
 
+#Function to print the summary of the build phases and write the profile files
+def writeProfile():
+    """Report where the build time went"""
+    print(Profiling.Spans.Summary())
+    if telemetry != None:
+        telemetry.Stop()
+        telemetry.Attach(Profiling.Spans)
+        print(telemetry.Summary(Profiling.Spans))
+    if profileFile != None:
+        Profiling.Spans.WriteChromeTrace(profileFile + ".trace.json")
+        Profiling.Spans.WriteSpeedscope(profileFile + ".speedscope.json", "build " + vEcuName)
+        print("Profile written to " + profileFile + ".trace.json and " + profileFile + ".speedscope.json")
+
+#Function to append the build to the build history and report regressed phases
+def recordHistory(returncode):
+    """Append the build to the build history, errors of the history do not fail the build"""
+    if historyFile == None:
+        return
+    try:
+        fingerprint = buildFingerprint()
+    except (IOError, OSError):
+        fingerprint = None
+    try:
+        with BuildHistory.History(historyFile) as history:
+            buildId = history.AddBuild(vEcuName, target, configuration, fingerprint, returncode,
+                BuildHistory.PhaseTimes(Profiling.Spans), comProfiler.CallCount)
+            for regression in history.FindRegressions(buildId):
+                print("*** Regression: %s" % regression)
+    except Exception as e:
+        DebugLog.Warning("Build history %s not updated: %s", historyFile, e)
+
 #Function that is used to add the new defines
 def setOrReplaceDefine(define):
     name = define.split('=', 1)[0]
@@ -281,6 +413,7 @@ if __name__ == "__main__":
     parser.add_argument('--showAllWarnings', action='store_true', default=None, help='Show all compiler warnings.')
     parser.add_argument('--configuration', choices=['Debug', 'Release'], help='Specifies the build configuration.')
     parser.add_argument('--osaAuthor', help='Name of the OSA file author')
+    parser.add_argument('--profileFile', help='Prefix of the profile files of the build phases.')
 
     args = parser.parse_args()
 
@@ -315,4 +448,22 @@ if __name__ == "__main__":
     if args.osaAuthor != None:
         osaAuthor = args.osaAuthor
 
-    sys.exit(build())
+    if args.profileFile != None:
+        profileFile = os.path.abspath(args.profileFile)
+
+    if telemetryInterval != None:
+        telemetry = ProcessTelemetry.TelemetrySampler(interval=telemetryInterval)
+        # The VEOS build tool is tracked by itself.
+        telemetry.Track(os.getpid(), "Python", includeChildren=False)
+        telemetry.Start()
+
+    # Keep the last debug messages of the helpers for the case of a failed build.
+    DebugLog.Configure(ringBufferSize=1000)
+    returncode = -1
+    try:
+        with DebugLog.DumpOnFailure(), Profiling.Span("build", vEcu=vEcuName):
+            returncode = build()
+    finally:
+        writeProfile()
+        recordHistory(returncode)
+    sys.exit(returncode)
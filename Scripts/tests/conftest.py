@@ -0,0 +1,80 @@
+"""
+--------------------------------------------------------------------------------
+File:        conftest.py
+
+Description: Fixtures of the tests of the helpers. The tests run against the
+             fake COM server of FakeSystemDesk.py, so they need neither
+             SystemDesk nor pywin32.
+
+Tip/Remarks: Run "python -m pytest tests" in the Scripts directory.
+--------------------------------------------------------------------------------
+"""
+
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import FakeSystemDesk
+import Utilities
+
+
+@pytest.fixture
+def fakeServer():
+    """
+    Connects Utilities to a fake SystemDesk with an empty project.
+    """
+    fakeServer = FakeSystemDesk.ConnectFakeSystemDesk()
+    yield fakeServer
+    Utilities.SdApplication = None
+    Utilities.InvalidateModelCaches()
+
+
+@pytest.fixture
+def commMatrix(fakeServer):
+    """
+    Creates the SystemSignal Speed and its ISignal, IPdu, Frame and
+    FrameTriggering on the CAN channel Ch. Returns them by name.
+    """
+    systemSignal = Utilities.GetOrCreatePackage("/Comm/SystemSignals").Elements.AddNewSystemSignal("Speed")
+    iSignal = Utilities.CreateISignal(systemSignal)
+    iSignal.Length = 16
+    iPdu = Utilities.GetOrCreatePackage("/Comm/Pdus").Elements.AddNewISignalIPdu("Pdu1")
+    iPdu.Length = 8
+    Utilities.AddISignalToPduMapping(iPdu, iSignal)
+    frame = Utilities.CreateFrame(iPdu)
+    channel = Utilities.GetOrCreatePackage("/Comm/Clusters").Elements.AddNewCanPhysicalChannel("Ch")
+    frameTriggering = Utilities.CreateFrameTriggering("CAN", channel, frame, 1, [], [])
+    return {"SystemSignal": systemSignal, "ISignal": iSignal, "IPdu": iPdu, "Frame": frame, \
+        "Channel": channel, "FrameTriggering": frameTriggering}
+
+
+@pytest.fixture
+def ecuConfiguration(fakeServer):
+    """
+    Creates the EcuConfiguration Ecu with the module configurations Os and Rte,
+    the OsTasks Task1 and Task2 and the components Swc1 and Swc2 of the type
+    SwcType with the TimingEvents Event0 to Event2 and their RTE instances.
+    """
+    package = Utilities.GetOrCreatePackage("/Ecu")
+    ecuConfiguration = Utilities.SdApplication.ActiveProject.EcuConfigurations.AddNew("Ecu")
+    ecucValues = ecuConfiguration.SetNewEcucValueCollection().EcucValues
+    moduleConfigurations = {}
+    for moduleName in ("Os", "Rte"):
+        moduleConfigurations[moduleName] = package.Elements.AddNewEcucModuleConfigurationValues(moduleName)
+        ecucValues.AddNew().EcucModuleConfigurationValuesRef = moduleConfigurations[moduleName]
+    for osTaskName in ("Task1", "Task2"):
+        moduleConfigurations["Os"].OsTasks.AddNew(osTaskName)
+    swcType = package.Elements.AddNewApplicationSwComponentType("SwcType")
+    events = swcType.InternalBehaviors.AddNew("Behavior").Events
+    for eventIndex in range(3):
+        events.AddNewTimingEvent("Event%d" % eventIndex)
+    composition = package.Elements.AddNewCompositionSwComponentType("Composition")
+    ecuConfiguration.EcuExtractSystem = package.Elements.AddNewSystem("EcuExtract")
+    ecuConfiguration.EcuExtractSystem.SetNewRootSwCompositionPrototype().SoftwareCompositionTref = composition
+    for componentName in ("Swc1", "Swc2"):
+        composition.Components.AddNewSwComponentPrototype(componentName).TypeTref = swcType
+        moduleConfigurations["Rte"].RteSwComponentInstances.AddNew(componentName)
+    return ecuConfiguration
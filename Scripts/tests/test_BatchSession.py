@@ -0,0 +1,40 @@
+"""
+--------------------------------------------------------------------------------
+File:        test_BatchSession.py
+
+Description: Tests of the nesting of BatchSessions.
+--------------------------------------------------------------------------------
+"""
+
+import pytest
+
+import Utilities
+
+
+def testNestedSessions(fakeServer):
+    with Utilities.BatchSession():
+        assert Utilities.SdApplication.BatchMode == True
+        with Utilities.BatchSession():
+            assert Utilities.SdApplication.BatchMode == True
+        # The inner session does not switch off the batch mode of the outer one.
+        assert Utilities.SdApplication.BatchMode == True
+    assert Utilities.SdApplication.BatchMode == False
+
+
+def testSessionRestoresBatchModeOnExceptions(fakeServer):
+    with pytest.raises(Exception, match="Generation failed"):
+        with Utilities.BatchSession():
+            with Utilities.BatchSession():
+                raise Exception("Generation failed")
+    assert Utilities.SdApplication.BatchMode == False
+    # The next session starts from the outermost level again.
+    with Utilities.BatchSession():
+        assert Utilities.SdApplication.BatchMode == True
+    assert Utilities.SdApplication.BatchMode == False
+
+
+def testSessionKeepsBatchModeOfTheCaller(fakeServer):
+    Utilities.SdApplication.BatchMode = True
+    with Utilities.BatchSession():
+        pass
+    assert Utilities.SdApplication.BatchMode == True
@@ -0,0 +1,80 @@
+"""
+--------------------------------------------------------------------------------
+File:        test_BuildHistory.py
+
+Description: Tests of the phase times and the regression check of the build
+             history.
+--------------------------------------------------------------------------------
+"""
+
+import pytest
+
+import BuildHistory
+import Profiling
+
+
+@pytest.fixture
+def history(tmp_path):
+    with BuildHistory.History(str(tmp_path / "BuildHistory.sqlite")) as history:
+        yield history
+
+
+def _AddBuild(history, buildSeconds, exportSeconds, returnCode=0, configuration="Debug"):
+    phases = [("build", buildSeconds), ("Export", exportSeconds)]
+    return history.AddBuild("Sut", "HostPC32/GCC", configuration, "fingerprint", returnCode, phases, comCalls=100)
+
+
+def testPhaseTimes():
+    spans = Profiling.SpanProfiler()
+    with spans.Span("build"):
+        with spans.Span("Export"):
+            with spans.Span("Write"):
+                pass
+    with spans.Span("Shutdown"):
+        pass
+    assert sorted(name for (name, seconds) in BuildHistory.PhaseTimes(spans)) == ["Export", "build"]
+
+
+def testFindRegressions(history):
+    for exportSeconds in (10.0, 12.0, 11.0):
+        _AddBuild(history, 60.0, exportSeconds)
+    # Failed builds and builds of other configurations are no baseline.
+    _AddBuild(history, 20.0, 2.0, returnCode=1)
+    _AddBuild(history, 20.0, 2.0, configuration="Release")
+    buildId = _AddBuild(history, 61.0, 16.0)
+    regressions = history.FindRegressions(buildId)
+    assert [(regression.PhaseName, regression.Seconds, regression.BaselineSeconds, regression.BaselineCount) \
+        for regression in regressions] == [("Export", 16.0, 11.0, 3)]
+    assert str(regressions[0]) == "Build %d (Sut, HostPC32/GCC, Debug): Export took 16.0 s, " \
+        "baseline 11.0 s of 3 builds (+45%%)" % buildId
+
+
+def testSmallIncreasesAreNoRegressions(history):
+    _AddBuild(history, 2.0, 0.5)
+    buildId = _AddBuild(history, 2.0, 1.2)
+    assert history.FindRegressions(buildId) == []
+    assert len(history.FindRegressions(buildId, minIncrease=0.5)) == 1
+    # The first build has no baseline.
+    assert history.FindRegressions(buildId - 1) == []
+
+
+def testWindow(history):
+    for exportSeconds in (30.0, 10.0, 10.0):
+        _AddBuild(history, 60.0, exportSeconds)
+    buildId = _AddBuild(history, 60.0, 20.0)
+    assert [regression.BaselineCount for regression in history.FindRegressions(buildId, window=2)] == [2]
+    assert history.FindRegressions(buildId, window=2)[0].BaselineSeconds == 10.0
+
+
+def testUnknownBuild(history):
+    with pytest.raises(Exception, match="Build 5 is not in the history"):
+        history.FindRegressions(5)
+
+
+def testTrendAndLastBuildIds(history):
+    firstBuildId = _AddBuild(history, 60.0, 10.0)
+    _AddBuild(history, 20.0, 2.0, configuration="Release")
+    lastBuildId = _AddBuild(history, 61.0, 11.0)
+    assert history.LastBuildIds() == [lastBuildId - 1, lastBuildId]
+    trend = history.Trend(configuration="Debug", phaseName="Export")
+    assert [(row[0], row[7], row[8]) for row in trend] == [(firstBuildId, "Export", 10.0), (lastBuildId, "Export", 11.0)]
@@ -0,0 +1,51 @@
+"""
+--------------------------------------------------------------------------------
+File:        test_ComTrace.py
+
+Description: Tests of the recording and the replay of COM traces by ComTrace.
+--------------------------------------------------------------------------------
+"""
+
+import ComTrace
+import Utilities
+
+
+def _ReadPackages():
+    Utilities.InvalidateModelCaches()
+    package = Utilities.GetOrCreatePackage("/A/B/C")
+    return (package.ShortName, [package.ShortName for package in \
+        Utilities.SdApplication.ActiveProject.RootAutosar.ArPackages])
+
+
+def testRecordAndReplay(fakeServer, tmp_path):
+    fileName = str(tmp_path / "Trace.jsonl.gz")
+    Utilities.GetOrCreatePackage("/Existing")
+    Utilities.SdApplication = ComTrace.GetRecorder(fileName).Dispatch("SystemDesk.Application", \
+        lambda progId: fakeServer.Application)
+    recorded = _ReadPackages()
+    ComTrace.StopRecording()
+    assert recorded == ("C", ["Existing", "A"])
+
+    replaySession = ComTrace.ReplaySession(fileName, timeScale=0)
+    Utilities.SdApplication = replaySession.Dispatch("SystemDesk.Application")
+    callCount = fakeServer.CallCount
+    assert _ReadPackages() == recorded
+    assert fakeServer.CallCount == callCount
+    assert replaySession.Statistics["Calls"] > 0
+    assert replaySession.Statistics["ArgumentMismatches"] == 0
+
+
+def testReplayByOptions(fakeServer, tmp_path):
+    fileName = str(tmp_path / "Trace.jsonl.gz")
+    Utilities.SdApplication = ComTrace.GetRecorder(fileName).Dispatch("SystemDesk.Application", \
+        lambda progId: fakeServer.Application)
+    recorded = _ReadPackages()
+    ComTrace.StopRecording()
+    Utilities.Options.ReplayComTrace = fileName
+    Utilities.Options.ReplayTimeScale = 0
+    try:
+        Utilities.SdApplication = Utilities._Dispatch("SystemDesk.Application")
+        assert _ReadPackages() == recorded
+    finally:
+        Utilities.Options.ReplayComTrace = None
+        Utilities.Options.ReplayTimeScale = 1.0
@@ -0,0 +1,89 @@
+"""
+--------------------------------------------------------------------------------
+File:        test_DebugLog.py
+
+Description: Tests of the gating of debug messages and the ring buffer of
+             DebugLog.py.
+--------------------------------------------------------------------------------
+"""
+
+import io
+
+import pytest
+
+import DebugLog
+
+
+class _FormatCounter():
+    """
+    Argument of a message which counts how often it is formatted.
+    """
+    def __init__(self):
+        self.Count = 0
+
+    def __str__(self):
+        self.Count += 1
+        return "counter"
+
+
+@pytest.fixture
+def stream(monkeypatch, tmp_path):
+    monkeypatch.delenv(DebugLog.DEBUG_VARIABLE, raising=False)
+    monkeypatch.chdir(tmp_path)
+    yield io.StringIO()
+    DebugLog.Configure(debug=False)
+
+
+def testDisabledDebugMessagesAreNotFormatted(stream):
+    DebugLog.Configure(debug=False, stream=stream)
+    formatCounter = _FormatCounter()
+    DebugLog.Debug("Value %s", formatCounter)
+    DebugLog.Info("Info %s", "message")
+    assert stream.getvalue() == "*** INFO: Info message\n"
+    assert formatCounter.Count == 0
+
+
+def testEnabledDebugMessages(stream):
+    DebugLog.Configure(debug=True, stream=stream)
+    DebugLog.Debug("Mapped %d events", 3)
+    assert stream.getvalue() == "*** DEBUG: Mapped 3 events\n"
+
+
+def testDebugIsEnabledByFileOrVariable(stream, monkeypatch):
+    DebugLog.Configure(stream=stream)
+    assert DebugLog.DebugEnabled == False
+    open(DebugLog.DEBUG_FILE, "w").close()
+    DebugLog.Configure(stream=stream)
+    assert DebugLog.DebugEnabled == True
+    DebugLog.Configure(debug=False, stream=stream)
+    assert DebugLog.DebugEnabled == False
+    monkeypatch.setenv(DebugLog.DEBUG_VARIABLE, "1")
+    DebugLog.Configure(stream=stream)
+    assert DebugLog.DebugEnabled == True
+
+
+def testRingBufferKeepsLastMessages(stream):
+    DebugLog.Configure(debug=False, ringBufferSize=3, stream=stream)
+    for messageIndex in range(5):
+        DebugLog.Debug("Message %d", messageIndex)
+    assert stream.getvalue() == ""
+    dumpStream = io.StringIO()
+    assert DebugLog.DumpRingBuffer(dumpStream) == 3
+    lines = dumpStream.getvalue().splitlines()
+    assert lines[0] == "*** Last 3 log messages:"
+    assert [line.split("*** DEBUG: ")[1] for line in lines[1:]] == ["Message 2", "Message 3", "Message 4"]
+    assert DebugLog.DumpRingBuffer(dumpStream) == 0
+
+
+def testDumpOnFailure(stream):
+    DebugLog.Configure(debug=False, ringBufferSize=10, stream=stream)
+    dumpStream = io.StringIO()
+    with pytest.raises(SystemExit):
+        with DebugLog.DumpOnFailure(dumpStream):
+            DebugLog.Debug("Build finished")
+            raise SystemExit(0)
+    assert dumpStream.getvalue() == ""
+    with pytest.raises(Exception, match="Build failed"):
+        with DebugLog.DumpOnFailure(dumpStream):
+            raise Exception("Build failed")
+    assert "Build finished" in dumpStream.getvalue()
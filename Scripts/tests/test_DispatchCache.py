@@ -0,0 +1,27 @@
+"""
+--------------------------------------------------------------------------------
+File:        test_DispatchCache.py
+
+Description: Tests of the dispatch ID cache with the fake COM objects of
+             DispatchBenchmark.py.
+--------------------------------------------------------------------------------
+"""
+
+import DispatchBenchmark
+import DispatchCache
+
+
+def testCachedDispatchSavesComCalls():
+    results = DispatchBenchmark.RunBenchmark()
+    assert len(results) == 3
+    for (scenarioName, dynamicCalls, cachedCalls) in results:
+        assert cachedCalls < dynamicCalls, scenarioName
+
+
+def testStatistics():
+    DispatchBenchmark.RunBenchmark()
+    statistics = DispatchCache.GetStatistics()
+    assert statistics["Interfaces"] > 0
+    assert statistics["Wrapped"] > statistics["Interfaces"]
+    DispatchCache.Reset()
+    assert DispatchCache.GetStatistics() == {"Interfaces": 0, "Wrapped": 0, "Fallbacks": 0}
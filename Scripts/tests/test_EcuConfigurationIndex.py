@@ -0,0 +1,57 @@
+"""
+--------------------------------------------------------------------------------
+File:        test_EcuConfigurationIndex.py
+
+Description: Tests of the EcuConfigurationIndex behind the lookups of module
+             configurations, component prototypes and RTE instances.
+--------------------------------------------------------------------------------
+"""
+
+import Utilities
+
+
+def testFindModuleConfiguration(fakeServer, ecuConfiguration):
+    rteConfiguration = Utilities.FindModuleConfiguration(ecuConfiguration, "Rte")
+    assert rteConfiguration.ShortName == "Rte"
+    assert Utilities.FindModuleConfiguration(ecuConfiguration, "Com") == None
+    callCount = fakeServer.CallCount
+    assert Utilities.FindModuleConfiguration(ecuConfiguration, "Rte") == rteConfiguration
+    assert Utilities.FindModuleConfiguration(ecuConfiguration, "Com") == None
+    # Only the key of the EcuConfiguration is read.
+    assert fakeServer.CallCount - callCount <= 2
+
+
+def testNoteModuleConfigurationAdded(ecuConfiguration):
+    ecuConfigurationIndex = Utilities.GetEcuConfigurationIndex(ecuConfiguration)
+    assert ecuConfigurationIndex.FindModuleConfiguration("Com") == None
+    comConfiguration = Utilities.GetElementByPath("/Ecu").Elements.AddNewEcucModuleConfigurationValues("Com")
+    ecuConfiguration.EcucValueCollection.EcucValues.AddNew().EcucModuleConfigurationValuesRef = comConfiguration
+    ecuConfigurationIndex.NoteModuleConfigurationAdded(comConfiguration, "Com")
+    assert ecuConfigurationIndex.FindModuleConfiguration("Com") == comConfiguration
+
+
+def testFindComponentPrototypes(ecuConfiguration):
+    swcType = Utilities.GetElementByPath("/Ecu/SwcType")
+    swcPrototypes = Utilities.FindSwcPrototypes(ecuConfiguration, swcType)
+    assert [swcPrototype.ShortName for swcPrototype in swcPrototypes] == ["Swc1", "Swc2"]
+    assert Utilities.FindSwcPrototype(ecuConfiguration, swcType) == swcPrototypes[0]
+    ecuConfigurationIndex = Utilities.GetEcuConfigurationIndex(ecuConfiguration)
+    assert ecuConfigurationIndex.FindComponentPrototype("Swc2") == swcPrototypes[1]
+    assert ecuConfigurationIndex.FindComponentPrototype("Swc3") == None
+
+
+def testFindRteSwComponentInstance(ecuConfiguration):
+    ecuConfigurationIndex = Utilities.GetEcuConfigurationIndex(ecuConfiguration)
+    rteConfiguration = ecuConfigurationIndex.FindModuleConfiguration("Rte")
+    assert ecuConfigurationIndex.FindRteSwComponentInstance("Swc1").ShortName == "Swc1"
+    assert ecuConfigurationIndex.FindRteSwComponentInstance("Swc3") == None
+    # Instances created later, e.g. by the RTE plugin, are found by a new scan.
+    swcInstance = rteConfiguration.RteSwComponentInstances.AddNew("Swc3")
+    assert ecuConfigurationIndex.FindRteSwComponentInstance("Swc3") == swcInstance
+
+
+def testIndexIsDiscardedWithModelCaches(ecuConfiguration):
+    ecuConfigurationIndex = Utilities.GetEcuConfigurationIndex(ecuConfiguration)
+    assert Utilities.GetEcuConfigurationIndex(ecuConfiguration) is ecuConfigurationIndex
+    Utilities.InvalidateModelCaches()
+    assert Utilities.GetEcuConfigurationIndex(ecuConfiguration) is not ecuConfigurationIndex
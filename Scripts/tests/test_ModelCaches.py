@@ -0,0 +1,112 @@
+"""
+--------------------------------------------------------------------------------
+File:        test_ModelCaches.py
+
+Description: Tests of the element cache, the package trie and the ancestor
+             cache of Utilities, including their invalidation after deletes.
+--------------------------------------------------------------------------------
+"""
+
+import Utilities
+
+
+def testElementCacheSavesComCalls(fakeServer):
+    package = Utilities.GetOrCreatePackage("/A/B")
+    element = package.Elements.AddNewSystemSignal("X")
+    assert Utilities.GetElementByPath("/A/B/X") == element
+    callCount = fakeServer.CallCount
+    assert Utilities.GetElementByPath("/A/B/X") == element
+    assert fakeServer.CallCount == callCount
+
+
+def testElementCacheKnowsMissingElements(fakeServer):
+    Utilities.GetOrCreatePackage("/A/B")
+    assert Utilities.GetElementByPath("/A/B/Z") == None
+    package = Utilities.GetOrCreatePackage("/A/B/Z")
+    assert Utilities.GetElementByPath("/A/B/Z") == package
+
+
+def testMissesSurviveUnrelatedElements(fakeServer):
+    Utilities.GetOrCreatePackage("/AUTOSAR_PhysicalUnits")
+    assert Utilities.GetNoUnit() == None
+    Utilities.GetOrCreatePackage("/AUTOSAR_PhysicalUnits/Other")
+    callCount = fakeServer.CallCount
+    assert Utilities.GetNoUnit() == None
+    assert fakeServer.CallCount == callCount
+    # A new element with a ShortName of the path turns the miss into a hit.
+    package = Utilities.GetOrCreatePackage("/AUTOSAR_PhysicalUnits/Units/NoUnit")
+    assert Utilities.GetNoUnit() == package
+
+
+def testElementCacheAfterDelete(fakeServer):
+    package = Utilities.GetOrCreatePackage("/A/B")
+    package.Elements.AddNewSystemSignal("X")
+    assert Utilities.GetElementByPath("/A/B/X") != None
+    Utilities.DeleteElementByPath("/A/B/X")
+    assert Utilities.GetElementByPath("/A/B/X") == None
+
+
+def testGetElementsByPaths(fakeServer):
+    package = Utilities.GetOrCreatePackage("/A/B")
+    x = package.Elements.AddNewSystemSignal("X")
+    y = package.Elements.AddNewSystemSignal("Y")
+    assert Utilities.GetElementsByPaths(["/A/B/X", "/A/B/Y", "/A/Q", "/A/B/X"]) == [x, y, None, x]
+
+
+def testPackageTrieSavesComCalls(fakeServer):
+    package = Utilities.GetOrCreatePackage("/A/B/C")
+    assert package.ShortName == "C"
+    callCount = fakeServer.CallCount
+    assert Utilities.GetOrCreatePackage("/A/B/C") == package
+    assert fakeServer.CallCount == callCount
+    packages = Utilities.GetOrCreatePackages(["/A/B/D", "/A/E", "/A/B/D"])
+    assert packages[0] == packages[2]
+    subPackage = Utilities.GetOrCreateSubPackage(package, "X")
+    assert Utilities.GetOrCreateSubPackage(package, "X") == subPackage
+    assert Utilities.GetElementByPath("/A/B/C/X") == subPackage
+
+
+def testPackageTrieAfterDelete(fakeServer):
+    package = Utilities.GetOrCreatePackage("/A/B/C")
+    subPackage = Utilities.GetOrCreateSubPackage(package, "X")
+    Utilities.DeleteElementByPath("/A/B")
+    newPackage = Utilities.GetOrCreatePackage("/A/B/C")
+    assert newPackage != package
+    assert Utilities.GetElementByPath("/A/B/C") == newPackage
+    newSubPackage = Utilities.GetOrCreateSubPackage(newPackage, "X")
+    assert newSubPackage != subPackage
+    assert newPackage.ArPackages.Count == 1
+
+
+def testPackageTrieAfterInvalidation(fakeServer):
+    package = Utilities.GetOrCreatePackage("/A/E")
+    Utilities.InvalidateModelCaches()
+    assert Utilities.GetOrCreatePackage("/A/E") == package
+    assert Utilities.GetElementByPath("/A").ArPackages.Count == 1
+
+
+def testAncestorCacheSavesComCalls(fakeServer):
+    package = Utilities.GetOrCreatePackage("/Comp/SwComponentTypes")
+    a = package.Elements.AddNewApplicationSwComponentType("a")
+    b = package.Elements.AddNewApplicationSwComponentType("b")
+    commonPackage = Utilities.FindCommonPackage(a)
+    assert commonPackage.ShortName == "Comp"
+    callCount = fakeServer.CallCount
+    assert Utilities.FindCommonPackage(a) == commonPackage
+    assert fakeServer.CallCount == callCount
+    assert Utilities.FindCommonPackage(b).ShortName == "Comp"
+    assert Utilities.FindPackage(a) == package
+    assert Utilities.FindAncestor(a, "INoType") == None
+    statistics = Utilities.GetAncestorCacheStatistics()
+    assert statistics["Hits"] >= 1
+    assert statistics["ParentHits"] >= 1
+
+
+def testAncestorCacheAfterDelete(fakeServer):
+    package = Utilities.GetOrCreatePackage("/Comp/SwComponentTypes")
+    element = package.Elements.AddNewApplicationSwComponentType("a")
+    assert Utilities.FindCommonPackage(element).ShortName == "Comp"
+    Utilities.DeleteElementByPath("/Comp")
+    package = Utilities.GetOrCreatePackage("/Other/SwComponentTypes")
+    element = package.Elements.AddNewApplicationSwComponentType("a")
+    assert Utilities.FindCommonPackage(element).ShortName == "Other"
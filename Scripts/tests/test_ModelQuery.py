@@ -0,0 +1,74 @@
+"""
+--------------------------------------------------------------------------------
+File:        test_ModelQuery.py
+
+Description: Tests of the parser, the plans and the results of ModelQuery.
+--------------------------------------------------------------------------------
+"""
+
+import pytest
+
+import ModelQuery
+import Utilities
+
+
+@pytest.fixture
+def signals(fakeServer):
+    for shortName in ("Brake_A", "Brake_B", "Speed"):
+        Utilities.GetOrCreatePackage("/Comm/Sig").Elements.AddNewISignal(shortName)
+    Utilities.GetOrCreatePackage("/Comm/Other/Deep").Elements.AddNewISignal("Brake_C").Length = 8
+    Utilities.GetOrCreatePackage("/Other").Elements.AddNewISignal("Brake_X")
+
+
+def _ShortNames(query):
+    return [element.ShortName for element in ModelQuery.Query(query)]
+
+
+def testPlans():
+    assert ModelQuery.CompileQuery("/Comm//IISignal[ShortName^='Brake_']").Explain() == \
+        ["PathLookup /Comm (path cache)", "TypeIndexLookup //IISignal[ShortName^='Brake_']"]
+    assert ModelQuery.CompileQuery("/Comm//IARPackage").Explain() == \
+        ["PathLookup /Comm (path cache)", "DescendantTraversal //IARPackage (packages only)"]
+    assert ModelQuery.CompileQuery("/Comm/Sig/*").Explain() == ["PathLookup /Comm/Sig (path cache)", "ChildScan /*"]
+
+
+def testPlansAreCached():
+    assert ModelQuery.CompileQuery("/Comm/Sig/*") is ModelQuery.CompileQuery("/Comm/Sig/*")
+
+
+def testInvalidQuery():
+    with pytest.raises(Exception, match="Invalid predicate"):
+        ModelQuery.CompileQuery("/A[x=")
+
+
+def testQueries(signals):
+    assert _ShortNames("/Comm//IISignal[ShortName^='Brake_']") == ["Brake_A", "Brake_B", "Brake_C"]
+    assert _ShortNames("/Comm/Sig/*[ShortName$='B']") == ["Brake_B"]
+    assert _ShortNames("//IISignal[Length=8]") == ["Brake_C"]
+    assert _ShortNames("/Comm/Sig/Speed") == ["Speed"]
+    assert _ShortNames("/Comm//Deep/IISignal") == ["Brake_C"]
+    assert _ShortNames("/Comm/Missing/*") == []
+
+
+def testTypeIndexLookupUsesReferenceIndex(signals):
+    query = "/Comm//IISignal[ShortName~='_[AC]$']"
+    assert _ShortNames(query) == ["Brake_A", "Brake_C"]
+    Utilities.GetReferenceIndex()
+    assert _ShortNames(query) == ["Brake_A", "Brake_C"]
+    Utilities.GetOrCreatePackage("/Comm/Sig").Elements.AddNewISignal("Brake_Z")
+    Utilities.InvalidateModelCaches()
+    Utilities.GetReferenceIndex()
+    assert _ShortNames("/Comm//IISignal[ShortName$='Z']") == ["Brake_Z"]
+
+
+def testRegisterTypeIndex(signals, monkeypatch):
+    monkeypatch.setattr(ModelQuery, "TypeIndexProviders", {})
+    monkeypatch.setattr(ModelQuery, "_CompiledQueries", {})
+    indexedArPaths = ["/Comm/Sig/Brake_B", "/Comm/Other/Deep/Brake_C", "/Other/Brake_X"]
+    ModelQuery.RegisterTypeIndex("IISignal", lambda arPath: \
+        [(Utilities.GetElementByPath(indexedArPath), indexedArPath) for indexedArPath in indexedArPaths])
+    query = "/Comm//IISignal[ShortName^='Brake_']"
+    assert ModelQuery.CompileQuery(query).Explain() == \
+        ["PathLookup /Comm (path cache)", "TypeIndexLookup //IISignal[ShortName^='Brake_']"]
+    # Only the indexed elements below the context are found.
+    assert _ShortNames(query) == ["Brake_B", "Brake_C"]
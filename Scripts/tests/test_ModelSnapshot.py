@@ -0,0 +1,61 @@
+"""
+--------------------------------------------------------------------------------
+File:        test_ModelSnapshot.py
+
+Description: Tests of the snapshots of ModelSnapshot: writing and reading a
+             snapshot and the differences between two snapshots.
+--------------------------------------------------------------------------------
+"""
+
+import ModelSnapshot
+import Utilities
+
+
+def testSnapshotRoundTrip(commMatrix, tmp_path):
+    fileName = str(tmp_path / "Project.sdsnap")
+    elementCount = ModelSnapshot.SnapshotProject(fileName)
+    with ModelSnapshot.Snapshot(fileName) as snapshot:
+        assert snapshot.Count == elementCount
+        iSignalId = snapshot.FindElement("/Comm/ISignals/SpeedISignal")
+        systemSignalId = snapshot.FindElement("/Comm/SystemSignals/Speed")
+        assert snapshot.ElementType(iSignalId) == "IISignal"
+        assert snapshot.ShortName(iSignalId) == "SpeedISignal"
+        assert snapshot.ArPath(iSignalId) == "/Comm/ISignals/SpeedISignal"
+        assert snapshot.Property(iSignalId, "Length") == "16"
+        assert snapshot.References(iSignalId) == [("SystemSignalRef", systemSignalId)]
+        assert snapshot.Referrers(systemSignalId) == [("SystemSignalRef", iSignalId)]
+        assert snapshot.ElementsOfType("IISignal") == [iSignalId]
+        assert snapshot.ShortName(snapshot.Parent(snapshot.Parent(iSignalId))) == "Comm"
+        assert snapshot.FindElement("/Comm/Missing") == None
+
+
+def testSnapshotOfExternalReference(commMatrix, tmp_path):
+    # The target is not below the root of the snapshot.
+    root = Utilities.GetElementByPath("/Comm/ISignals")
+    fileName = str(tmp_path / "ISignals.sdsnap")
+    ModelSnapshot.SnapshotProject(fileName, root=root)
+    with ModelSnapshot.Snapshot(fileName) as snapshot:
+        assert snapshot.References(snapshot.FindElement("/SpeedISignal")) == [("SystemSignalRef", -1)]
+
+
+def testDiffSnapshots(commMatrix, tmp_path):
+    oldFileName = str(tmp_path / "Old.sdsnap")
+    newFileName = str(tmp_path / "New.sdsnap")
+    ModelSnapshot.SnapshotProject(oldFileName)
+    commMatrix["ISignal"].Length = 8
+    systemSignal = Utilities.GetElementByPath("/Comm/SystemSignals").Elements.AddNewSystemSignal("Torque")
+    commMatrix["ISignal"].SystemSignalRef = systemSignal
+    commMatrix["FrameTriggering"].Delete()
+    ModelSnapshot.SnapshotProject(newFileName)
+    with ModelSnapshot.Snapshot(oldFileName) as oldSnapshot, ModelSnapshot.Snapshot(newFileName) as newSnapshot:
+        snapshotDiff = ModelSnapshot.DiffSnapshots(oldSnapshot, newSnapshot)
+        assert not snapshotDiff.IsEmpty()
+        assert [elementChange.Key for elementChange in snapshotDiff.Added] == ["/Comm/SystemSignals/Torque"]
+        assert [elementChange.Key for elementChange in snapshotDiff.Removed] == ["/Comm/Clusters/Ch/Pdu1FrameTriggering"]
+        assert [elementChange.Key for elementChange in snapshotDiff.Modified] == ["/Comm/ISignals/SpeedISignal"]
+        assert snapshotDiff.Modified[0].Changes == ["Length: 16 -> 8", \
+            "-SystemSignalRef /Comm/SystemSignals/Speed", "+SystemSignalRef /Comm/SystemSignals/Torque"]
+        assert snapshotDiff.ReferenceChanges == 2
+        assert snapshotDiff.Touches(["IISignal"])
+        assert not snapshotDiff.Touches(packages=["/Comm/Pdus"])
+        assert ModelSnapshot.DiffSnapshots(oldSnapshot, oldSnapshot).IsEmpty()
@@ -0,0 +1,77 @@
+"""
+--------------------------------------------------------------------------------
+File:        test_OfflineModel.py
+
+Description: Tests of the offline backend and its ARXML output.
+--------------------------------------------------------------------------------
+"""
+
+import xml.etree.ElementTree
+
+import pytest
+
+import OfflineModel
+import Utilities
+
+
+@pytest.fixture
+def offlineSignal():
+    """
+    Creates the SystemSignal Speed and its ISignal in the offline model.
+    Returns the ISignal.
+    """
+    Utilities.UseOfflineBackend()
+    systemSignal = Utilities.GetOrCreatePackage("/Comm/SystemSignals").Elements.AddNewSystemSignal("Speed")
+    iSignal = Utilities.CreateISignal(systemSignal)
+    yield iSignal
+    Utilities.SdApplication = None
+    Utilities.InvalidateModelCaches()
+
+
+def _ReadArxml(fileName):
+    namespace = "{%s}" % OfflineModel.AUTOSAR_NAMESPACE
+    root = xml.etree.ElementTree.parse(fileName).getroot()
+    for element in root.iter():
+        element.tag = element.tag.replace(namespace, "")
+    return root
+
+
+def testWriteArxml(offlineSignal, tmp_path):
+    offlineSignal.Length = 16
+    Utilities.SetSpecialDataString(offlineSignal, "NoRestart", "false")
+    arxmlFileName = str(tmp_path / "Signals.arxml")
+    assert OfflineModel.WriteArxml(arxmlFileName) == 10
+    root = _ReadArxml(arxmlFileName)
+    iSignal = root.find("AR-PACKAGES/AR-PACKAGE/AR-PACKAGES/AR-PACKAGE/ELEMENTS/I-SIGNAL")
+    # The properties are written in schema order, not in the order they were set.
+    assert [child.tag for child in iSignal] == ["SHORT-NAME", "DESC", "ADMIN-DATA", "LENGTH", "SYSTEM-SIGNAL-REF"]
+    assert iSignal.find("LENGTH").text == "16"
+    assert iSignal.find("SYSTEM-SIGNAL-REF").attrib == {"DEST": "SYSTEM-SIGNAL"}
+    assert iSignal.find("SYSTEM-SIGNAL-REF").text == "/Comm/SystemSignals/Speed"
+    sd = iSignal.find("ADMIN-DATA/SDGS/SDG/SD")
+    assert (sd.attrib, sd.text) == ({"GID": "NoRestart"}, "false")
+
+
+def testLookupsLikeSystemDesk(offlineSignal):
+    assert Utilities.GetElementByPath("/Comm/ISignals/SpeedISignal") == offlineSignal
+    assert offlineSignal.Parent.ShortName == "ISignals"
+    with pytest.raises(AttributeError):
+        offlineSignal.NoSuchProperty
+
+
+def testDuplicateShortNames(offlineSignal):
+    systemSignals = Utilities.GetElementByPath("/Comm/SystemSignals").Elements
+    with pytest.raises(Exception, match="already contains an element with the ShortName Speed"):
+        systemSignals.AddNewSystemSignal("Speed")
+    systemSignal = systemSignals.AddNewSystemSignal("Speed2")
+    with pytest.raises(Exception, match="already contains an element with the ShortName Speed"):
+        systemSignal.ShortName = "Speed"
+    assert systemSignals.Count == 2
+
+
+def testEcuConfigurationsAreNotWritten(offlineSignal, tmp_path):
+    Utilities.SdApplication.ActiveProject.EcuConfigurations.AddNew("Ecu")
+    arxmlFileName = str(tmp_path / "Signals.arxml")
+    with pytest.raises(Exception, match="ECU configurations"):
+        OfflineModel.WriteArxml(arxmlFileName)
+    assert OfflineModel.WriteArxml(arxmlFileName, packages=[Utilities.GetElementByPath("/Comm")]) == 7
@@ -0,0 +1,87 @@
+"""
+--------------------------------------------------------------------------------
+File:        test_ProcessTelemetry.py
+
+Description: Tests of the usage per span computed by the TelemetrySampler.
+--------------------------------------------------------------------------------
+"""
+
+import os
+
+import pytest
+
+import ProcessTelemetry
+import Profiling
+
+
+class _ScriptedProvider():
+    """
+    Provider which returns the given samples of each process one by one.
+    """
+    def __init__(self, samples):
+        # Lists of the tuples (timeNs, cpuSeconds, childrenCpuSeconds, rssBytes, readBytes, writeBytes) by pid.
+        self._Samples = dict((pid, list(pidSamples)) for (pid, pidSamples) in samples.items())
+
+    def Sample(self, pid):
+        if not self._Samples[pid]:
+            return None
+        return ProcessTelemetry.ProcessSample(*self._Samples[pid].pop(0))
+
+    def FindPids(self, name):
+        return sorted(self._Samples)
+
+
+def _Sampler():
+    provider = _ScriptedProvider({
+        1: [(0, 1.0, 0.0, 100, 0, 0), (1000, 1.5, 2.0, 300, 10, 5), (2000, 2.0, 4.0, 200, 30, 5),
+            (3000, 2.5, 4.0, 100, 30, 5)],
+        2: [(2500, 0.0, 0.0, 50, 0, 0)]})
+    sampler = ProcessTelemetry.TelemetrySampler(provider, interval=0.0)
+    sampler.Track(1, "SystemDesk")
+    sampler.Track(2, "Python", includeChildren=False)
+    for sampleIndex in range(3):
+        sampler.SampleOnce()
+    return sampler
+
+
+def testUsage():
+    usages = _Sampler().Usage(500, 2000)
+    assert len(usages) == 1
+    usage = usages[0]
+    # The sample at 0 is the start value, the CPU time includes the children.
+    assert (usage.ProcessName, usage.CpuSeconds, usage.PeakRssBytes, usage.ReadBytes, usage.WriteBytes) == \
+        ("SystemDesk", 5.0, 300, 30, 5)
+    assert usage.CpuLoad == pytest.approx(5.0 / 1.5e-6)
+
+
+def testUsageWithoutChildren():
+    usages = _Sampler().Usage(2400, 3000)
+    assert [(usage.ProcessName, usage.CpuSeconds, usage.PeakRssBytes) for usage in usages] == \
+        [("SystemDesk", 0.5, 100), ("Python", 0.0, 50)]
+    assert _Sampler().Usage(4000, 5000) == []
+
+
+def testAttachAndSummary():
+    spans = Profiling.SpanProfiler()
+    spans.Spans = [("VEOS build", 500, 1500, 0, 0, 1, {}), ("Short", 500, 10, 0, 2, 3, {})]
+    sampler = _Sampler()
+    sampler.Attach(spans, minSeconds=1e-6)
+    assert spans.Spans[0][6] == {"SystemDesk CPU [s]": "5.00", "SystemDesk peak RSS [MB]": "0.0", \
+        "SystemDesk read/write [MB]": "0.0/0.0"}
+    assert spans.Spans[1][6] == {}
+    summary = sampler.Summary(spans, minSeconds=1e-6).splitlines()
+    assert len(summary) == 2
+    assert summary[1].split()[:4] == ["VEOS", "build", "SystemDesk", "5.00"]
+
+
+def testTrackByName():
+    sampler = ProcessTelemetry.TelemetrySampler(_ScriptedProvider({7: [(0, 0.0, 0.0, 1, 0, 0)]}))
+    assert sampler.TrackByName("Veos") == 1
+    assert sampler.Processes == {7: "Veos"}
+
+
+@pytest.mark.skipif(not os.path.isdir("/proc/self"), reason="needs /proc")
+def testProcFsProvider():
+    sample = ProcessTelemetry.ProcFsProvider().Sample(os.getpid())
+    assert sample.RssBytes > 0
+    assert sample.CpuSeconds >= 0.0
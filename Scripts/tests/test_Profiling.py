@@ -0,0 +1,132 @@
+"""
+--------------------------------------------------------------------------------
+File:        test_Profiling.py
+
+Description: Tests of the COM call profiler, its latency histograms and the
+             span profiler.
+--------------------------------------------------------------------------------
+"""
+
+import json
+import threading
+import types
+
+import Profiling
+import Utilities
+
+
+def testHistogramPercentiles():
+    histogram = Profiling.LatencyHistogram()
+    for milliseconds in range(1, 101):
+        histogram.Add(milliseconds / 1000.0)
+    assert histogram.Count == 100
+    assert histogram.MaxTime == 0.1
+    # The percentiles are accurate to one bucket of about 9 percent.
+    for percent in (50, 95, 99):
+        assert percent / 1000.0 <= histogram.Percentile(percent) <= percent / 1000.0 * 1.1
+    assert histogram.Percentile(100) == 0.1
+    assert Profiling.LatencyHistogram().Percentile(50) == 0.0
+
+
+def testCallsAreAttributedToHelpers(fakeServer, tmp_path):
+    helpers = types.ModuleType("Helpers")
+    exec("def CountPackages(root):\n    return root.ArPackages.Count\n", vars(helpers))
+    profiler = Profiling.ComProfiler(str(tmp_path / "Report.txt"))
+    profiler.InstrumentModule(helpers)
+    application = profiler.Wrap(fakeServer.Application)
+    callCount = fakeServer.CallCount
+    root = application.ActiveProject.RootAutosar
+    root.ArPackages.AddNew("Comm")
+    assert helpers.CountPackages(root) == 1
+    assert profiler.CallCount == fakeServer.CallCount - callCount
+    assert sorted(profiler.CallSites) == [("<script>", "ActiveProject"), ("<script>", "AddNew"), \
+        ("<script>", "ArPackages"), ("<script>", "RootAutosar"), ("CountPackages", "ArPackages"), \
+        ("CountPackages", "Count")]
+    # Wrapped objects keep their identity and are unwrapped for the model.
+    assert root == fakeServer.Application.ActiveProject.RootAutosar
+    profiler.WriteReport()
+    with open(profiler.ReportFile) as reportFile:
+        report = reportFile.read()
+    assert report.startswith("COM calls: 6,")
+    assert "CountPackages" in report
+
+
+def testGeneratorHelpers(fakeServer):
+    helpers = types.ModuleType("Helpers")
+    exec("def IteratePackages(root):\n    for package in root.ArPackages:\n        yield package.ShortName\n", \
+        vars(helpers))
+    profiler = Profiling.ComProfiler()
+    profiler.InstrumentModule(helpers)
+    root = profiler.Wrap(fakeServer.Application).ActiveProject.RootAutosar
+    for shortName in ("A", "B"):
+        Utilities.GetOrCreatePackage("/" + shortName)
+    for shortName in helpers.IteratePackages(root):
+        root.ArPackages.Item(shortName)
+    assert profiler.CallSites[("IteratePackages", "ShortName")].Count == 2
+    assert profiler.CallSites[("<script>", "Item")].Count == 2
+
+
+def _BuildSpans(spans):
+    with spans.Span("Build", target="VEOS"):
+        for exportIndex in range(2):
+            with spans.Span("Export"):
+                pass
+        spans.Profiled()(_Shutdown)()
+
+
+def _Shutdown():
+    pass
+
+
+def testNestedSpans():
+    spans = Profiling.SpanProfiler()
+    _BuildSpans(spans)
+    assert sorted((path, totals[0]) for (path, totals) in spans.Totals.items()) == \
+        [(("Build",), 1), (("Build", "Export"), 2), (("Build", "_Shutdown"), 1)]
+    (count, totalNs, childNs) = spans.Totals[("Build",)]
+    assert childNs == spans.Totals[("Build", "Export")][1] + spans.Totals[("Build", "_Shutdown")][1]
+    assert childNs <= totalNs
+    summary = spans.Summary().splitlines()
+    # The children are indented below their parent.
+    assert summary[1].startswith("Build ")
+    assert sorted(line.split()[0] for line in summary[2:]) == ["Export", "_Shutdown"]
+    assert all(line.startswith("  ") for line in summary[2:])
+
+
+def testChromeTrace(tmp_path):
+    spans = Profiling.SpanProfiler()
+    _BuildSpans(spans)
+    traceFileName = str(tmp_path / "Build.trace.json")
+    spans.WriteChromeTrace(traceFileName)
+    with open(traceFileName) as traceFile:
+        events = json.load(traceFile)["traceEvents"]
+    assert [event["name"] for event in events] == ["Export", "Export", "_Shutdown", "Build"]
+    assert set(event["ph"] for event in events) == {"X"}
+    (build, export) = (events[3], events[0])
+    assert build["args"] == {"target": "VEOS"}
+    assert build["ts"] <= export["ts"] and export["ts"] + export["dur"] <= build["ts"] + build["dur"]
+
+
+def testSpeedscope(tmp_path):
+    spans = Profiling.SpanProfiler()
+    _BuildSpans(spans)
+    thread = threading.Thread(target=_BuildSpans, args=(spans,))
+    thread.start()
+    thread.join()
+    speedscopeFileName = str(tmp_path / "Build.speedscope.json")
+    spans.WriteSpeedscope(speedscopeFileName, "Build")
+    with open(speedscopeFileName) as speedscopeFile:
+        speedscope = json.load(speedscopeFile)
+    frameNames = [frame["name"] for frame in speedscope["shared"]["frames"]]
+    assert len(speedscope["profiles"]) == 2
+    for profile in speedscope["profiles"]:
+        events = [(event["type"], frameNames[event["frame"]]) for event in profile["events"]]
+        assert events == [("O", "Build"), ("O", "Export"), ("C", "Export"), ("O", "Export"), ("C", "Export"), \
+            ("O", "_Shutdown"), ("C", "_Shutdown"), ("C", "Build")]
+
+
+def testMaxSpans():
+    spans = Profiling.SpanProfiler(maxSpans=2)
+    _BuildSpans(spans)
+    assert len(spans.ChromeTrace()["traceEvents"]) == 2
+    assert spans.Totals[("Build",)][0] == 1
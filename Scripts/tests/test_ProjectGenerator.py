@@ -0,0 +1,65 @@
+"""
+--------------------------------------------------------------------------------
+File:        test_ProjectGenerator.py
+
+Description: Tests of the generated projects and the command line of
+             ProjectGenerator.py.
+--------------------------------------------------------------------------------
+"""
+
+import os
+import re
+import subprocess
+import sys
+
+import pytest
+
+import OfflineModel
+import ProjectGenerator
+import Utilities
+
+# Small shape, which is generated in a few milliseconds.
+_TinyShape = ProjectGenerator.ProjectShape(swcCount=8, packageFanOut=2, signalCount=40, taskCount=5)
+
+
+@pytest.fixture
+def offlineBackend():
+    Utilities.UseOfflineBackend()
+    yield
+    Utilities.SdApplication = None
+    Utilities.InvalidateModelCaches()
+
+
+def _GenerateArxml(seed, fileName):
+    Utilities.UseOfflineBackend()
+    generated = ProjectGenerator.GenerateProject(_TinyShape, seed)
+    OfflineModel.WriteArxml(fileName, packages=[generated.RootPackage])
+    with open(fileName, encoding="utf-8") as arxmlFile:
+        return (generated, arxmlFile.read())
+
+
+def testSameSeedSameProject(offlineBackend, tmp_path):
+    (generated, arxml) = _GenerateArxml(1, str(tmp_path / "First.arxml"))
+    summary = generated.Summary()
+    assert (summary["Components"], summary["SystemSignals"], summary["OsTasks"]) == (8, 40, 5)
+    # Each of the two runnables of a SWC has a TimingEvent.
+    assert summary["MappedEvents"] == 16
+    assert _GenerateArxml(1, str(tmp_path / "Second.arxml"))[1] == arxml
+    assert _GenerateArxml(2, str(tmp_path / "Other.arxml"))[1] != arxml
+
+
+def testConstantsHaveUniqueNames(offlineBackend, tmp_path):
+    arxml = _GenerateArxml(1, str(tmp_path / "Generated.arxml"))[1]
+    constantNames = re.findall(r"<CONSTANT-SPECIFICATION>\s*<SHORT-NAME>([^<]*)<", arxml)
+    assert len(constantNames) > 0
+    assert len(set(constantNames)) == len(constantNames)
+
+
+def testCommandLine(tmp_path):
+    arxmlFileName = str(tmp_path / "Generated.arxml")
+    scriptDir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    process = subprocess.run([sys.executable, "ProjectGenerator.py", "--shape", "Small", "--seed", "1", \
+        arxmlFileName], cwd=scriptDir, capture_output=True, text=True)
+    assert process.returncode == 0, process.stderr
+    assert re.search(r"^\d+ elements written to ", process.stdout, re.MULTILINE)
+    assert os.path.getsize(arxmlFileName) > 0
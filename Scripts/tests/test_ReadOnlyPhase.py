@@ -0,0 +1,53 @@
+"""
+--------------------------------------------------------------------------------
+File:        test_ReadOnlyPhase.py
+
+Description: Tests of the ReadOnlyPhase and its read-through proxies.
+--------------------------------------------------------------------------------
+"""
+
+import Utilities
+
+
+def testProxiesCacheReads(fakeServer, ecuConfiguration):
+    osConfiguration = Utilities.FindModuleConfiguration(ecuConfiguration, "Os")
+    with Utilities.ReadOnlyPhase() as phase:
+        assert phase.Wrap(osConfiguration).OsTasks.Item("Task1").ShortName == "Task1"
+        callCount = fakeServer.CallCount
+        assert phase.Wrap(osConfiguration).OsTasks.Item("Task1").ShortName == "Task1"
+        assert fakeServer.CallCount == callCount
+        # OsTasks, Item, the result of Item("Task1") and ShortName
+        assert phase.Statistics["Hits"] == 4
+    # After the phase, the proxies read from the model again.
+    osTasks = phase.Wrap(osConfiguration).OsTasks
+    callCount = fakeServer.CallCount
+    assert osTasks.Count == 2
+    assert fakeServer.CallCount > callCount
+
+
+def testWritesDiscardCachedValues(ecuConfiguration):
+    osConfiguration = Utilities.FindModuleConfiguration(ecuConfiguration, "Os")
+    with Utilities.ReadOnlyPhase() as phase:
+        osTasks = phase.Wrap(osConfiguration).OsTasks
+        assert osTasks.Count == 2
+        osTask = osTasks.AddNew("Task3")
+        assert osTasks.Count == 3
+        osTask.ShortName = "Task4"
+        assert osTasks.Item(2).ShortName == "Task4"
+
+
+def testProxiesKeepTheElementIdentity(ecuConfiguration):
+    rteConfiguration = Utilities.FindModuleConfiguration(ecuConfiguration, "Rte")
+    osTask = Utilities.FindModuleConfiguration(ecuConfiguration, "Os").OsTasks.Item("Task2")
+    with Utilities.ReadOnlyPhase() as phase:
+        proxy = phase.Wrap(osTask)
+        assert proxy == osTask
+        assert phase.Wrap(osTask) is proxy
+        # Proxies are unwrapped before they are passed to the model.
+        mapping = phase.Wrap(rteConfiguration).RteSwComponentInstances.Item("Swc1").RteEventToTaskMappings \
+            .AddNew("Event0")
+        mapping.RteMappedToTaskRef = proxy
+        mapping.RtePositionInTask = 0
+        assert Utilities.FindNextPositionInTask(phase.Wrap(rteConfiguration), proxy) == 1
+    assert rteConfiguration.RteSwComponentInstances.Item("Swc1").RteEventToTaskMappings.Item("Event0") \
+        .RteMappedToTaskRef == osTask
@@ -0,0 +1,95 @@
+"""
+--------------------------------------------------------------------------------
+File:        test_ReferenceIndex.py
+
+Description: Tests of the ReferenceIndex, the dependency-ordered bulk delete
+             and the incremental refresh of the SignalPathIndex.
+--------------------------------------------------------------------------------
+"""
+
+import pytest
+
+import Utilities
+
+
+def testFindReferrers(commMatrix):
+    referenceIndex = Utilities.GetReferenceIndex()
+    assert referenceIndex.FindReferrers(commMatrix["SystemSignal"]) == [(commMatrix["ISignal"], "SystemSignalRef")]
+    assert referenceIndex.FindReferences(commMatrix["ISignal"]) == [("SystemSignalRef", commMatrix["SystemSignal"])]
+
+
+def testIndexFollowsHelpers(commMatrix):
+    referenceIndex = Utilities.GetReferenceIndex()
+    systemSignal = Utilities.GetElementByPath("/Comm/SystemSignals").Elements.AddNewSystemSignal("Late")
+    iSignal = Utilities.CreateISignal(systemSignal)
+    assert referenceIndex.FindReferrers(systemSignal) == [(iSignal, "SystemSignalRef")]
+    assert referenceIndex.GetArPath(iSignal) == "/Comm/ISignals/LateISignal"
+
+
+def testFindImpact(commMatrix):
+    systemSignals = Utilities.GetElementByPath("/Comm/SystemSignals")
+    impact = Utilities.GetReferenceIndex().FindImpact(systemSignals)
+    assert impact == [(commMatrix["ISignal"], "SystemSignalRef", commMatrix["SystemSignal"])]
+    # The references between the deleted elements do not count.
+    impact = Utilities.GetReferenceIndex().FindImpact([systemSignals, Utilities.GetElementByPath("/Comm/ISignals")])
+    mapping = commMatrix["IPdu"].ISignalToPduMappings.Elements[0]
+    assert impact == [(mapping, "ISignalRef", commMatrix["ISignal"])]
+
+
+def testDeleteElementsRefusesReferencedElements(commMatrix):
+    with pytest.raises(Exception, match="still referenced"):
+        Utilities.DeleteElements([commMatrix["SystemSignal"]])
+    assert Utilities.GetElementByPath("/Comm/SystemSignals/Speed") == commMatrix["SystemSignal"]
+
+
+def testGetDeletionOrder(commMatrix):
+    referenceIndex = Utilities.GetReferenceIndex()
+    order = referenceIndex.GetDeletionOrder([commMatrix["SystemSignal"], commMatrix["ISignal"]])
+    assert order == [commMatrix["ISignal"], commMatrix["SystemSignal"]]
+    order = referenceIndex.GetDeletionOrder([commMatrix["IPdu"], commMatrix["Frame"], commMatrix["FrameTriggering"]])
+    assert order == [commMatrix["FrameTriggering"], commMatrix["Frame"], commMatrix["IPdu"]]
+
+
+def testDeleteElements(commMatrix):
+    deleted = Utilities.DeleteElements([commMatrix["FrameTriggering"], commMatrix["Frame"]])
+    assert deleted == [commMatrix["FrameTriggering"], commMatrix["Frame"]]
+    assert Utilities.GetElementByPath("/Comm/Frames/Pdu1Frame") == None
+    assert Utilities.GetReferenceIndex().FindReferrers(commMatrix["IPdu"]) == []
+
+
+def testSignalPath(commMatrix):
+    signalPathIndex = Utilities.GetSignalPathIndex()
+    assert signalPathIndex.FindDownstream(commMatrix["ISignal"], "PhysicalChannel") == [commMatrix["Channel"]]
+    assert signalPathIndex.FindUpstream(commMatrix["Channel"], "SystemSignal") == [commMatrix["SystemSignal"]]
+    assert signalPathIndex.GetKind(commMatrix["IPdu"]) == "IPdu"
+
+
+def testSignalPathRefresh(commMatrix):
+    signalPathIndex = Utilities.GetSignalPathIndex()
+    assert signalPathIndex.FindDownstream(commMatrix["Frame"]) == [commMatrix["FrameTriggering"], commMatrix["Channel"]]
+    Utilities.DeleteElements([commMatrix["FrameTriggering"]])
+    assert signalPathIndex.FindDownstream(commMatrix["Frame"]) == []
+    iPdu = Utilities.GetElementByPath("/Comm/Pdus").Elements.AddNewISignalIPdu("Pdu2")
+    iPdu.Length = 8
+    Utilities.AddISignalToPduMapping(iPdu, commMatrix["ISignal"])
+    frame = Utilities.CreateFrame(iPdu)
+    assert signalPathIndex.FindUpstream(frame, "IPdu") == [iPdu]
+    assert signalPathIndex.FindDownstream(commMatrix["ISignal"], "Frame") == [commMatrix["Frame"], frame]
+
+
+def testSignalPathOfDataElement(commMatrix):
+    swcPackage = Utilities.GetOrCreatePackage("/Swcs")
+    swc = swcPackage.Elements.AddNewApplicationSwComponentType("Swc")
+    port = swc.Ports.AddNewPPortPrototype("PortX")
+    dataElement = swcPackage.Elements.AddNewSenderReceiverInterface("If").DataElements.AddNew("Speed")
+    system = Utilities.GetOrCreatePackage("/Systems").Elements.AddNewSystem("System")
+    senderReceiverMapping = system.Mappings.AddNewSystemMapping("Mapping").DataMappings \
+        .AddNewSenderReceiverToSignalMapping()
+    dataElementIref = senderReceiverMapping.SetNewDataElementIref()
+    dataElementIref.ContextComponentRefs.Add(swc)
+    dataElementIref.ContextPortRef = port
+    dataElementIref.TargetDataPrototypeRef = dataElement
+    senderReceiverMapping.SystemSignalRef = commMatrix["SystemSignal"]
+    Utilities.InvalidateModelCaches()
+    signalPathIndex = Utilities.GetSignalPathIndex()
+    assert signalPathIndex.FindFrames("Swc", "PortX", "Speed") == [commMatrix["Frame"]]
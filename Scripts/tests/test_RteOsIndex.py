@@ -0,0 +1,116 @@
+"""
+--------------------------------------------------------------------------------
+File:        test_RteOsIndex.py
+
+Description: Tests of the RteOsIndex behind the RTE and OS mapping helpers.
+--------------------------------------------------------------------------------
+"""
+
+import pytest
+
+import Utilities
+
+
+@pytest.fixture
+def rteOs(ecuConfiguration):
+    """
+    Maps Event0 and Event1 of Swc1 to Task1, the BSW main function
+    Com_MainFunctionRx to Task2 and adds an alarm which activates Task2.
+    Returns the configurations and tasks by name.
+    """
+    rteConfiguration = Utilities.FindModuleConfiguration(ecuConfiguration, "Rte")
+    osConfiguration = Utilities.FindModuleConfiguration(ecuConfiguration, "Os")
+    (task1, task2) = (osConfiguration.OsTasks.Item("Task1"), osConfiguration.OsTasks.Item("Task2"))
+    swcInstance = rteConfiguration.RteSwComponentInstances.Item("Swc1")
+    for (eventName, positionInTask) in (("Event0", 0), ("Event1", 4)):
+        mapping = swcInstance.RteEventToTaskMappings.AddNew(eventName)
+        mapping.RteMappedToTaskRef = task1
+        mapping.RtePositionInTask = positionInTask
+
+    bswModule = Utilities.GetOrCreatePackage("/Bsw").Elements.AddNewBswModuleDescription("Com")
+    bswEvent = bswModule.InternalBehaviors.AddNew("ComBehavior").Events.AddNewBswTimingEvent("ComTimer")
+    bswEvent.StartsOnEventRef = bswModule.ProvidedEntrys.AddNewBswModuleEntity("Com_MainFunctionRx")
+    bswMapping = rteConfiguration.RteBswModuleInstances.AddNew("Com").RteBswEventToTaskMappings.AddNew("ComMapping")
+    bswMapping.RteBswEventRef = bswEvent
+    bswMapping.RteBswMappedToTaskRef = task2
+    bswMapping.RteBswPositionInTask = 2
+
+    osAlarm = osConfiguration.OsAlarms.AddNew("AlarmTask2")
+    osAlarm.SetNewOsAlarmAction().OsAlarmActivateTaskRef = task2
+    return {"Rte": rteConfiguration, "Os": osConfiguration, "Task1": task1, "Task2": task2, \
+        "BswMapping": bswMapping, "Alarm": osAlarm}
+
+
+def testFindNextPositionInTask(rteOs):
+    assert Utilities.FindNextPositionInTask(rteOs["Rte"], rteOs["Task1"]) == 5
+    assert Utilities.FindNextPositionInTask(rteOs["Rte"], rteOs["Task2"]) == 3
+    assert Utilities.FindNextPositionInTask(None, rteOs["Task1"]) == 0
+
+
+def testIndexFollowsMappingHelpers(ecuConfiguration, rteOs):
+    Utilities.AddRteEventMapping(ecuConfiguration, rteOs["Task1"], "Swc2", "Event0")
+    assert Utilities.FindNextPositionInTask(rteOs["Rte"], rteOs["Task1"]) == 6
+    # Moving the last mapping to another task frees its position.
+    Utilities.UpdateRteEventMapping(ecuConfiguration, rteOs["Task2"], "Swc2", "Event0")
+    assert Utilities.FindNextPositionInTask(rteOs["Rte"], rteOs["Task1"]) == 5
+    assert Utilities.FindNextPositionInTask(rteOs["Rte"], rteOs["Task2"]) == 4
+
+
+def testIndexSavesComCalls(fakeServer, rteOs):
+    Utilities.FindNextPositionInTask(rteOs["Rte"], rteOs["Task1"])
+    callCount = fakeServer.CallCount
+    for index in range(10):
+        Utilities.FindNextPositionInTask(rteOs["Rte"], rteOs["Task1"])
+    # Only the name of the task is read.
+    assert fakeServer.CallCount - callCount <= 10
+
+
+def testFindOsTaskForBswMainFunction(rteOs):
+    assert Utilities.FindOsTaskForBswMainFunction(rteOs["Rte"], "Com", "Com_MainFunctionRx") == rteOs["Task2"]
+    assert Utilities.FindOsTaskForBswMainFunction(rteOs["Rte"], "Com", "MainFunctionRx") == rteOs["Task2"]
+    assert Utilities.FindOsTaskForBswMainFunction(rteOs["Rte"], "Com", "MainFunctionTx") == None
+    assert Utilities.GetRteOsIndex().FindBswEventToTaskMapping(rteOs["Rte"], "ComMapping") == rteOs["BswMapping"]
+
+
+def testFindOsAlarmForOsTask(rteOs):
+    assert Utilities.FindOsAlarmForOsTask(rteOs["Task2"]) == rteOs["Alarm"]
+    assert Utilities.FindOsAlarmForOsTask(rteOs["Task1"]) == None
+
+
+def testNoteOsTaskDeleted(rteOs):
+    rteOsIndex = Utilities.GetRteOsIndex()
+    assert rteOsIndex.FindOsAlarmForOsTask(rteOs["Task2"]) == rteOs["Alarm"]
+    assert rteOsIndex.FindNextPositionInTask(rteOs["Rte"], rteOs["Task2"]) == 3
+    rteOsIndex.NoteOsTaskDeleted(rteOs["Task2"])
+    assert rteOsIndex.FindOsAlarmForOsTask(rteOs["Task2"]) == None
+    assert rteOsIndex.FindNextPositionInTask(rteOs["Rte"], rteOs["Task2"]) == 0
+    assert rteOsIndex.FindNextPositionInTask(rteOs["Rte"], rteOs["Task1"]) == 5
+
+
+def testApplyRteEventMappings(ecuConfiguration, rteOs):
+    rows = [("Swc1", "Event0", "Task1", 0), ("Swc1", "Event2", "Task1"), ("Swc2", "Event0", "Task2", None, None, None)]
+    assert Utilities.ApplyRteEventMappings(ecuConfiguration, rows) == (2, 0)
+    swcInstance = rteOs["Rte"].RteSwComponentInstances.Item("Swc1")
+    assert swcInstance.RteEventToTaskMappings.Item("Event2").RtePositionInTask == 5
+    assert rteOs["Rte"].RteSwComponentInstances.Item("Swc2").RteEventToTaskMappings.Item("Event0") \
+        .RtePositionInTask == 3
+    # Applying the same rows again changes nothing.
+    assert Utilities.ApplyRteEventMappings(ecuConfiguration, rows) == (0, 0)
+    assert Utilities.ApplyRteEventMappings(ecuConfiguration, [("Swc1", "Event1", rteOs["Task2"])]) == (0, 1)
+    assert swcInstance.RteEventToTaskMappings.Item("Event1").RteMappedToTaskRef == rteOs["Task2"]
+    assert swcInstance.RteEventToTaskMappings.Item("Event1").RtePositionInTask == 4
+
+
+def testApplyRteEventMappingsRefusesUnknownTasks(ecuConfiguration, rteOs):
+    with pytest.raises(Exception, match="No element Task9 found in OsTasks"):
+        Utilities.ApplyRteEventMappings(ecuConfiguration, [("Swc1", "Event2", "Task9")])
+
+
+def testReadRteEventMappings(tmp_path):
+    csvFileName = str(tmp_path / "Mappings.csv")
+    with open(csvFileName, "w") as csvFile:
+        csvFile.write("Component,Event,Task,Position,OsAlarm\n")
+        csvFile.write("Swc1,Event0,Task1,3,\n")
+        csvFile.write("Swc2, Event1 ,Task2,,AlarmTask2\n")
+    assert Utilities.ReadRteEventMappings(csvFileName) == \
+        [("Swc1", "Event0", "Task1", 3, None, None), ("Swc2", "Event1", "Task2", None, None, "AlarmTask2")]
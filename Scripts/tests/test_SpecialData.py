@@ -0,0 +1,60 @@
+"""
+--------------------------------------------------------------------------------
+File:        test_SpecialData.py
+
+Description: Tests of the SpecialDataAccessor behind the special data helpers.
+--------------------------------------------------------------------------------
+"""
+
+import pytest
+
+import Utilities
+
+
+@pytest.fixture
+def runnables(fakeServer):
+    runnableEntities = Utilities.GetOrCreatePackage("/Swcs").Elements.AddNewApplicationSwComponentType("Swc") \
+        .InternalBehaviors.AddNew("Behavior").Runnables
+    return [runnableEntities.AddNew("Run%d" % runnableIndex) for runnableIndex in range(3)]
+
+
+def testSetAndGetSpecialData(runnables):
+    Utilities.SetSpecialData([(runnables[0], "NoRestartCode", "false"), (runnables[1], "NoRestartCode", "true")])
+    Utilities.SetSpecialDataString(runnables[0], "Owner", "Chassis")
+    Utilities.SetSpecialDataString(runnables[0], "NoRestartCode", "true")
+    # Read the values back from the model.
+    Utilities.GetSpecialDataAccessor().Clear()
+    assert Utilities.GetSpecialData(runnables) == [(runnables[0], "NoRestartCode", "true"), \
+        (runnables[0], "Owner", "Chassis"), (runnables[1], "NoRestartCode", "true")]
+    sdgs = runnables[0].AdminData.Sdgs
+    assert sdgs.Count == 1
+    assert sdgs.Item(0).SdgContents.Sd.Count == 2
+
+
+def testSetSpecialDataRunnableKind(runnables):
+    Utilities.SetSpecialDataRunnableKind(runnables[2], "InitRunnable")
+    Utilities.SetSpecialDataRunnableKind(runnables[2], "TerminateRunnable")
+    Utilities.GetSpecialDataAccessor().Clear()
+    assert Utilities.GetSpecialData(runnables, "edve:RunnableKind") == [(runnables[2], None, "TerminateRunnable")]
+    assert Utilities.GetSpecialData(runnables) == []
+
+
+def testAccessorSavesComCalls(fakeServer, runnables):
+    Utilities.SetSpecialDataString(runnables[0], "Tag0", "0")
+    callCount = fakeServer.CallCount
+    Utilities.SetSpecialDataString(runnables[0], "Tag0", "1")
+    # Only the key of the element is read and the value is set.
+    assert fakeServer.CallCount - callCount <= 2
+
+
+def testAccessorKeepsLastElements(fakeServer, runnables):
+    specialDataAccessor = Utilities.SpecialDataAccessor(maxElements=2)
+    for runnable in runnables:
+        specialDataAccessor.SetValue(runnable, "edve:taggedStringValue", "Tag", runnable.ShortName)
+    callCount = fakeServer.CallCount
+    assert specialDataAccessor.GetValues(runnables[2], "edve:taggedStringValue") == {"Tag": "Run2"}
+    lastElementCalls = fakeServer.CallCount - callCount
+    # The SDGs of the first element were dropped and are collected again.
+    callCount = fakeServer.CallCount
+    assert specialDataAccessor.GetValues(runnables[0], "edve:taggedStringValue") == {"Tag": "Run0"}
+    assert fakeServer.CallCount - callCount > lastElementCalls
@@ -0,0 +1,43 @@
+"""
+--------------------------------------------------------------------------------
+File:        test_UtilitiesBenchmark.py
+
+Description: Tests of the fake COM server and the COM call gate of
+             UtilitiesBenchmark.py.
+--------------------------------------------------------------------------------
+"""
+
+import UtilitiesBenchmark
+import Utilities
+
+
+def testFakeServerCountsCalls(fakeServer):
+    Utilities.GetOrCreatePackage("/Comm")
+    assert fakeServer.CallCount == sum(fakeServer.Calls.values())
+    assert fakeServer.CallCount > 0
+    fakeServer.Reset()
+    with fakeServer.Paused():
+        Utilities.GetOrCreatePackage("/Comm/ISignals")
+    assert fakeServer.CallCount == 0
+
+
+def testComCallsWithinBaseline():
+    results = UtilitiesBenchmark.RunBenchmark(sizes=(1000,))
+    assert [result.ScenarioName for result in results] == ["RteEventMappings", "CommMatrix", "ValueSpecifications"]
+    assert UtilitiesBenchmark.CompareWithBaseline(results, UtilitiesBenchmark.LoadBaseline()) == []
+
+
+def testWallTimesAreOptIn(tmp_path):
+    baselineFileName = str(tmp_path / "Baseline.json")
+    result = UtilitiesBenchmark.BenchmarkResult("CommMatrix", 10, 100, 1.0, [])
+    UtilitiesBenchmark.SaveBaseline([result], baselineFileName)
+    assert UtilitiesBenchmark.LoadBaseline(baselineFileName) == {"CommMatrix": {"10": {"ComCalls": 100}}}
+    UtilitiesBenchmark.SaveBaseline([result], baselineFileName, withTimes=True)
+    baseline = UtilitiesBenchmark.LoadBaseline(baselineFileName)
+    slowerResult = UtilitiesBenchmark.BenchmarkResult("CommMatrix", 10, 100, 2.0, [])
+    assert UtilitiesBenchmark.CompareWithBaseline([slowerResult], baseline) == []
+    assert UtilitiesBenchmark.CompareWithBaseline([slowerResult], baseline, checkTimes=True) == \
+        ["CommMatrix(10): 2.000 s, baseline 1.000 s"]
+    moreCallsResult = UtilitiesBenchmark.BenchmarkResult("CommMatrix", 10, 110, 1.0, [])
+    assert UtilitiesBenchmark.CompareWithBaseline([moreCallsResult], baseline) == \
+        ["CommMatrix(10): 110 COM calls, baseline 100"]
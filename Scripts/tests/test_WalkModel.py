@@ -0,0 +1,64 @@
+"""
+--------------------------------------------------------------------------------
+File:        test_WalkModel.py
+
+Description: Tests of WalkModel and IterateCollection.
+--------------------------------------------------------------------------------
+"""
+
+import pytest
+
+import Utilities
+
+
+@pytest.fixture
+def model(fakeServer):
+    for packagePath in ("/Comm/Signals", "/Comm/Pdus", "/Swcs"):
+        Utilities.GetOrCreatePackage(packagePath)
+    signals = Utilities.GetElementByPath("/Comm/Signals").Elements
+    for signalIndex in range(5):
+        signals.AddNewISignal("Signal%d" % signalIndex).Length = signalIndex
+    Utilities.GetElementByPath("/Comm/Pdus").Elements.AddNewISignalIPdu("Pdu")
+    Utilities.GetElementByPath("/Swcs").Elements.AddNewApplicationSwComponentType("Swc")
+
+
+def testWalkModel(model):
+    root = Utilities.SdApplication.ActiveProject.RootAutosar
+    walkItems = list(Utilities.WalkModel(root, chunkSize=2))
+    assert [walkItem.ArPath for walkItem in walkItems] == ["/Comm", "/Comm/Signals"] \
+        + ["/Comm/Signals/Signal%d" % signalIndex for signalIndex in range(5)] \
+        + ["/Comm/Pdus", "/Comm/Pdus/Pdu", "/Swcs", "/Swcs/Swc"]
+    assert [walkItem.Depth for walkItem in walkItems[:3]] == [1, 2, 3]
+    assert walkItems[2].Element == Utilities.GetElementByPath("/Comm/Signals/Signal0")
+
+
+def testWalkModelFiltersAndPrunes(model):
+    root = Utilities.GetElementByPath("/Comm")
+    walkItems = Utilities.WalkModel(root, "IISignal", properties=["Length"], rootArPath="/Comm")
+    assert [(walkItem.ArPath, walkItem.Properties["Length"]) for walkItem in walkItems][-2:] == \
+        [("/Comm/Signals/Signal3", 3), ("/Comm/Signals/Signal4", 4)]
+    root = Utilities.SdApplication.ActiveProject.RootAutosar
+    walkItems = Utilities.WalkModel(root, ["IARPackage", "IISignalIPdu"], \
+        prune=lambda walkItem: walkItem.ArPath == "/Comm/Signals")
+    assert [walkItem.ArPath for walkItem in walkItems] == ["/Comm", "/Comm/Signals", "/Comm/Pdus", "/Comm/Pdus/Pdu", \
+        "/Swcs"]
+
+
+def testWalkModelStopsEarly(fakeServer, model):
+    root = Utilities.SdApplication.ActiveProject.RootAutosar
+    callCount = fakeServer.CallCount
+    for walkItem in Utilities.WalkModel(root):
+        pass
+    fullWalkCalls = fakeServer.CallCount - callCount
+    callCount = fakeServer.CallCount
+    for walkItem in Utilities.WalkModel(root):
+        if walkItem.ElementType == "IISignal":
+            break
+    assert fakeServer.CallCount - callCount < fullWalkCalls
+
+
+def testIterateCollection(model):
+    signals = Utilities.GetElementByPath("/Comm/Signals").Elements
+    assert [signal.ShortName for signal in Utilities.IterateCollection(signals, chunkSize=2)] == \
+        ["Signal%d" % signalIndex for signalIndex in range(5)]
+    assert list(Utilities.IterateCollection(Utilities.GetElementByPath("/Swcs").ArPackages)) == []